@@ -425,6 +425,18 @@ def _target_table_for(dialect: str) -> str:
     }[dialect]
 
 
+def _target_columns_for(dialect: str, df: pd.DataFrame | None) -> list[str] | None:
+    column_map: dict[str, list[str] | None] = {
+        "returns_report": list(df.columns) if df is not None else None,
+        "reimbursements_report": list(df.columns) if df is not None else None,
+        "fee_preview_report": list(amazon_fee_preview.TARGET_COLUMNS),
+        "inventory_ledger_report": list(amazon_inventory_ledger.TARGET_COLUMNS),
+        "ads_sp_cost_daily_report": list(amazon_ads_sp_cost.TARGET_COLUMNS),
+        "settlements_txn_report": list(amazon_settlements.TARGET_COLUMNS),
+    }
+    return column_map[dialect]
+
+
 def _build_import_meta(
     file_path: Path,
     *,
@@ -589,15 +601,7 @@ def import_file(  # noqa: C901
         idempotent_enabled=idempotent_enabled,
     )
 
-    column_map: dict[str, list[str] | None] = {
-        "returns_report": list(df.columns) if df is not None else None,
-        "reimbursements_report": list(df.columns) if df is not None else None,
-        "fee_preview_report": list(amazon_fee_preview.TARGET_COLUMNS),
-        "inventory_ledger_report": list(amazon_inventory_ledger.TARGET_COLUMNS),
-        "ads_sp_cost_daily_report": list(amazon_ads_sp_cost.TARGET_COLUMNS),
-        "settlements_txn_report": list(amazon_settlements.TARGET_COLUMNS),
-    }
-    columns = column_map[dialect]
+    columns = _target_columns_for(dialect, df)
     conflict_cols = _conflict_columns_for(dialect, df=df, metadata=metadata)
 
     engine = create_engine(build_dsn(sync=True))
@@ -0,0 +1,429 @@
+"""Split one large CSV import into byte-range shards that load in parallel.
+
+The coordinator plans the shards and claims the ``load_log`` row of the whole file. Every shard
+loads its byte range in its own transaction together with a marker row, so a failed shard is
+retried on its own and a rerun of a failed import skips the shards that already landed. The
+finalizer records the outcome on the parent row and runs ANALYZE once for the whole file.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import structlog
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.orm import sessionmaker
+
+from awa_common.db.load_log import (
+    LOAD_LOG,
+    STATUS_SUCCESS,
+    get_load_log_id,
+    mark_failed,
+    mark_success,
+    reclaim_failed_load_log,
+    soft_update_meta_on_duplicate,
+    try_insert_load_log,
+)
+from awa_common.dsn import build_dsn
+from awa_common.etl.idempotency import compute_idempotency_key
+from awa_common.metrics import record_etl_run, record_etl_skip
+from awa_common.settings import settings
+from etl.load_csv import (
+    _INGEST_CFG,
+    SOURCE_NAME,
+    ImportValidationError,
+    _build_import_meta,
+    _conflict_columns_for,
+    _derive_idempotency_key,
+    _detect_dialect_from_columns,
+    _normalize_for_dialect,
+    _sha256_file,
+    _target_columns_for,
+    _target_table_for,
+)
+from services.etl.dialects import normalise_headers, schemas
+from services.worker.copy_loader import copy_df_via_temp
+
+SHARD_SOURCE = f"{SOURCE_NAME}.shard"
+_SCAN_BLOCK_BYTES = 1024 * 1024
+_DELIMITERS = (",", ";", "\t", "|")
+logger = structlog.get_logger(__name__).bind(service="ingest", etl_name="sharded")
+
+
+@dataclass(slots=True, frozen=True)
+class ShardPlan:
+    """Byte layout of a CSV file: where the header ends and the ``[start, end)`` range of each shard."""
+
+    size: int
+    header_end: int
+    ranges: tuple[tuple[int, int], ...]
+
+
+def plan_shards(path: Path, *, shard_bytes: int) -> ShardPlan:
+    """Cut ``path`` into ranges of roughly ``shard_bytes`` that start and end on record boundaries.
+
+    A newline only ends a record when it is outside a quoted field, so quoted multi-line values
+    never straddle two shards. The file is scanned once in blocks; quote parity is carried across
+    blocks by counting quotes, and newlines are only inspected near each cut point.
+    """
+
+    if shard_bytes <= 0:
+        raise ValueError("shard_bytes must be positive")
+    size = path.stat().st_size
+    boundaries: list[int] = []
+    target = 0  # the first record boundary closes the header
+    in_quotes = False
+    offset = 0
+    with path.open("rb") as handle:
+        while block := handle.read(_SCAN_BLOCK_BYTES):
+            counted = 0
+            search = max(target - offset, 0)
+            while search < len(block):
+                newline = block.find(b"\n", search)
+                if newline == -1:
+                    break
+                in_quotes ^= block.count(b'"', counted, newline) % 2 == 1
+                counted = newline
+                if in_quotes:
+                    search = newline + 1
+                    continue
+                boundaries.append(offset + newline + 1)
+                target = boundaries[-1] + shard_bytes
+                search = max(target - offset, newline + 1)
+            in_quotes ^= block.count(b'"', counted) % 2 == 1
+            offset += len(block)
+    if not boundaries:
+        return ShardPlan(size=size, header_end=size, ranges=())
+    ends = [*boundaries[1:], size]
+    ranges = tuple((start, end) for start, end in zip(boundaries, ends, strict=True) if end > start)
+    return ShardPlan(size=size, header_end=boundaries[0], ranges=ranges)
+
+
+def _decode(data: bytes) -> tuple[str, str]:
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return data.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    raise ImportValidationError("Failed to decode CSV header")
+
+
+def _read_header(path: Path, header_end: int) -> tuple[list[str], str]:
+    with path.open("rb") as handle:
+        header_text, _ = _decode(handle.read(header_end))
+    delimiter = max(_DELIMITERS, key=header_text.count)
+    columns = next(csv.reader(io.StringIO(header_text), delimiter=delimiter), [])
+    if not columns:
+        raise ImportValidationError("empty file")
+    return columns, delimiter
+
+
+def _shard_key(parent_key: str, start: int, end: int) -> str:
+    # Keyed on the byte range rather than the shard index so a rerun with a different shard size
+    # never mistakes a marker for a range it did not cover.
+    key: str = compute_idempotency_key(content=f"{parent_key}:{start}-{end}".encode())
+    return key
+
+
+def _make_engine() -> Any:
+    return create_engine(build_dsn(sync=True))
+
+
+def prepare_sharded_import(
+    path: Path,
+    plan: ShardPlan,
+    *,
+    report_type: str | None = None,
+    force: bool = False,
+    idempotency_key: str | None = None,
+    task_id: str | None = None,
+) -> dict[str, Any]:
+    """Detect the dialect from the header and claim the ``load_log`` row for the whole file.
+
+    Uses the same source and idempotency key as :func:`etl.load_csv.import_file`, so a file is
+    deduplicated whichever path imported it. A previous sharded run that failed is reclaimed
+    instead of skipped. Returns the job description the shard and finalize tasks receive.
+    """
+
+    columns, delimiter = _read_header(path, plan.header_end)
+    dialect = report_type or _detect_dialect_from_columns(normalise_headers(columns))
+    try:
+        target_table = _target_table_for(dialect)
+    except KeyError as err:
+        raise ImportValidationError(f"Unknown report: {dialect}") from err
+    idempotent_enabled = bool(
+        _INGEST_CFG.ingest_idempotent if _INGEST_CFG else getattr(settings, "INGEST_IDEMPOTENT", True)
+    )
+    payload_meta = _build_import_meta(
+        path,
+        target_table=target_table,
+        dialect=dialect,
+        streaming=False,
+        extra={
+            "force": bool(force),
+            "file_sha256": idempotency_key or _sha256_file(path),
+            "sharded": True,
+            "shards": len(plan.ranges),
+        },
+    )
+    idempotency_value = _derive_idempotency_key(
+        path,
+        target_table=target_table,
+        dialect=dialect,
+        user_key=idempotency_key,
+        force=force,
+        idempotent_enabled=idempotent_enabled,
+    )
+    processed_by = settings.SERVICE_NAME
+    engine = _make_engine()
+    try:
+        with sessionmaker(bind=engine, expire_on_commit=False, future=True)() as session:
+            result = try_insert_load_log(
+                session,
+                source=SOURCE_NAME,
+                idempotency_key=idempotency_value,
+                payload_meta=payload_meta,
+                processed_by=processed_by,
+                task_id=task_id,
+            )
+            if result == "inserted":
+                load_log_id = get_load_log_id(session, source=SOURCE_NAME, idempotency_key=idempotency_value)
+            else:
+                load_log_id = reclaim_failed_load_log(
+                    session,
+                    source=SOURCE_NAME,
+                    idempotency_key=idempotency_value,
+                    payload_meta=payload_meta,
+                    processed_by=processed_by,
+                    task_id=task_id,
+                )
+                if load_log_id is None:
+                    soft_update_meta_on_duplicate(
+                        session,
+                        source=SOURCE_NAME,
+                        idempotency_key=idempotency_value,
+                        payload_meta=payload_meta,
+                        processed_by=processed_by,
+                        task_id=task_id,
+                    )
+            session.commit()
+    finally:
+        engine.dispose()
+
+    if load_log_id is None:
+        record_etl_skip(SOURCE_NAME)
+        logger.info(
+            "etl.skipped",
+            source=SOURCE_NAME,
+            idempotency_key=idempotency_value,
+            target_table=target_table,
+            dialect=dialect,
+        )
+        return {
+            "status": "skipped",
+            "rows": 0,
+            "dialect": dialect,
+            "target_table": target_table,
+            "warnings": [],
+            "idempotency_key": idempotency_value,
+        }
+    return {
+        "status": "pending",
+        "load_log_id": load_log_id,
+        "idempotency_key": idempotency_value,
+        "dialect": dialect,
+        "target_table": target_table,
+        "delimiter": delimiter,
+        "header_end": plan.header_end,
+        "shards": [list(shard) for shard in plan.ranges],
+        "payload_meta": payload_meta,
+        "started_at": time.time(),
+    }
+
+
+def _read_shard(header: bytes, body: bytes, delimiter: str) -> pd.DataFrame:
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return pd.read_csv(io.BytesIO(header + body), sep=delimiter, encoding=encoding)
+        except UnicodeDecodeError:
+            continue
+        except (pd.errors.ParserError, ValueError) as err:
+            raise ImportValidationError(f"Failed to read CSV shard: {err}") from err
+    raise ImportValidationError("Failed to decode CSV shard")
+
+
+def load_shard(
+    header: bytes,
+    body: bytes,
+    *,
+    job: dict[str, Any],
+    start: int,
+    end: int,
+    task_id: str | None = None,
+) -> dict[str, Any]:
+    """Load the ``[start, end)`` byte range of a prepared job, at most once.
+
+    The rows and the shard's marker row commit in one transaction: a failure leaves nothing behind
+    and the shard can simply run again, while a shard that already committed is skipped.
+    """
+
+    dialect = job["dialect"]
+    target_table = job["target_table"]
+    shard_key = _shard_key(job["idempotency_key"], start, end)
+    engine = _make_engine()
+    try:
+        with engine.connect() as db_conn:
+            previous = db_conn.execute(
+                LOAD_LOG.select()
+                .with_only_columns(LOAD_LOG.c.payload_meta)
+                .where(LOAD_LOG.c.source == SHARD_SOURCE, LOAD_LOG.c.idempotency_key == shard_key)
+            ).scalar_one_or_none()
+        if previous is not None:
+            record_etl_skip(SHARD_SOURCE)
+            return {"status": "skipped", "rows": int(previous.get("rows", 0)), "start": start, "end": end}
+
+        normalized = _normalize_for_dialect(_read_shard(header, body, job["delimiter"]), dialect)
+        try:
+            validated = schemas.validate(normalized, dialect)
+        except ValueError as err:
+            raise ImportValidationError(str(err)) from err
+        marker_meta = {"parent_id": job["load_log_id"], "start": start, "end": end, "rows": len(validated)}
+
+        with record_etl_run(SHARD_SOURCE):
+            conn: Any = engine.raw_connection()
+            try:
+                conn.autocommit = False
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "INSERT INTO load_log (source, idempotency_key, status, payload_meta, processed_by, task_id) "
+                        "VALUES (%s, %s, %s, %s::jsonb, %s, %s) "
+                        "ON CONFLICT (source, idempotency_key) DO NOTHING RETURNING id",
+                        (
+                            SHARD_SOURCE,
+                            shard_key,
+                            STATUS_SUCCESS,
+                            json.dumps(marker_meta),
+                            settings.SERVICE_NAME,
+                            task_id,
+                        ),
+                    )
+                    claimed = cur.fetchone() is not None
+                if not claimed:
+                    conn.rollback()
+                    return {"status": "skipped", "rows": len(validated), "start": start, "end": end}
+                if len(validated):
+                    copy_df_via_temp(
+                        engine,
+                        validated,
+                        target_table=target_table,
+                        target_schema=None,
+                        columns=_target_columns_for(dialect, validated) or list(validated.columns),
+                        conflict_cols=_conflict_columns_for(dialect, df=validated),
+                        analyze_after=False,
+                        connection=conn,
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+    finally:
+        engine.dispose()
+    logger.info(
+        "etl.shard_loaded",
+        source=SHARD_SOURCE,
+        load_log_id=job["load_log_id"],
+        target_table=target_table,
+        start=start,
+        end=end,
+        rows=len(validated),
+    )
+    return {"status": "success", "rows": len(validated), "start": start, "end": end}
+
+
+def finalize_sharded_import(job: dict[str, Any], results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Record the combined outcome of every shard on the parent row and ANALYZE the table once."""
+
+    target_table = job["target_table"]
+    rows_loaded = sum(int(result.get("rows", 0)) for result in results)
+    skipped = sum(1 for result in results if result.get("status") == "skipped")
+    analyze_min = int(_INGEST_CFG.analyze_min_rows if _INGEST_CFG else getattr(settings, "ANALYZE_MIN_ROWS", 50_000))
+    if rows_loaded == 0:
+        fail_sharded_import(job, "empty file")
+        raise ImportValidationError("empty file")
+
+    payload_meta = {**job["payload_meta"], "rows": rows_loaded, "shards_skipped": skipped, "warnings": []}
+    duration_ms = int((time.time() - float(job["started_at"])) * 1000)
+    engine = _make_engine()
+    try:
+        if rows_loaded >= analyze_min:
+            with engine.begin() as db_conn:
+                db_conn.execute(text(f"ANALYZE {target_table}"))
+        with sessionmaker(bind=engine, future=True)() as session:
+            session.execute(
+                update(LOAD_LOG).where(LOAD_LOG.c.id == job["load_log_id"]).values(payload_meta=payload_meta)
+            )
+            mark_success(session, job["load_log_id"], duration_ms)
+            session.commit()
+    finally:
+        engine.dispose()
+    logger.info(
+        "etl.success",
+        source=SOURCE_NAME,
+        idempotency_key=job["idempotency_key"],
+        target_table=target_table,
+        dialect=job["dialect"],
+        rows=rows_loaded,
+        shards=len(results),
+        shards_skipped=skipped,
+    )
+    return {
+        "status": "success",
+        "rows": rows_loaded,
+        "dialect": job["dialect"],
+        "target_table": target_table,
+        "warnings": [],
+        "idempotency_key": job["idempotency_key"],
+        "sharded": True,
+        "shards": len(results),
+        "shards_skipped": skipped,
+    }
+
+
+def fail_sharded_import(job: dict[str, Any], error: str) -> None:
+    """Mark the parent row failed; shards that committed keep their markers for the next run."""
+
+    engine = _make_engine()
+    try:
+        with sessionmaker(bind=engine, future=True)() as session:
+            mark_failed(session, job["load_log_id"], error)
+            session.commit()
+    finally:
+        engine.dispose()
+    logger.warning(
+        "etl.failed",
+        source=SOURCE_NAME,
+        idempotency_key=job["idempotency_key"],
+        target_table=job["target_table"],
+        dialect=job["dialect"],
+        error=error,
+    )
+
+
+__all__ = [
+    "SHARD_SOURCE",
+    "ShardPlan",
+    "fail_sharded_import",
+    "finalize_sharded_import",
+    "load_shard",
+    "plan_shards",
+    "prepare_sharded_import",
+]
@@ -220,6 +220,17 @@ class CelerySettings(SettingsGroup):
     logistics_cron: str
     alerts_schedule_cron: str
     alerts_check_interval_min: int | None
+    alerts_outbox_enabled: bool = False
+    alerts_deliver_cron: str = "*/1 * * * *"
+    ingest_concurrency: int = 4
+    ingest_prefetch_multiplier: int = 1
+    ingest_bulk_concurrency: int = 4
+    ingest_bulk_prefetch_multiplier: int = 1
+    maintenance_concurrency: int = 1
+    maintenance_prefetch_multiplier: int = 1
+    notifications_concurrency: int = 2
+    notifications_prefetch_multiplier: int = 4
+    bulk_import_threshold_bytes: int = 64 * 1024 * 1024
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> CelerySettings:
@@ -248,6 +259,17 @@ class CelerySettings(SettingsGroup):
             logistics_cron=cfg.LOGISTICS_CRON,
             alerts_schedule_cron=cfg.ALERTS_EVALUATION_INTERVAL_CRON,
             alerts_check_interval_min=int(cfg.CHECK_INTERVAL_MIN) if cfg.CHECK_INTERVAL_MIN else None,
+            alerts_outbox_enabled=bool(cfg.ALERT_OUTBOX_ENABLED),
+            alerts_deliver_cron=cfg.ALERT_SCHEDULE_CRON,
+            ingest_concurrency=max(1, int(cfg.CELERY_INGEST_CONCURRENCY)),
+            ingest_prefetch_multiplier=max(1, int(cfg.CELERY_INGEST_PREFETCH_MULTIPLIER)),
+            ingest_bulk_concurrency=max(1, int(cfg.CELERY_INGEST_BULK_CONCURRENCY)),
+            ingest_bulk_prefetch_multiplier=max(1, int(cfg.CELERY_INGEST_BULK_PREFETCH_MULTIPLIER)),
+            maintenance_concurrency=max(1, int(cfg.CELERY_MAINTENANCE_CONCURRENCY)),
+            maintenance_prefetch_multiplier=max(1, int(cfg.CELERY_MAINTENANCE_PREFETCH_MULTIPLIER)),
+            notifications_concurrency=max(1, int(cfg.CELERY_NOTIFICATIONS_CONCURRENCY)),
+            notifications_prefetch_multiplier=max(1, int(cfg.CELERY_NOTIFICATIONS_PREFETCH_MULTIPLIER)),
+            bulk_import_threshold_bytes=max(0, int(cfg.INGEST_BULK_THRESHOLD_MB)) * 1024 * 1024,
         )
 
     @property
@@ -278,6 +300,9 @@ class SecuritySettings(SettingsGroup):
     oidc_jwks_pool_limit: int
     oidc_jwks_background_refresh: bool
     audit_enabled: bool
+    audit_queue_max: int
+    audit_batch_size: int
+    audit_flush_interval_ms: int
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> SecuritySettings:
@@ -299,6 +324,9 @@ class SecuritySettings(SettingsGroup):
             oidc_jwks_pool_limit=int(cfg.OIDC_JWKS_POOL_LIMIT),
             oidc_jwks_background_refresh=bool(cfg.OIDC_JWKS_BACKGROUND_REFRESH),
             audit_enabled=bool(cfg.SECURITY_ENABLE_AUDIT),
+            audit_queue_max=max(int(cfg.AUDIT_QUEUE_MAX), 1),
+            audit_batch_size=max(int(cfg.AUDIT_BATCH_SIZE), 1),
+            audit_flush_interval_ms=max(int(cfg.AUDIT_FLUSH_INTERVAL_MS), 0),
         )
 
 
@@ -312,6 +340,8 @@ class LimiterSettings(SettingsGroup):
     roi_by_vendor_per_user: int
     near_limit_threshold: float
     warn_interval_s: float
+    algorithm: Literal["fixed_window", "sliding_window", "gcra"]
+    local_precheck: bool
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> LimiterSettings:
@@ -327,6 +357,8 @@ class LimiterSettings(SettingsGroup):
             roi_by_vendor_per_user=int(cfg.RATE_LIMIT_ROI_BY_VENDOR_PER_USER),
             near_limit_threshold=float(cfg.LIMITER_NEAR_LIMIT_THRESHOLD),
             warn_interval_s=float(cfg.LIMITER_WARN_INTERVAL_S),
+            algorithm=cfg.RATE_LIMIT_ALGORITHM,
+            local_precheck=bool(cfg.RATE_LIMIT_LOCAL_PRECHECK),
         )
 
 
@@ -374,12 +406,20 @@ class LLMSettings(SettingsGroup):
     backoff_max_ms: float
     bin_timeout_s: float
     max_output_bytes: int
+    bin_pool_size: int
+    bin_pool_command: str | None
+    bin_pool_queue_size: int
+    bin_pool_max_requests: int
+    batch_window_ms: float
+    batch_max_size: int
     email_cloud_threshold_chars: int
     pricelist_cloud_threshold_rows: int
     allow_cloud_fallback: bool
     enable_email: bool
     enable_pricelist: bool
     min_confidence: float
+    response_cache_ttl_s: float
+    response_cache_max_entries: int
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> LLMSettings:
@@ -401,12 +441,20 @@ class LLMSettings(SettingsGroup):
             backoff_max_ms=float(cfg.LLM_BACKOFF_MAX_MS),
             bin_timeout_s=float(cfg.LLM_BIN_TIMEOUT_SEC),
             max_output_bytes=int(cfg.LLM_MAX_OUTPUT_BYTES),
+            bin_pool_size=max(int(cfg.LLM_BIN_POOL_SIZE), 0),
+            bin_pool_command=cfg.LLM_BIN_POOL_COMMAND or None,
+            bin_pool_queue_size=max(int(cfg.LLM_BIN_POOL_QUEUE_SIZE), 0),
+            bin_pool_max_requests=max(int(cfg.LLM_BIN_POOL_MAX_REQUESTS), 0),
+            batch_window_ms=max(float(cfg.LLM_BATCH_WINDOW_MS), 0.0),
+            batch_max_size=max(int(cfg.LLM_BATCH_MAX_SIZE), 1),
             email_cloud_threshold_chars=int(cfg.LLM_EMAIL_CLOUD_THRESHOLD_CHARS),
             pricelist_cloud_threshold_rows=int(cfg.LLM_PRICELIST_CLOUD_THRESHOLD_ROWS),
             allow_cloud_fallback=bool(cfg.LLM_ALLOW_CLOUD_FALLBACK),
             enable_email=bool(cfg.LLM_ENABLE_EMAIL),
             enable_pricelist=bool(cfg.LLM_ENABLE_PRICELIST),
             min_confidence=float(cfg.LLM_MIN_CONFIDENCE),
+            response_cache_ttl_s=float(cfg.LLM_RESPONSE_CACHE_TTL_S),
+            response_cache_max_entries=int(cfg.LLM_RESPONSE_CACHE_MAX_ENTRIES),
         )
 
 
@@ -577,6 +625,10 @@ class IngestionSettings(SettingsGroup):
     ingest_idempotent: bool
     analyze_min_rows: int
     queue_names: list[str]
+    sharding_enabled: bool = True
+    shard_threshold_mb: int = 512
+    shard_size_mb: int = 64
+    shard_max_retries: int = 3
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> IngestionSettings:
@@ -591,6 +643,10 @@ class IngestionSettings(SettingsGroup):
             ingest_idempotent=bool(cfg.INGEST_IDEMPOTENT),
             analyze_min_rows=int(cfg.ANALYZE_MIN_ROWS),
             queue_names=_split_csv(cfg.QUEUE_NAMES),
+            sharding_enabled=bool(cfg.INGEST_SHARDING_ENABLED),
+            shard_threshold_mb=max(0, int(cfg.INGEST_SHARD_THRESHOLD_MB)),
+            shard_size_mb=max(1, int(cfg.INGEST_SHARD_SIZE_MB)),
+            shard_max_retries=max(0, int(cfg.INGEST_SHARD_MAX_RETRIES)),
         )
 
 
@@ -610,6 +666,12 @@ class EmailSettings(SettingsGroup):
     host: str
     username: str
     password: str
+    watch_mode: Literal["poll", "idle"]
+    idle_timeout_s: float
+    poll_interval_s: float
+    reconnect_backoff_max_s: float
+    fetch_batch_size: int
+    pipeline_concurrency: int
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> EmailSettings:
@@ -617,6 +679,12 @@ class EmailSettings(SettingsGroup):
             host=cfg.IMAP_HOST,
             username=cfg.IMAP_USER,
             password=cfg.IMAP_PASS,
+            watch_mode=cfg.IMAP_WATCH_MODE,
+            idle_timeout_s=max(1.0, float(cfg.IMAP_IDLE_TIMEOUT_S)),
+            poll_interval_s=max(0.1, float(cfg.IMAP_POLL_INTERVAL_S)),
+            reconnect_backoff_max_s=max(1.0, float(cfg.IMAP_RECONNECT_BACKOFF_MAX_S)),
+            fetch_batch_size=max(1, int(cfg.IMAP_FETCH_BATCH_SIZE)),
+            pipeline_concurrency=max(1, int(cfg.IMAP_PIPELINE_CONCURRENCY)),
         )
 
 
@@ -624,6 +692,7 @@ class RepricerSettings(SettingsGroup):
     min_roi: Decimal
     buybox_gap: Decimal
     rounding_quant: Decimal
+    chunk_size: int
 
     @classmethod
     def from_settings(cls, cfg: Settings) -> RepricerSettings:
@@ -631,6 +700,7 @@ class RepricerSettings(SettingsGroup):
             min_roi=Decimal(str(cfg.REPRICER_MIN_ROI)),
             buybox_gap=Decimal(str(cfg.REPRICER_BUYBOX_GAP)),
             rounding_quant=Decimal(str(cfg.REPRICER_ROUND)),
+            chunk_size=max(1, int(cfg.REPRICER_CHUNK_SIZE)),
         )
 
 
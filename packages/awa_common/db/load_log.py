@@ -129,3 +129,39 @@ def get_load_log_id(session: Session, *, source: str, idempotency_key: str) -> i
         .limit(1)
     )
     return session.execute(stmt).scalar_one_or_none()
+
+
+def reclaim_failed_load_log(
+    session: Session,
+    *,
+    source: str,
+    idempotency_key: str,
+    payload_meta: dict,
+    processed_by: str | None = None,
+    task_id: str | None = None,
+) -> int | None:
+    """Move a failed sharded load back to pending so a rerun only loads its unfinished shards.
+
+    Only entries whose ``payload_meta`` is flagged ``sharded`` are reclaimed; whole-file loads keep
+    their skip-on-duplicate behaviour. Returns the reclaimed id, or ``None`` when nothing matched.
+    """
+
+    stmt = (
+        update(LOAD_LOG)
+        .where(
+            LOAD_LOG.c.source == source,
+            LOAD_LOG.c.idempotency_key == idempotency_key,
+            LOAD_LOG.c.status == STATUS_FAILED,
+            LOAD_LOG.c.payload_meta.contains({"sharded": True}),
+        )
+        .values(
+            status=STATUS_PENDING,
+            payload_meta=payload_meta,
+            processed_by=processed_by,
+            task_id=task_id,
+            error_message=None,
+            updated_at=func.now(),
+        )
+        .returning(LOAD_LOG.c.id)
+    )
+    return session.execute(stmt).scalar_one_or_none()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import time
-from collections.abc import Callable, Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass
 from typing import Any, Literal
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from awa_common.db.load_log import (
@@ -18,6 +19,7 @@ from awa_common.db.load_log import (
 from awa_common.settings import settings as SETTINGS
 
 SessionFactory = Callable[[], Session]
+AsyncSessionFactory = Callable[[], AsyncSession]
 
 
 @dataclass
@@ -30,6 +32,16 @@ class ProcessHandle:
     payload_meta: dict[str, Any]
 
 
+@dataclass
+class AsyncProcessHandle:
+    session: AsyncSession
+    load_log_id: int
+    source: str
+    idempotency_key: str
+    task_id: str | None
+    payload_meta: dict[str, Any]
+
+
 @contextmanager
 def process_once(
     session_factory: SessionFactory,
@@ -103,3 +115,77 @@ def process_once(
             session.commit()
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def process_once_async(
+    session_factory: AsyncSessionFactory,
+    *,
+    source: str,
+    payload_meta: dict[str, Any],
+    idempotency_key: str,
+    on_duplicate: Literal["skip", "update_meta"] = "skip",
+    task_id: str | None = None,
+    processed_by: str | None = None,
+) -> AsyncGenerator[AsyncProcessHandle | None]:
+    """Async variant of :func:`process_once` for jobs that already run on an event loop.
+
+    The load_log helpers are shared with the sync guard through ``AsyncSession.run_sync``.
+    """
+
+    session = session_factory()
+    processed_by = processed_by or SETTINGS.SERVICE_NAME
+    try:
+        result = await session.run_sync(
+            try_insert_load_log,
+            source=source,
+            idempotency_key=idempotency_key,
+            payload_meta=payload_meta,
+            processed_by=processed_by,
+            task_id=task_id,
+        )
+
+        if result == "duplicate":
+            if on_duplicate == "update_meta":
+                await session.run_sync(
+                    soft_update_meta_on_duplicate,
+                    source=source,
+                    idempotency_key=idempotency_key,
+                    payload_meta=payload_meta,
+                    processed_by=processed_by,
+                    task_id=task_id,
+                )
+                await session.commit()
+            else:
+                await session.rollback()
+            yield None
+            return
+
+        await session.commit()
+        load_log_id = await session.run_sync(get_load_log_id, source=source, idempotency_key=idempotency_key)
+        if load_log_id is None:
+            raise RuntimeError("Load log entry inserted but could not be retrieved.")
+
+        handle = AsyncProcessHandle(
+            session=session,
+            load_log_id=load_log_id,
+            source=source,
+            idempotency_key=idempotency_key,
+            task_id=task_id,
+            payload_meta=payload_meta,
+        )
+        started_at = time.perf_counter()
+
+        try:
+            yield handle
+        except Exception as exc:
+            await session.rollback()
+            await session.run_sync(mark_failed, load_log_id, str(exc))
+            await session.commit()
+            raise
+        else:
+            duration_ms = int((time.perf_counter() - started_at) * 1000)
+            await session.run_sync(mark_success, load_log_id, duration_ms)
+            await session.commit()
+    finally:
+        await session.close()
@@ -28,12 +28,15 @@ from awa_common.metrics import (
     record_external_http_request,
     record_external_http_retry,
 )
+from awa_common.rate_control import AdaptiveRateController, is_throttle_status, rate_controller_for
 from awa_common.settings import settings
 
 __all__ = ["AsyncHTTPClient", "HTTPClient", "HTTPClientError", "RetryableStatusError"]
 
 logger = structlog.get_logger(__name__)
 
+_HEADERS_AT_EXTENSION = "awa_headers_at"
+
 
 class HTTPClientError(Exception):
     """Raised when an HTTP request fails after exhausting all retries."""
@@ -242,6 +245,7 @@ class _BaseHTTPClient:
         backoff_max_s: float | None = None,
         retry_jitter_s: float | None = None,
         retry_status_codes: tuple[int, ...] | list[int] | set[int] | frozenset[int] | None = None,
+        adaptive_rate: bool | None = None,
     ) -> None:
         self.integration = (integration or "default").strip().lower() or "default"
         self._timeout = timeout or _default_timeout()
@@ -256,6 +260,10 @@ class _BaseHTTPClient:
         self._retry_jitter = float(retry_jitter_s if retry_jitter_s is not None else settings.HTTP_BACKOFF_JITTER_S)
         configured_statuses = retry_status_codes if retry_status_codes is not None else settings.HTTP_RETRY_STATUS_CODES
         self._retry_status_codes = frozenset(configured_statuses or [])
+        if adaptive_rate is None:
+            opted_in = {name.strip().lower() for name in getattr(settings, "HTTP_ADAPTIVE_RATE_INTEGRATIONS", [])}
+            adaptive_rate = bool(getattr(settings, "HTTP_ADAPTIVE_RATE_ENABLED", False)) or self.integration in opted_in
+        self._adaptive_rate = bool(adaptive_rate)
         self._task_id = getattr(getattr(settings, "etl", None), "task_id", None)
         self._request_id = structlog_contextvars.get_contextvars().get("request_id")
 
@@ -458,6 +466,7 @@ class HTTPClient(_BaseHTTPClient):
         method: str = "GET",
         chunk_size: int = 1 << 20,
         on_chunk: Callable[[bytes], Any] | None = None,
+        on_response: Callable[[httpx.Response], Any] | None = None,
         **kwargs: Any,
     ) -> Path:
         method_name = (method or "GET").upper()
@@ -485,6 +494,8 @@ class HTTPClient(_BaseHTTPClient):
                         retry_after=retry_after,
                     )
                 response.raise_for_status()
+                if on_response is not None:
+                    on_response(response)
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
                 with dest_path.open("wb") as handle:
                     for chunk in response.iter_bytes(chunk_size=chunk_size):
@@ -518,6 +529,9 @@ class AsyncHTTPClient(_BaseHTTPClient):
         if self._base_url:
             client_kwargs["base_url"] = self._base_url
         self._client = httpx.AsyncClient(**client_kwargs)
+        self._rate: AdaptiveRateController | None = (
+            rate_controller_for(self.integration) if self._adaptive_rate else None
+        )
 
     async def __aenter__(self) -> AsyncHTTPClient:
         return self
@@ -540,6 +554,29 @@ class AsyncHTTPClient(_BaseHTTPClient):
         else:
             response.close()
 
+    async def _rate_limited(self, action: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        rate = self._rate
+        if rate is None:
+            return await action()
+        await rate.acquire()
+        started = time.perf_counter()
+        try:
+            response = await action()
+        except RetryableStatusError as exc:
+            if is_throttle_status(exc.response.status_code):
+                rate.on_throttle(exc.retry_after)
+            raise
+        except httpx.TimeoutException:
+            rate.on_throttle()
+            raise
+        if is_throttle_status(response.status_code):
+            rate.on_throttle(_parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code < 500:
+            # Streamed downloads stamp when the headers arrived; body transfer time is not congestion.
+            headers_at = response.extensions.get(_HEADERS_AT_EXTENSION, time.perf_counter())
+            rate.on_success(headers_at - started)
+        return response
+
     async def _execute(
         self,
         *,
@@ -566,7 +603,7 @@ class AsyncHTTPClient(_BaseHTTPClient):
             async for attempt in retrying:
                 attempts += 1
                 with attempt:
-                    response = await action()
+                    response = await self._rate_limited(action)
                     should_retry, retry_after = self._retry_after_for_response(response)
                     if should_retry:
                         if hasattr(response, "aclose"):
@@ -658,6 +695,7 @@ class AsyncHTTPClient(_BaseHTTPClient):
         method: str = "GET",
         chunk_size: int = 1 << 20,
         on_chunk: Callable[[bytes], Any] | None = None,
+        on_response: Callable[[httpx.Response], Any] | None = None,
         **kwargs: Any,
     ) -> Path:
         method_name = (method or "GET").upper()
@@ -676,6 +714,7 @@ class AsyncHTTPClient(_BaseHTTPClient):
 
         async def _stream() -> httpx.Response:
             async with self._client.stream(method_name, url, **kwargs) as response:
+                response.extensions[_HEADERS_AT_EXTENSION] = time.perf_counter()
                 should_retry, retry_after = self._retry_after_for_response(response)
                 if should_retry:
                     raise RetryableStatusError(
@@ -685,6 +724,10 @@ class AsyncHTTPClient(_BaseHTTPClient):
                         retry_after=retry_after,
                     )
                 response.raise_for_status()
+                if on_response is not None:
+                    maybe_awaitable = on_response(response)
+                    if inspect.isawaitable(maybe_awaitable):
+                        await maybe_awaitable
                 dest_path.parent.mkdir(parents=True, exist_ok=True)
                 with dest_path.open("wb") as handle:
                     async for chunk in response.aiter_bytes(chunk_size=chunk_size):
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import threading
 import time
+import weakref
+from collections import OrderedDict
 from collections.abc import Callable, Mapping, Sequence
 from enum import Enum
 from typing import Any, Literal
@@ -99,10 +105,91 @@ def _config():
         return None
 
 
+# One pooled client per event loop: httpx connections cannot cross loops, and Celery tasks
+# run each job under a fresh ``asyncio.run``.
+_HTTP_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncHTTPClient] = weakref.WeakKeyDictionary()
+_HTTP_CLIENTS_LOCK = threading.Lock()
+
+
+def _shared_http_client(factory: Callable[[], AsyncHTTPClient]) -> AsyncHTTPClient:
+    loop = asyncio.get_running_loop()
+    with _HTTP_CLIENTS_LOCK:
+        client = _HTTP_CLIENTS.get(loop)
+        if client is None:
+            client = factory()
+            _HTTP_CLIENTS[loop] = client
+        return client
+
+
+async def close_http_clients() -> None:
+    """Close the pooled LLM HTTP client owned by the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    with _HTTP_CLIENTS_LOCK:
+        client = _HTTP_CLIENTS.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+class _ResponseCache:
+    """Process-wide LRU of validated LLM responses with a per-entry TTL."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: dict[str, Any], *, ttl_s: float, max_entries: int) -> None:
+        if ttl_s <= 0 or max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_s, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_RESPONSE_CACHE = _ResponseCache()
+
+
+def clear_response_cache() -> None:
+    _RESPONSE_CACHE.clear()
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
 class LLMClient:
     """Typed helper wrapper around the LLM microservice."""
 
-    def __init__(self, *, http_client_factory: Callable[[str], AsyncHTTPClient] | None = None):
+    def __init__(
+        self,
+        *,
+        http_client_factory: Callable[[str], AsyncHTTPClient] | None = None,
+        pooled: bool = True,
+    ):
         cfg = _config()
         if cfg is None:
             raise LLMConfigurationError("LLM settings not initialised")
@@ -121,7 +208,12 @@ class LLMClient:
         self.enable_email = bool(getattr(cfg, "enable_email", False))
         self.enable_pricelist = bool(getattr(cfg, "enable_pricelist", False))
         self.min_confidence = float(getattr(cfg, "min_confidence", 0.0) or 0.0)
-        self._http_client_factory = http_client_factory or self._build_http_client
+        self.cache_ttl_s = float(getattr(cfg, "response_cache_ttl_s", 3600.0) or 0.0)
+        self.cache_max_entries = int(getattr(cfg, "response_cache_max_entries", 512) or 0)
+        self._http_client_factory = http_client_factory
+        # Pooled clients live until ``close_http_clients()`` on their loop; one-shot callers that do not
+        # own the loop pass ``pooled=False`` so every request closes its own connections.
+        self._pooled = pooled
 
     def _normalise_provider(self, provider: str | None) -> ProviderType:
         prov = (provider or "local").lower()
@@ -136,6 +228,33 @@ class LLMClient:
             max_retries=1,
         )
 
+    async def _send(self, url: str, body: dict[str, Any]) -> Any:  # pragma: no cover - network boundary
+        if self._http_client_factory is not None or not self._pooled:
+            factory = self._http_client_factory or self._build_http_client
+            async with factory("llm_service") as cli:
+                return await cli.post_json(url, json=body, headers=self._headers(), timeout=self.timeout)
+        cli = _shared_http_client(lambda: self._build_http_client("llm_service"))
+        return await cli.post_json(url, json=body, headers=self._headers(), timeout=self.timeout)
+
+    def _cache_key(self, body: Mapping[str, Any]) -> str | None:
+        """Content address for deterministic requests: task, model, schema and input hashes."""
+
+        if self.cache_ttl_s <= 0 or self.cache_max_entries <= 0 or body.get("temperature"):
+            return None
+        return _digest(
+            {
+                "task": body.get("task"),
+                "model": body.get("model"),
+                "schema": _digest(body.get("schema")),
+                "input": _digest(body.get("input")),
+                "max_tokens": body.get("max_tokens"),
+            }
+        )
+
+    def _remember(self, key: str | None, response: Mapping[str, Any]) -> None:
+        if key is not None:
+            _RESPONSE_CACHE.put(key, dict(response), ttl_s=self.cache_ttl_s, max_entries=self.cache_max_entries)
+
     def _provider_for_task(  # pragma: no cover - policy is configuration driven
         self,
         task: str,
@@ -203,8 +322,7 @@ class LLMClient:
         outcome = "error"
         url = f"{self.base_url}/llm"
         try:
-            async with self._http_client_factory("llm_service") as cli:
-                data = await cli.post_json(url, json=body, headers=self._headers(), timeout=self.timeout)
+            data = await self._send(url, body)
             outcome = "success"
             return data if isinstance(data, dict) else {"result": data}
         except Exception as exc:
@@ -249,20 +367,26 @@ class LLMClient:
         body: dict[str, Any],
         model_cls: type[BaseModel] | None = None,
     ) -> tuple[Any, ProviderType]:
+        cache_key = self._cache_key(body)
+        cached = _RESPONSE_CACHE.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            record_llm_request(task, provider, "cache_hit", 0.0)
+            parsed, prov_used = self._extract_result(task, cached)
+            return (parsed if model_cls is None else model_cls.model_validate(parsed)), prov_used
         try:
             response = await self._post(body, provider=provider, task=task)
         except Exception as exc:
             if self._should_fallback(provider):
                 return await self._fallback(
-                    task=task, from_provider=provider, body=body, model_cls=model_cls, error=exc
+                    task=task, from_provider=provider, body=body, model_cls=model_cls, error=exc, cache_key=cache_key
                 )
             raise
 
         try:
             parsed, prov_used = self._extract_result(task, response)
-            if model_cls is None:
-                return parsed, prov_used
-            return model_cls.model_validate(parsed), prov_used
+            result = parsed if model_cls is None else model_cls.model_validate(parsed)
+            self._remember(cache_key, response)
+            return result, prov_used
         except ValidationError as exc:
             record_llm_error(task, provider, "validation_error")
             if self._should_fallback(provider):
@@ -272,6 +396,7 @@ class LLMClient:
                     body=body,
                     model_cls=model_cls,
                     error=exc,
+                    cache_key=cache_key,
                 )
             raise LLMInvalidResponseError(f"LLM response failed validation for task={task}") from exc
         except LLMInvalidResponseError:
@@ -283,6 +408,7 @@ class LLMClient:
                     body=body,
                     model_cls=model_cls,
                     error=None,
+                    cache_key=cache_key,
                 )
             raise
 
@@ -294,6 +420,7 @@ class LLMClient:
         body: dict[str, Any],
         model_cls: type[BaseModel] | None,
         error: Exception | None,
+        cache_key: str | None = None,
     ) -> tuple[Any, ProviderType]:
         record_llm_fallback(task, from_provider, "cloud", error.__class__.__name__ if error else "retry")
         logger.info(
@@ -309,12 +436,15 @@ class LLMClient:
         response = await self._post(fallback_body, provider="cloud", task=task)
         parsed, prov_used = self._extract_result(task, response)
         if model_cls is None:
+            self._remember(cache_key, response)
             return parsed, prov_used
         try:
-            return model_cls.model_validate(parsed), prov_used
+            result = model_cls.model_validate(parsed)
         except ValidationError as exc:
             record_llm_error(task, "cloud", "validation_error")
             raise LLMInvalidResponseError(f"LLM fallback response failed validation for task={task}") from exc
+        self._remember(cache_key, response)
+        return result, prov_used
 
     def _build_payload(
         self,
@@ -469,12 +599,12 @@ class LLMClient:
 
 
 async def classify_email(**kwargs: Any) -> EmailLLMResult:  # pragma: no cover - facade
-    client = LLMClient()
+    client = LLMClient(pooled=False)
     return await client.classify_email(**kwargs)
 
 
 async def parse_price_list(**kwargs: Any) -> PriceListLLMResult:  # pragma: no cover - facade
-    client = LLMClient()
+    client = LLMClient(pooled=False)
     return await client.parse_price_list(**kwargs)
 
 
@@ -484,5 +614,5 @@ async def generate(  # pragma: no cover - facade
     max_tokens: int = 256,
     provider: str | None = None,
 ) -> str:
-    client = LLMClient()
+    client = LLMClient(pooled=False)
     return await client.generate(prompt, temperature=temperature, max_tokens=max_tokens, provider=provider)
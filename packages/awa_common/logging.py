@@ -9,9 +9,9 @@ from contextvars import ContextVar
 from typing import Any
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog import contextvars as structlog_contextvars
 from structlog.stdlib import BoundLogger, LoggerFactory, ProcessorFormatter
 
@@ -160,29 +160,39 @@ def bind_celery_task(task_name: str | None = None, *, task_id: str | None = None
         structlog_contextvars.bind_contextvars(**updates)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+class RequestIdMiddleware:
     """Ensure every request has correlation ids and propagate them."""
 
     header_name = "X-Request-ID"
 
-    async def dispatch(self, request: Request, call_next: Callable[..., Any]) -> Response:
-        request_id = request.headers.get(self.header_name) or str(uuid.uuid4())
-        traceparent = request.headers.get("traceparent")
-        trace_id = _extract_trace_id(traceparent) or request.headers.get("X-Trace-ID") or request_id
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        request.state.request_id = request_id
-        request.state.trace_id = trace_id
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        request_id = headers.get(self.header_name) or str(uuid.uuid4())
+        trace_id = _extract_trace_id(headers.get("traceparent")) or headers.get("X-Trace-ID") or request_id
+
+        state = Request(scope).state
+        state.request_id = request_id
+        state.trace_id = trace_id
         set_request_context(request_id, trace_id)
 
-        response: Response | None = None
+        async def send_with_ids(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                if self.header_name not in response_headers:
+                    response_headers.append(self.header_name, request_id)
+                if trace_id and "X-Trace-ID" not in response_headers:
+                    response_headers.append("X-Trace-ID", trace_id)
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_with_ids)
         finally:
-            if response is not None:
-                response.headers.setdefault(self.header_name, request_id)
-                if trace_id:
-                    response.headers.setdefault("X-Trace-ID", trace_id)
             clear_request_context()
 
 
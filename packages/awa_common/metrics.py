@@ -7,7 +7,8 @@ import os
 import threading
 import time
 from collections.abc import Awaitable, Callable, Iterable, Iterator
-from contextlib import contextmanager
+from contextlib import contextmanager, suppress
+from datetime import datetime
 from pathlib import Path
 from typing import Any, TypeVar, cast
 
@@ -21,7 +22,7 @@ from prometheus_client import (
     generate_latest,
     start_http_server,
 )
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from awa_common.logging import bind_celery_task
 from awa_common.settings import settings
@@ -138,6 +139,18 @@ EXTERNAL_HTTP_RETRIES_TOTAL = Counter(
     ("integration", "method", "reason", *BASE_LABELS),
     registry=REGISTRY,
 )
+EXTERNAL_HTTP_RATE_LIMIT_RPS = Gauge(
+    "external_http_rate_limit_rps",
+    "Adaptive client-side request rate per integration",
+    ("integration", *BASE_LABELS),
+    registry=REGISTRY,
+)
+EXTERNAL_HTTP_THROTTLE_SECONDS_TOTAL = Counter(
+    "external_http_throttle_seconds_total",
+    "Seconds outbound requests waited on the adaptive rate limiter",
+    ("integration", *BASE_LABELS),
+    registry=REGISTRY,
+)
 OIDC_JWKS_REFRESH_TOTAL = Counter(
     "oidc_jwks_refresh_total",
     "JWKS refresh attempts by issuer",
@@ -339,6 +352,25 @@ LOGISTICS_UPSERT_BATCH_SECONDS = Histogram(
     buckets=HTTP_BUCKETS,
     registry=REGISTRY,
 )
+FEES_PIPELINE_ROWS_TOTAL = Counter(
+    "fees_h10_pipeline_rows_total",
+    "Rows passing through each fees_h10 refresh pipeline stage",
+    ("stage", *BASE_LABELS),
+    registry=REGISTRY,
+)
+FEES_PIPELINE_FLUSH_SECONDS = Histogram(
+    "fees_h10_pipeline_flush_seconds",
+    "Duration of fees_h10 writer flushes in seconds",
+    (*BASE_LABELS,),
+    buckets=HTTP_BUCKETS,
+    registry=REGISTRY,
+)
+FEES_PIPELINE_BACKLOG = Gauge(
+    "fees_h10_pipeline_backlog",
+    "Rows fetched but not yet written by the fees_h10 pipeline",
+    (*BASE_LABELS,),
+    registry=REGISTRY,
+)
 AWA_INGEST_DOWNLOAD_BYTES_TOTAL = Counter(
     "awa_ingest_download_bytes_total",
     "Bytes downloaded for ingest URIs",
@@ -430,6 +462,13 @@ QUEUE_BACKLOG = Gauge(
     ("queue", *BASE_LABELS),
     registry=REGISTRY,
 )
+CELERY_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_queue_wait_seconds",
+    "Time Celery tasks wait in their queue before a worker starts them",
+    ("queue", *BASE_LABELS),
+    buckets=(0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600),
+    registry=REGISTRY,
+)
 DB_POOL_IN_USE = Gauge(
     "db_pool_in_use",
     "Checked-out database connections",
@@ -579,6 +618,36 @@ ALERTBOT_STARTUP_VALIDATION_OK = Gauge(
     (*BASE_LABELS,),
     registry=REGISTRY,
 )
+ALERTBOT_OUTBOX_EVENTS_TOTAL = Counter(
+    "alertbot_outbox_events_total",
+    "Alert outbox row transitions (enqueued, deduped, sent, retried, failed)",
+    (*BASE_LABELS, "event"),
+    registry=REGISTRY,
+)
+ALERTBOT_OUTBOX_PENDING = Gauge(
+    "alertbot_outbox_pending",
+    "Alert outbox rows waiting for delivery after the last drain",
+    (*BASE_LABELS,),
+    registry=REGISTRY,
+)
+AUDIT_LOG_BACKLOG = Gauge(
+    "audit_log_backlog",
+    "Audit records buffered in memory waiting to be written",
+    (*BASE_LABELS,),
+    registry=REGISTRY,
+)
+AUDIT_LOG_DROPPED_TOTAL = Counter(
+    "audit_log_dropped_total",
+    "Audit records discarded because the buffer was full or a batch write failed",
+    ("reason", *BASE_LABELS),
+    registry=REGISTRY,
+)
+AUDIT_LOG_WRITTEN_TOTAL = Counter(
+    "audit_log_written_total",
+    "Audit records written to Postgres by the background writer",
+    (*BASE_LABELS,),
+    registry=REGISTRY,
+)
 LLM_REQUESTS_TOTAL = Counter(
     "llm_requests_total",
     "LLM request attempts grouped by task/provider/outcome",
@@ -623,6 +692,32 @@ LLM_PROVIDER_TIMEOUTS_TOTAL = Counter(
     ("provider", "operation", *BASE_LABELS),
     registry=REGISTRY,
 )
+LLM_BIN_POOL_QUEUE_DEPTH = Gauge(
+    "llm_bin_pool_queue_depth",
+    "Requests waiting for a local LLM binary worker",
+    (*BASE_LABELS,),
+    registry=REGISTRY,
+)
+LLM_BIN_POOL_LATENCY_SECONDS = Histogram(
+    "llm_bin_pool_latency_seconds",
+    "Local LLM binary pool latency by stage (queue wait or worker run)",
+    ("stage", *BASE_LABELS),
+    buckets=HTTP_BUCKETS,
+    registry=REGISTRY,
+)
+LLM_BIN_POOL_RECYCLES_TOTAL = Counter(
+    "llm_bin_pool_recycles_total",
+    "Local LLM binary workers replaced, grouped by reason",
+    ("reason", *BASE_LABELS),
+    registry=REGISTRY,
+)
+LLM_BATCH_SIZE = Histogram(
+    "llm_batch_size",
+    "LLM requests coalesced into one backend invocation",
+    ("backend", *BASE_LABELS),
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+    registry=REGISTRY,
+)
 EMAIL_ENRICHED_TOTAL = Counter(
     "email_enriched_total",
     "Email enrichment outcomes",
@@ -635,6 +730,12 @@ EMAIL_NEEDS_MANUAL_REVIEW_TOTAL = Counter(
     ("reason", *BASE_LABELS),
     registry=REGISTRY,
 )
+EMAIL_WATCHER_RECONNECTS_TOTAL = Counter(
+    "email_watcher_reconnects_total",
+    "IMAP watcher reconnects after a dropped or failed connection",
+    ("reason", *BASE_LABELS),
+    registry=REGISTRY,
+)
 PRICELISTS_ENRICHED_TOTAL = Counter(
     "pricelists_enriched_total",
     "Price lists enriched via LLM",
@@ -668,18 +769,28 @@ PRICE_IMPORTER_ROWS_TOTAL = Counter(
 )
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+class MetricsMiddleware:
     """Record Prometheus metrics for FastAPI HTTP requests."""
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         start = time.perf_counter()
-        method = request.method.upper()
+        method = str(scope.get("method", "GET")).upper()
         status_code = 500
-        path_template = _path_template(request)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message["status"])
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive, send_with_status)
         except HTTPException as exc:
             status_code = exc.status_code
             raise
@@ -690,7 +801,8 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             duration = time.perf_counter() - start
             labels = _with_base_labels(
                 method=method,
-                path_template=path_template,
+                # Resolved after routing so the label carries the route template, not the raw path.
+                path_template=_path_template(Request(scope)),
                 status=str(status_code),
             )
             HTTP_REQUESTS_TOTAL.labels(**labels).inc()
@@ -732,6 +844,8 @@ _CELERY_METRICS_ENABLED = False
 _BACKLOG_THREAD: threading.Thread | None = None
 _BACKLOG_LOCK = threading.Lock()
 _BACKLOG_WARNED_AT: dict[str, float] = {}
+# Message header stamped at publish time so the worker can measure how long a task sat in its queue.
+PUBLISHED_AT_HEADER = "awa_published_at"
 
 
 def _task_label(sender: Any) -> str:
@@ -753,8 +867,14 @@ def enable_celery_metrics(
     broker_url: str | None,
     queue_names: Iterable[str] | None = None,
     backlog_interval_s: int = 15,
+    priority_steps: Iterable[int] = (),
+    priority_sep: str = ":",
 ) -> None:
-    """Register Celery signal handlers and optional backlog polling."""
+    """Register Celery signal handlers and optional backlog polling.
+
+    ``priority_steps``/``priority_sep`` mirror the Redis transport options so the backlog of a queue
+    includes the per-priority lists kombu keeps next to it.
+    """
     global _CELERY_METRICS_ENABLED
     if _CELERY_METRICS_ENABLED:
         return
@@ -764,18 +884,50 @@ def enable_celery_metrics(
     except Exception:  # pragma: no cover - Celery not installed in some environments
         return
 
+    signals.before_task_publish.connect(on_before_task_publish, weak=False)
     signals.task_prerun.connect(on_task_prerun, weak=False)
     signals.task_postrun.connect(on_task_postrun, weak=False)
     signals.task_failure.connect(on_task_failure, weak=False)
 
-    _maybe_start_backlog_probe(broker_url=broker_url, queue_names=queue_names, interval=backlog_interval_s)
+    _maybe_start_backlog_probe(
+        broker_url=broker_url,
+        queue_names=queue_names,
+        interval=backlog_interval_s,
+        priority_steps=priority_steps,
+        priority_sep=priority_sep,
+    )
     _CELERY_METRICS_ENABLED = True
 
 
-def on_task_prerun(sender: Any, task_id: str, **_kwargs: Any) -> None:
+def on_before_task_publish(headers: dict[str, Any] | None = None, **_kwargs: Any) -> None:
+    """Celery signal handler for before_task_publish."""
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def _observe_queue_wait(task: Any) -> None:
+    request = getattr(task, "request", None)
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if not isinstance(published_at, int | float):
+        return
+    delivery_info = getattr(request, "delivery_info", None) or {}
+    queue = delivery_info.get("routing_key") or "unknown"
+    ready_at = float(published_at)
+    eta = getattr(request, "eta", None)
+    if eta:
+        # Delayed tasks only start waiting once their ETA passes.
+        with suppress(TypeError, ValueError):
+            eta_at = eta if isinstance(eta, datetime) else datetime.fromisoformat(str(eta))
+            ready_at = max(ready_at, eta_at.timestamp())
+    wait = max(time.time() - ready_at, 0.0)
+    CELERY_QUEUE_WAIT_SECONDS.labels(**_with_base_labels(queue=queue)).observe(wait)
+
+
+def on_task_prerun(sender: Any, task_id: str, **kwargs: Any) -> None:
     """Celery signal handler for task_prerun."""
     task_name = _task_label(sender)
     TASK_RUNS_TOTAL.labels(**_with_base_labels(task=task_name, status="start")).inc()
+    _observe_queue_wait(kwargs.get("task", sender))
     bind_celery_task()
     if not task_id:
         return
@@ -815,6 +967,8 @@ def _maybe_start_backlog_probe(  # noqa: C901
     broker_url: str | None,
     queue_names: Iterable[str] | None,
     interval: int,
+    priority_steps: Iterable[int] = (),
+    priority_sep: str = ":",
 ) -> None:
     global _BACKLOG_THREAD
     if _BACKLOG_THREAD is not None:
@@ -833,6 +987,8 @@ def _maybe_start_backlog_probe(  # noqa: C901
     queues = tuple(q for q in queue_names if q)
     if not queues:
         return
+    steps = tuple(step for step in priority_steps if step)
+    queue_keys = {queue: (queue, *(f"{queue}{priority_sep}{step}" for step in steps)) for queue in queues}
 
     redis_cfg = getattr(settings, "redis", None)
     warn_size = getattr(redis_cfg, "backlog_warn_size", None) or getattr(settings, "REDIS_BACKLOG_WARN_SIZE", None)
@@ -848,7 +1004,7 @@ def _maybe_start_backlog_probe(  # noqa: C901
         while True:
             for queue in queues:
                 try:
-                    backlog = client.llen(queue)
+                    backlog = sum(cast(int, client.llen(key)) for key in queue_keys[queue])
                 except Exception:
                     continue
                 backlog_value = cast(float | int, backlog)
@@ -886,6 +1042,11 @@ def start_worker_metrics_http_if_enabled(port_env: str = "WORKER_METRICS_PORT")
     if not enabled:
         return
     port = int(observability.worker_metrics_port if observability else getattr(settings, "WORKER_METRICS_PORT", 9108))
+    # Per-queue worker processes are each handed their own port through the environment, since
+    # every process keeps its own registry.
+    override = os.getenv(port_env)
+    if override and override.strip().isdigit():
+        port = int(override)
     start_http_server(port, registry=REGISTRY)
 
 
@@ -1039,6 +1200,16 @@ def observe_external_http_latency(integration: str, method: str, duration_s: flo
     EXTERNAL_HTTP_REQUEST_DURATION_SECONDS.labels(**labels).observe(max(duration_s, 0.0))
 
 
+def set_external_http_rate_limit(integration: str, rps: float) -> None:
+    labels = _with_base_labels(integration=(integration or "default").strip().lower() or "default")
+    EXTERNAL_HTTP_RATE_LIMIT_RPS.labels(**labels).set(max(rps, 0.0))
+
+
+def record_external_http_throttle(integration: str, delay_s: float) -> None:
+    labels = _with_base_labels(integration=(integration or "default").strip().lower() or "default")
+    EXTERNAL_HTTP_THROTTLE_SECONDS_TOTAL.labels(**labels).inc(max(delay_s, 0.0))
+
+
 def record_external_http_retry(integration: str, method: str, reason: str) -> None:
     """Record retry attempts performed by the shared HTTP client."""
     labels = _with_base_labels(
@@ -1159,6 +1330,20 @@ def record_logistics_upsert_batch(duration_s: float) -> None:
     LOGISTICS_UPSERT_BATCH_SECONDS.labels(**_with_base_labels()).observe(max(duration_s, 0.0))
 
 
+def record_fees_pipeline_rows(stage: str, rows: int = 1) -> None:
+    if rows <= 0:
+        return
+    FEES_PIPELINE_ROWS_TOTAL.labels(**_with_base_labels(stage=(stage or "unknown"))).inc(rows)
+
+
+def record_fees_pipeline_flush(duration_s: float) -> None:
+    FEES_PIPELINE_FLUSH_SECONDS.labels(**_with_base_labels()).observe(max(duration_s, 0.0))
+
+
+def set_fees_pipeline_backlog(rows: int) -> None:
+    FEES_PIPELINE_BACKLOG.labels(**_with_base_labels()).set(max(rows, 0))
+
+
 def _llm_labels(task: str, provider: str | None) -> dict[str, str]:  # pragma: no cover - trivial helper
     return _with_base_labels(task=(task or "unknown"), provider=(provider or "unknown"))
 
@@ -1213,6 +1398,34 @@ def record_llm_provider_timeout(provider: str, operation: str) -> None:  # pragm
     LLM_PROVIDER_TIMEOUTS_TOTAL.labels(**_llm_provider_labels(provider, operation)).inc()
 
 
+def set_audit_log_backlog(depth: int) -> None:  # pragma: no cover - metrics wrapper
+    AUDIT_LOG_BACKLOG.labels(**_with_base_labels()).set(max(depth, 0))
+
+
+def record_audit_log_dropped(reason: str, count: int = 1) -> None:  # pragma: no cover - metrics wrapper
+    AUDIT_LOG_DROPPED_TOTAL.labels(**_with_base_labels(reason=(reason or "unknown"))).inc(max(count, 0))
+
+
+def record_audit_log_written(count: int) -> None:  # pragma: no cover - metrics wrapper
+    AUDIT_LOG_WRITTEN_TOTAL.labels(**_with_base_labels()).inc(max(count, 0))
+
+
+def set_llm_bin_pool_queue_depth(depth: int) -> None:  # pragma: no cover - metrics wrapper
+    LLM_BIN_POOL_QUEUE_DEPTH.labels(**_with_base_labels()).set(max(depth, 0))
+
+
+def observe_llm_bin_pool_latency(stage: str, duration_s: float) -> None:  # pragma: no cover - metrics wrapper
+    LLM_BIN_POOL_LATENCY_SECONDS.labels(**_with_base_labels(stage=(stage or "unknown"))).observe(max(duration_s, 0.0))
+
+
+def record_llm_bin_pool_recycle(reason: str) -> None:  # pragma: no cover - metrics wrapper
+    LLM_BIN_POOL_RECYCLES_TOTAL.labels(**_with_base_labels(reason=(reason or "unknown"))).inc()
+
+
+def observe_llm_batch_size(backend: str, size: int) -> None:  # pragma: no cover - metrics wrapper
+    LLM_BATCH_SIZE.labels(**_with_base_labels(backend=(backend or "unknown"))).observe(max(size, 0))
+
+
 def record_email_enriched(outcome: str) -> None:  # pragma: no cover - metrics wrapper
     EMAIL_ENRICHED_TOTAL.labels(**_with_base_labels(outcome=(outcome or "unknown"))).inc()
 
@@ -1221,6 +1434,10 @@ def record_email_needs_manual_review(reason: str) -> None:  # pragma: no cover -
     EMAIL_NEEDS_MANUAL_REVIEW_TOTAL.labels(**_with_base_labels(reason=(reason or "unknown"))).inc()
 
 
+def record_email_watcher_reconnect(reason: str) -> None:  # pragma: no cover - metrics wrapper
+    EMAIL_WATCHER_RECONNECTS_TOTAL.labels(**_with_base_labels(reason=(reason or "unknown"))).inc()
+
+
 def record_pricelist_enriched(outcome: str) -> None:  # pragma: no cover - metrics wrapper
     PRICELISTS_ENRICHED_TOTAL.labels(**_with_base_labels(outcome=(outcome or "unknown"))).inc()
 
@@ -1484,6 +1701,9 @@ __all__ = [
     "LOGISTICS_ETL_ERRORS_TOTAL",
     "LOGISTICS_UPSERT_ROWS_TOTAL",
     "LOGISTICS_UPSERT_BATCH_SECONDS",
+    "FEES_PIPELINE_ROWS_TOTAL",
+    "FEES_PIPELINE_FLUSH_SECONDS",
+    "FEES_PIPELINE_BACKLOG",
     "AWA_INGEST_DOWNLOAD_BYTES_TOTAL",
     "AWA_INGEST_DOWNLOAD_SECONDS",
     "AWA_INGEST_DOWNLOAD_FAILURES_TOTAL",
@@ -1493,11 +1713,15 @@ __all__ = [
     "EXTERNAL_HTTP_REQUESTS_TOTAL",
     "EXTERNAL_HTTP_REQUEST_DURATION_SECONDS",
     "EXTERNAL_HTTP_RETRIES_TOTAL",
+    "EXTERNAL_HTTP_RATE_LIMIT_RPS",
+    "EXTERNAL_HTTP_THROTTLE_SECONDS_TOTAL",
     "OIDC_JWKS_REFRESH_TOTAL",
     "OIDC_JWKS_REFRESH_FAILURES_TOTAL",
     "OIDC_JWKS_AGE_SECONDS",
     "OIDC_VALIDATE_FAILURES_TOTAL",
     "QUEUE_BACKLOG",
+    "CELERY_QUEUE_WAIT_SECONDS",
+    "PUBLISHED_AT_HEADER",
     "DB_POOL_IN_USE",
     "DB_POOL_CAPACITY",
     "DB_POOL_OVERFLOW",
@@ -1509,8 +1733,16 @@ __all__ = [
     "LLM_REQUEST_LATENCY_SECONDS",
     "LLM_REQUEST_ERRORS_TOTAL",
     "LLM_FALLBACK_TOTAL",
+    "AUDIT_LOG_BACKLOG",
+    "AUDIT_LOG_DROPPED_TOTAL",
+    "AUDIT_LOG_WRITTEN_TOTAL",
+    "LLM_BIN_POOL_QUEUE_DEPTH",
+    "LLM_BIN_POOL_LATENCY_SECONDS",
+    "LLM_BIN_POOL_RECYCLES_TOTAL",
+    "LLM_BATCH_SIZE",
     "EMAIL_ENRICHED_TOTAL",
     "EMAIL_NEEDS_MANUAL_REVIEW_TOTAL",
+    "EMAIL_WATCHER_RECONNECTS_TOTAL",
     "PRICELISTS_ENRICHED_TOTAL",
     "PRICELISTS_NEEDS_MANUAL_REVIEW_TOTAL",
     "PRICE_IMPORTER_VALIDATE_SECONDS",
@@ -1526,6 +1758,7 @@ __all__ = [
     "monitor_event_loop_lag",
     "instrument_task",
     "init",
+    "on_before_task_publish",
     "on_task_failure",
     "on_task_postrun",
     "on_task_prerun",
@@ -1557,20 +1790,33 @@ __all__ = [
     "record_external_http_request",
     "observe_external_http_latency",
     "record_external_http_retry",
+    "set_external_http_rate_limit",
+    "record_external_http_throttle",
     "record_logistics_rows",
     "record_logistics_error",
     "record_logistics_task_duration",
     "record_etl_retry",
     "record_logistics_upsert_rows",
     "record_logistics_upsert_batch",
+    "record_fees_pipeline_rows",
+    "record_fees_pipeline_flush",
+    "set_fees_pipeline_backlog",
     "record_llm_request",
     "record_llm_error",
     "record_llm_fallback",
     "record_llm_provider_request",
     "observe_llm_provider_latency",
     "record_llm_provider_timeout",
+    "set_audit_log_backlog",
+    "record_audit_log_dropped",
+    "record_audit_log_written",
+    "set_llm_bin_pool_queue_depth",
+    "observe_llm_bin_pool_latency",
+    "record_llm_bin_pool_recycle",
+    "observe_llm_batch_size",
     "record_email_enriched",
     "record_email_needs_manual_review",
+    "record_email_watcher_reconnect",
     "record_pricelist_enriched",
     "record_pricelist_manual_review",
     "record_price_importer_rows",
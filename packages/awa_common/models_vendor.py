@@ -1,14 +1,15 @@
 """Canonical ORM models for vendor pricing shared across services.
 
-This module is the single source of truth for the `vendors` and `vendor_prices`
-tables used by the price importer and any other services that persist vendor
-pricing data.
+This module is the single source of truth for the `vendors`, `vendor_prices`
+and `vendor_column_mappings` tables used by the price importer and any other
+services that persist vendor pricing data.
 """
 
 import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint, func
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -46,4 +47,16 @@ class VendorPrice(Base):
     __table_args__ = (UniqueConstraint("vendor_id", "sku", name="uq_vendor_sku"),)
 
 
-__all__ = ["Vendor", "VendorPrice"]
+class VendorColumnMapping(Base):
+    """Resolved price-sheet header mapping cached per vendor and header signature."""
+
+    __tablename__ = "vendor_column_mappings"
+
+    vendor_id: Mapped[int] = mapped_column(ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True)
+    header_signature: Mapped[str] = mapped_column(String(64), primary_key=True)
+    mapping: Mapped[dict[str, str]] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    source: Mapped[str] = mapped_column(String(16), nullable=False, default="heuristic")
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+__all__ = ["Vendor", "VendorColumnMapping", "VendorPrice"]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+
+from awa_common.metrics import record_external_http_throttle, set_external_http_rate_limit
+from awa_common.settings import settings
+
+__all__ = ["AdaptiveRateController", "is_throttle_status", "rate_controller_for", "reset_rate_controllers"]
+
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class AdaptiveRateController:
+    """AIMD-tuned token bucket shared by every client talking to one integration.
+
+    Requests reserve slots on a virtual schedule (GCRA), so the bucket needs no lock tied to an
+    event loop. Successful responses add ``increase_rps`` per second of traffic; 429/503 responses,
+    timeouts and latency above ``latency_factor`` x the observed baseline cut the rate
+    multiplicatively, at most once per ``cooldown_s``. A ``Retry-After`` pauses all callers.
+    """
+
+    def __init__(
+        self,
+        integration: str,
+        *,
+        initial_rps: float,
+        min_rps: float,
+        max_rps: float,
+        burst: int,
+        increase_rps: float,
+        decrease_factor: float,
+        latency_factor: float,
+        cooldown_s: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[object]] | None = None,
+    ) -> None:
+        self.integration = integration
+        self.min_rps = max(min_rps, 0.01)
+        self.max_rps = max(max_rps, self.min_rps)
+        self.burst = max(1, int(burst))
+        self.increase_rps = max(increase_rps, 0.0)
+        self.decrease_factor = min(max(decrease_factor, 0.05), 1.0)
+        self.latency_factor = latency_factor
+        self.cooldown_s = max(cooldown_s, 0.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._rate = min(max(initial_rps, self.min_rps), self.max_rps)
+        self._tat = 0.0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._latency_ewma: float | None = None
+        self._latency_floor: float | None = None
+        set_external_http_rate_limit(integration, self._rate)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def reserve(self) -> float:
+        """Claim the next slot and return how long the caller must wait before sending."""
+        with self._lock:
+            now = self._clock()
+            interval = 1.0 / self._rate
+            self._tat = max(self._tat, now) + interval
+            return max(0.0, self._tat - now - self.burst * interval, self._paused_until - now)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay <= 0:
+            return
+        record_external_http_throttle(self.integration, delay)
+        await (self._sleep or asyncio.sleep)(delay)
+
+    def on_success(self, latency_s: float) -> None:
+        with self._lock:
+            if self._latency_congested(latency_s):
+                self._decrease()
+                return
+            self._set_rate(self._rate + self.increase_rps / self._rate)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            if retry_after:
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+            self._decrease()
+
+    def _latency_congested(self, latency_s: float) -> bool:
+        if latency_s <= 0 or self.latency_factor <= 0:
+            return False
+        floor = self._latency_floor
+        # The baseline creeps up so a permanently slower endpoint is not treated as congestion forever.
+        self._latency_floor = latency_s if floor is None else min(floor * 1.01, latency_s)
+        ewma = self._latency_ewma
+        self._latency_ewma = latency_s if ewma is None else 0.8 * ewma + 0.2 * latency_s
+        return floor is not None and self._latency_ewma > floor * self.latency_factor
+
+    def _decrease(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown_s:
+            return
+        self._last_decrease = now
+        self._set_rate(self._rate * self.decrease_factor)
+
+    def _set_rate(self, value: float) -> None:
+        rate = min(max(value, self.min_rps), self.max_rps)
+        if rate != self._rate:
+            self._rate = rate
+            set_external_http_rate_limit(self.integration, rate)
+
+
+_CONTROLLERS: dict[str, AdaptiveRateController] = {}
+_CONTROLLERS_LOCK = threading.Lock()
+
+
+def rate_controller_for(integration: str) -> AdaptiveRateController:
+    """Return the process-wide controller for ``integration``, creating it from settings."""
+    key = (integration or "default").strip().lower() or "default"
+    with _CONTROLLERS_LOCK:
+        controller = _CONTROLLERS.get(key)
+        if controller is None:
+            controller = AdaptiveRateController(
+                key,
+                initial_rps=settings.HTTP_RATE_INITIAL_RPS,
+                min_rps=settings.HTTP_RATE_MIN_RPS,
+                max_rps=settings.HTTP_RATE_MAX_RPS,
+                burst=settings.HTTP_RATE_BURST,
+                increase_rps=settings.HTTP_RATE_INCREASE_RPS,
+                decrease_factor=settings.HTTP_RATE_DECREASE_FACTOR,
+                latency_factor=settings.HTTP_RATE_LATENCY_FACTOR,
+                cooldown_s=settings.HTTP_RATE_COOLDOWN_S,
+            )
+            _CONTROLLERS[key] = controller
+        return controller
+
+
+def reset_rate_controllers() -> None:
+    with _CONTROLLERS_LOCK:
+        _CONTROLLERS.clear()
+
+
+def is_throttle_status(status_code: int) -> bool:
+    return status_code in _THROTTLE_STATUSES
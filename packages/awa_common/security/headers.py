@@ -1,39 +1,44 @@
 from __future__ import annotations
 
-from collections.abc import Callable
 from typing import Any
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
-class _SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: Any, *, settings: Any) -> None:
-        super().__init__(app)
+class _SecurityHeadersMiddleware:
+    def __init__(self, app: ASGIApp, *, settings: Any) -> None:
+        self.app = app
         self._settings = settings
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Any]) -> Response:
-        response: Response = await call_next(request)
-
-        def _set_if_missing(header: str, value: str | None) -> None:
-            if not value:
-                return
-            if header in response.headers:
-                return  # Respect explicit header set by route.
-            response.headers[header] = value
-
-        _set_if_missing("X-Content-Type-Options", self._settings.SECURITY_X_CONTENT_TYPE_OPTIONS)
-        _set_if_missing("X-Frame-Options", self._settings.SECURITY_FRAME_OPTIONS)
-        _set_if_missing("Referrer-Policy", self._settings.SECURITY_REFERRER_POLICY)
-        if getattr(self._settings, "SECURITY_HSTS_ENABLED", False):
-            env = getattr(self._settings, "ENV", "local")
+    def _headers(self) -> list[tuple[str, str]]:
+        settings = self._settings
+        headers = [
+            ("X-Content-Type-Options", settings.SECURITY_X_CONTENT_TYPE_OPTIONS),
+            ("X-Frame-Options", settings.SECURITY_FRAME_OPTIONS),
+            ("Referrer-Policy", settings.SECURITY_REFERRER_POLICY),
+        ]
+        if getattr(settings, "SECURITY_HSTS_ENABLED", False):
+            env = getattr(settings, "ENV", "local")
             if env in {"stage", "prod"}:
-                _set_if_missing(
-                    "Strict-Transport-Security",
-                    "max-age=31536000; includeSubDomains; preload",
-                )
-
-        return response
+                headers.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload"))
+        return [(header, value) for header, value in headers if value]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for header, value in self._headers():
+                    if header not in response_headers:  # Respect explicit header set by route.
+                        response_headers.append(header, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 def install_security_headers(app: FastAPI, settings: Any) -> None:
@@ -1,20 +1,24 @@
 from __future__ import annotations
 
-from collections.abc import Callable
 from typing import Any
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 class _RequestTooLarge(Exception):
     """Raised when an incoming request exceeds the configured byte cap."""
 
 
-class BodySizeLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: Any, *, settings: Any) -> None:
-        super().__init__(app)
+def _too_large() -> JSONResponse:
+    return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+
+
+class BodySizeLimitMiddleware:
+    def __init__(self, app: ASGIApp, *, settings: Any) -> None:
+        self.app = app
         self._settings = settings
         try:
             settings.__dict__.pop("ingestion", None)
@@ -24,29 +28,30 @@ class BodySizeLimitMiddleware(BaseHTTPMiddleware):
         default_limit = getattr(settings, "MAX_REQUEST_BYTES", 1_048_576)
         self._max_bytes = int(getattr(ingest_cfg, "max_request_bytes", default_limit))
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Any]) -> Response:  # noqa: C901
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:  # noqa: C901
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         limit = self._max_bytes
-        header_value = request.headers.get("content-length")
-        size_hint: int | None = None
+        header_value = Headers(scope=scope).get("content-length")
         if header_value:
             try:
                 size_hint = int(header_value)
             except ValueError:
-                size_hint = None
+                pass
             else:
                 if size_hint > limit:
-                    return JSONResponse(status_code=413, content={"detail": "Request body too large"})
-        original_receive = request._receive  # type: ignore[attr-defined]
-
-        if size_hint is not None:
-            request._receive = original_receive  # type: ignore[attr-defined]
-            return await call_next(request)
+                    await _too_large()(scope, receive, send)
+                else:
+                    await self.app(scope, receive, send)
+                return
 
         total = 0
+        response_started = False
 
-        async def limited_receive() -> dict[str, Any]:
+        async def limited_receive() -> Message:
             nonlocal total
-            message = await original_receive()
+            message = await receive()
             if message["type"] == "http.request":
                 body = message.get("body", b"") or b""
                 total += len(body)
@@ -54,20 +59,22 @@ class BodySizeLimitMiddleware(BaseHTTPMiddleware):
                     raise _RequestTooLarge
             return message
 
-        request._receive = limited_receive  # type: ignore[attr-defined]
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
+            await self.app(scope, limited_receive, tracking_send)
         except _RequestTooLarge:
-            return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            if response_started:
+                raise
+            await _too_large()(scope, receive, send)
         except BaseExceptionGroup as exc:  # pragma: no cover - Python 3.11+ task groups
-            for err in exc.exceptions:
-                if isinstance(err, _RequestTooLarge):
-                    return JSONResponse(status_code=413, content={"detail": "Request body too large"})
-            raise
-        finally:
-            request._receive = original_receive  # type: ignore[attr-defined]
-
-        return response
+            if response_started or not any(isinstance(err, _RequestTooLarge) for err in exc.exceptions):
+                raise
+            await _too_large()(scope, receive, send)
 
 
 def install_body_size_limit(app: FastAPI, settings: Any) -> None:
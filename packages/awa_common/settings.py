@@ -231,12 +231,18 @@ class Settings(BaseSettings):
     RATE_LIMIT_ROI_BY_VENDOR_PER_USER: int = 12
     LIMITER_NEAR_LIMIT_THRESHOLD: float = 0.9
     LIMITER_WARN_INTERVAL_S: float = 60.0
+    RATE_LIMIT_ALGORITHM: Literal["fixed_window", "sliding_window", "gcra"] = "fixed_window"
+    RATE_LIMIT_LOCAL_PRECHECK: bool = True
     MAX_REQUEST_BYTES: int = 268_435_456  # 256 MB ceiling for uploads
     INGEST_STREAMING_ENABLED: bool = True
     INGEST_STREAMING_THRESHOLD_MB: int = 50
     INGEST_CHUNK_SIZE_MB: int = 8
     INGEST_STREAMING_CHUNK_SIZE_MB: int = 8
     INGEST_STREAMING_CHUNK_SIZE: int = 50_000
+    INGEST_SHARDING_ENABLED: bool = True
+    INGEST_SHARD_THRESHOLD_MB: int = 512
+    INGEST_SHARD_SIZE_MB: int = 64
+    INGEST_SHARD_MAX_RETRIES: int = 3
     INGEST_IDEMPOTENT: bool = True
     ANALYZE_MIN_ROWS: int = 50_000
     USE_COPY: bool = True
@@ -278,6 +284,15 @@ class Settings(BaseSettings):
     CELERY_TASK_ALWAYS_EAGER: bool = False
     CELERY_LOOP_LAG_MONITOR: bool = True
     CELERY_LOOP_LAG_INTERVAL_S: float | None = None
+    CELERY_INGEST_CONCURRENCY: int = 4
+    CELERY_INGEST_PREFETCH_MULTIPLIER: int = 1
+    CELERY_INGEST_BULK_CONCURRENCY: int = 4
+    CELERY_INGEST_BULK_PREFETCH_MULTIPLIER: int = 1
+    CELERY_MAINTENANCE_CONCURRENCY: int = 1
+    CELERY_MAINTENANCE_PREFETCH_MULTIPLIER: int = 1
+    CELERY_NOTIFICATIONS_CONCURRENCY: int = 2
+    CELERY_NOTIFICATIONS_PREFETCH_MULTIPLIER: int = 4
+    INGEST_BULK_THRESHOLD_MB: int = 64
     BACKLOG_PROBE_SECONDS: int = 15
     REDIS_BACKLOG_WARN_SIZE: int = 1000
     REDIS_BACKLOG_WARN_INTERVAL_S: float = 60.0
@@ -339,6 +354,18 @@ class Settings(BaseSettings):
     HTTP_BACKOFF_MAX_S: float = 30.0
     HTTP_BACKOFF_JITTER_S: float = 1.0
     HTTP_RETRY_STATUS_CODES: list[int] = Field(default_factory=lambda: [429, 500, 502, 503, 504])
+    HTTP_ADAPTIVE_RATE_ENABLED: bool = False
+    HTTP_ADAPTIVE_RATE_INTEGRATIONS: list[str] = Field(
+        default_factory=lambda: ["helium10", "logistics_etl", "telegram"]
+    )
+    HTTP_RATE_INITIAL_RPS: float = 20.0
+    HTTP_RATE_MIN_RPS: float = 0.5
+    HTTP_RATE_MAX_RPS: float = 200.0
+    HTTP_RATE_BURST: int = 10
+    HTTP_RATE_INCREASE_RPS: float = 1.0
+    HTTP_RATE_DECREASE_FACTOR: float = 0.5
+    HTTP_RATE_LATENCY_FACTOR: float = 4.0
+    HTTP_RATE_COOLDOWN_S: float = 1.0
     ETL_RETRY_MIN_S: float = 0.5
     ENABLE_LIVE: bool = False
     TASK_ID: str | None = None
@@ -368,6 +395,12 @@ class Settings(BaseSettings):
     LLM_BACKOFF_MAX_MS: float = 5000.0
     LLM_BIN_TIMEOUT_SEC: float = 30.0
     LLM_MAX_OUTPUT_BYTES: int = 65536
+    LLM_BIN_POOL_SIZE: int = 0
+    LLM_BIN_POOL_COMMAND: str | None = None
+    LLM_BIN_POOL_QUEUE_SIZE: int = 16
+    LLM_BIN_POOL_MAX_REQUESTS: int = 200
+    LLM_BATCH_WINDOW_MS: float = 10.0
+    LLM_BATCH_MAX_SIZE: int = 8
     LLM_LAN_HEALTH_TIMEOUT_S: float = 1.0
     LLM_EMAIL_CLOUD_THRESHOLD_CHARS: int = 12000
     LLM_PRICELIST_CLOUD_THRESHOLD_ROWS: int = 500
@@ -375,6 +408,8 @@ class Settings(BaseSettings):
     LLM_ENABLE_EMAIL: bool = False
     LLM_ENABLE_PRICELIST: bool = False
     LLM_MIN_CONFIDENCE: float = 0.35
+    LLM_RESPONSE_CACHE_TTL_S: float = 3600.0
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = 512
 
     # Auth configuration (Keycloak OIDC)
     OIDC_ISSUER: str = Field(default="https://keycloak.local/realms/awa")
@@ -390,6 +425,9 @@ class Settings(BaseSettings):
 
     # Audit trail
     SECURITY_ENABLE_AUDIT: bool = True
+    AUDIT_QUEUE_MAX: int = 10000
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_MS: int = 250
 
     # Alert bot configuration
     TELEGRAM_TOKEN: str = ""
@@ -407,13 +445,22 @@ class Settings(BaseSettings):
     )
     ALERT_SCHEDULE_CRON: str = Field(
         default="*/1 * * * *",
-        description="Optional alias for the alert bot beat schedule (`ALERT_SCHEDULE_CRON`).",
+        description="Cron cadence for `alertbot.deliver`, which drains the alert outbox (default every minute).",
     )
     ALERT_EVAL_CONCURRENCY: int = 8
     ALERT_SEND_CONCURRENCY: int = 8
     ALERT_TELEGRAM_MAX_RPS: float = 25.0
     ALERT_TELEGRAM_MAX_CHAT_RPS: float = 1.0
     ALERT_RULE_TIMEOUT_S: float = 15.0
+    ALERT_INCREMENTAL_ENABLED: bool = True
+    ALERT_WATERMARK_OVERLAP_S: float = 300.0
+    ALERT_TEMPLATE_CACHE_SIZE: int = 256
+    ALERT_OUTBOX_ENABLED: bool = True
+    ALERT_OUTBOX_DEDUPE_WINDOW_S: float = 3600.0
+    ALERT_OUTBOX_MAX_ATTEMPTS: int = 5
+    ALERT_OUTBOX_BATCH_SIZE: int = 200
+    ALERT_OUTBOX_LEASE_S: float = 120.0
+    ALERT_OUTBOX_DRAIN_S: float = 50.0
     TELEGRAM_CONNECT_TIMEOUT_S: float = 3.0
     TELEGRAM_TOTAL_TIMEOUT_S: float = 10.0
     ROI_THRESHOLD: int = 5
@@ -457,20 +504,34 @@ class Settings(BaseSettings):
     FEES_RAW_TABLE: str = "fees_raw"
     H10_MAX_CONCURRENCY: int = 5
     H10_DB_POOL_MAX_SIZE: int = 10
+    H10_WRITE_BATCH_ROWS: int = 200
+    H10_WRITE_FLUSH_S: float = 2.0
+    H10_REFRESH_BUDGET: int = 2_000
+    H10_REFRESH_MIN_AGE_HOURS: float = 20.0
+    H10_REFRESH_MAX_AGE_DAYS: float = 30.0
+    H10_REFRESH_ROI_BAND_PCT: float = 10.0
 
     # Price importer
     PRICE_IMPORTER_CHUNK_ROWS: int = 10_000
     PRICE_IMPORTER_VALIDATION_WORKERS: int = 4
+    PRICE_IMPORTER_VALIDATION_BACKEND: Literal["thread", "process"] = "thread"
 
     # Email ingestion
     IMAP_HOST: str = ""
     IMAP_USER: str = ""
     IMAP_PASS: str = ""
+    IMAP_WATCH_MODE: Literal["poll", "idle"] = "poll"
+    IMAP_IDLE_TIMEOUT_S: float = 300.0
+    IMAP_POLL_INTERVAL_S: float = 60.0
+    IMAP_RECONNECT_BACKOFF_MAX_S: float = 60.0
+    IMAP_FETCH_BATCH_SIZE: int = 50
+    IMAP_PIPELINE_CONCURRENCY: int = 8
 
     # Repricer defaults
     REPRICER_MIN_ROI: Decimal = Decimal("0.05")
     REPRICER_BUYBOX_GAP: Decimal = Decimal("0.05")
     REPRICER_ROUND: Decimal = Decimal("0.10")
+    REPRICER_CHUNK_SIZE: int = 10000
 
     def __init__(self, **values: Any) -> None:
         _apply_legacy_env_aliases()
@@ -681,6 +742,7 @@ class Settings(BaseSettings):
             "RATE_LIMIT_OPS": self.RATE_LIMIT_OPS,
             "RATE_LIMIT_ADMIN": self.RATE_LIMIT_ADMIN,
             "LIMITER_NEAR_LIMIT_THRESHOLD": self.LIMITER_NEAR_LIMIT_THRESHOLD,
+            "RATE_LIMIT_ALGORITHM": self.RATE_LIMIT_ALGORITHM,
             "REDIS_BACKLOG_WARN_SIZE": self.REDIS_BACKLOG_WARN_SIZE,
             "DB_POOL_WARN_PCT": self.DB_POOL_WARN_PCT,
             "MAX_REQUEST_BYTES": self.MAX_REQUEST_BYTES,
@@ -10,9 +10,11 @@ from types import FrameType
 from typing import Any, Literal, get_args
 
 import structlog
+from jinja2 import TemplateSyntaxError
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 from awa_common.settings import settings
+from services.alert_bot.templates import compile_template, template_source
 
 yaml = importlib.import_module("yaml")
 RuleType = Literal[
@@ -225,6 +227,23 @@ def load_config(path: str | Path, *, overrides: dict[str, bool] | None = None) -
     return document.to_runtime(config_path, override_map)
 
 
+def precompile_templates(runtime: AlertRulesRuntime) -> int:
+    """Compile every rule template into the shared cache so syntax errors fail the load, not the send."""
+
+    sources: set[tuple[str, str | None]] = set()
+    for rule in runtime.rules:
+        source = template_source(rule.type, rule.template)
+        key = (source, rule.parse_mode)
+        if key in sources:
+            continue
+        try:
+            compile_template(source, rule.parse_mode)
+        except TemplateSyntaxError as exc:
+            raise ValueError(f"rule '{rule.id}' has an invalid template (line {exc.lineno}): {exc.message}") from exc
+        sources.add(key)
+    return len(sources)
+
+
 _ACTIVE_MANAGER: AlertConfigManager | None = None
 
 
@@ -311,9 +330,12 @@ class AlertConfigManager:
         if not force and self._config is not None and current_mtime == self._mtime_ns:
             return self._config
         runtime = load_config(self._path, overrides=self._overrides)
+        compiled = precompile_templates(runtime)
         self._config = runtime
         self._mtime_ns = current_mtime
-        self._logger.info("alert_rules_config.loaded", rules=len(runtime.rules), version=runtime.version)
+        self._logger.info(
+            "alert_rules_config.loaded", rules=len(runtime.rules), templates=compiled, version=runtime.version
+        )
         return runtime
 
 
@@ -329,4 +351,5 @@ __all__ = [
     "RuleType",
     "load_config",
     "parse_rule_overrides",
+    "precompile_templates",
 ]
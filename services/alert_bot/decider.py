@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 from collections import OrderedDict
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 
 from services.alert_bot.config import AlertRule
-from services.alert_bot.rules import AlertEvent
+from services.alert_bot.rules import MAX_MESSAGE_BYTES, AlertEvent
+
+_SEVERITY_ORDER = {"critical": 0, "error": 1, "high": 1, "warning": 2, "warn": 2, "info": 3}
+_MESSAGE_SEPARATOR = "\n\n"
 
 
 @dataclass(slots=True)
@@ -36,6 +40,29 @@ class AlertRequest:
     dedupe_key: str
     disable_web_page_preview: bool
     labels: dict[str, str] = field(default_factory=dict)
+    dedupe_keys: tuple[str, ...] = ()
+    rule_ids: tuple[str, ...] = ()
+
+    @property
+    def part_keys(self) -> tuple[str, ...]:
+        """Dedupe keys of every event folded into this message."""
+        return self.dedupe_keys or (self.dedupe_key,)
+
+    @property
+    def part_rule_ids(self) -> tuple[str, ...]:
+        return self.rule_ids or (self.rule_id,)
+
+
+@dataclass(slots=True)
+class DeliveryPlan:
+    """Coalesced messages grouped into one ordered lane per chat."""
+
+    lanes: dict[str, list[AlertRequest]]
+    requests_in: int = 0
+
+    @property
+    def messages(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
 
 
 def dedupe_events(events: Iterable[AlertEvent]) -> list[AlertEvent]:
@@ -111,6 +138,71 @@ def build_alert_requests(decisions: Sequence[RuleDecision]) -> list[AlertRequest
     return requests
 
 
+def plan_deliveries(requests: Sequence[AlertRequest], *, max_message_chars: int = MAX_MESSAGE_BYTES) -> DeliveryPlan:
+    """Pack per-recipient requests into as few messages as fit Telegram's size limit.
+
+    Requests for the same chat, severity and formatting are joined in order while the combined
+    text stays within ``max_message_chars`` (Telegram counts characters, as ``_chunk_text`` does).
+    Each chat gets one lane ordered by severity, most severe first; sending a lane sequentially
+    keeps messages in order and leaves the per-chat rate to that chat alone.
+    """
+
+    groups: dict[str, dict[tuple[str, str | None, bool], list[AlertRequest]]] = {}
+    seen: set[tuple[str, str]] = set()
+    for request in requests:
+        if (request.chat_id, request.dedupe_key) in seen:
+            continue
+        seen.add((request.chat_id, request.dedupe_key))
+        key = (request.severity, request.parse_mode, request.disable_web_page_preview)
+        groups.setdefault(request.chat_id, {}).setdefault(key, []).append(request)
+    lanes: dict[str, list[AlertRequest]] = {}
+    for chat_id, by_format in groups.items():
+        ordered = sorted(by_format.items(), key=lambda item: _SEVERITY_ORDER.get(item[0][0], len(_SEVERITY_ORDER)))
+        lane: list[AlertRequest] = []
+        for _, members in ordered:
+            lane.extend(_coalesce(members, max_message_chars))
+        lanes[chat_id] = lane
+    return DeliveryPlan(lanes=lanes, requests_in=len(requests))
+
+
+def _coalesce(members: list[AlertRequest], limit: int) -> list[AlertRequest]:
+    messages: list[AlertRequest] = []
+    pending: list[AlertRequest] = []
+    size = 0
+    for request in members:
+        extra = len(request.message) + (len(_MESSAGE_SEPARATOR) if pending else 0)
+        if pending and size + extra > limit:
+            messages.append(_merge(pending))
+            pending, size, extra = [], 0, len(request.message)
+        pending.append(request)
+        size += extra
+    if pending:
+        messages.append(_merge(pending))
+    return messages
+
+
+def _merge(parts: list[AlertRequest]) -> AlertRequest:
+    if len(parts) == 1:
+        return parts[0]
+    first = parts[0]
+    keys = tuple(key for part in parts for key in part.part_keys)
+    rule_ids = tuple(dict.fromkeys(rule_id for part in parts for rule_id in part.part_rule_ids))
+    labels = {key: value for key, value in first.labels.items() if all(p.labels.get(key) == value for p in parts)}
+    digest = hashlib.sha1("\x1f".join(keys).encode("utf-8"), usedforsecurity=False).hexdigest()
+    return AlertRequest(
+        rule_id=rule_ids[0],
+        severity=first.severity,
+        chat_id=first.chat_id,
+        message=_MESSAGE_SEPARATOR.join(part.message for part in parts),
+        parse_mode=first.parse_mode,
+        dedupe_key=f"batch:{digest}",
+        disable_web_page_preview=first.disable_web_page_preview,
+        labels=labels,
+        dedupe_keys=keys,
+        rule_ids=rule_ids,
+    )
+
+
 def _resolve_severity(rule: AlertRule | None) -> str:
     if rule is None:
         return "info"
@@ -131,9 +223,11 @@ def _intent_labels(rule: AlertRule | None) -> dict[str, str]:
 
 __all__ = [
     "AlertRequest",
+    "DeliveryPlan",
     "NotificationIntent",
     "RuleDecision",
     "build_alert_requests",
     "build_notification_intents",
     "dedupe_events",
+    "plan_deliveries",
 ]
@@ -0,0 +1,199 @@
+"""Durable Postgres outbox for alert deliveries.
+
+``AlertBotRunner.run`` enqueues requests and returns once rules are evaluated; the ``alertbot.deliver``
+task claims due rows, coalesces them per chat and sends them. A Telegram ``retry_after`` reschedules the
+affected rows instead of sleeping, and a (chat, dedupe key) pair is not queued again until
+``ALERT_OUTBOX_DEDUPE_WINDOW_S`` has passed since it was last queued.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from services.alert_bot.decider import AlertRequest
+from services.alert_bot.rules import fetch_rows
+
+ENQUEUE_SQL = """
+    INSERT INTO alert_outbox (
+        chat_id, dedupe_key, rule_id, severity, message, parse_mode, disable_web_page_preview, labels
+    )
+    SELECT s.chat_id, s.dedupe_key, s.rule_id, s.severity, s.message, s.parse_mode, s.preview, s.labels::jsonb
+    FROM unnest(
+        $1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[], $7::bool[], $8::text[]
+    ) AS s(chat_id, dedupe_key, rule_id, severity, message, parse_mode, preview, labels)
+    ON CONFLICT (chat_id, dedupe_key) DO UPDATE
+    SET rule_id = EXCLUDED.rule_id,
+        severity = EXCLUDED.severity,
+        message = EXCLUDED.message,
+        parse_mode = EXCLUDED.parse_mode,
+        disable_web_page_preview = EXCLUDED.disable_web_page_preview,
+        labels = EXCLUDED.labels,
+        status = 'pending',
+        attempts = 0,
+        next_attempt_at = now(),
+        locked_until = NULL,
+        last_error = NULL,
+        created_at = now(),
+        sent_at = NULL
+    WHERE alert_outbox.status IN ('sent', 'failed')
+      AND alert_outbox.created_at < now() - make_interval(secs => $9)
+    RETURNING id
+"""
+
+CLAIM_SQL = """
+    UPDATE alert_outbox AS o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        locked_until = now() + make_interval(secs => $2)
+    WHERE o.id IN (
+        SELECT id
+        FROM alert_outbox
+        WHERE (status = 'pending' AND next_attempt_at <= now())
+           OR (status = 'sending' AND locked_until < now())
+        ORDER BY next_attempt_at, id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING o.id, o.chat_id, o.dedupe_key, o.rule_id, o.severity, o.message, o.parse_mode,
+              o.disable_web_page_preview, o.labels::text AS labels, o.attempts
+"""
+
+MARK_SENT_SQL = """
+    UPDATE alert_outbox
+    SET status = 'sent', sent_at = now(), locked_until = NULL, last_error = NULL
+    WHERE id = ANY($1::bigint[])
+"""
+
+RESCHEDULE_SQL = """
+    UPDATE alert_outbox
+    SET status = 'pending',
+        locked_until = NULL,
+        next_attempt_at = now() + make_interval(secs => $2),
+        last_error = $3,
+        attempts = CASE WHEN $4 THEN GREATEST(attempts - 1, 0) ELSE attempts END
+    WHERE id = ANY($1::bigint[])
+"""
+
+MARK_FAILED_SQL = """
+    UPDATE alert_outbox
+    SET status = 'failed', locked_until = NULL, last_error = $2
+    WHERE id = ANY($1::bigint[])
+"""
+
+BACKLOG_SQL = """
+    SELECT count(*)::int AS pending,
+           EXTRACT(EPOCH FROM min(
+               CASE WHEN status = 'sending' THEN locked_until ELSE next_attempt_at END
+           ) - now())::float8 AS next_due_s
+    FROM alert_outbox
+    WHERE status IN ('pending', 'sending')
+"""
+
+PURGE_SQL = """
+    DELETE FROM alert_outbox
+    WHERE status IN ('sent', 'failed') AND created_at < now() - make_interval(secs => $1)
+"""
+
+
+@dataclass(slots=True)
+class OutboxEntry:
+    id: int
+    attempts: int
+    request: AlertRequest
+
+
+async def enqueue(requests: Sequence[AlertRequest], *, dedupe_window_s: float) -> int:
+    """Queue requests in one round trip and return how many rows were (re)queued."""
+
+    unique: dict[tuple[str, str], AlertRequest] = {}
+    for request in requests:
+        unique.setdefault((request.chat_id, request.dedupe_key), request)
+    if not unique:
+        return 0
+    batch = list(unique.values())
+    rows = await fetch_rows(
+        ENQUEUE_SQL,
+        [request.chat_id for request in batch],
+        [request.dedupe_key for request in batch],
+        [request.rule_id for request in batch],
+        [request.severity for request in batch],
+        [request.message for request in batch],
+        [request.parse_mode for request in batch],
+        [request.disable_web_page_preview for request in batch],
+        [json.dumps(request.labels, sort_keys=True) for request in batch],
+        max(float(dedupe_window_s), 0.0),
+    )
+    return len(rows)
+
+
+async def claim(limit: int, *, lease_s: float) -> list[OutboxEntry]:
+    """Lease up to ``limit`` due rows (and rows whose lease expired), oldest first."""
+
+    rows = await fetch_rows(CLAIM_SQL, max(1, int(limit)), max(float(lease_s), 1.0))
+    entries = [
+        OutboxEntry(
+            id=int(row["id"]),
+            attempts=int(row["attempts"]),
+            request=AlertRequest(
+                rule_id=row["rule_id"],
+                severity=row["severity"],
+                chat_id=row["chat_id"],
+                message=row["message"],
+                parse_mode=row["parse_mode"],
+                dedupe_key=row["dedupe_key"],
+                disable_web_page_preview=bool(row["disable_web_page_preview"]),
+                labels=json.loads(row["labels"] or "{}"),
+            ),
+        )
+        for row in rows
+    ]
+    entries.sort(key=lambda entry: entry.id)
+    return entries
+
+
+async def mark_sent(ids: Sequence[int]) -> None:
+    if ids:
+        await fetch_rows(MARK_SENT_SQL, list(ids))
+
+
+async def reschedule(ids: Sequence[int], delay_s: float, error: str | None, *, refund: bool = False) -> None:
+    """Return rows to the queue after ``delay_s``; ``refund`` undoes the attempt counted at claim time."""
+
+    if ids:
+        await fetch_rows(RESCHEDULE_SQL, list(ids), max(float(delay_s), 0.0), error, refund)
+
+
+async def mark_failed(ids: Sequence[int], error: str | None) -> None:
+    if ids:
+        await fetch_rows(MARK_FAILED_SQL, list(ids), error)
+
+
+async def backlog() -> tuple[int, float | None]:
+    """Return the number of undelivered rows and seconds until the next one is due."""
+
+    rows = await fetch_rows(BACKLOG_SQL)
+    if not rows:
+        return 0, None
+    row = rows[0]
+    next_due = row["next_due_s"]
+    return int(row["pending"] or 0), (float(next_due) if next_due is not None else None)
+
+
+async def purge(older_than_s: float) -> None:
+    """Drop delivered and failed rows that no longer take part in deduplication."""
+
+    await fetch_rows(PURGE_SQL, max(float(older_than_s), 0.0))
+
+
+__all__ = [
+    "OutboxEntry",
+    "backlog",
+    "claim",
+    "enqueue",
+    "mark_failed",
+    "mark_sent",
+    "purge",
+    "reschedule",
+]
@@ -3,17 +3,28 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import time
-from collections.abc import Awaitable, Callable, Mapping, Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Mapping, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from typing import Any
 
 import asyncpg
 import structlog
-from jinja2 import Environment, StrictUndefined, TemplateError
+from jinja2 import TemplateError
 
 from awa_common.dsn import build_dsn
 from awa_common.settings import settings as SETTINGS
 from services.alert_bot.config import AlertRule
+from services.alert_bot.rules.incremental import (
+    INCREMENTAL_QUERIES,
+    LOAD_STATE_SQL,
+    SAVE_STATE_SQL,
+    RuleState,
+    params_hash,
+)
+from services.alert_bot.templates import DEFAULT_TEMPLATES, compile_template, template_source
 
 # Logging --------------------------------------------------------------------
 _LOGGER = structlog.get_logger(__name__).bind(
@@ -89,13 +100,18 @@ async def fetch_rows(query: str, *args: Any) -> list[asyncpg.Record]:
 
 async def query_roi_breaches(min_roi_pct: float, min_duration_days: int) -> list[asyncpg.Record]:
     return await fetch_rows(
-        "SELECT asin, roi_pct FROM roi_view WHERE roi_pct < $1 AND updated_at < now() - interval '$2 days'",
+        """
+        SELECT asin, roi_pct, EXTRACT(EPOCH FROM now() - updated_at)::float8 / 86400 AS age_days
+        FROM roi_view
+        WHERE roi_pct < $1 AND updated_at < now() - make_interval(days => $2)
+        """,
         min_roi_pct,
         min_duration_days,
     )
 
 
 async def query_price_increase(delta_pct: float) -> list[asyncpg.Record]:
+    # ``delta`` stays unrounded so shared and incremental filters agree with the WHERE; templates round it.
     return await fetch_rows(
         """
         WITH t AS (
@@ -104,9 +120,9 @@ async def query_price_increase(delta_pct: float) -> list[asyncpg.Record]:
                    updated_at
             FROM vendor_prices
         )
-        SELECT sku, vendor_id, ROUND((cost - prev_cost) / prev_cost * 100, 2) AS delta
+        SELECT sku, vendor_id, (cost - prev_cost) / prev_cost * 100 AS delta
         FROM t
-        WHERE prev_cost IS NOT NULL AND delta > $1
+        WHERE prev_cost IS NOT NULL AND prev_cost <> 0 AND (cost - prev_cost) / prev_cost * 100 > $1
         ORDER BY updated_at DESC
         """,
         delta_pct,
@@ -118,7 +134,7 @@ async def query_buybox_drop(drop_pct: float) -> list[asyncpg.Record]:
         """
         SELECT asin, 100 * (price_48h - price_now) / price_48h AS drop_pct
         FROM buybox_prices
-        WHERE drop_pct > $1
+        WHERE price_48h <> 0 AND 100 * (price_48h - price_now) / price_48h > $1
         """,
         drop_pct,
     )
@@ -130,11 +146,238 @@ async def query_high_returns(returns_pct: float) -> list[asyncpg.Record]:
 
 async def query_stale_price_lists(stale_days: int) -> list[asyncpg.Record]:
     return await fetch_rows(
-        "SELECT vendor_id FROM vendor_prices GROUP BY vendor_id HAVING MAX(updated_at) < now() - interval '$1 days'",
+        """
+        SELECT vendor_id, EXTRACT(EPOCH FROM now() - MAX(updated_at))::float8 / 86400 AS age_days
+        FROM vendor_prices
+        GROUP BY vendor_id
+        HAVING MAX(updated_at) < now() - make_interval(days => $1)
+        """,
         stale_days,
     )
 
 
+# Shared snapshots -----------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class SharedQuery:
+    """A query several rules can share: run once with the loosest args, then filter per rule."""
+
+    fetch: Callable[..., Awaitable[list[asyncpg.Record]]]
+    loosest: Callable[[list[tuple[Any, ...]]], tuple[Any, ...]]
+    keep: Callable[[Mapping[str, Any], tuple[Any, ...]], bool]
+
+
+def _roi_args(rule: AlertRule) -> tuple[float, int]:
+    return (
+        float(rule.params.get("min_roi_pct", SETTINGS.ROI_THRESHOLD)),
+        int(rule.params.get("min_days", SETTINGS.ROI_DURATION_DAYS)),
+    )
+
+
+def _price_increase_args(rule: AlertRule) -> tuple[float]:
+    return (float(rule.params.get("grow_pct", SETTINGS.COST_DELTA_PCT)),)
+
+
+def _buybox_args(rule: AlertRule) -> tuple[float]:
+    return (float(rule.params.get("drop_pct", SETTINGS.PRICE_DROP_PCT)),)
+
+
+def _returns_args(rule: AlertRule) -> tuple[float]:
+    return (float(rule.params.get("returns_pct", SETTINGS.RETURNS_PCT)),)
+
+
+def _stale_args(rule: AlertRule) -> tuple[int]:
+    return (int(rule.params.get("stale_days", SETTINGS.STALE_DAYS)),)
+
+
+def _min_first(values: list[tuple[Any, ...]]) -> tuple[Any, ...]:
+    return (min(value[0] for value in values),)
+
+
+def _above(column: str) -> Callable[[Mapping[str, Any], tuple[Any, ...]], bool]:
+    return lambda row, args: row[column] is not None and row[column] > args[0]
+
+
+# Fetchers resolve the module-level query at call time so tests can patch them.
+SHARED_QUERIES: dict[str, SharedQuery] = {
+    "roi_breaches": SharedQuery(
+        fetch=lambda *args: query_roi_breaches(*args),
+        loosest=lambda values: (max(v[0] for v in values), min(v[1] for v in values)),
+        keep=lambda row, args: row["roi_pct"] < args[0] and row["age_days"] > args[1],
+    ),
+    "price_increase": SharedQuery(
+        fetch=lambda *args: query_price_increase(*args), loosest=_min_first, keep=_above("delta")
+    ),
+    "buybox_drop": SharedQuery(
+        fetch=lambda *args: query_buybox_drop(*args), loosest=_min_first, keep=_above("drop_pct")
+    ),
+    "high_returns": SharedQuery(
+        fetch=lambda *args: query_high_returns(*args), loosest=_min_first, keep=_above("returns_ratio")
+    ),
+    "stale_price_lists": SharedQuery(
+        fetch=lambda *args: query_stale_price_lists(*args), loosest=_min_first, keep=_above("age_days")
+    ),
+}
+
+_RULE_QUERIES: dict[str, tuple[str, Callable[[AlertRule], tuple[Any, ...]]]] = {
+    "roi_drop": ("roi_breaches", _roi_args),
+    "roi": ("roi_breaches", _roi_args),
+    "price_increase_pct": ("price_increase", _price_increase_args),
+    "buybox_loss": ("buybox_drop", _buybox_args),
+    "buybox_drop_pct": ("buybox_drop", _buybox_args),
+    "returns_spike": ("high_returns", _returns_args),
+    "returns_rate_pct": ("high_returns", _returns_args),
+    "price_outdated": ("stale_price_lists", _stale_args),
+    "stale_price_days": ("stale_price_lists", _stale_args),
+}
+
+
+class RuleBatch:
+    """Share one scan per query type across every due rule of a batch.
+
+    With incremental evaluation enabled, rule types backed by :mod:`.incremental` read only rows
+    changed since the oldest watermark among the batch's rules and keep per-rule state in
+    ``alert_rule_state``; if that state cannot be loaded the batch falls back to full snapshots.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule], *, incremental: bool | None = None) -> None:
+        grouped: dict[str, list[tuple[Any, ...]]] = {}
+        self._incremental_rules: dict[str, tuple[str, tuple[Any, ...]]] = {}
+        for rule in rules:
+            entry = _RULE_QUERIES.get(rule.type)
+            if entry is not None:
+                name, args_for = entry
+                args = args_for(rule)
+                grouped.setdefault(name, []).append(args)
+                if name in INCREMENTAL_QUERIES:
+                    self._incremental_rules[rule.id] = (name, args)
+        self.args = {name: SHARED_QUERIES[name].loosest(values) for name, values in grouped.items()}
+        self.incremental = bool(SETTINGS.ALERT_INCREMENTAL_ENABLED if incremental is None else incremental)
+        self._overlap_s = float(SETTINGS.ALERT_WATERMARK_OVERLAP_S)
+        self._tasks: dict[str, asyncio.Task[Any]] = {}
+        self._states: dict[str, RuleState] = {}
+        self._updated: dict[str, RuleState] = {}
+
+    @property
+    def queries_run(self) -> int:
+        return len(self._tasks)
+
+    async def _shared(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+        # Shielded so one rule timing out does not cancel the scan the other rules are waiting on.
+        return await asyncio.shield(task)
+
+    async def rows(self, name: str, args: tuple[Any, ...]) -> list[asyncpg.Record] | list[Mapping[str, Any]]:
+        query = SHARED_QUERIES[name]
+        shared_args = self.args.get(name)
+        if shared_args is None:
+            return await query.fetch(*args)
+        rows = await self._shared(name, lambda: query.fetch(*shared_args))
+        return [row for row in rows if query.keep(row, args)]
+
+    async def incremental_rows(self, rule: AlertRule, name: str, args: tuple[Any, ...]) -> list[dict[str, Any]] | None:
+        """Return the rule's current breaches from its watermark state, or ``None`` to fall back."""
+
+        if not self.incremental or rule.id not in self._incremental_rules:
+            return None
+        await self._shared("states", self._load_states)
+        if not self.incremental:
+            return None
+        query = INCREMENTAL_QUERIES[name]
+        state = self._state_for(rule.id, name, args)
+        since = state.since(self._overlap_s)
+        changes = await self._shared(
+            f"changes:{name}", lambda: fetch_rows(query.changes_sql, self._changes_since(name))
+        )
+        updated = state.advanced(query, changes, args, since=since)
+        self._updated[rule.id] = updated
+        return updated.breaches(query, args, datetime.now(UTC))
+
+    def _state_for(self, rule_id: str, name: str, args: tuple[Any, ...]) -> RuleState:
+        expected = params_hash(name, args)
+        state = self._states.get(rule_id)
+        if state is None or state.params_hash != expected:
+            # New rule or changed thresholds: rebuild from a full scan.
+            return RuleState(rule_id, expected)
+        return state
+
+    def _changes_since(self, name: str) -> datetime | None:
+        bounds = [
+            self._state_for(rule_id, rule_name, args).since(self._overlap_s)
+            for rule_id, (rule_name, args) in self._incremental_rules.items()
+            if rule_name == name
+        ]
+        if not bounds or any(bound is None for bound in bounds):
+            return None
+        return min(bound for bound in bounds if bound is not None)
+
+    async def _load_states(self) -> None:
+        try:
+            records = await fetch_rows(LOAD_STATE_SQL, list(self._incremental_rules))
+        except Exception as exc:
+            self.incremental = False
+            _LOGGER.warning("alert_rule.state_unavailable", error=str(exc))
+            return
+        self._states = {record["rule_id"]: RuleState.from_record(record) for record in records}
+
+    async def save_states(self) -> None:
+        if not self._updated:
+            return
+        states = list(self._updated.values())
+        try:
+            await fetch_rows(
+                SAVE_STATE_SQL,
+                [state.rule_id for state in states],
+                [state.params_hash for state in states],
+                [state.watermark for state in states],
+                [state.encoded_active() for state in states],
+            )
+        except Exception as exc:
+            _LOGGER.warning("alert_rule.state_save_failed", error=str(exc), rules=len(states))
+
+    async def aclose(self) -> None:
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in self._tasks.values():
+            if task.done() and not task.cancelled():
+                task.exception()
+
+
+_ACTIVE_BATCH: ContextVar[RuleBatch | None] = ContextVar("alert_rule_batch", default=None)
+
+
+@asynccontextmanager
+async def rule_batch(rules: Iterable[AlertRule], *, incremental: bool | None = None) -> AsyncIterator[RuleBatch]:
+    """Evaluate rules inside this block against shared per-query-type snapshots."""
+
+    batch = RuleBatch(rules, incremental=incremental)
+    token = _ACTIVE_BATCH.set(batch)
+    try:
+        yield batch
+    finally:
+        _ACTIVE_BATCH.reset(token)
+        await batch.aclose()
+        await batch.save_states()
+        _LOGGER.debug("alert_rule.batch_queries", query_types=len(batch.args), queries=batch.queries_run)
+
+
+async def _shared_rows(rule: AlertRule) -> tuple[tuple[Any, ...], Sequence[Mapping[str, Any]]]:
+    name, args_for = _RULE_QUERIES[rule.type]
+    args = args_for(rule)
+    batch = _ACTIVE_BATCH.get()
+    if batch is None:
+        return args, await SHARED_QUERIES[name].fetch(*args)
+    incremental = await batch.incremental_rows(rule, name, args)
+    if incremental is not None:
+        return args, incremental
+    return args, await batch.rows(name, args)
+
+
 # Alert events and templates --------------------------------------------------
 MAX_MESSAGE_BYTES = 4096
 
@@ -149,53 +392,9 @@ class AlertEvent:
     disable_web_page_preview: bool = True
 
 
-_HTML_ENV = Environment(
-    autoescape=True,
-    trim_blocks=True,
-    lstrip_blocks=True,
-    undefined=StrictUndefined,
-)
-_TEXT_ENV = Environment(
-    autoescape=False,
-    trim_blocks=True,
-    lstrip_blocks=True,
-    undefined=StrictUndefined,
-)
-
-DEFAULT_TEMPLATES: dict[str, str] = {
-    "roi_drop": """⚠️ ROI ниже {{ params.min_roi_pct }}% по {{ count }} SKU.
-{% for row in rows -%}
-• {{ row.asin }} — {{ "%.2f"|format(row.roi_pct) }}%
-{% endfor %}
-""",
-    "buybox_loss": """🏷️ Buy Box просел > {{ params.drop_pct }}% по {{ count }} листингам.
-{% for row in rows -%}
-• {{ row.asin }} — {{ "%.2f"|format(row.drop_pct) }}%
-{% endfor %}
-""",
-    "returns_spike": """🔄 Возвраты > {{ params.returns_pct }}% по {{ count }} товар(ам).
-{% for row in rows -%}
-• {{ row.asin }} — {{ "%.2f"|format(row.returns_ratio) }}%
-{% endfor %}
-""",
-    "price_outdated": """📜 Обновите прайс-лист. {{ count }} поставщик(ов) без апдейта > {{ params.stale_days }} дн.
-{% for row in rows -%}
-• vendor {{ row.vendor_id }}
-{% endfor %}
-""",
-    "price_increase_pct": """💸 Закупочная цена выросла > {{ params.grow_pct }}% для {{ count }} SKU.
-{% for row in rows -%}
-• {{ row.sku }} — {{ "%.2f"|format(row.delta) }}%
-{% endfor %}
-""",
-    "fallback": "{{ rule }} triggered {{ count }} event(s).",
-}
-
-
 def render_template(template: str, context: Mapping[str, Any], *, parse_mode: str | None = "HTML") -> list[str]:
-    env = _HTML_ENV if (parse_mode or "").upper() == "HTML" else _TEXT_ENV
     try:
-        rendered = env.from_string(template).render(**context)
+        rendered = compile_template(template, parse_mode).render(**context)
     except TemplateError as exc:
         _LOGGER.error("alert_rule.template_error", rule=context.get("rule"), error=str(exc))
         return [f"[template error] {exc}"]
@@ -245,7 +444,7 @@ async def evaluate_rule(rule: AlertRule) -> list[AlertEvent]:
     return await handler(rule)
 
 
-def _rows_to_dicts(rows: list[asyncpg.Record]) -> list[dict[str, Any]]:
+def _rows_to_dicts(rows: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
     return [dict(row) for row in rows]
 
 
@@ -255,15 +454,8 @@ def _hash_key(*parts: str) -> str:
     return digest
 
 
-def _render_events(
-    rule: AlertRule, context: dict[str, Any], *, dedupe_hint: str, template_fallback: str
-) -> list[AlertEvent]:
-    template = (
-        rule.template
-        or DEFAULT_TEMPLATES.get(rule.type)
-        or DEFAULT_TEMPLATES.get(template_fallback)
-        or DEFAULT_TEMPLATES["fallback"]
-    )
+def _render_events(rule: AlertRule, context: dict[str, Any], *, dedupe_hint: str) -> list[AlertEvent]:
+    template = template_source(rule.type, rule.template)
     texts = render_template(template, context, parse_mode=rule.parse_mode)
     events: list[AlertEvent] = []
     for idx, text in enumerate(texts):
@@ -298,9 +490,7 @@ def _build_context(rule: AlertRule, rows: Sequence[Mapping[str, Any]], params: d
 @register_rule_handler("roi_drop")
 @register_rule_handler("roi")
 async def handle_roi_drop(rule: AlertRule) -> list[AlertEvent]:
-    min_roi = float(rule.params.get("min_roi_pct", SETTINGS.ROI_THRESHOLD))
-    min_days = int(rule.params.get("min_days", SETTINGS.ROI_DURATION_DAYS))
-    rows = await query_roi_breaches(min_roi, min_days)
+    (min_roi, min_days), rows = await _shared_rows(rule)
     if not rows:
         return []
     context = _build_context(
@@ -308,13 +498,12 @@ async def handle_roi_drop(rule: AlertRule) -> list[AlertEvent]:
         _rows_to_dicts(rows),
         params={"min_roi_pct": min_roi, "min_days": min_days},
     )
-    return _render_events(rule, context, dedupe_hint=f"{min_roi}:{min_days}", template_fallback="roi_drop")
+    return _render_events(rule, context, dedupe_hint=f"{min_roi}:{min_days}")
 
 
 @register_rule_handler("price_increase_pct")
 async def handle_price_increase(rule: AlertRule) -> list[AlertEvent]:
-    grow_pct = float(rule.params.get("grow_pct", SETTINGS.COST_DELTA_PCT))
-    rows = await query_price_increase(grow_pct)
+    (grow_pct,), rows = await _shared_rows(rule)
     if not rows:
         return []
     context = _build_context(
@@ -322,14 +511,13 @@ async def handle_price_increase(rule: AlertRule) -> list[AlertEvent]:
         _rows_to_dicts(rows),
         params={"grow_pct": grow_pct},
     )
-    return _render_events(rule, context, dedupe_hint=f"{grow_pct}", template_fallback="price_increase_pct")
+    return _render_events(rule, context, dedupe_hint=f"{grow_pct}")
 
 
 @register_rule_handler("buybox_loss")
 @register_rule_handler("buybox_drop_pct")
 async def handle_buybox_loss(rule: AlertRule) -> list[AlertEvent]:
-    drop_pct = float(rule.params.get("drop_pct", SETTINGS.PRICE_DROP_PCT))
-    rows = await query_buybox_drop(drop_pct)
+    (drop_pct,), rows = await _shared_rows(rule)
     if not rows:
         return []
     context = _build_context(
@@ -337,14 +525,13 @@ async def handle_buybox_loss(rule: AlertRule) -> list[AlertEvent]:
         _rows_to_dicts(rows),
         params={"drop_pct": drop_pct},
     )
-    return _render_events(rule, context, dedupe_hint=f"{drop_pct}", template_fallback="buybox_loss")
+    return _render_events(rule, context, dedupe_hint=f"{drop_pct}")
 
 
 @register_rule_handler("returns_spike")
 @register_rule_handler("returns_rate_pct")
 async def handle_returns(rule: AlertRule) -> list[AlertEvent]:
-    returns_pct = float(rule.params.get("returns_pct", SETTINGS.RETURNS_PCT))
-    rows = await query_high_returns(returns_pct)
+    (returns_pct,), rows = await _shared_rows(rule)
     if not rows:
         return []
     context = _build_context(
@@ -352,14 +539,13 @@ async def handle_returns(rule: AlertRule) -> list[AlertEvent]:
         _rows_to_dicts(rows),
         params={"returns_pct": returns_pct},
     )
-    return _render_events(rule, context, dedupe_hint=f"{returns_pct}", template_fallback="returns_spike")
+    return _render_events(rule, context, dedupe_hint=f"{returns_pct}")
 
 
 @register_rule_handler("price_outdated")
 @register_rule_handler("stale_price_days")
 async def handle_price_outdated(rule: AlertRule) -> list[AlertEvent]:
-    stale_days = int(rule.params.get("stale_days", SETTINGS.STALE_DAYS))
-    rows = await query_stale_price_lists(stale_days)
+    (stale_days,), rows = await _shared_rows(rule)
     if not rows:
         return []
     context = _build_context(
@@ -367,7 +553,7 @@ async def handle_price_outdated(rule: AlertRule) -> list[AlertEvent]:
         _rows_to_dicts(rows),
         params={"stale_days": stale_days},
     )
-    return _render_events(rule, context, dedupe_hint=f"{stale_days}", template_fallback="price_outdated")
+    return _render_events(rule, context, dedupe_hint=f"{stale_days}")
 
 
 @register_rule_handler("custom")
@@ -378,11 +564,16 @@ async def handle_custom(rule: AlertRule) -> list[AlertEvent]:
         return []
     rows = payload if isinstance(payload, list) else [payload]
     context = _build_context(rule, rows, params=rule.params)
-    return _render_events(rule, context, dedupe_hint="custom", template_fallback="fallback")
+    return _render_events(rule, context, dedupe_hint="custom")
 
 
 __all__ = [
     "AlertEvent",
+    "DEFAULT_TEMPLATES",
+    "RuleBatch",
+    "SHARED_QUERIES",
+    "SharedQuery",
+    "rule_batch",
     "evaluate_rule",
     "register_rule_handler",
     "get_rule_handler",
@@ -0,0 +1,192 @@
+"""Watermark-based incremental evaluation for alert rules over large tables.
+
+Each rule keeps a high-water mark on ``updated_at`` and a small map of active candidates. An
+evaluation only reads rows changed since the watermark, folds them into the candidate map
+(adding rows that match the rule's threshold, dropping rows that no longer do) and reports the
+candidates that currently breach. Time-based conditions ("not updated for N days") are checked
+against the stored ``updated_at`` so breaches that appear by ageing need no rescan.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+Row = Mapping[str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class IncrementalQuery:
+    changes_sql: str
+    key: Callable[[Row], str]
+    matches: Callable[[Row, tuple[Any, ...]], bool]
+    breaching: Callable[[Row, tuple[Any, ...], datetime], bool]
+
+
+def _older_than(days_index: int) -> Callable[[Row, tuple[Any, ...], datetime], bool]:
+    def _check(row: Row, args: tuple[Any, ...], now: datetime) -> bool:
+        return _as_datetime(row["updated_at"]) < now - timedelta(days=args[days_index])
+
+    return _check
+
+
+INCREMENTAL_QUERIES: dict[str, IncrementalQuery] = {
+    "roi_breaches": IncrementalQuery(
+        changes_sql="""
+            SELECT asin, roi_pct, updated_at
+            FROM roi_view
+            WHERE $1::timestamptz IS NULL OR updated_at > $1
+        """,
+        key=lambda row: str(row["asin"]),
+        matches=lambda row, args: row["roi_pct"] is not None and row["roi_pct"] < args[0],
+        breaching=_older_than(1),
+    ),
+    "price_increase": IncrementalQuery(
+        changes_sql="""
+            WITH changed AS (
+                SELECT DISTINCT vendor_id, sku
+                FROM vendor_prices
+                WHERE $1::timestamptz IS NULL OR updated_at > $1
+            ), ranked AS (
+                SELECT vp.vendor_id, vp.sku, vp.cost, vp.updated_at,
+                       LAG(vp.cost) OVER (PARTITION BY vp.vendor_id, vp.sku ORDER BY vp.updated_at) AS prev_cost,
+                       ROW_NUMBER() OVER (PARTITION BY vp.vendor_id, vp.sku ORDER BY vp.updated_at DESC) AS rn
+                FROM vendor_prices vp
+                JOIN changed c ON c.vendor_id = vp.vendor_id AND c.sku = vp.sku
+            )
+            SELECT vendor_id, sku, updated_at,
+                   CASE WHEN prev_cost IS NULL OR prev_cost = 0 THEN NULL
+                        ELSE (cost - prev_cost) / prev_cost * 100 END AS delta
+            FROM ranked
+            WHERE rn = 1
+        """,
+        key=lambda row: f"{row['vendor_id']}:{row['sku']}",
+        matches=lambda row, args: row["delta"] is not None and row["delta"] > args[0],
+        breaching=lambda _row, _args, _now: True,
+    ),
+    "stale_price_lists": IncrementalQuery(
+        changes_sql="""
+            SELECT vendor_id, MAX(updated_at) AS updated_at
+            FROM vendor_prices
+            WHERE $1::timestamptz IS NULL OR updated_at > $1
+            GROUP BY vendor_id
+        """,
+        key=lambda row: str(row["vendor_id"]),
+        matches=lambda _row, _args: True,
+        breaching=_older_than(0),
+    ),
+}
+
+LOAD_STATE_SQL = """
+    SELECT rule_id, params_hash, watermark, active::text AS active
+    FROM alert_rule_state
+    WHERE rule_id = ANY($1::text[])
+"""
+
+SAVE_STATE_SQL = """
+    INSERT INTO alert_rule_state (rule_id, params_hash, watermark, active, updated_at)
+    SELECT s.rule_id, s.params_hash, s.watermark, s.active::jsonb, now()
+    FROM unnest($1::text[], $2::text[], $3::timestamptz[], $4::text[]) AS s(rule_id, params_hash, watermark, active)
+    ON CONFLICT (rule_id) DO UPDATE
+    SET params_hash = EXCLUDED.params_hash,
+        watermark = EXCLUDED.watermark,
+        active = EXCLUDED.active,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def params_hash(query_name: str, args: tuple[Any, ...]) -> str:
+    payload = json.dumps([query_name, list(args)], default=str).encode("utf-8")
+    return hashlib.sha1(payload, usedforsecurity=False).hexdigest()
+
+
+@dataclass(slots=True)
+class RuleState:
+    rule_id: str
+    params_hash: str
+    watermark: datetime | None = None
+    active: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_record(cls, record: Row) -> RuleState:
+        raw = record["active"]
+        active = json.loads(raw) if isinstance(raw, str) else dict(raw or {})
+        watermark = record["watermark"]
+        return cls(
+            rule_id=record["rule_id"],
+            params_hash=record["params_hash"],
+            watermark=_as_datetime(watermark) if watermark is not None else None,
+            active=active,
+        )
+
+    def since(self, overlap_s: float) -> datetime | None:
+        """Lower bound for the next change scan; overlaps so late-committed rows are not missed."""
+        if self.watermark is None:
+            return None
+        return self.watermark - timedelta(seconds=max(overlap_s, 0.0))
+
+    def advanced(
+        self, query: IncrementalQuery, rows: Iterable[Row], args: tuple[Any, ...], *, since: datetime | None
+    ) -> RuleState:
+        """Return a new state with rows changed after ``since`` folded in; ``self`` is left untouched."""
+        active = dict(self.active)
+        watermark = self.watermark
+        for row in rows:
+            if since is not None and _as_datetime(row["updated_at"]) <= since:
+                continue
+            key = query.key(row)
+            if query.matches(row, args):
+                active[key] = _to_json_row(row)
+            else:
+                active.pop(key, None)
+            updated_at = row.get("updated_at")
+            if updated_at is not None:
+                stamp = _as_datetime(updated_at)
+                watermark = stamp if watermark is None else max(watermark, stamp)
+        return RuleState(self.rule_id, self.params_hash, watermark, active)
+
+    def breaches(self, query: IncrementalQuery, args: tuple[Any, ...], now: datetime) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for row in self.active.values():
+            if not query.breaching(row, args, now):
+                continue
+            output = dict(row)
+            if "updated_at" in row:
+                output["age_days"] = (now - _as_datetime(row["updated_at"])).total_seconds() / 86400
+            rows.append(output)
+        return rows
+
+    def encoded_active(self) -> str:
+        return json.dumps(self.active, sort_keys=True, separators=(",", ":"))
+
+
+def _as_datetime(value: Any) -> datetime:
+    stamp = datetime.fromisoformat(value) if isinstance(value, str) else value
+    return stamp if stamp.tzinfo is not None else stamp.replace(tzinfo=UTC)
+
+
+def _to_json_row(row: Row) -> dict[str, Any]:
+    converted: dict[str, Any] = {}
+    for key, value in dict(row).items():
+        if isinstance(value, datetime):
+            converted[key] = _as_datetime(value).isoformat()
+        elif isinstance(value, Decimal):
+            converted[key] = float(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+__all__ = [
+    "INCREMENTAL_QUERIES",
+    "IncrementalQuery",
+    "LOAD_STATE_SQL",
+    "RuleState",
+    "SAVE_STATE_SQL",
+    "params_hash",
+]
@@ -19,10 +19,16 @@ class AlertBotSettings(BaseModel):
     telegram_token: str = ""
     default_chat_id: str | None = None
     evaluation_cron: str = Field(default="*/5 * * * *", description="Primary schedule for alertbot.run")
-    send_cron: str = Field(default="*/1 * * * *", description="Alias used by Celery beat")
+    send_cron: str = Field(default="*/1 * * * *", description="Schedule for alertbot.deliver")
     eval_concurrency: int = 8
     send_concurrency: int = 8
     rule_timeout_s: float = 15.0
+    outbox_enabled: bool = Field(default=False, description="Queue alerts in alert_outbox for alertbot.deliver")
+    outbox_dedupe_window_s: float = 3600.0
+    outbox_max_attempts: int = 5
+    outbox_batch_size: int = 200
+    outbox_lease_s: float = 120.0
+    outbox_drain_s: float = 50.0
     env: str = "local"
     service_name: str = "alert_bot"
     version: str = "0.0.0"
@@ -59,6 +65,12 @@ class AlertBotSettings(BaseModel):
             eval_concurrency=int(shared.ALERT_EVAL_CONCURRENCY),
             send_concurrency=int(shared.ALERT_SEND_CONCURRENCY),
             rule_timeout_s=float(shared.ALERT_RULE_TIMEOUT_S),
+            outbox_enabled=bool(shared.ALERT_OUTBOX_ENABLED),
+            outbox_dedupe_window_s=float(shared.ALERT_OUTBOX_DEDUPE_WINDOW_S),
+            outbox_max_attempts=int(shared.ALERT_OUTBOX_MAX_ATTEMPTS),
+            outbox_batch_size=int(shared.ALERT_OUTBOX_BATCH_SIZE),
+            outbox_lease_s=float(shared.ALERT_OUTBOX_LEASE_S),
+            outbox_drain_s=float(shared.ALERT_OUTBOX_DRAIN_S),
             env=shared.ENV,
             service_name=(shared.SERVICE_NAME or "alert_bot") or "alert_bot",
             version=shared.VERSION,
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from jinja2 import Environment, StrictUndefined, Template
+
+from awa_common.settings import settings
+
+_HTML_ENV = Environment(
+    autoescape=True,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    undefined=StrictUndefined,
+)
+_TEXT_ENV = Environment(
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    undefined=StrictUndefined,
+)
+
+DEFAULT_TEMPLATES: dict[str, str] = {
+    "roi_drop": """⚠️ ROI ниже {{ params.min_roi_pct }}% по {{ count }} SKU.
+{% for row in rows -%}
+• {{ row.asin }} — {{ "%.2f"|format(row.roi_pct) }}%
+{% endfor %}
+""",
+    "buybox_loss": """🏷️ Buy Box просел > {{ params.drop_pct }}% по {{ count }} листингам.
+{% for row in rows -%}
+• {{ row.asin }} — {{ "%.2f"|format(row.drop_pct) }}%
+{% endfor %}
+""",
+    "returns_spike": """🔄 Возвраты > {{ params.returns_pct }}% по {{ count }} товар(ам).
+{% for row in rows -%}
+• {{ row.asin }} — {{ "%.2f"|format(row.returns_ratio) }}%
+{% endfor %}
+""",
+    "price_outdated": """📜 Обновите прайс-лист. {{ count }} поставщик(ов) без апдейта > {{ params.stale_days }} дн.
+{% for row in rows -%}
+• vendor {{ row.vendor_id }}
+{% endfor %}
+""",
+    "price_increase_pct": """💸 Закупочная цена выросла > {{ params.grow_pct }}% для {{ count }} SKU.
+{% for row in rows -%}
+• {{ row.sku }} — {{ "%.2f"|format(row.delta) }}%
+{% endfor %}
+""",
+    "fallback": "{{ rule }} triggered {{ count }} event(s).",
+}
+
+# Default template each registered rule type falls back to; shared by the evaluators and precompilation.
+TEMPLATE_FALLBACKS: dict[str, str] = {
+    "roi_drop": "roi_drop",
+    "roi": "roi_drop",
+    "price_increase_pct": "price_increase_pct",
+    "buybox_loss": "buybox_loss",
+    "buybox_drop_pct": "buybox_loss",
+    "returns_spike": "returns_spike",
+    "returns_rate_pct": "returns_spike",
+    "price_outdated": "price_outdated",
+    "stale_price_days": "price_outdated",
+    "custom": "fallback",
+}
+
+_CACHE: OrderedDict[tuple[str, bool], Template] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _is_html(parse_mode: str | None) -> bool:
+    return (parse_mode or "").upper() == "HTML"
+
+
+def compile_template(source: str, parse_mode: str | None = "HTML") -> Template:
+    """Return the compiled template for ``source``, reusing a bounded LRU of earlier compilations.
+
+    Raises ``jinja2.TemplateSyntaxError`` when the source does not parse.
+    """
+
+    html = _is_html(parse_mode)
+    key = (hashlib.sha1(source.encode("utf-8"), usedforsecurity=False).hexdigest(), html)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+        if cached is not None:
+            _CACHE.move_to_end(key)
+            return cached
+    compiled = (_HTML_ENV if html else _TEXT_ENV).from_string(source)
+    limit = max(1, int(settings.ALERT_TEMPLATE_CACHE_SIZE))
+    with _CACHE_LOCK:
+        _CACHE[key] = compiled
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > limit:
+            _CACHE.popitem(last=False)
+    return compiled
+
+
+def template_source(rule_type: str, template: str | None) -> str:
+    """Resolve the template a rule renders with: its own, its type's default, then the generic one."""
+
+    fallback = TEMPLATE_FALLBACKS.get(rule_type)
+    return (
+        template
+        or DEFAULT_TEMPLATES.get(rule_type)
+        or (DEFAULT_TEMPLATES.get(fallback) if fallback else None)
+        or DEFAULT_TEMPLATES["fallback"]
+    )
+
+
+def clear_template_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def template_cache_size() -> int:
+    with _CACHE_LOCK:
+        return len(_CACHE)
+
+
+__all__ = [
+    "DEFAULT_TEMPLATES",
+    "TEMPLATE_FALLBACKS",
+    "clear_template_cache",
+    "compile_template",
+    "template_cache_size",
+    "template_source",
+]
@@ -48,18 +48,21 @@ class TelegramTransport:
 
     def _record_metrics(self, request: AlertRequest, result: TelegramSendResult) -> None:
         status_label = "success" if result.ok else "failed"
-        ALERTS_SENT_TOTAL.labels(
-            rule=request.rule_id,
-            severity=request.severity,
-            channel="telegram",
-            status=status_label,
-            **self._metric_labels,
-        ).inc()
+        rule_ids = request.part_rule_ids
+        for rule_id in rule_ids:
+            ALERTS_SENT_TOTAL.labels(
+                rule=rule_id,
+                severity=request.severity,
+                channel="telegram",
+                status=status_label,
+                **self._metric_labels,
+            ).inc()
         if result.ok:
             self._logger.debug("telegram.send_ok", rule=request.rule_id, chat_id=request.chat_id)
             return
         error_type = _classify_error(result)
-        ALERT_ERRORS_TOTAL.labels(rule=request.rule_id, type=error_type, **self._metric_labels).inc()
+        for rule_id in rule_ids:
+            ALERT_ERRORS_TOTAL.labels(rule=rule_id, type=error_type, **self._metric_labels).inc()
         self._logger.error(
             "telegram.send_failed",
             rule=request.rule_id,
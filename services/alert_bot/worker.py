@@ -16,16 +16,19 @@ from awa_common.metrics import (
     ALERT_RULE_SKIPPED_TOTAL,
     ALERTBOT_BATCH_DURATION_SECONDS,
     ALERTBOT_EVENTS_EMITTED_TOTAL,
+    ALERTBOT_OUTBOX_EVENTS_TOTAL,
+    ALERTBOT_OUTBOX_PENDING,
     ALERTBOT_RULE_EVAL_DURATION_SECONDS,
     ALERTBOT_RULES_EVALUATED_TOTAL,
     ALERTBOT_RULES_SUPPRESSED_TOTAL,
     ALERTBOT_STARTUP_VALIDATION_OK,
 )
 from awa_common.settings import settings
-from services.alert_bot import config as config_module
+from awa_common.telegram import TelegramSendResult
+from services.alert_bot import config as config_module, outbox
 from services.alert_bot.config import AlertRule, AlertRulesRuntime
-from services.alert_bot.decider import AlertRequest, RuleDecision, build_alert_requests
-from services.alert_bot.rules import AlertEvent, evaluate_rule
+from services.alert_bot.decider import AlertRequest, RuleDecision, build_alert_requests, plan_deliveries
+from services.alert_bot.rules import AlertEvent, evaluate_rule, rule_batch
 from services.alert_bot.rules_store import SUPPORTED_RULE_KEYS, DbRulesStore, FileRulesStore, RuleConfig, RulesStore
 from services.alert_bot.settings import AlertBotSettings
 from services.alert_bot.transport import TelegramTransport
@@ -60,6 +63,7 @@ class BatchStats:
     rules_total: int = 0
     rules_evaluated: int = 0
     events_total: int = 0
+    messages_queued: int = 0
     messages_planned: int = 0
     messages_sent: int = 0
     messages_failed: int = 0
@@ -219,7 +223,8 @@ class AlertBotRunner:
         await self._ensure_validation(runtime_config, requests)
         stats.degraded = not self._sending_enabled
         stats.degraded_reason = self._degraded_reason
-        await self._dispatch_requests(requests, stats)
+        if not (self._settings.outbox_enabled and await self._enqueue_requests(requests, stats)):
+            await self._dispatch_requests(requests, stats)
 
         batch_duration = time.perf_counter() - batch_start
         ALERTBOT_BATCH_DURATION_SECONDS.labels(**self._metric_labels).observe(batch_duration)
@@ -230,6 +235,7 @@ class AlertBotRunner:
             rules_total=stats.rules_total,
             due_rules=len(due_rules),
             events=stats.events_total,
+            messages_queued=stats.messages_queued,
             messages_sent=stats.messages_sent,
             messages_failed=stats.messages_failed,
             retries=stats.retries,
@@ -297,8 +303,9 @@ class AlertBotRunner:
     async def _evaluate_rules(self, rules: list[AlertRule], stats: BatchStats) -> list[RuleEvaluationResult]:
         concurrency = max(1, self._settings.eval_concurrency)
         semaphore = asyncio.Semaphore(concurrency)
-        tasks = [self._evaluate_single_rule(rule, semaphore) for rule in rules]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async with rule_batch(rules):
+            tasks = [self._evaluate_single_rule(rule, semaphore) for rule in rules]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         evaluations: list[RuleEvaluationResult] = []
         for result in results:
             if isinstance(result, RuleEvaluationResult):
@@ -385,12 +392,20 @@ class AlertBotRunner:
                 self._record_rule_skip(request.rule_id, "disabled")
             logger.warning("alertbot.sending_skipped", reason=self._degraded_reason, messages=skipped)
             return
-        send_tasks: list[asyncio.Task[None]] = []
-        for request in requests:
-            stats.messages_planned += 1
-            send_tasks.append(asyncio.create_task(self._send_request(request, stats)))
-        if send_tasks:
-            await asyncio.gather(*send_tasks)
+        plan = plan_deliveries(requests)
+        stats.messages_planned += plan.messages
+        logger.debug(
+            "alertbot.delivery_planned", requests=plan.requests_in, messages=plan.messages, chats=len(plan.lanes)
+        )
+        # One sequential lane per chat: ordering within a chat is kept and a chat's backlog waits on its
+        # own rate instead of holding send slots other chats could use.
+        lane_tasks = [asyncio.create_task(self._send_lane(lane, stats)) for lane in plan.lanes.values()]
+        if lane_tasks:
+            await asyncio.gather(*lane_tasks)
+
+    async def _send_lane(self, lane: list[AlertRequest], stats: BatchStats) -> None:
+        for request in lane:
+            await self._send_request(request, stats)
 
     async def _send_request(self, request: AlertRequest, stats: BatchStats) -> None:
         attempt = 0
@@ -419,6 +434,116 @@ class AlertBotRunner:
             return
         stats.messages_failed += 1
 
+    async def _enqueue_requests(self, requests: list[AlertRequest], stats: BatchStats) -> bool:
+        if not requests:
+            return True
+        try:
+            queued = await outbox.enqueue(requests, dedupe_window_s=self._settings.outbox_dedupe_window_s)
+        except Exception as exc:
+            logger.warning("alertbot.outbox.enqueue_failed", error=str(exc), fallback="direct")
+            return False
+        stats.messages_queued += queued
+        self._record_outbox("enqueued", queued)
+        self._record_outbox("deduped", len(requests) - queued)
+        return True
+
+    async def deliver(self) -> dict[str, Any]:
+        """Drain due outbox rows until the queue is idle or ``outbox_drain_s`` runs out."""
+
+        start = time.perf_counter()
+        stats = BatchStats()
+        if not self._settings.enabled:
+            return _format_summary(stats, duration=0.0)
+        deadline = time.monotonic() + max(self._settings.outbox_drain_s, 0.0)
+        runtime_config = self._load_config()
+        while True:
+            entries = await outbox.claim(self._settings.outbox_batch_size, lease_s=self._settings.outbox_lease_s)
+            if not entries:
+                _, next_due = await outbox.backlog()
+                if next_due is None or time.monotonic() + max(next_due, 0.0) >= deadline:
+                    break
+                await asyncio.sleep(max(next_due, 0.05))
+                continue
+            await self._ensure_validation(runtime_config, [entry.request for entry in entries])
+            if not self._sending_enabled:
+                await outbox.reschedule(
+                    [entry.id for entry in entries], 60.0, self._degraded_reason or "sending_disabled", refund=True
+                )
+                stats.degraded = True
+                stats.degraded_reason = self._degraded_reason
+                break
+            await self._deliver_entries(entries, stats)
+            if time.monotonic() >= deadline:
+                break
+        pending, _ = await outbox.backlog()
+        ALERTBOT_OUTBOX_PENDING.labels(**self._metric_labels).set(pending)
+        await outbox.purge(self._settings.outbox_dedupe_window_s)
+        duration = time.perf_counter() - start
+        logger.info(
+            "alertbot.outbox.drained",
+            messages_sent=stats.messages_sent,
+            messages_failed=stats.messages_failed,
+            retries=stats.retries,
+            pending=pending,
+            duration_s=round(duration, 3),
+        )
+        return _format_summary(stats, duration=duration)
+
+    async def _deliver_entries(self, entries: list[outbox.OutboxEntry], stats: BatchStats) -> None:
+        by_key = {(entry.request.chat_id, entry.request.dedupe_key): entry for entry in entries}
+        plan = plan_deliveries([entry.request for entry in entries])
+        stats.messages_planned += plan.messages
+        lanes = [self._deliver_lane(lane, by_key, stats) for lane in plan.lanes.values()]
+        await asyncio.gather(*lanes)
+
+    async def _deliver_lane(
+        self,
+        lane: list[AlertRequest],
+        by_key: dict[tuple[str, str], outbox.OutboxEntry],
+        stats: BatchStats,
+    ) -> None:
+        for index, message in enumerate(lane):
+            parts = [by_key[(message.chat_id, key)] for key in message.part_keys]
+            ids = [entry.id for entry in parts]
+            async with self._send_semaphore:
+                send_start = time.perf_counter()
+                result = await self._transport.send(message)
+                stats.send_latencies.append(time.perf_counter() - send_start)
+            if result.ok:
+                await outbox.mark_sent(ids)
+                stats.messages_sent += 1
+                self._record_outbox("sent", len(ids))
+                continue
+            error = result.description or result.status
+            attempts = max(entry.attempts for entry in parts)
+            if _is_retryable(result) and attempts < self._settings.outbox_max_attempts:
+                delay = result.retry_after if result.retry_after is not None else min(2.0**attempts, 300.0)
+                await outbox.reschedule(ids, delay, error)
+                stats.retries += 1
+                self._record_outbox("retried", len(ids))
+                if result.retry_after is not None:
+                    # The chat is throttled: hand the rest of its lane back without spending an attempt.
+                    rest = [by_key[(later.chat_id, key)].id for later in lane[index + 1 :] for key in later.part_keys]
+                    await outbox.reschedule(rest, delay, error, refund=True)
+                    return
+                continue
+            await outbox.mark_failed(ids, error)
+            stats.messages_failed += 1
+            self._record_outbox("failed", len(ids))
+            logger.error(
+                "alertbot.send.failed",
+                rule_id=message.rule_id,
+                chat_id=message.chat_id,
+                status=result.status,
+                error_type=result.error_type,
+                description=result.description,
+                attempts=attempts,
+            )
+
+    def _record_outbox(self, event: str, rows: int) -> None:
+        if rows > 0:
+            ALERTBOT_OUTBOX_EVENTS_TOTAL.labels(event=event, **self._metric_labels).inc(rows)
+
     def _raise_config_error(self, reason: str) -> None:
         message = (reason or "invalid_config").strip() or "invalid_config"
         fix_hint = "Set TELEGRAM_TOKEN and TELEGRAM_DEFAULT_CHAT_ID to valid values"
@@ -557,11 +682,21 @@ def _percentile(samples: list[float], percentile: float) -> float:
     return ordered[lower] * (1 - weight) + ordered[upper] * weight
 
 
+def _is_retryable(result: TelegramSendResult) -> bool:
+    if result.status == "retry":
+        return True
+    response = result.response
+    if response is None or response.error_type == "CONFIG":
+        return False
+    return response.status_code == 0 or response.status_code >= 500
+
+
 def _format_summary(stats: BatchStats, *, duration: float) -> dict[str, Any]:
     summary = {
         "rules_total": stats.rules_total,
         "rules_evaluated": stats.rules_evaluated,
         "events_emitted": stats.events_total,
+        "notifications_queued": stats.messages_queued,
         "notifications_sent": stats.messages_sent,
         "notifications_failed": stats.messages_failed,
         "messages_planned": stats.messages_planned,
@@ -580,6 +715,10 @@ async def evaluate_alert_rules(now: datetime | None = None) -> dict[str, Any]:
     return await RUNNER.run(now=now)
 
 
+async def deliver_alerts() -> dict[str, Any]:
+    return await RUNNER.deliver()
+
+
 def alert_rules_health() -> dict[str, Any]:
     return RUNNER.health()
 
@@ -600,4 +739,10 @@ def run_startup_validation() -> None:
         raise SystemExit(f"Alert bot configuration invalid: {exc}") from exc
 
 
-__all__ = ["AlertConfigurationError", "evaluate_alert_rules", "alert_rules_health", "run_startup_validation"]
+__all__ = [
+    "AlertConfigurationError",
+    "deliver_alerts",
+    "evaluate_alert_rules",
+    "alert_rules_health",
+    "run_startup_validation",
+]
@@ -1,5 +1,5 @@
 from __future__ import annotations
 
-from services.api.middlewares.audit import AuditMiddleware, insert_audit
+from services.api.middlewares.audit import AuditLogWriter, AuditMiddleware, insert_audit, insert_audit_batch
 
-__all__ = ["AuditMiddleware", "insert_audit"]
+__all__ = ["AuditLogWriter", "AuditMiddleware", "insert_audit", "insert_audit_batch"]
@@ -37,6 +37,7 @@ from etl.load_csv import ImportFileError
 from services.api.schemas import ErrorCode
 from services.api.security import get_request_id
 from services.worker.celery_app import celery_app
+from services.worker.queues import import_route
 from services.worker.tasks import task_import_file
 
 logger: BoundLogger = structlog.get_logger(__name__)
@@ -246,7 +247,7 @@ def enqueue_import_task(upload: IngestUpload, *, report_type: str | None, force:
     async_result = task_import_file.apply_async(
         args=[upload.uri],
         kwargs={"report_type": report_type or None, "force": force, "idempotency_key": upload.digest},
-        queue="ingest",
+        **import_route(upload.total_bytes),
     )
     bound_log = log.bind(task_id=async_result.id, uri=upload.uri)
     if celery_app.conf.task_always_eager:
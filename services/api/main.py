@@ -39,7 +39,7 @@ from awa_common.security.request_limits import install_body_size_limit
 from awa_common.settings import settings
 from awa_common.utils.env import env_bool, env_str
 from services.api.errors import install_exception_handlers
-from services.api.middlewares.audit import AuditMiddleware
+from services.api.middlewares.audit import AuditLogWriter, AuditMiddleware
 from services.api.security import install_security
 from services.api.sentry_config import init_sentry_if_configured
 
@@ -190,9 +190,13 @@ async def lifespan(_app: FastAPI):
             raise
     await oidc_provider.init_async_jwks_provider(settings)
     jwks_started = True
+    audit_writer = _start_audit_writer()
+    _app.state.audit_writer = audit_writer
     try:
         yield
     finally:
+        _app.state.audit_writer = None
+        await audit_writer.close()
         if lag_stop is not None:
             lag_stop()
             _app.state.loop_lag_stop = None
@@ -211,6 +215,19 @@ async def lifespan(_app: FastAPI):
         await dispose_async_engine()
 
 
+def _start_audit_writer() -> AuditLogWriter:
+    security_cfg = getattr(settings, "security", None)
+    writer = AuditLogWriter(
+        lambda: get_sessionmaker()(),
+        max_queue=security_cfg.audit_queue_max if security_cfg else settings.AUDIT_QUEUE_MAX,
+        batch_size=security_cfg.audit_batch_size if security_cfg else settings.AUDIT_BATCH_SIZE,
+        flush_interval_s=(security_cfg.audit_flush_interval_ms if security_cfg else settings.AUDIT_FLUSH_INTERVAL_MS)
+        / 1000.0,
+    )
+    writer.start()
+    return writer
+
+
 def create_app() -> FastAPI:
     cfg = settings
     app_version = getattr(cfg, "APP_VERSION", "0.0.0")
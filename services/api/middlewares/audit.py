@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import time
-from collections.abc import Awaitable, Callable, Mapping
+from collections.abc import Callable, Mapping, Sequence
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
-from fastapi import Request, Response
+from fastapi import Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from awa_common.metrics import record_audit_log_dropped, record_audit_log_written, set_audit_log_backlog
 from awa_common.security.models import UserCtx
 from awa_common.settings import settings
 from services.api.security import get_request_id
@@ -25,7 +27,7 @@ _AUDIT_SQL = text(
         ts, user_id, email, roles, method, path, route,
         status, latency_ms, ip, ua, request_id
     ) VALUES (
-        :ts, :user_id, :email, :roles, :method, :path, :route,
+        :ts, :user_id, :email, CAST(CAST(:roles AS TEXT) AS TEXT[]), :method, :path, :route,
         :status, :latency_ms, :ip, :ua, :request_id
     )
     """
@@ -37,6 +39,112 @@ async def insert_audit(session: AsyncSession, record: Mapping[str, Any]) -> None
     await session.execute(_AUDIT_SQL, filtered)
 
 
+async def insert_audit_batch(session: AsyncSession, records: Sequence[Mapping[str, Any]]) -> None:
+    if records:
+        await session.execute(_AUDIT_SQL, [dict(record) for record in records])
+
+
+class AuditLogWriter:
+    """Buffer audit records in memory and write them in batches off the request path.
+
+    A batch is written once ``batch_size`` records are waiting or ``flush_interval_s`` after its first record.
+    Records are dropped (and counted) when the buffer is full or a batch fails, so a slow audit table never
+    holds up API responses.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        max_queue: int,
+        batch_size: int,
+        flush_interval_s: float,
+    ) -> None:
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max(int(max_queue), 1))
+        self._batch_size = max(int(batch_size), 1)
+        self._flush_interval_s = max(float(flush_interval_s), 0.0)
+        # Records taken off the queue but not yet handed to a write, kept so shutdown can still flush them.
+        self._held: list[dict[str, Any]] = []
+        self._writing: asyncio.Future[None] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize() + len(self._held)
+
+    def submit(self, record: Mapping[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(dict(record))
+        except asyncio.QueueFull:
+            record_audit_log_dropped("queue_full")
+            return False
+        set_audit_log_backlog(self.backlog)
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    async def close(self) -> None:
+        """Stop the background task and write everything still buffered."""
+
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if self._writing is not None:
+            with contextlib.suppress(Exception):
+                await self._writing
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._held or not self._queue.empty():
+            batch, self._held = self._held, []
+            self._take(batch)
+            await self._write(batch)
+
+    def _take(self, batch: list[dict[str, Any]]) -> None:
+        while len(batch) < self._batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._held.append(await self._queue.get())
+            deadline = loop.time() + self._flush_interval_s
+            while True:
+                self._take(self._held)
+                remaining = deadline - loop.time()
+                if len(self._held) >= self._batch_size or remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(remaining):
+                        self._held.append(await self._queue.get())
+                except TimeoutError:
+                    break
+            batch, self._held = self._held, []
+            self._writing = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._writing)
+            self._writing = None
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            async with self._session_factory() as session:
+                await insert_audit_batch(session, batch)
+                await session.commit()
+        except Exception:
+            record_audit_log_dropped("write_failed", len(batch))
+            logger.warning("audit_log_batch_write_failed", records=len(batch), exc_info=True)
+        else:
+            record_audit_log_written(len(batch))
+        finally:
+            set_audit_log_backlog(self.backlog)
+
+
 def _client_ip(request: Request) -> str:
     xff = request.headers.get("x-forwarded-for")
     if xff:
@@ -52,29 +160,38 @@ def _client_ip(request: Request) -> str:
     return "unknown"
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
+class AuditMiddleware:
     def __init__(self, app: ASGIApp, session_factory: async_sessionmaker[AsyncSession]) -> None:
-        super().__init__(app)
+        self.app = app
         self._session_factory = session_factory
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         start = time.perf_counter()
-        response = await call_next(request)
+        status_code: int | None = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = int(message["status"])
+            await send(message)
 
+        await self.app(scope, receive, send_with_status)
+        await self._audit(Request(scope), status_code, start)
+
+    async def _audit(self, request: Request, status_code: int | None, start: float) -> None:
         if not settings.SECURITY_ENABLE_AUDIT:
-            return response
+            return
 
         user = getattr(request.state, "user", None)
         if not isinstance(user, UserCtx):
-            return response
+            return
 
         path = request.url.path
         if path in _EXCLUDED_PATHS:
-            return response
+            return
 
         route = request.scope.get("route")
         route_pattern = getattr(route, "path_format", None) or getattr(route, "path", None)
@@ -91,13 +208,18 @@ class AuditMiddleware(BaseHTTPMiddleware):
             "method": request.method,
             "path": path,
             "route": route_pattern or path,
-            "status": getattr(response, "status_code", None),
+            "status": status_code,
             "latency_ms": int((time.perf_counter() - start) * 1000),
             "ip": _client_ip(request),
             "ua": request.headers.get("user-agent"),
             "request_id": request_id,
         }
 
+        writer = getattr(request.app.state, "audit_writer", None)
+        if isinstance(writer, AuditLogWriter):
+            writer.submit(record)
+            return
+
         try:
             async with self._session_factory() as session:
                 await insert_audit(session, record)
@@ -110,4 +232,3 @@ class AuditMiddleware(BaseHTTPMiddleware):
                 user_id=user.sub,
                 exc_info=True,
             )
-        return response
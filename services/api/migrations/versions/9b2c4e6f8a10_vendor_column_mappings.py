@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision = "9b2c4e6f8a10"
+down_revision = "7e66e1d1c4e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        dedent(
+            """
+            CREATE TABLE IF NOT EXISTS vendor_column_mappings (
+                vendor_id INTEGER NOT NULL REFERENCES vendors (id) ON DELETE CASCADE,
+                header_signature VARCHAR(64) NOT NULL,
+                mapping JSONB NOT NULL,
+                source VARCHAR(16) NOT NULL DEFAULT 'heuristic',
+                updated_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (vendor_id, header_signature)
+            );
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS vendor_column_mappings;")
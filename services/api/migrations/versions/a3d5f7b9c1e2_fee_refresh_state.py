@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision = "a3d5f7b9c1e2"
+down_revision = "9b2c4e6f8a10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        dedent(
+            """
+            CREATE TABLE IF NOT EXISTS fee_refresh_state (
+                asin TEXT PRIMARY KEY,
+                last_fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                last_changed_at TIMESTAMPTZ,
+                fetch_count INTEGER NOT NULL DEFAULT 0,
+                change_count INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fee_refresh_state_last_fetched ON fee_refresh_state (last_fetched_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_fee_refresh_state_last_fetched;")
+    op.execute("DROP TABLE IF EXISTS fee_refresh_state;")
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision = "c4e6a8b0d2f3"
+down_revision = "a3d5f7b9c1e2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        dedent(
+            """
+            CREATE TABLE IF NOT EXISTS alert_rule_state (
+                rule_id TEXT PRIMARY KEY,
+                params_hash TEXT NOT NULL,
+                watermark TIMESTAMPTZ,
+                active JSONB NOT NULL DEFAULT '{}'::jsonb,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+            """
+        )
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_vendor_prices_updated_at ON vendor_prices (updated_at);")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_vendor_prices_updated_at;")
+    op.execute("DROP TABLE IF EXISTS alert_rule_state;")
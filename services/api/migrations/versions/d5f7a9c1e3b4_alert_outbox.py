@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+from alembic import op  # type: ignore[attr-defined]
+
+revision = "d5f7a9c1e3b4"
+down_revision = "c4e6a8b0d2f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        dedent(
+            """
+            CREATE TABLE IF NOT EXISTS alert_outbox (
+                id BIGSERIAL PRIMARY KEY,
+                chat_id TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL,
+                rule_id TEXT NOT NULL,
+                severity TEXT NOT NULL DEFAULT 'info',
+                message TEXT NOT NULL,
+                parse_mode TEXT,
+                disable_web_page_preview BOOLEAN NOT NULL DEFAULT TRUE,
+                labels JSONB NOT NULL DEFAULT '{}'::jsonb,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                locked_until TIMESTAMPTZ,
+                last_error TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                sent_at TIMESTAMPTZ,
+                CONSTRAINT uq_alert_outbox_chat_dedupe UNIQUE (chat_id, dedupe_key)
+            );
+            """
+        )
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_alert_outbox_due ON alert_outbox (next_attempt_at) "
+        "WHERE status IN ('pending', 'sending');"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_alert_outbox_due;")
+    op.execute("DROP TABLE IF EXISTS alert_outbox;")
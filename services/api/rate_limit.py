@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import math
 import time
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
@@ -17,6 +18,80 @@ from awa_common.settings import Settings, parse_rate_limit, settings
 
 logger = structlog.get_logger(__name__)
 _DEFAULT_SKIP_PATHS = {"/ready", "/health", "/metrics"}
+_PRECHECK_MAX_KEYS = 10_000
+
+# One round trip per request: KEYS[1] = bucket, ARGV = limit, window_ms, algorithm.
+# Returns {allowed (0/1), used, reset_ms}. The fixed window only sets the expiry when the key is new,
+# so hits inside a window no longer push its reset out.
+CONSUME_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local algorithm = ARGV[3]
+
+if algorithm == 'fixed_window' then
+    local count = redis.call('INCR', key)
+    local ttl = redis.call('PTTL', key)
+    if ttl < 0 then
+        redis.call('PEXPIRE', key, window)
+        ttl = window
+    end
+    if count > limit then
+        return {0, count, ttl}
+    end
+    return {1, count, ttl}
+end
+
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+if algorithm == 'gcra' then
+    local interval = window / limit
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - window
+    if allow_at > now then
+        return {0, limit, math.ceil(allow_at - now)}
+    end
+    redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+    return {1, math.ceil((new_tat - now) / interval), math.ceil(new_tat - now)}
+end
+
+-- sliding_window: current fixed bucket plus the previous one weighted by its remaining overlap.
+local start = now - (now % window)
+local state = redis.call('HMGET', key, 'start', 'cur', 'prev')
+local bucket = tonumber(state[1])
+local cur = tonumber(state[2]) or 0
+local prev = tonumber(state[3]) or 0
+if bucket ~= start then
+    if bucket == start - window then
+        prev = cur
+    else
+        prev = 0
+    end
+    cur = 0
+end
+local elapsed = now - start
+local used = math.floor(prev * (window - elapsed) / window) + cur
+if used >= limit then
+    local wait
+    if cur >= limit then
+        wait = (window - elapsed) + math.ceil(window * (1 - limit / cur)) + 1
+    else
+        wait = math.ceil((window - elapsed) - window * (limit - cur) / prev) + 1
+    end
+    return {0, used, math.max(wait, 1)}
+end
+redis.call('HSET', key, 'start', start, 'cur', cur + 1, 'prev', prev)
+redis.call('PEXPIRE', key, window * 2)
+return {1, used + 1, window - elapsed}
+"""
 
 
 @dataclass(frozen=True)
@@ -68,6 +143,16 @@ class SmartRateLimiter:
         self._warn_threshold = max(0.0, min(self._warn_threshold, 1.0))
         self._warn_interval = max(0.0, self._warn_interval)
         self._warned_at: dict[str, float] = {}
+        self._algorithm = str(
+            limiter_cfg.algorithm if limiter_cfg else getattr(cfg, "RATE_LIMIT_ALGORITHM", "fixed_window")
+        )
+        self._local_precheck = bool(
+            limiter_cfg.local_precheck if limiter_cfg else getattr(cfg, "RATE_LIMIT_LOCAL_PRECHECK", True)
+        )
+        # key -> monotonic deadline for buckets Redis already rejected; lets repeat offenders be turned
+        # away without a round trip. Reset whenever the Redis client changes.
+        self._blocked_until: dict[str, float] = {}
+        self._blocked_client: Any = None
 
     def dependency(self, profile: RateLimitProfile | None = None) -> Callable[[Request], Awaitable[None]]:
         async def _dependency(request: Request) -> None:
@@ -182,28 +267,50 @@ class SmartRateLimiter:
                 logger.debug("rate_limit_token_error", error=str(exc))
         return None
 
+    def _precheck(self, redis: Any, key: str) -> int | None:
+        if not self._local_precheck:
+            return None
+        if redis is not self._blocked_client:
+            self._blocked_until.clear()
+            self._blocked_client = redis
+            return None
+        deadline = self._blocked_until.get(key)
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._blocked_until.pop(key, None)
+            return None
+        return max(1, math.ceil(remaining))
+
+    def _block(self, key: str, reset_ms: int) -> None:
+        if not self._local_precheck or reset_ms <= 0:
+            return
+        now = time.monotonic()
+        if len(self._blocked_until) >= _PRECHECK_MAX_KEYS:
+            for stale in [name for name, deadline in self._blocked_until.items() if deadline <= now]:
+                self._blocked_until.pop(stale, None)
+            while len(self._blocked_until) >= _PRECHECK_MAX_KEYS:
+                self._blocked_until.pop(next(iter(self._blocked_until)))
+        self._blocked_until[key] = now + reset_ms / 1000.0
+
     async def _consume(
         self, redis: Any, key: str, limit: int, window: int, role_label: str | None = None
     ) -> tuple[bool, int, int]:
+        blocked_for = self._precheck(redis, key)
+        if blocked_for is not None:
+            return False, 0, blocked_for
         try:
-            count = await redis.incr(key)
+            result = await redis.eval(CONSUME_LUA, 1, key, limit, window * 1000, self._algorithm)
+            allowed, used, reset_ms = (int(value) for value in result)
         except Exception as exc:
-            self._record_redis_error("incr", key, exc)
+            self._record_redis_error("eval", key, exc)
             return True, limit, window
-        try:
-            await redis.expire(key, window)
-        except Exception as exc:
-            self._record_redis_error("expire", key, exc)
-            return True, limit, window
-        remaining = max(0, limit - count)
-        try:
-            ttl = await redis.ttl(key)
-        except Exception as exc:
-            self._record_redis_error("ttl", key, exc)
-            ttl = window
-        reset_in = ttl if isinstance(ttl, int) and ttl > 0 else window
-        await self._maybe_warn(key, limit, window, role_label=role_label or "unknown", count=count)
-        return count <= limit, remaining, reset_in
+        reset_in = max(1, math.ceil(reset_ms / 1000)) if reset_ms > 0 else window
+        if not allowed:
+            self._block(key, reset_ms)
+        await self._maybe_warn(key, limit, window, role_label=role_label or "unknown", count=used)
+        return bool(allowed), max(0, limit - used), reset_in
 
 
 def _effective_role(user: UserCtx | None) -> Role:
@@ -287,6 +394,7 @@ def roi_by_vendor_rate_limiter(cfg: Settings | None = None) -> Callable[[Request
 
 
 __all__ = [
+    "CONSUME_LUA",
     "RateLimitProfile",
     "SmartRateLimiter",
     "build_rate_key",
@@ -8,8 +8,7 @@ import structlog
 from asgi_correlation_id import correlation_id
 from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from awa_common.logging import bind_user_sub
 from awa_common.security import oidc
@@ -35,18 +34,17 @@ def get_request_id(request: Request) -> str:
     return request_id
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """Ensure request scoped metadata (request_id) is always present."""
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
-        request_id = get_request_id(request)
-        structlog.contextvars.bind_contextvars(request_id=request_id)
-        response = await call_next(request)
-        return response
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            request_id = get_request_id(Request(scope))
+            structlog.contextvars.bind_contextvars(request_id=request_id)
+        await self.app(scope, receive, send)
 
 
 async def current_user(
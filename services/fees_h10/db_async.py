@@ -47,35 +47,87 @@ def _chunk_rows(rows: Sequence[dict[str, Any]], batch_size: int) -> Iterable[lis
         yield list(rows[idx : idx + batch_size])
 
 
+_FEE_COLUMNS = ("asin", "fulfil_fee", "referral_fee", "storage_fee", "currency")
+_FEE_CASTS = ("text", "numeric", "numeric", "numeric", "text")
+
+
 def _build_upsert_query(chunk: Sequence[dict[str, Any]]) -> tuple[str, list[Any]]:
-    cols = ("asin", "fulfil_fee", "referral_fee", "storage_fee", "currency")
+    cols = _FEE_COLUMNS
     placeholders: list[str] = []
     params: list[Any] = []
     for index, row in enumerate(chunk):
         base = index * len(cols)
-        placeholders.append("(" + ", ".join(f"${base + offset + 1}" for offset in range(len(cols))) + ")")
+        placeholders.append(
+            "(" + ", ".join(f"${base + offset + 1}::{_FEE_CASTS[offset]}" for offset in range(len(cols))) + ")"
+        )
         params.extend(row[col] for col in cols)
 
     values_sql = ", ".join(placeholders)
+    # One round trip upserts the fees and records per-ASIN refresh state for the planner:
+    # every fetched ASIN bumps fetch_count, and rows the upsert touched also bump change_count.
     query = f"""
-    INSERT INTO fees_raw (asin, fulfil_fee, referral_fee, storage_fee, currency)
-    VALUES {values_sql}
-    ON CONFLICT (asin) DO UPDATE
-      SET
-        fulfil_fee = EXCLUDED.fulfil_fee,
-        referral_fee = EXCLUDED.referral_fee,
-        storage_fee = EXCLUDED.storage_fee,
-        currency = EXCLUDED.currency,
-        updated_at = NOW()
-      WHERE fees_raw.fulfil_fee IS DISTINCT FROM EXCLUDED.fulfil_fee
-         OR fees_raw.referral_fee IS DISTINCT FROM EXCLUDED.referral_fee
-         OR fees_raw.storage_fee IS DISTINCT FROM EXCLUDED.storage_fee
-         OR fees_raw.currency IS DISTINCT FROM EXCLUDED.currency
-    RETURNING (xmax = 0) AS inserted_flag;
+    WITH incoming (asin, fulfil_fee, referral_fee, storage_fee, currency) AS (
+      VALUES {values_sql}
+    ),
+    upserted AS (
+      INSERT INTO fees_raw (asin, fulfil_fee, referral_fee, storage_fee, currency)
+      SELECT asin, fulfil_fee, referral_fee, storage_fee, currency FROM incoming
+      ON CONFLICT (asin) DO UPDATE
+        SET
+          fulfil_fee = EXCLUDED.fulfil_fee,
+          referral_fee = EXCLUDED.referral_fee,
+          storage_fee = EXCLUDED.storage_fee,
+          currency = EXCLUDED.currency,
+          updated_at = NOW()
+        WHERE fees_raw.fulfil_fee IS DISTINCT FROM EXCLUDED.fulfil_fee
+           OR fees_raw.referral_fee IS DISTINCT FROM EXCLUDED.referral_fee
+           OR fees_raw.storage_fee IS DISTINCT FROM EXCLUDED.storage_fee
+           OR fees_raw.currency IS DISTINCT FROM EXCLUDED.currency
+      RETURNING fees_raw.asin, (xmax = 0) AS inserted_flag
+    ),
+    refresh_state AS (
+      INSERT INTO fee_refresh_state (asin, last_fetched_at, last_changed_at, fetch_count, change_count)
+      SELECT DISTINCT ON (i.asin)
+        i.asin,
+        NOW(),
+        CASE WHEN u.asin IS NULL THEN NULL ELSE NOW() END,
+        1,
+        CASE WHEN u.asin IS NULL THEN 0 ELSE 1 END
+      FROM incoming i
+      LEFT JOIN upserted u ON u.asin = i.asin
+      ON CONFLICT (asin) DO UPDATE
+        SET
+          last_fetched_at = EXCLUDED.last_fetched_at,
+          last_changed_at = COALESCE(EXCLUDED.last_changed_at, fee_refresh_state.last_changed_at),
+          fetch_count = fee_refresh_state.fetch_count + 1,
+          change_count = fee_refresh_state.change_count + EXCLUDED.change_count
+    )
+    SELECT inserted_flag FROM upserted;
     """
     return query, params
 
 
+_RECORD_FAILED_FETCHES = """
+INSERT INTO fee_refresh_state (asin, last_fetched_at)
+SELECT DISTINCT unnest($1::text[]), NOW()
+ON CONFLICT (asin) DO UPDATE SET last_fetched_at = EXCLUDED.last_fetched_at
+"""
+
+
+async def record_failed_fetches(asins: Sequence[str]) -> None:
+    """Stamp a fetch attempt for ASINs Helium10 returned nothing for.
+
+    ``fetch_count`` is left alone, so the change rate only reflects real fetches, but the planner stops
+    treating a delisted or failing ASIN as never fetched and putting it ahead of genuinely stale rows.
+    """
+    if not asins:
+        return
+    pool = await init_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(_RECORD_FAILED_FETCHES, list(asins))
+    logger.info("fees_h10.failed_fetches_recorded", component="fees_h10", count=len(asins))
+
+
 async def upsert_fee_rows(rows: Sequence[dict[str, Any]], batch_size: int = 500) -> dict[str, int]:
     items = list(rows)
     if not items:
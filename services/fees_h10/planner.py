@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from awa_common.settings import settings as SETTINGS
+
+
+@dataclass(frozen=True)
+class RefreshCandidate:
+    """Per-ASIN refresh state used to rank fee refreshes."""
+
+    asin: str
+    last_fetched_at: datetime | None = None
+    fetch_count: int = 0
+    change_count: int = 0
+    roi_pct: float | None = None
+
+    @property
+    def change_rate(self) -> float:
+        # Laplace-smoothed share of fetches that changed the stored fees.
+        return (self.change_count + 1) / (self.fetch_count + 2)
+
+
+@dataclass(frozen=True)
+class RefreshPlan:
+    asins: list[str]
+    candidates: int
+    new_listings: int
+    overdue: int
+    fresh: int
+    planned_at: datetime
+
+    def as_meta(self) -> dict[str, Any]:
+        return {
+            "planned_at": self.planned_at.isoformat(),
+            "candidates": self.candidates,
+            "planned": len(self.asins),
+            "new_listings": self.new_listings,
+            "overdue": self.overdue,
+            "fresh": self.fresh,
+        }
+
+
+def roi_sensitivity(roi_pct: float | None, *, threshold: float, band: float) -> float:
+    """Return 0..1, highest when ROI sits near the alerting threshold where fee drift flips decisions."""
+    if roi_pct is None:
+        return 0.5
+    return 1.0 / (1.0 + abs(float(roi_pct) - threshold) / max(band, 1e-6))
+
+
+def priority(candidate: RefreshCandidate, now: datetime, *, threshold: float, band: float) -> float:
+    if candidate.last_fetched_at is None:
+        return float("inf")
+    age_days = max((now - candidate.last_fetched_at).total_seconds(), 0.0) / 86400
+    sensitivity = roi_sensitivity(candidate.roi_pct, threshold=threshold, band=band)
+    return age_days * candidate.change_rate * (0.5 + sensitivity)
+
+
+def plan_refresh(
+    candidates: Iterable[RefreshCandidate],
+    *,
+    now: datetime | None = None,
+    budget: int | None = None,
+    min_age_hours: float | None = None,
+    max_age_days: float | None = None,
+    roi_threshold: float | None = None,
+    roi_band: float | None = None,
+) -> RefreshPlan:
+    """Pick the ASINs worth spending Helium10 quota on this run.
+
+    Never-fetched listings come first, then rows older than ``max_age_days`` (oldest first), then
+    the remaining rows older than ``min_age_hours`` ranked by staleness x change frequency x ROI
+    sensitivity. ``budget`` caps the result; ``0`` or ``None`` means unlimited.
+    """
+    now = now or datetime.now(UTC)
+    budget = int(SETTINGS.H10_REFRESH_BUDGET if budget is None else budget)
+    min_age = timedelta(hours=float(SETTINGS.H10_REFRESH_MIN_AGE_HOURS if min_age_hours is None else min_age_hours))
+    max_age = timedelta(days=float(SETTINGS.H10_REFRESH_MAX_AGE_DAYS if max_age_days is None else max_age_days))
+    threshold = float(SETTINGS.ROI_THRESHOLD if roi_threshold is None else roi_threshold)
+    band = float(SETTINGS.H10_REFRESH_ROI_BAND_PCT if roi_band is None else roi_band)
+
+    new: list[RefreshCandidate] = []
+    overdue: list[RefreshCandidate] = []
+    eligible: list[RefreshCandidate] = []
+    fresh = 0
+    total = 0
+    for candidate in candidates:
+        total += 1
+        if candidate.last_fetched_at is None:
+            new.append(candidate)
+            continue
+        age = now - candidate.last_fetched_at
+        if age >= max_age:
+            overdue.append(candidate)
+        elif age >= min_age:
+            eligible.append(candidate)
+        else:
+            fresh += 1
+
+    overdue.sort(key=lambda c: c.last_fetched_at or now)
+    eligible.sort(key=lambda c: priority(c, now, threshold=threshold, band=band), reverse=True)
+    ordered = [c.asin for c in (*new, *overdue, *eligible)]
+    if budget > 0:
+        ordered = ordered[:budget]
+    return RefreshPlan(
+        asins=ordered,
+        candidates=total,
+        new_listings=len(new),
+        overdue=len(overdue),
+        fresh=fresh,
+        planned_at=now,
+    )
+
+
+__all__ = ["RefreshCandidate", "RefreshPlan", "plan_refresh", "priority", "roi_sensitivity"]
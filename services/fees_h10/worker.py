@@ -3,13 +3,13 @@ from __future__ import annotations
 import asyncio
 import json
 import time
-from collections.abc import Awaitable, Callable, Coroutine
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
 from decimal import ROUND_HALF_UP, Decimal
 from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar, cast
 
 import httpx
 import structlog
-from celery import Celery, shared_task
+from celery import Celery, current_task, shared_task
 from sqlalchemy import create_engine, text, update
 from sqlalchemy.orm import sessionmaker
 
@@ -25,12 +25,16 @@ from awa_common.metrics import (
     record_etl_retry,
     record_etl_run,
     record_etl_skip,
+    record_fees_pipeline_flush,
+    record_fees_pipeline_rows,
+    set_fees_pipeline_backlog,
 )
 from awa_common.sentry import init_sentry
 from awa_common.settings import settings as SETTINGS
 
 from . import db_async
 from .client import close_http_client, fetch_fees, init_http_client
+from .planner import RefreshCandidate, RefreshPlan, plan_refresh
 
 configure_logging(service="fees_h10", level=SETTINGS.LOG_LEVEL)
 metrics_init(service="fees_h10", env=SETTINGS.APP_ENV, version=SETTINGS.APP_VERSION)
@@ -123,14 +127,70 @@ def list_active_asins() -> list[str]:
         engine.dispose()
 
 
-def build_idempotency(asins: list[str]) -> tuple[str, dict[str, Any]]:
-    payload = json.dumps({"asins": sorted(asins)}, sort_keys=True, separators=(",", ":")).encode("utf-8")
+def load_refresh_candidates(asins: list[str]) -> list[RefreshCandidate]:
+    """Attach per-ASIN refresh state and latest ROI to ``asins``.
+
+    ASINs without state (or when the lookup fails) are returned as never-fetched candidates.
+    """
+    if not asins:
+        return []
+    fallback = [RefreshCandidate(asin) for asin in asins]
+    if not _database_configured():
+        return fallback
+    roi_view = getattr(SETTINGS, "ROI_MATERIALIZED_VIEW_NAME", "mat_v_roi_full")
+    query = text(
+        f"""
+        SELECT s.asin, s.last_fetched_at, s.fetch_count, s.change_count, r.roi_pct
+          FROM fee_refresh_state s
+          LEFT JOIN (
+                SELECT asin, MAX(roi_pct) AS roi_pct FROM {roi_view} GROUP BY asin
+          ) r ON r.asin = s.asin
+         WHERE s.asin = ANY(:asins)
+        """
+    )
+    engine = create_engine(build_dsn(sync=True), future=True)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(query, {"asins": list(asins)}).fetchall()
+    except Exception:
+        logger.warning("fees_h10.refresh_state_lookup_failed", component="fees_h10")
+        return fallback
+    finally:
+        engine.dispose()
+    state = {
+        row[0]: RefreshCandidate(
+            asin=row[0],
+            last_fetched_at=row[1],
+            fetch_count=int(row[2] or 0),
+            change_count=int(row[3] or 0),
+            roi_pct=float(row[4]) if row[4] is not None else None,
+        )
+        for row in rows
+    }
+    return [state.get(asin, candidate) for asin, candidate in zip(asins, fallback, strict=True)]
+
+
+def plan_refresh_asins() -> RefreshPlan:
+    asins = list_active_asins()
+    plan = plan_refresh(load_refresh_candidates(asins))
+    logger.info("fees_h10.refresh_planned", component="fees_h10", **plan.as_meta())
+    return plan
+
+
+def build_idempotency(
+    asins: list[str], extra: dict[str, Any] | None = None, *, run_id: str | None = None
+) -> tuple[str, dict[str, Any]]:
+    # The planner hands out the same ASIN set run after run when the catalog fits the budget, so a
+    # scheduled run is keyed on its own id rather than on the ASINs, which a redelivery may re-plan.
+    content: dict[str, Any] = {"run_id": run_id} if run_id is not None else {"asins": sorted(asins)}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")
     key = compute_idempotency_key(content=payload)
     meta = build_payload_meta(
         extra={
             "asin_count": len(asins),
             "mode": "live",
             "source_url": HELIUM_ENDPOINT,
+            **(extra or {}),
         }
     )
     return key, meta
@@ -168,35 +228,103 @@ def _retry_reason(exc: BaseException) -> str:
     return exc.__class__.__name__
 
 
-async def _fetch_single(asin: str, semaphore: asyncio.Semaphore) -> dict[str, Any] | None:
-    async with semaphore:
-        try:
-            payload = await fetch_fees(asin)
-        except httpx.HTTPError as exc:
-            logger.warning(
-                "fees_h10.fetch_failed",
-                component="fees_h10",
-                asin=asin,
-                error=str(exc),
-                error_type=exc.__class__.__name__,
-            )
-            record_etl_retry("fees_h10", _retry_reason(exc))
-            return None
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.warning(
-                "fees_h10.fetch_failed",
-                component="fees_h10",
-                asin=asin,
-                error=str(exc),
-                error_type=exc.__class__.__name__,
-            )
-            record_etl_retry("fees_h10", _retry_reason(exc))
-            return None
-        row = _normalise_row(payload)
-        if not row["asin"]:
-            logger.warning("fees_h10.missing_asin", component="fees_h10", asin=asin)
-            return None
-        return row
+async def _fetch_single(asin: str) -> dict[str, Any] | None:
+    try:
+        payload = await fetch_fees(asin)
+    except httpx.HTTPError as exc:
+        logger.warning(
+            "fees_h10.fetch_failed",
+            component="fees_h10",
+            asin=asin,
+            error=str(exc),
+            error_type=exc.__class__.__name__,
+        )
+        record_etl_retry("fees_h10", _retry_reason(exc))
+        return None
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.warning(
+            "fees_h10.fetch_failed",
+            component="fees_h10",
+            asin=asin,
+            error=str(exc),
+            error_type=exc.__class__.__name__,
+        )
+        record_etl_retry("fees_h10", _retry_reason(exc))
+        return None
+    row = _normalise_row(payload)
+    if not row["asin"]:
+        logger.warning("fees_h10.missing_asin", component="fees_h10", asin=asin)
+        return None
+    return row
+
+
+_PIPELINE_DONE = object()
+
+
+async def _fetch_worker(asins: Iterator[str], results: asyncio.Queue[Any], failed: list[str]) -> None:
+    # Workers share one iterator, so each ASIN is fetched exactly once without a pre-filled queue.
+    for asin in asins:
+        row = await _fetch_single(asin)
+        if row is None:
+            record_fees_pipeline_rows("failed")
+            failed.append(asin)
+            continue
+        record_fees_pipeline_rows("fetched")
+        await results.put(row)
+
+
+class _BatchWriter:
+    """Drain fetched rows into ``db_async.upsert_fee_rows`` every ``batch_rows`` rows or ``flush_s`` seconds."""
+
+    def __init__(self, results: asyncio.Queue[Any], *, batch_rows: int, flush_s: float, persist: bool) -> None:
+        self.results = results
+        self.batch_rows = max(1, batch_rows)
+        self.flush_s = max(0.0, flush_s)
+        self.persist = persist
+        self.buffer: list[dict[str, Any]] = []
+        self.received = 0
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.flushes = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(self.results.get(), timeout)
+            except TimeoutError:
+                await self.flush()
+                deadline = None
+                continue
+            if item is _PIPELINE_DONE:
+                await self.flush()
+                return
+            self.received += 1
+            self.buffer.append(item)
+            set_fees_pipeline_backlog(self.results.qsize() + len(self.buffer))
+            if deadline is None:
+                deadline = loop.time() + self.flush_s
+            if len(self.buffer) >= self.batch_rows:
+                await self.flush()
+                deadline = None
+
+    async def flush(self) -> None:
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        if self.persist:
+            started = time.perf_counter()
+            summary = await db_async.upsert_fee_rows(batch)
+            record_fees_pipeline_flush(time.perf_counter() - started)
+            record_fees_pipeline_rows("written", len(batch))
+            self.processed += len(batch)
+            self.inserted += summary.get("inserted", 0)
+            self.updated += summary.get("updated", 0)
+            self.flushes += 1
+        set_fees_pipeline_backlog(self.results.qsize())
 
 
 async def _bulk(asins: list[str]) -> dict[str, int]:
@@ -204,54 +332,67 @@ async def _bulk(asins: list[str]) -> dict[str, int]:
         logger.info("fees_h10.no_asins", component="fees_h10")
         return {"requested": 0, "processed": 0, "failures": 0, "inserted": 0, "updated": 0}
 
-    semaphore = asyncio.Semaphore(max(1, SETTINGS.H10_MAX_CONCURRENCY))
     start = time.perf_counter()
-    results = await asyncio.gather(*(_fetch_single(asin, semaphore) for asin in asins))
-    rows = [row for row in results if row]
-    failures = len(asins) - len(rows)
+    batch_rows = max(1, int(getattr(SETTINGS, "H10_WRITE_BATCH_ROWS", 200) or 1))
+    flush_s = float(getattr(SETTINGS, "H10_WRITE_FLUSH_S", 2.0) or 0.0)
+    results: asyncio.Queue[Any] = asyncio.Queue(maxsize=batch_rows * 2)
+    writer = _BatchWriter(results, batch_rows=batch_rows, flush_s=flush_s, persist=_database_configured())
+    pending = iter(asins)
+    failed: list[str] = []
+    workers = min(max(1, SETTINGS.H10_MAX_CONCURRENCY), len(asins))
+    fetchers = [asyncio.create_task(_fetch_worker(pending, results, failed)) for _ in range(workers)]
+    fetching: asyncio.Future[Any] = asyncio.gather(*fetchers)
+    writing: asyncio.Future[Any] = asyncio.create_task(writer.run())
+    try:
+        done, _ = await asyncio.wait({fetching, writing}, return_when=asyncio.FIRST_COMPLETED)
+        if writing in done:
+            # The writer only returns after the sentinel, so finishing first means it failed.
+            writing.result()
+        await fetching
+        await results.put(_PIPELINE_DONE)
+        await writing
+        if failed and writer.persist:
+            await db_async.record_failed_fetches(failed)
+    except BaseException:
+        for task in (*fetchers, writing):
+            task.cancel()
+        await asyncio.gather(fetching, writing, return_exceptions=True)
+        raise
+    finally:
+        set_fees_pipeline_backlog(0)
 
+    failures = len(asins) - writer.received
     if failures:
         logger.warning(
             "fees_h10.partial_fetch",
             component="fees_h10",
             requested=len(asins),
-            successes=len(rows),
+            successes=writer.received,
             failures=failures,
         )
+    if writer.received and not writer.persist:
+        logger.warning("fees_h10.database_unconfigured", component="fees_h10", pending_rows=writer.received)
 
-    if not rows:
-        record_etl_batch("fees_h10", processed=0, errors=failures, duration_s=time.perf_counter() - start)
-        return {"requested": len(asins), "processed": 0, "failures": failures, "inserted": 0, "updated": 0}
-
-    if not _database_configured():
-        logger.warning("fees_h10.database_unconfigured", component="fees_h10", pending_rows=len(rows))
-        record_etl_batch("fees_h10", processed=0, errors=failures, duration_s=time.perf_counter() - start)
-        return {"requested": len(asins), "processed": 0, "failures": failures, "inserted": 0, "updated": 0}
-
-    summary = await db_async.upsert_fee_rows(rows)
-    duration_ms = int((time.perf_counter() - start) * 1000)
-    logger.info(
-        "fees_h10.upsert_completed",
-        component="fees_h10",
-        requested=len(asins),
-        processed=len(rows),
-        inserted=summary["inserted"],
-        updated=summary["updated"],
-        failures=failures,
-        duration_ms=duration_ms,
-    )
-    record_etl_batch(
-        "fees_h10",
-        processed=len(rows),
-        errors=failures,
-        duration_s=duration_ms / 1000,
-    )
+    duration_s = time.perf_counter() - start
+    if writer.processed:
+        logger.info(
+            "fees_h10.upsert_completed",
+            component="fees_h10",
+            requested=len(asins),
+            processed=writer.processed,
+            inserted=writer.inserted,
+            updated=writer.updated,
+            failures=failures,
+            batches=writer.flushes,
+            duration_ms=int(duration_s * 1000),
+        )
+    record_etl_batch("fees_h10", processed=writer.processed, errors=failures, duration_s=duration_s)
     return {
         "requested": len(asins),
-        "processed": len(rows),
+        "processed": writer.processed,
         "failures": failures,
-        "inserted": summary.get("inserted", 0),
-        "updated": summary.get("updated", 0),
+        "inserted": writer.inserted,
+        "updated": writer.updated,
     }
 
 
@@ -264,11 +405,21 @@ async def _run_refresh(asins: list[str]) -> dict[str, int]:
         await db_async.close_pool()
 
 
+def _celery_task_id() -> str | None:
+    request = getattr(current_task, "request", None) if current_task else None
+    task_id = getattr(request, "id", None)
+    return str(task_id) if task_id else None
+
+
 @shared_task_typed(name="fees.refresh")
 @instrument_task("fees_h10_update", emit_metrics=False)
 def refresh_fees() -> None:
-    asins = list_active_asins()
-    idempotency_key, payload_meta = build_idempotency(asins)
+    plan = plan_refresh_asins()
+    asins = plan.asins
+    # Redeliveries and retries keep the Celery request id; direct calls outside a worker are their own run.
+    task_id = _celery_task_id()
+    run_id = task_id or plan.planned_at.isoformat()
+    idempotency_key, payload_meta = build_idempotency(asins, extra=plan.as_meta(), run_id=run_id)
     engine = create_engine(build_dsn(sync=True), future=True)
     SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, future=True)
     summary: dict[str, int] | None = None
@@ -279,6 +430,7 @@ def refresh_fees() -> None:
             payload_meta=payload_meta,
             idempotency_key=idempotency_key,
             on_duplicate="update_meta",
+            task_id=task_id,
         ) as handle:
             if handle is None:
                 record_etl_skip(SOURCE_NAME)
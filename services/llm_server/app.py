@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import os
+import shlex
 import time
-from collections.abc import Mapping
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Literal
 
@@ -15,9 +17,17 @@ from pydantic import BaseModel, Field, ValidationError
 from awa_common.llm import EmailLLMResult, LLMInvalidResponseError, PriceListLLMResult
 from awa_common.metrics import MetricsMiddleware, record_llm_error, record_llm_request, register_metrics_endpoint
 from awa_common.settings import settings
+from services.llm_server.batching import MicroBatcher
 from services.llm_server.bin_runner import run_llm_binary
-from services.llm_server.errors import LLMBinaryError, LLMServiceError
+from services.llm_server.errors import (
+    LLMBinaryError,
+    LLMBinaryOSFailure,
+    LLMBinaryTimeoutError,
+    LLMProviderTimeoutError,
+    LLMServiceError,
+)
 from services.llm_server.provider_client import LLMProviderHTTPClient, ProviderConfig
+from services.llm_server.worker_pool import LLMWorkerPool
 
 logger = structlog.get_logger(__name__).bind(component="llm_server")
 
@@ -50,6 +60,12 @@ BACKOFF_MAX_S = max(
 )
 BIN_TIMEOUT = max(float(getattr(_CFG, "bin_timeout_s", getattr(settings, "LLM_BIN_TIMEOUT_SEC", 30.0))), 0.1)
 MAX_OUTPUT_BYTES = max(int(getattr(_CFG, "max_output_bytes", getattr(settings, "LLM_MAX_OUTPUT_BYTES", 65536))), 1024)
+BIN_POOL_SIZE = int(getattr(_CFG, "bin_pool_size", 0) or 0)
+BIN_POOL_COMMAND = shlex.split(getattr(_CFG, "bin_pool_command", None) or "")
+BIN_POOL_QUEUE_SIZE = int(getattr(_CFG, "bin_pool_queue_size", 16))
+BIN_POOL_MAX_REQUESTS = int(getattr(_CFG, "bin_pool_max_requests", 200))
+BATCH_WINDOW_S = max(float(getattr(_CFG, "batch_window_ms", 10.0)), 0.0) / 1000.0
+BATCH_MAX_SIZE = max(int(getattr(_CFG, "batch_max_size", 8)), 1)
 if _CFG.provider == "local" and not LOCAL_BASE:  # pragma: no cover - startup validation
     raise RuntimeError("LLM_PROVIDER_BASE_URL must be set when using the local provider")
 if _CFG.secondary_provider == "local" and not LOCAL_BASE:  # pragma: no cover - startup validation
@@ -57,8 +73,11 @@ if _CFG.secondary_provider == "local" and not LOCAL_BASE:  # pragma: no cover -
 MODEL = "/models/llama3-q4_K_M.gguf"
 BIN = "/llama/main"
 
+_BIN_POOL: LLMWorkerPool | None = None
+
 _RETRY_STATUS_CODES = tuple(getattr(settings, "HTTP_RETRY_STATUS_CODES", (429, 500, 502, 503, 504)))
 _PROVIDER_CLIENTS: dict[str, LLMProviderHTTPClient] = {}
+_PROVIDER_BATCHERS: dict[tuple[str, str], MicroBatcher] = {}
 
 if LOCAL_BASE:
     _PROVIDER_CLIENTS["local"] = LLMProviderHTTPClient(
@@ -114,12 +133,55 @@ class LegacyRequest(BaseModel):
     temperature: float = 0.7
 
 
-app = FastAPI(title="LLM microservice", version="1.0")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    global _BIN_POOL
+    if BIN_POOL_SIZE > 0 and BIN_POOL_COMMAND:
+        _BIN_POOL = LLMWorkerPool(
+            BIN_POOL_COMMAND,
+            size=BIN_POOL_SIZE,
+            queue_size=BIN_POOL_QUEUE_SIZE,
+            max_requests=BIN_POOL_MAX_REQUESTS,
+            timeout_s=BIN_TIMEOUT,
+            max_output_bytes=MAX_OUTPUT_BYTES,
+        )
+        await _BIN_POOL.start()
+    try:
+        yield
+    finally:
+        pool, _BIN_POOL = _BIN_POOL, None
+        if pool is not None:
+            await pool.close()
+
+
+app = FastAPI(title="LLM microservice", version="1.0", lifespan=_lifespan)
 app.add_middleware(MetricsMiddleware)
 register_metrics_endpoint(app)
 
 
+async def _run_bin_batch(payloads: list[dict[str, Any]]) -> list[tuple[str, bool] | LLMBinaryError]:
+    pool = _BIN_POOL
+    if pool is None:
+        raise LLMBinaryOSFailure("LLM worker pool is closed")
+    return await pool.run_batch(payloads, log_context={"task": "legacy_chat"})
+
+
+_BIN_BATCHER = MicroBatcher(_run_bin_batch, backend="bin_pool", window_s=BATCH_WINDOW_S, max_size=BATCH_MAX_SIZE)
+
+
 async def _legacy_chat(req: LegacyRequest) -> dict[str, Any]:
+    if _BIN_POOL is not None:
+        payload = {"prompt": req.prompt, "max_tokens": req.max_tokens, "temperature": req.temperature}
+        if BATCH_MAX_SIZE > 1:
+            output, truncated = await _BIN_BATCHER.submit(
+                payload,
+                timeout_s=BIN_TIMEOUT + BATCH_WINDOW_S,
+                on_timeout=lambda: LLMBinaryTimeoutError(timeout_s=BIN_TIMEOUT),
+            )
+        else:
+            output, truncated = await _BIN_POOL.run(payload, log_context={"task": "legacy_chat"})
+        completion = output.strip()
+        return {"completion": f"{completion} [truncated]" if truncated else completion}
     output, truncated = await run_llm_binary(
         [
             BIN,
@@ -209,10 +271,29 @@ def _build_payload(req: LLMRequest, provider: str) -> dict[str, Any]:
     return payload
 
 
+def _provider_batcher(provider: str, operation: str) -> MicroBatcher:
+    batcher = _PROVIDER_BATCHERS.get((provider, operation))
+    if batcher is None:
+
+        async def _invoke(payloads: list[dict[str, Any]]) -> list[Any]:
+            return await _provider_client(provider).chat_completions(payloads, operation=operation)
+
+        batcher = MicroBatcher(_invoke, backend=provider, window_s=BATCH_WINDOW_S, max_size=BATCH_MAX_SIZE)
+        _PROVIDER_BATCHERS[(provider, operation)] = batcher
+    return batcher
+
+
 async def _call_provider(req: LLMRequest, provider: str) -> Any:
     payload = _build_payload(req, provider)
     client = _provider_client(provider)
-    data = await client.chat_completion(payload, operation=req.task)
+    if BATCH_MAX_SIZE > 1:
+        data = await _provider_batcher(provider, req.task).submit(
+            payload,
+            timeout_s=REQUEST_TIMEOUT + BATCH_WINDOW_S,
+            on_timeout=lambda: LLMProviderTimeoutError(provider=provider),
+        )
+    else:
+        data = await client.chat_completion(payload, operation=req.task)
     return _extract_content(data)
 
 
@@ -318,6 +399,8 @@ def _health_errors() -> list[str]:
             errors.append("LLM binary path is not a file")
         elif not os.access(bin_path, os.X_OK):
             errors.append("LLM binary is not executable")
+        if BIN_POOL_SIZE > 0 and not BIN_POOL_COMMAND:
+            errors.append("LLM_BIN_POOL_COMMAND missing for LLM_BIN_POOL_SIZE > 0")
     if "cloud" in providers and not CLOUD_API_KEY:
         errors.append("LLM_CLOUD_API_KEY missing for cloud provider")
     return errors
@@ -0,0 +1,85 @@
+"""Micro-batching of concurrent LLM requests.
+
+Requests submitted within ``window_s`` of the first one (or until ``max_size`` are waiting) are handed to the
+backend as one invocation, and each caller receives its own result or exception. Callers keep their own
+deadline: a caller that gives up is dropped from a batch that has not been dispatched yet, and a result that
+arrives after the deadline is discarded.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from awa_common.metrics import observe_llm_batch_size
+
+BatchInvoker = Callable[[list[Any]], Awaitable[Sequence[Any]]]
+
+
+class MicroBatcher:
+    def __init__(self, invoke: BatchInvoker, *, backend: str, window_s: float, max_size: int) -> None:
+        self._invoke = invoke
+        self._backend = backend
+        self._window_s = max(float(window_s), 0.0)
+        self._max_size = max(int(max_size), 1)
+        self._pending: list[tuple[Any, asyncio.Future[Any]]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: Any, *, timeout_s: float, on_timeout: Callable[[], Exception]) -> Any:
+        """Queue ``item`` for the next batch and wait up to ``timeout_s`` for its result."""
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures cannot cross event loops (each TestClient or worker restart brings its own).
+            self._loop, self._pending, self._flush_handle = loop, [], None
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._max_size or self._max_size == 1:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window_s, self._flush)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout_s)
+        except TimeoutError as exc:
+            raise on_timeout() from exc
+        finally:
+            if not future.done():
+                future.cancel()
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[Any, asyncio.Future[Any]]]) -> None:
+        observe_llm_batch_size(self._backend, len(batch))
+        try:
+            results = await self._invoke([item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        if len(results) != len(batch):
+            error = RuntimeError(f"{self._backend} batch returned {len(results)} results for {len(batch)} requests")
+            results = [error] * len(batch)
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+__all__ = ["MicroBatcher"]
@@ -133,3 +133,9 @@ class LLMBinaryNonZeroExitError(LLMBinaryError):
 class LLMBinaryOSFailure(LLMBinaryError):
     def __init__(self, message: str = "LLM binary failed to launch") -> None:
         super().__init__(message, status_code=502, error_type="bin_os_error")
+
+
+class LLMBinaryOverloadedError(LLMBinaryError):
+    def __init__(self, message: str = "LLM binary workers are busy", *, queue_size: int | None = None) -> None:
+        details = {"queue_size": queue_size} if queue_size is not None else None
+        super().__init__(message, status_code=503, error_type="bin_overloaded", details=details)
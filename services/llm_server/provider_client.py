@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import time
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from typing import Any
 
@@ -135,30 +136,33 @@ class LLMProviderHTTPClient:
             error=str(exc),
         )
 
-    async def chat_completion(self, payload: dict[str, Any], *, operation: str = "chat_completion") -> Any:
+    def _url(self) -> str:
         base = self._config.base_url.rstrip("/")
         if base.endswith("/v1"):
-            url = f"{base}/chat/completions"
-        else:
-            url = f"{base}/v1/chat/completions"
+            return f"{base}/chat/completions"
+        return f"{base}/v1/chat/completions"
+
+    def _http_client(self) -> AsyncHTTPClient:
+        return AsyncHTTPClient(
+            integration=self._config.integration,
+            total_timeout_s=self._request_timeout_s,
+            max_retries=self._max_retries,
+            backoff_base_s=self._backoff_base_s,
+            backoff_max_s=self._backoff_max_s,
+            retry_status_codes=self._retry_status_codes,
+            transport=self._transport,
+        )
+
+    async def _post(self, client: AsyncHTTPClient, payload: dict[str, Any], operation: str) -> Any:
         start = time.perf_counter()
         outcome: ProviderOutcome = "error"
         try:
-            async with AsyncHTTPClient(
-                integration=self._config.integration,
-                total_timeout_s=self._request_timeout_s,
-                max_retries=self._max_retries,
-                backoff_base_s=self._backoff_base_s,
-                backoff_max_s=self._backoff_max_s,
-                retry_status_codes=self._retry_status_codes,
-                transport=self._transport,
-            ) as client:
-                response_json = await client.post_json(
-                    url,
-                    json=payload,
-                    headers=self._headers(),
-                    timeout=self._request_timeout_s,
-                )
+            response_json = await client.post_json(
+                self._url(),
+                json=payload,
+                headers=self._headers(),
+                timeout=self._request_timeout_s,
+            )
             outcome = "success"
             return response_json
         except Exception as exc:
@@ -171,3 +175,25 @@ class LLMProviderHTTPClient:
             observe_llm_provider_latency(self.provider, operation, duration)
             if outcome == "timeout":
                 record_llm_provider_timeout(self.provider, operation)
+
+    async def chat_completion(self, payload: dict[str, Any], *, operation: str = "chat_completion") -> Any:
+        async with self._http_client() as client:
+            return await self._post(client, payload, operation)
+
+    async def chat_completions(
+        self, payloads: Sequence[dict[str, Any]], *, operation: str = "chat_completion"
+    ) -> list[Any | LLMProviderError]:
+        """Send a batch over one connection pool; failures are returned in place of their responses.
+
+        Chat completion endpoints take one conversation per call, so the batch is issued as concurrent
+        requests on a shared client and the provider's own continuous batching merges them server-side.
+        """
+
+        async with self._http_client() as client:
+            results = await asyncio.gather(
+                *(self._post(client, payload, operation) for payload in payloads), return_exceptions=True
+            )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, LLMProviderError):
+                raise result
+        return list(results)
@@ -0,0 +1,312 @@
+"""Pool of long-lived local LLM binary workers.
+
+Each worker is started once from ``LLM_BIN_POOL_COMMAND`` and serves requests over stdin/stdout with
+length-prefixed frames: a 4-byte big-endian length followed by that many bytes of UTF-8 JSON. Requests are
+``{"prompt", "max_tokens", "temperature"}``; replies are ``{"output": str}`` or ``{"error": str}``. A frame
+may also carry a JSON array of requests, answered by an array of replies in the same order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import struct
+import time
+from collections.abc import Coroutine, Sequence
+from typing import Any
+
+import structlog
+
+from awa_common.metrics import (
+    observe_llm_bin_pool_latency,
+    record_llm_bin_pool_recycle,
+    set_llm_bin_pool_queue_depth,
+)
+
+from .bin_runner import _STDERR_MAX_BYTES, _decode_payload
+from .errors import (
+    LLMBinaryError,
+    LLMBinaryNonZeroExitError,
+    LLMBinaryOSFailure,
+    LLMBinaryOverloadedError,
+    LLMBinaryTimeoutError,
+)
+
+logger = structlog.get_logger(__name__).bind(component="llm_bin_pool")
+
+_HEADER = struct.Struct(">I")
+_MAX_FRAME_BYTES = 16 * 1024 * 1024
+_STOP_GRACE_S = 1.0
+
+
+class _ProtocolError(Exception):
+    """The worker sent something that is not a valid frame."""
+
+
+async def write_frame(writer: asyncio.StreamWriter, payload: Any) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    writer.write(_HEADER.pack(len(body)) + body)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    """Read one frame; raises ``asyncio.IncompleteReadError`` when the worker closed its stdout."""
+
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if length > _MAX_FRAME_BYTES:
+        raise _ProtocolError(f"frame of {length} bytes exceeds {_MAX_FRAME_BYTES}")
+    try:
+        return json.loads(await reader.readexactly(length))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise _ProtocolError("frame is not valid JSON") from exc
+
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.served = 0
+        self._stderr = bytearray()
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+
+    @classmethod
+    async def spawn(cls, command: Sequence[str]) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        return cls(proc)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def _drain_stderr(self) -> None:
+        assert self.proc.stderr is not None
+        while chunk := await self.proc.stderr.read(_STDERR_MAX_BYTES):
+            self._stderr += chunk
+            del self._stderr[:-_STDERR_MAX_BYTES]
+
+    def stderr_tail(self) -> str:
+        return self._stderr.decode("utf-8", errors="replace")
+
+    async def request(self, payload: Any) -> Any:
+        assert self.proc.stdin is not None
+        assert self.proc.stdout is not None
+        await write_frame(self.proc.stdin, payload)
+        return await read_frame(self.proc.stdout)
+
+    async def stop(self) -> None:
+        if self.alive and self.proc.stdin is not None:
+            with contextlib.suppress(Exception):
+                self.proc.stdin.close()
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout=_STOP_GRACE_S)
+            except TimeoutError:
+                with contextlib.suppress(ProcessLookupError):
+                    self.proc.kill()
+        with contextlib.suppress(Exception):
+            await self.proc.wait()
+        with contextlib.suppress(Exception):
+            await self._stderr_task
+
+
+class LLMWorkerPool:
+    """Fixed-size pool of warm binary workers with a bounded admission queue.
+
+    A worker is replaced after ``max_requests`` requests, when it crashes, times out, breaks the framing, or
+    its caller is cancelled mid-request (its stdout would otherwise be out of step with the next caller).
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        *,
+        size: int,
+        queue_size: int,
+        max_requests: int,
+        timeout_s: float,
+        max_output_bytes: int,
+    ) -> None:
+        self._command = list(command)
+        self._size = max(int(size), 1)
+        self._queue_size = max(int(queue_size), 0)
+        self._max_requests = max(int(max_requests), 0)
+        self._timeout_s = float(timeout_s)
+        self._max_output_bytes = int(max_output_bytes)
+        # Free slots: a warm worker, or None when the slot must spawn one before use.
+        self._idle: asyncio.Queue[_Worker | None] = asyncio.Queue()
+        self._waiting = 0
+        self._busy = 0
+        self._closed = False
+        self._background: set[asyncio.Task[None]] = set()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def start(self) -> None:
+        for _ in range(self._size):
+            try:
+                self._idle.put_nowait(await _Worker.spawn(self._command))
+            except OSError as exc:
+                logger.warning("llm.bin_pool.spawn_failed", error=str(exc), error_type=exc.__class__.__name__)
+                self._idle.put_nowait(None)
+        logger.info("llm.bin_pool.started", size=self._size, bin=self._command[0] if self._command else None)
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._background):
+            with contextlib.suppress(Exception):
+                await task
+        workers: list[_Worker] = []
+        while not self._idle.empty():
+            slot = self._idle.get_nowait()
+            if slot is not None:
+                workers.append(slot)
+        await asyncio.gather(*(worker.stop() for worker in workers), return_exceptions=True)
+
+    async def run(self, payload: dict[str, Any], *, log_context: dict[str, Any] | None = None) -> tuple[str, bool]:
+        """Send ``payload`` to a free worker and return ``(output, truncated)`` like ``run_llm_binary``."""
+
+        ctx = dict(log_context or {})
+        return self._output(await self._exchange(payload, ctx), ctx)
+
+    async def run_batch(
+        self, payloads: Sequence[dict[str, Any]], *, log_context: dict[str, Any] | None = None
+    ) -> list[tuple[str, bool] | LLMBinaryError]:
+        """Send several requests as one JSON-array frame; per-request failures are returned, not raised."""
+
+        ctx = dict(log_context or {}, batch_size=len(payloads))
+        replies = await self._exchange(list(payloads), ctx)
+        if not isinstance(replies, list) or len(replies) != len(payloads):
+            raise LLMBinaryError("LLM worker batch reply does not match the request", error_type="bin_protocol_error")
+        results: list[tuple[str, bool] | LLMBinaryError] = []
+        for reply in replies:
+            try:
+                results.append(self._output(reply, ctx))
+            except LLMBinaryError as exc:
+                results.append(exc)
+        return results
+
+    async def _exchange(self, frame: Any, ctx: dict[str, Any]) -> Any:
+        if self._closed:
+            raise LLMBinaryOSFailure("LLM worker pool is closed")
+        if self._idle.empty() and self._waiting >= self._queue_size:
+            logger.warning("llm.bin_pool.overloaded", queue_size=self._queue_size, busy=self._busy, **ctx)
+            raise LLMBinaryOverloadedError(queue_size=self._queue_size)
+
+        self._waiting += 1
+        set_llm_bin_pool_queue_depth(self._waiting)
+        queued_at = time.perf_counter()
+        # One budget covers the admission wait and the request, so a caller never waits past timeout_s.
+        deadline = asyncio.get_running_loop().time() + self._timeout_s
+        try:
+            async with asyncio.timeout_at(deadline):
+                slot = await self._idle.get()
+        except TimeoutError as exc:
+            logger.warning("llm.bin_pool.queue_timeout", timeout_s=self._timeout_s, **ctx)
+            raise LLMBinaryTimeoutError(timeout_s=self._timeout_s) from exc
+        finally:
+            self._waiting -= 1
+            set_llm_bin_pool_queue_depth(self._waiting)
+        observe_llm_bin_pool_latency("queue", time.perf_counter() - queued_at)
+
+        self._busy += 1
+        worker: _Worker | None = slot
+        recycle: str | None = "cancelled"
+        started = time.perf_counter()
+        try:
+            if worker is None or not worker.alive:
+                previous, worker = worker, None
+                worker = await self._spawn(previous)
+            async with asyncio.timeout_at(deadline):
+                reply = await worker.request(frame)
+            recycle = None
+        except TimeoutError as exc:
+            recycle = "timeout"
+            logger.warning("llm.bin_pool.timeout", timeout_s=self._timeout_s, **ctx)
+            raise LLMBinaryTimeoutError(timeout_s=self._timeout_s) from exc
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            recycle = "crash"
+            assert worker is not None
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(worker.proc.wait(), timeout=_STOP_GRACE_S)
+            stderr = worker.stderr_tail()
+            logger.warning("llm.bin_pool.worker_died", exit_code=worker.proc.returncode, stderr=stderr, **ctx)
+            raise LLMBinaryNonZeroExitError(exit_code=worker.proc.returncode, stderr=stderr) from exc
+        except _ProtocolError as exc:
+            recycle = "protocol"
+            logger.warning("llm.bin_pool.protocol_error", error=str(exc), **ctx)
+            raise LLMBinaryError("LLM worker sent an invalid frame", error_type="bin_protocol_error") from exc
+        finally:
+            self._busy -= 1
+            observe_llm_bin_pool_latency("run", time.perf_counter() - started)
+            if worker is not None and recycle is None:
+                worker.served += 1
+                if self._max_requests and worker.served >= self._max_requests:
+                    recycle = "max_requests"
+            if recycle is None and self._closed:
+                # close() only drains idle slots, so a worker that was busy then has to be stopped here.
+                assert worker is not None
+                self._track(worker.stop())
+            elif recycle is None:
+                self._idle.put_nowait(worker)
+            else:
+                self._replace(worker, recycle)
+        return reply
+
+    def _output(self, reply: Any, ctx: dict[str, Any]) -> tuple[str, bool]:
+        if not isinstance(reply, dict):
+            raise LLMBinaryError("LLM worker reply must be a JSON object", error_type="bin_protocol_error")
+        if reply.get("error"):
+            raise LLMBinaryNonZeroExitError(stderr=str(reply["error"])[:_STDERR_MAX_BYTES])
+        encoded = str(reply.get("output") or "").encode("utf-8")
+        truncated = len(encoded) > self._max_output_bytes
+        output = _decode_payload(encoded, truncated=False, max_bytes=self._max_output_bytes)
+        logger.info("llm.bin_pool.completed", truncated=truncated, output_bytes=len(encoded), **ctx)
+        return output, truncated
+
+    async def _spawn(self, previous: _Worker | None) -> _Worker:
+        if previous is not None:
+            record_llm_bin_pool_recycle("crash")
+            await previous.stop()
+        try:
+            return await _Worker.spawn(self._command)
+        except OSError as exc:
+            logger.warning("llm.bin_pool.spawn_failed", error=str(exc), error_type=exc.__class__.__name__)
+            raise LLMBinaryOSFailure(str(exc)) from exc
+
+    def _replace(self, worker: _Worker | None, reason: str) -> None:
+        """Stop ``worker`` and refill its slot in the background so callers never wait on teardown."""
+
+        if worker is not None:
+            record_llm_bin_pool_recycle(reason)
+
+        async def _refill() -> None:
+            if worker is not None:
+                await worker.stop()
+            fresh: _Worker | None = None
+            if not self._closed:
+                with contextlib.suppress(OSError):
+                    fresh = await _Worker.spawn(self._command)
+            if fresh is not None and self._closed:
+                await fresh.stop()
+                fresh = None
+            self._idle.put_nowait(fresh)
+
+        self._track(_refill())
+
+    def _track(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+__all__ = ["LLMWorkerPool", "read_frame", "write_frame"]
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import csv
+import hashlib
 import io
+import os
+import tempfile
+from collections.abc import Iterator
 from dataclasses import asdict, dataclass
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any
+from pathlib import Path
+from typing import IO, Any
 from urllib.parse import parse_qs, urlparse
 
 import anyio
@@ -24,16 +30,20 @@ URL = Settings().FREIGHT_API_URL
 
 __all__ = [
     "URL",
+    "SourceStream",
     "UnsupportedExcelError",
     "UnsupportedFileFormatError",
     "fetch_rates",
     "fetch_sources",
+    "open_sources",
 ]
 
 logger = structlog.get_logger(__name__).bind(component="logistics_etl.client")
 _HTTP_CLIENT: AsyncHTTPClient | None = None
 _HTTP_CLIENT_CONFIG: tuple[float, int] | None = None
 _HTTP_LOCK = asyncio.Lock()
+_CHUNK_SIZE = 1 << 20
+_SNIFF_BYTES = 1024
 
 
 class UnsupportedExcelError(RuntimeError):
@@ -53,6 +63,113 @@ class SourcePayload:
     error: Exception | None = None
 
 
+@dataclass
+class SourceStream:
+    """Downloaded source spooled to a temporary file and parsed lazily.
+
+    ``sha256`` and ``size`` are computed while the payload is downloaded, so idempotency checks
+    never need the full payload in memory. Callers own the spool and must call :meth:`close`.
+    """
+
+    source: str
+    path: Path | None
+    meta: dict[str, Any]
+    sha256: str | None = None
+    size: int = 0
+    error: Exception | None = None
+    rows_read: int = 0
+
+    def head(self, size: int = _SNIFF_BYTES) -> bytes:
+        if self.path is None:
+            return b""
+        with self.path.open("rb") as handle:
+            return handle.read(size)
+
+    def iter_rows(self) -> Iterator[dict[str, Any]]:
+        """Yield normalised rows one at a time without materialising the payload."""
+        if self.path is None or not self.size:
+            return
+        for row in _iter_rows(self.source, self.path, self.meta, self.head()):
+            self.rows_read += 1
+            yield row
+
+    def close(self) -> None:
+        if self.path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                self.path.unlink()
+            self.path = None
+
+
+class _Spool:
+    """Temporary file plus a running sha256 for a source being downloaded."""
+
+    def __init__(self) -> None:
+        fd, name = tempfile.mkstemp(prefix="logistics-")
+        os.close(fd)
+        self.path = Path(name)
+        self._handle: IO[bytes] | None = None
+        self._hasher = hashlib.sha256()
+        self.size = 0
+
+    def reset(self) -> None:
+        self._hasher = hashlib.sha256()
+        self.size = 0
+        if self._handle is not None:
+            self._handle.seek(0)
+            self._handle.truncate()
+
+    def update(self, chunk: bytes) -> None:
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+
+    def write(self, chunk: bytes) -> None:
+        if self._handle is None:
+            self._handle = self.path.open("wb")
+        self._handle.write(chunk)
+        self.update(chunk)
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def finish(self, source: str, meta: dict[str, Any]) -> SourceStream:
+        self._close_handle()
+        digest = self._hasher.hexdigest() if self.size else None
+        return SourceStream(source=source, path=self.path, meta=meta, sha256=digest, size=self.size)
+
+    def discard(self) -> None:
+        self._close_handle()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+
+async def open_sources(semaphore: asyncio.Semaphore | None = None) -> list[SourceStream]:
+    """
+    Download logistics sources configured via LOGISTICS_SOURCES to temporary spools.
+
+    Unlike :func:`fetch_sources` nothing is parsed up front: rows are produced lazily by
+    :meth:`SourceStream.iter_rows`, keeping memory flat regardless of payload size. Downloads
+    run concurrently, bounded by ``semaphore`` (defaults to LOGISTICS_MAX_CONCURRENCY).
+    """
+    cfg = Settings()
+    sources_env = cfg.LOGISTICS_SOURCES or ""
+    uris = [s.strip() for s in sources_env.split(",") if s.strip()]
+    timeout_s = int(cfg.LOGISTICS_TIMEOUT_S)
+    retries = int(cfg.LOGISTICS_RETRIES)
+    limiter = semaphore or asyncio.Semaphore(max(1, int(cfg.LOGISTICS_MAX_CONCURRENCY)))
+
+    async def _open(uri: str) -> SourceStream:
+        async with limiter:
+            try:
+                return await _stream_with_retries(uri, timeout_s=timeout_s, retries=retries)
+            except Exception as exc:  # pragma: no cover - logged for observability
+                logger.exception("Failed to fetch logistics source %s", uri)
+                return SourceStream(uri, None, {}, error=exc)
+
+    return list(await asyncio.gather(*(_open(uri) for uri in uris)))
+
+
 async def fetch_sources() -> list[dict[str, Any]]:
     """
     Fetch logistics rate sources configured via LOGISTICS_SOURCES.
@@ -157,9 +274,7 @@ async def _ensure_http_client(timeout_s: float | None = None, retries: int | Non
         return _HTTP_CLIENT
 
 
-async def _download_with_retries(url_or_uri: str, *, timeout_s: int, retries: int) -> tuple[bytes, dict[str, Any]]:
-    parsed = urlparse(url_or_uri)
-    scheme = (parsed.scheme or "").lower()
+def _retry_config(retries: int) -> tuple[RetryConfig, int]:
     cfg = Settings()
     attempts = max(1, int(getattr(cfg, "ETL_RETRY_ATTEMPTS", retries)), int(retries))
     raw_jitter = getattr(cfg, "ETL_RETRY_JITTER_S", 0.0)
@@ -175,6 +290,13 @@ async def _download_with_retries(url_or_uri: str, *, timeout_s: int, retries: in
         jitter=jitter_seconds > 0,
         retry_on=(Exception,),
     )
+    return retry_cfg, attempts
+
+
+async def _download_with_retries(url_or_uri: str, *, timeout_s: int, retries: int) -> tuple[bytes, dict[str, Any]]:
+    parsed = urlparse(url_or_uri)
+    scheme = (parsed.scheme or "").lower()
+    retry_cfg, attempts = _retry_config(retries)
 
     if scheme in ("http", "https"):
         return await _download_http(url_or_uri, timeout_s=timeout_s, retries=attempts)
@@ -197,6 +319,40 @@ async def _download_with_retries(url_or_uri: str, *, timeout_s: int, retries: in
     return await _download()
 
 
+async def _stream_with_retries(url_or_uri: str, *, timeout_s: int, retries: int) -> SourceStream:
+    parsed = urlparse(url_or_uri)
+    scheme = (parsed.scheme or "").lower()
+    retry_cfg, attempts = _retry_config(retries)
+
+    if scheme in ("http", "https"):
+        return await _stream_http(url_or_uri, timeout_s=timeout_s, retries=attempts)
+
+    if scheme == "s3":
+
+        async def target() -> SourceStream:
+            return await _stream_s3(parsed, url_or_uri, timeout_s)
+    elif scheme == "ftp":
+
+        async def target() -> SourceStream:
+            return await _stream_ftp(parsed, url_or_uri, timeout_s)
+    else:
+        raise ValueError(f"Unsupported logistics source scheme: {scheme or 'unknown'}")
+
+    @aretry(retry_cfg)
+    async def _download() -> SourceStream:
+        return await target()
+
+    return await _download()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client so the next run builds one on its own event loop."""
+    global _HTTP_CLIENT, _HTTP_CLIENT_CONFIG
+    client, _HTTP_CLIENT, _HTTP_CLIENT_CONFIG = _HTTP_CLIENT, None, None
+    if client is not None:
+        await client.aclose()
+
+
 class _LegacyHTTPWrapper:
     async def get_client(self) -> AsyncHTTPClient:
         return await _ensure_http_client()
@@ -205,6 +361,19 @@ class _LegacyHTTPWrapper:
 http_client = _LegacyHTTPWrapper()
 
 
+def _http_meta(headers: Any) -> dict[str, Any]:
+    etag = headers.get("etag")
+    meta = {
+        "content_type": headers.get("content-type"),
+        "etag": etag.strip('"') if etag else None,
+        "last_modified": headers.get("last-modified"),
+    }
+    seqno = headers.get("x-amz-version-id") or meta.get("etag")
+    if seqno:
+        meta["seqno"] = seqno.strip('"')
+    return meta
+
+
 async def _download_http(
     url: str, timeout_s: int | None = None, retries: int | None = None
 ) -> tuple[bytes, dict[str, Any]]:
@@ -217,16 +386,7 @@ async def _download_http(
             body = await response.aread()
         else:
             body = getattr(response, "content", b"")
-        etag = response.headers.get("etag")
-        meta = {
-            "content_type": response.headers.get("content-type"),
-            "etag": etag.strip('"') if etag else None,
-            "last_modified": response.headers.get("last-modified"),
-        }
-        seqno = response.headers.get("x-amz-version-id") or meta.get("etag")
-        if seqno:
-            meta["seqno"] = seqno.strip('"')
-        return body or b"", meta
+        return body or b"", _http_meta(response.headers)
     finally:
         close = getattr(response, "aclose", None)
         if callable(close):
@@ -235,7 +395,34 @@ async def _download_http(
             response.close()
 
 
-async def _download_s3(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
+async def _stream_http(url: str, timeout_s: int | None = None, retries: int | None = None) -> SourceStream:
+    client = await _ensure_http_client(timeout_s=timeout_s, retries=retries)
+    spool = _Spool()
+    meta: dict[str, Any] = {}
+
+    def _on_response(response: Any) -> None:
+        # Called once per attempt: a retried download starts hashing from scratch.
+        spool.reset()
+        meta.clear()
+        meta.update(_http_meta(response.headers))
+
+    try:
+        await client.download_to_file(
+            url,
+            dest_path=spool.path,
+            chunk_size=_CHUNK_SIZE,
+            on_chunk=spool.update,
+            on_response=_on_response,
+            follow_redirects=True,
+            timeout=timeout_s,
+        )
+    except BaseException:
+        spool.discard()
+        raise
+    return spool.finish(url, meta)
+
+
+def _s3_request(parsed) -> tuple[str, str, dict[str, Any]]:
     bucket = parsed.netloc
     key = parsed.path.lstrip("/")
     extra: dict[str, Any] = {}
@@ -244,36 +431,68 @@ async def _download_s3(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
         version_id = params.get("versionId") or params.get("versionid")
         if version_id:
             extra["VersionId"] = version_id[0]
+    return bucket, key, extra
+
+
+def _s3_meta(response: dict[str, Any]) -> dict[str, Any]:
+    meta = {
+        "etag": (response.get("ETag") or "").strip('"') or None,
+        "last_modified": None,
+        "content_type": response.get("ContentType"),
+        "seqno": response.get("VersionId"),
+    }
+    last_modified = response.get("LastModified")
+    if last_modified:
+        if isinstance(last_modified, datetime):
+            meta["last_modified"] = last_modified.isoformat()
+        else:
+            meta["last_modified"] = str(last_modified)
+    if not meta.get("seqno") and meta.get("etag"):
+        meta["seqno"] = meta["etag"]
+    return meta
+
+
+def _s3_get_object(parsed, timeout_s: int) -> dict[str, Any]:
+    bucket, key, extra = _s3_request(parsed)
+    client = create_boto3_client(
+        config=get_s3_client_config(connect_timeout=timeout_s, read_timeout=timeout_s, max_pool_connections=None)
+    )
+    try:
+        return client.get_object(Bucket=bucket, Key=key, **extra)
+    except Exception as exc:  # pragma: no cover - bubbled to retry
+        raise RuntimeError(str(exc)) from exc
 
+
+async def _download_s3(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
     def _get() -> tuple[bytes, dict[str, Any]]:
-        client = create_boto3_client(
-            config=get_s3_client_config(connect_timeout=timeout_s, read_timeout=timeout_s, max_pool_connections=None)
-        )
+        response = _s3_get_object(parsed, timeout_s)
+        return response["Body"].read(), _s3_meta(response)
+
+    return await anyio.to_thread.run_sync(_get, limiter=None)
+
+
+async def _stream_s3(parsed, source: str, timeout_s: int) -> SourceStream:
+    def _get() -> SourceStream:
+        spool = _Spool()
         try:
-            response = client.get_object(Bucket=bucket, Key=key, **extra)
-        except Exception as exc:  # pragma: no cover - bubbled to retry
-            raise RuntimeError(str(exc)) from exc
-        body = response["Body"].read()
-        meta = {
-            "etag": (response.get("ETag") or "").strip('"') or None,
-            "last_modified": None,
-            "content_type": response.get("ContentType"),
-            "seqno": response.get("VersionId"),
-        }
-        last_modified = response.get("LastModified")
-        if last_modified:
-            if isinstance(last_modified, datetime):
-                meta["last_modified"] = last_modified.isoformat()
+            response = _s3_get_object(parsed, timeout_s)
+            body = response["Body"]
+            iter_chunks = getattr(body, "iter_chunks", None)
+            if callable(iter_chunks):
+                for chunk in iter_chunks(chunk_size=_CHUNK_SIZE):
+                    spool.write(chunk)
             else:
-                meta["last_modified"] = str(last_modified)
-        if not meta.get("seqno") and meta.get("etag"):
-            meta["seqno"] = meta["etag"]
-        return body, meta
+                for chunk in iter(lambda: body.read(_CHUNK_SIZE), b""):
+                    spool.write(chunk)
+        except BaseException:
+            spool.discard()
+            raise
+        return spool.finish(source, _s3_meta(response))
 
     return await anyio.to_thread.run_sync(_get, limiter=None)
 
 
-async def _download_ftp(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
+def _ftp_retrieve(parsed, timeout_s: int, callback: Any) -> dict[str, Any]:
     path = parsed.path.lstrip("/")
     host = parsed.hostname
     if not host:
@@ -282,28 +501,46 @@ async def _download_ftp(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
     username = parsed.username or "anonymous"
     password = parsed.password or "anonymous@"
 
-    def _get() -> tuple[bytes, dict[str, Any]]:
-        from ftplib import FTP
+    from ftplib import FTP
+
+    meta: dict[str, Any] = {}
+    with FTP() as ftp:
+        ftp.connect(host, port, timeout=timeout_s)
+        ftp.login(username, password)
+        ftp.retrbinary(f"RETR {path}", callback)
+        try:
+            stat = ftp.sendcmd(f"MDTM {path}")
+            if stat.startswith("213"):
+                timestamp = stat.split()[1]
+                meta["last_modified"] = timestamp
+                meta["seqno"] = timestamp
+        except Exception:  # pragma: no cover - optional metadata
+            pass
+    return meta
 
+
+async def _download_ftp(parsed, timeout_s: int) -> tuple[bytes, dict[str, Any]]:
+    def _get() -> tuple[bytes, dict[str, Any]]:
         buf = io.BytesIO()
-        meta: dict[str, Any] = {}
-        with FTP() as ftp:
-            ftp.connect(host, port, timeout=timeout_s)
-            ftp.login(username, password)
-            ftp.retrbinary(f"RETR {path}", buf.write)
-            try:
-                stat = ftp.sendcmd(f"MDTM {path}")
-                if stat.startswith("213"):
-                    timestamp = stat.split()[1]
-                    meta["last_modified"] = timestamp
-                    meta["seqno"] = timestamp
-            except Exception:  # pragma: no cover - optional metadata
-                pass
+        meta = _ftp_retrieve(parsed, timeout_s, buf.write)
         return buf.getvalue(), meta
 
     return await anyio.to_thread.run_sync(_get, limiter=None)
 
 
+async def _stream_ftp(parsed, source: str, timeout_s: int) -> SourceStream:
+    def _get() -> SourceStream:
+        spool = _Spool()
+        try:
+            meta = _ftp_retrieve(parsed, timeout_s, spool.write)
+        except BaseException:
+            spool.discard()
+            raise
+        return spool.finish(source, meta)
+
+    return await anyio.to_thread.run_sync(_get, limiter=None)
+
+
 def _parse_rows(source: str, raw: bytes, meta: dict[str, Any]) -> list[dict[str, Any]]:
     if not raw:
         return []
@@ -317,6 +554,20 @@ def _parse_rows(source: str, raw: bytes, meta: dict[str, Any]) -> list[dict[str,
     raise UnsupportedFileFormatError(f"Unsupported data format for {diag}")
 
 
+def _iter_rows(source: str, path: Path, meta: dict[str, Any], head: bytes) -> Iterator[dict[str, Any]]:
+    hint = meta.get("content_type") or source
+    fmt = _detect_format(head, hint)
+    if fmt == "csv":
+        with path.open("rb") as handle:
+            yield from _iter_csv_rows(source, handle)
+        return
+    if fmt == "excel":
+        yield from _iter_excel_rows(source, path)
+        return
+    diag = _format_diagnostics(source, meta, head)
+    raise UnsupportedFileFormatError(f"Unsupported data format for {diag}")
+
+
 def _detect_format(raw_bytes: bytes, name_or_ct: str | None) -> str:
     hint = (name_or_ct or "").lower()
     if ".csv" in hint or "text/csv" in hint:
@@ -325,7 +576,7 @@ def _detect_format(raw_bytes: bytes, name_or_ct: str | None) -> str:
         return "excel"
     # Fallback: try sniffing CSV
     try:
-        sample = raw_bytes[:1024].decode("utf-8-sig")
+        sample = raw_bytes[:_SNIFF_BYTES].decode("utf-8-sig")
         csv.Sniffer().sniff(sample)
         return "csv"
     except Exception:
@@ -339,48 +590,65 @@ def _format_diagnostics(source: str, meta: dict[str, Any], raw: bytes) -> str:
 
 
 def _parse_csv_rows(source: str, raw: bytes) -> list[dict[str, Any]]:
-    text = raw.decode("utf-8-sig")
-    buf = io.StringIO(text)
+    return list(_iter_csv_rows(source, io.BytesIO(raw)))
+
+
+def _iter_csv_rows(source: str, handle: IO[bytes]) -> Iterator[dict[str, Any]]:
+    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+    count = 0
     try:
-        dialect = csv.Sniffer().sniff(text[:1024])
-    except csv.Error:
-        dialect = csv.excel
-    reader = csv.DictReader(buf, dialect=dialect)
-    rows: list[dict[str, Any]] = []
-    for row in reader:
+        sample = text.read(_SNIFF_BYTES)
+        text.seek(0)
         try:
-            rows.append(_normalize_row(row, source))
-        except ValueError as exc:
-            record_etl_normalize_error("logistics_etl", "row_error")
-            logger.warning("Skipping invalid row from %s: %s", source, exc)
-    record_etl_rows_normalized("logistics_etl", len(rows))
-    return rows
+            dialect = csv.Sniffer().sniff(sample)
+        except csv.Error:
+            dialect = csv.excel
+        for row in csv.DictReader(text, dialect=dialect):
+            try:
+                normalized = _normalize_row(row, source)
+            except ValueError as exc:
+                record_etl_normalize_error("logistics_etl", "row_error")
+                logger.warning("Skipping invalid row from %s: %s", source, exc)
+                continue
+            count += 1
+            yield normalized
+    finally:
+        text.detach()
+        record_etl_rows_normalized("logistics_etl", count)
 
 
 def _parse_excel_rows(source: str, raw: bytes) -> list[dict[str, Any]]:
+    return list(_iter_excel_rows(source, io.BytesIO(raw)))
+
+
+def _iter_excel_rows(source: str, workbook: Path | IO[bytes]) -> Iterator[dict[str, Any]]:
     try:
         from openpyxl import load_workbook  # type: ignore[import]
     except Exception as exc:
         raise UnsupportedExcelError("openpyxl is required to process Excel logistics sources") from exc
 
-    stream = io.BytesIO(raw)
-    wb = load_workbook(stream, read_only=True, data_only=True)
+    wb = load_workbook(workbook, read_only=True, data_only=True)
     ws = wb.active
-    rows: list[dict[str, Any]] = []
     headers: list[str] = []
-    for idx, row in enumerate(ws.iter_rows(values_only=True)):
-        values = list(row)
-        if idx == 0:
-            headers = [str(v).strip() if v is not None else "" for v in values]
-            continue
-        data = {headers[i]: values[i] for i in range(min(len(headers), len(values)))}
-        try:
-            rows.append(_normalize_row(data, source))
-        except ValueError as exc:
-            record_etl_normalize_error("logistics_etl", "row_error")
-            logger.warning("Skipping invalid Excel row from %s: %s", source, exc)
-    record_etl_rows_normalized("logistics_etl", len(rows))
-    return rows
+    count = 0
+    try:
+        for idx, row in enumerate(ws.iter_rows(values_only=True)):
+            values = list(row)
+            if idx == 0:
+                headers = [str(v).strip() if v is not None else "" for v in values]
+                continue
+            data = {headers[i]: values[i] for i in range(min(len(headers), len(values)))}
+            try:
+                normalized = _normalize_row(data, source)
+            except ValueError as exc:
+                record_etl_normalize_error("logistics_etl", "row_error")
+                logger.warning("Skipping invalid Excel row from %s: %s", source, exc)
+                continue
+            count += 1
+            yield normalized
+    finally:
+        wb.close()
+        record_etl_rows_normalized("logistics_etl", count)
 
 
 def _normalize_row(row: dict[str, Any], source: str) -> dict[str, Any]:  # noqa: C901
@@ -5,16 +5,17 @@ import asyncio
 import hashlib
 import json
 import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from typing import TYPE_CHECKING, Any
 
 import anyio
 import structlog
-from sqlalchemy import create_engine, update
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from awa_common.db.load_log import LOAD_LOG
-from awa_common.dsn import build_dsn
-from awa_common.etl.guard import process_once
+from awa_common.etl.guard import process_once_async
 from awa_common.etl.idempotency import build_payload_meta, compute_idempotency_key
 from awa_common.metrics import (
     instrument_task as _instrument_task,
@@ -49,6 +50,10 @@ else:
     instrument_task = _instrument_task
 
 SOURCE_NAME = "logistics_etl"
+_KEY_COLS = ["carrier", "origin", "dest", "service", "effective_from"]
+_UPDATE_COLS = ["eur_per_kg", "effective_to", "updated_at"]
+
+Snapshot = dict[str, Any] | client.SourceStream
 
 
 def _summarize_results(results: list[dict[str, Any]]) -> dict[str, Any]:
@@ -63,24 +68,31 @@ def _summarize_results(results: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+def _fingerprint(snap: Snapshot) -> dict[str, Any]:
+    if isinstance(snap, client.SourceStream):
+        return {
+            "source": snap.source,
+            "seqno": snap.meta.get("seqno"),
+            "sha256": snap.sha256,
+            "bytes": snap.size,
+        }
+    raw = snap.get("raw") or b""
+    meta = snap.get("meta") or {}
+    return {
+        "source": str(snap.get("source") or "unknown"),
+        "seqno": meta.get("seqno"),
+        "sha256": hashlib.sha256(raw).hexdigest() if raw else None,
+        "rows": len(snap.get("rows") or []),
+    }
+
+
 def _build_idempotency(
-    snapshots: list[dict[str, Any]],
+    snapshots: list[Snapshot],
     legacy_rows: list[dict[str, Any]],
     *,
     dry_run: bool,
 ) -> tuple[str, dict[str, Any]]:
-    fingerprint: list[dict[str, Any]] = []
-    for snap in snapshots:
-        raw = snap.get("raw") or b""
-        meta = snap.get("meta") or {}
-        fingerprint.append(
-            {
-                "source": str(snap.get("source") or "unknown"),
-                "seqno": meta.get("seqno"),
-                "sha256": hashlib.sha256(raw).hexdigest() if raw else None,
-                "rows": len(snap.get("rows") or []),
-            }
-        )
+    fingerprint: list[dict[str, Any]] = [_fingerprint(snap) for snap in snapshots]
     if not fingerprint:
         fingerprint.append({"legacy_rows": len(legacy_rows)})
 
@@ -93,32 +105,47 @@ def _build_idempotency(
             "snapshot_count": len(snapshots),
             "legacy_rows": len(legacy_rows),
             "dry_run": dry_run,
-            "sources": [snap.get("source") for snap in snapshots],
+            "sources": [_snapshot_source(snap) for snap in snapshots],
         }
     )
     return key, meta
 
 
+def _close_snapshots(snapshots: Iterable[Snapshot]) -> None:
+    for snap in snapshots:
+        if isinstance(snap, client.SourceStream):
+            snap.close()
+
+
 @instrument_task("logistics_etl")
 async def full(
     dry_run: bool = False,
-    snapshots: list[dict[str, Any]] | None = None,
+    snapshots: list[Snapshot] | None = None,
     legacy_rows: list[dict[str, Any]] | None = None,
+    semaphore: asyncio.Semaphore | None = None,
 ) -> list[dict[str, Any]]:
     cfg = Settings()
     sources_config = (cfg.LOGISTICS_SOURCES or "").strip()
-    snapshot_list: list[dict[str, Any]] | None = snapshots
+    snapshot_list: list[Snapshot] | None = snapshots
+    sem = semaphore or asyncio.Semaphore(max(1, int(cfg.LOGISTICS_MAX_CONCURRENCY)))
     with record_etl_run("logistics_etl"):
+        owned = snapshot_list is None
         if snapshot_list is None:
-            snapshot_list = await client.fetch_sources()
-        if snapshot_list:
-            return await _process_snapshots(
-                snapshot_list,
-                dry_run=dry_run,
-                per_source_timeout=max(1, int(cfg.LOGISTICS_PER_SOURCE_TIMEOUT_SECONDS)),
-                gather_timeout=max(1, int(cfg.LOGISTICS_GATHER_TIMEOUT_SECONDS)),
-                max_concurrency=max(1, int(cfg.LOGISTICS_MAX_CONCURRENCY)),
-            )
+            snapshot_list = list(await client.open_sources(sem))
+        try:
+            if snapshot_list:
+                return await _process_snapshots(
+                    snapshot_list,
+                    dry_run=dry_run,
+                    per_source_timeout=max(1, int(cfg.LOGISTICS_PER_SOURCE_TIMEOUT_SECONDS)),
+                    gather_timeout=max(1, int(cfg.LOGISTICS_GATHER_TIMEOUT_SECONDS)),
+                    max_concurrency=max(1, int(cfg.LOGISTICS_MAX_CONCURRENCY)),
+                    batch_size=max(1, int(cfg.LOGISTICS_UPSERT_BATCH_SIZE)),
+                    semaphore=sem,
+                )
+        finally:
+            if owned:
+                _close_snapshots(snapshot_list)
 
     if sources_config and not snapshot_list:
         return []
@@ -131,17 +158,19 @@ async def full(
 
     await repository.upsert_many(
         table="logistics_rates",
-        key_cols=["carrier", "origin", "dest", "service", "effective_from"],
+        key_cols=_KEY_COLS,
         rows=legacy_payload,
-        update_columns=["eur_per_kg", "effective_to", "updated_at"],
+        update_columns=_UPDATE_COLS,
     )
     return legacy_payload
 
 
-async def _collect_inputs() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+async def _collect_inputs(
+    semaphore: asyncio.Semaphore | None = None,
+) -> tuple[list[Snapshot], list[dict[str, Any]]]:
     cfg = Settings()
     sources_config = (cfg.LOGISTICS_SOURCES or "").strip()
-    snapshots = await client.fetch_sources()
+    snapshots: list[Snapshot] = list(await client.open_sources(semaphore))
     if snapshots:
         return snapshots, []
     if sources_config:
@@ -150,17 +179,25 @@ async def _collect_inputs() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]
     return [], legacy_rows
 
 
-def run_once_with_guard(dry_run: bool = False) -> list[dict[str, Any]]:
-    snapshots, legacy_rows = asyncio.run(_collect_inputs())
-    idempotency_key, payload_meta = _build_idempotency(
-        snapshots,
-        legacy_rows,
-        dry_run=dry_run,
-    )
-    engine = create_engine(build_dsn(sync=True), future=True)
-    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+async def run_once_async(dry_run: bool = False) -> list[dict[str, Any]]:
+    """Fetch, guard, process and record a logistics run on a single event loop.
+
+    Downloads, the load_log guard and per-source upserts share the repository async engine and
+    the HTTP client; one semaphore sized by LOGISTICS_MAX_CONCURRENCY bounds both download and
+    upsert work per source.
+    """
+    cfg = Settings()
+    sem = asyncio.Semaphore(max(1, int(cfg.LOGISTICS_MAX_CONCURRENCY)))
+    snapshots: list[Snapshot] = []
     try:
-        with process_once(
+        snapshots, legacy_rows = await _collect_inputs(sem)
+        idempotency_key, payload_meta = _build_idempotency(
+            snapshots,
+            legacy_rows,
+            dry_run=dry_run,
+        )
+        SessionLocal = async_sessionmaker(bind=repository._get_engine(), expire_on_commit=False)
+        async with process_once_async(
             SessionLocal,
             source=SOURCE_NAME,
             payload_meta=payload_meta,
@@ -176,36 +213,44 @@ def run_once_with_guard(dry_run: bool = False) -> list[dict[str, Any]]:
                     legacy_rows=len(legacy_rows),
                 )
                 return []
-            results = asyncio.run(full(dry_run=dry_run, snapshots=snapshots, legacy_rows=legacy_rows))
+            results = await full(dry_run=dry_run, snapshots=snapshots, legacy_rows=legacy_rows, semaphore=sem)
             meta = dict(payload_meta)
             meta.update(_summarize_results(results))
-            handle.session.execute(
+            await handle.session.execute(
                 update(LOAD_LOG).where(LOAD_LOG.c.id == handle.load_log_id).values(payload_meta=meta)
             )
             return results
     finally:
-        engine.dispose()
+        _close_snapshots(snapshots)
+        await client.close_http_client()
+        await repository.dispose_engine()
+
+
+def run_once_with_guard(dry_run: bool = False) -> list[dict[str, Any]]:
+    return asyncio.run(run_once_async(dry_run=dry_run))
 
 
 async def _process_snapshots(
-    snapshots: list[dict[str, Any]],
+    snapshots: list[Snapshot],
     *,
     dry_run: bool,
     per_source_timeout: int,
     gather_timeout: int,
     max_concurrency: int,
+    batch_size: int | None = None,
+    semaphore: asyncio.Semaphore | None = None,
 ) -> list[dict[str, Any]]:
-    sem = asyncio.Semaphore(max_concurrency)
+    sem = semaphore or asyncio.Semaphore(max_concurrency)
     results: list[dict[str, Any] | None] = [None] * len(snapshots)
 
-    async def _run_single(idx: int, snapshot: dict[str, Any]) -> None:
-        uri = str(snapshot.get("source") or "unknown")
+    async def _run_single(idx: int, snapshot: Snapshot) -> None:
+        uri = _snapshot_source(snapshot)
         start = time.perf_counter()
         async with sem:
             logistics_task_inflight_change(uri, 1)
             try:
                 with anyio.fail_after(per_source_timeout):
-                    summary = await _handle_snapshot(snapshot, dry_run=dry_run)
+                    summary = await _handle_snapshot(snapshot, dry_run=dry_run, batch_size=batch_size)
             except TimeoutError:
                 record_logistics_error(uri, "timeout")
                 record_etl_retry("logistics_etl", "timeout")
@@ -243,47 +288,81 @@ async def _process_snapshots(
     return [res for res in results if res is not None]
 
 
-async def _handle_snapshot(snapshot: dict[str, Any], *, dry_run: bool) -> dict[str, Any]:
-    uri = str(snapshot.get("source") or "unknown")
-    raw, meta, rows = _hydrate_snapshot(snapshot)
-    error = snapshot.get("error")
+def _snapshot_source(snapshot: Snapshot) -> str:
+    if isinstance(snapshot, client.SourceStream):
+        return snapshot.source or "unknown"
+    return str(snapshot.get("source") or "unknown")
+
+
+def _to_db_row(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "carrier": row["carrier"],
+        "origin": row["origin"],
+        "dest": row["dest"],
+        "service": row["service"],
+        "eur_per_kg": row["eur_per_kg"],
+        "effective_from": row["valid_from"],
+        "effective_to": row["valid_to"],
+        "source": row.get("source"),
+    }
+
+
+def _batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def _handle_snapshot(
+    snapshot: Snapshot,
+    *,
+    dry_run: bool,
+    batch_size: int | None = None,
+) -> dict[str, Any]:
+    uri = _snapshot_source(snapshot)
+    rows: Iterable[dict[str, Any]]
+    if isinstance(snapshot, client.SourceStream):
+        meta, error, sha256 = snapshot.meta, snapshot.error, snapshot.sha256
+        rows = snapshot.iter_rows()
+    else:
+        raw, meta, rows = _hydrate_snapshot(snapshot)
+        error = snapshot.get("error")
+        sha256 = hashlib.sha256(raw).hexdigest() if raw else None
     if isinstance(error, BaseException):
         raise error
-    sha256 = hashlib.sha256(raw).hexdigest() if raw else None
     seqno_value = meta.get("seqno")
     seqno = str(seqno_value) if seqno_value is not None else None
     logical_source = str(meta.get("source") or uri)
 
     skipped = False
+    rows_in = 0
     rows_upserted = 0
     if sha256 or seqno:
         already_seen = await repository.seen_load(logical_source, sha256, seqno)
         if already_seen:
             skipped = True
 
-    if not skipped and not dry_run and rows:
-        db_rows = [
-            {
-                "carrier": row["carrier"],
-                "origin": row["origin"],
-                "dest": row["dest"],
-                "service": row["service"],
-                "eur_per_kg": row["eur_per_kg"],
-                "effective_from": row["valid_from"],
-                "effective_to": row["valid_to"],
-                "source": row.get("source"),
-            }
-            for row in rows
-        ]
-        summary = await repository.upsert_many(
-            table="logistics_rates",
-            key_cols=["carrier", "origin", "dest", "service", "effective_from"],
-            rows=db_rows,
-            update_columns=["eur_per_kg", "effective_to", "updated_at"],
-        )
-        rows_upserted = (summary or {}).get("inserted", 0) + (summary or {}).get("updated", 0)
-        if sha256 is not None or seqno is not None:
-            await repository.mark_load(logical_source, sha256, seqno, len(rows))
+    if skipped:
+        # Streams are not parsed once the payload is known; eager snapshots still report their size.
+        rows_in = len(rows) if isinstance(rows, list) else 0
+    else:
+        size = batch_size or max(1, int(Settings().LOGISTICS_UPSERT_BATCH_SIZE))
+        batches = _batched(rows, size)
+        # Parsing is CPU-bound, so each bounded batch is produced off the event loop.
+        batch: list[dict[str, Any]]
+        while batch := await anyio.to_thread.run_sync(next, batches, []):
+            rows_in += len(batch)
+            if dry_run:
+                continue
+            summary = await repository.upsert_many(
+                table="logistics_rates",
+                key_cols=_KEY_COLS,
+                rows=[_to_db_row(row) for row in batch],
+                update_columns=_UPDATE_COLS,
+            )
+            rows_upserted += (summary or {}).get("inserted", 0) + (summary or {}).get("updated", 0)
+        if not dry_run and rows_in and (sha256 is not None or seqno is not None):
+            await repository.mark_load(logical_source, sha256, seqno, rows_in)
 
     status = "success"
     if skipped:
@@ -291,7 +370,7 @@ async def _handle_snapshot(snapshot: dict[str, Any], *, dry_run: bool) -> dict[s
 
     return {
         "source": uri,
-        "rows_in": len(rows),
+        "rows_in": rows_in,
         "rows_upserted": rows_upserted if not dry_run and not skipped else 0,
         "skipped": skipped,
         "sha256": sha256,
@@ -325,12 +404,18 @@ def _hydrate_snapshot(snapshot: dict[str, Any]) -> tuple[bytes, dict[str, Any],
     return raw, meta, rows
 
 
-def _timeout_result(snapshot: dict[str, Any]) -> dict[str, Any]:
-    uri = str(snapshot.get("source") or "unknown")
+def _describe_snapshot(snapshot: Snapshot) -> tuple[str, dict[str, Any], int]:
+    if isinstance(snapshot, client.SourceStream):
+        return _snapshot_source(snapshot), snapshot.meta, snapshot.rows_read
     _, meta, rows = _hydrate_snapshot(snapshot)
+    return _snapshot_source(snapshot), meta, len(rows)
+
+
+def _timeout_result(snapshot: Snapshot) -> dict[str, Any]:
+    uri, meta, rows_in = _describe_snapshot(snapshot)
     return {
         "source": uri,
-        "rows_in": len(rows),
+        "rows_in": rows_in,
         "rows_upserted": 0,
         "skipped": False,
         "sha256": None,
@@ -339,12 +424,11 @@ def _timeout_result(snapshot: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _error_result(snapshot: dict[str, Any], exc: Exception) -> dict[str, Any]:
-    uri = str(snapshot.get("source") or "unknown")
-    _, meta, rows = _hydrate_snapshot(snapshot)
+def _error_result(snapshot: Snapshot, exc: Exception) -> dict[str, Any]:
+    uri, meta, rows_in = _describe_snapshot(snapshot)
     return {
         "source": uri,
-        "rows_in": len(rows),
+        "rows_in": rows_in,
         "rows_upserted": 0,
         "skipped": False,
         "sha256": None,
@@ -3,6 +3,7 @@ from __future__ import annotations
 import time
 from collections.abc import Iterable, Mapping, Sequence
 from datetime import date, datetime
+from itertools import islice
 from typing import Any
 
 from sqlalchemy import Column, MetaData, Table, func, literal_column, or_, text
@@ -25,6 +26,14 @@ def _get_engine() -> AsyncEngine:
     return _engine
 
 
+async def dispose_engine() -> None:
+    """Dispose the shared async engine; it is rebuilt lazily on the next event loop."""
+    global _engine
+    engine, _engine = _engine, None
+    if engine is not None:
+        await engine.dispose()
+
+
 def _prepare_row(row: Mapping[str, Any]) -> dict[str, Any]:
     prepared = dict(row)
     for key in ("effective_from", "effective_to"):
@@ -53,27 +62,21 @@ async def upsert_many(  # noqa: C901  # pragma: no cover - exercised via integra
     update_columns: Sequence[str] | None = None,
 ) -> dict[str, int]:
     cfg = Settings()
-    incoming = [_prepare_row(row) for row in rows]
-    if not incoming:
-        return {"inserted": 0, "updated": 0, "skipped": 0}
-
     update_columns = list(update_columns or [])
     if not key_cols:
         raise ValueError("at least one key column is required")
 
-    engine = _get_engine()
-    inserted = updated = 0
+    inserted = updated = total = 0
     batch_size = max(1, int(cfg.LOGISTICS_UPSERT_BATCH_SIZE))
     statement_timeout_ms = max(0, int(cfg.DB_STATEMENT_TIMEOUT_SECONDS) * 1000)
-    all_columns = sorted({col for row in incoming for col in row.keys()})
-    metadata = MetaData()
-    table_obj = Table(
-        table,
-        metadata,
-        *[Column(col, NullType()) for col in all_columns],
-    )
 
     async def _execute_batch(batch: list[dict[str, Any]]) -> tuple[int, int]:
+        batch_columns = sorted({col for row in batch for col in row.keys()})
+        table_obj = Table(
+            table,
+            MetaData(),
+            *[Column(col, NullType()) for col in batch_columns],
+        )
         stmt = pg_insert(table_obj).values(batch)
         excluded = stmt.excluded
         set_clauses: dict[str, Any] = {}
@@ -94,7 +97,7 @@ async def upsert_many(  # noqa: C901  # pragma: no cover - exercised via integra
             where=or_(*distinct_checks) if distinct_checks else None,
         ).returning(literal_column("xmax = 0").label("inserted_flag"))
 
-        async with engine.begin() as conn:
+        async with _get_engine().begin() as conn:
             if cfg.TESTING and statement_timeout_ms:
                 await conn.execute(text("SET LOCAL statement_timeout = :ms"), {"ms": statement_timeout_ms})
             result = await conn.execute(stmt)
@@ -103,11 +106,13 @@ async def upsert_many(  # noqa: C901  # pragma: no cover - exercised via integra
         updated_batch = len(rows) - inserted_batch
         return inserted_batch, updated_batch
 
-    for offset in range(0, len(incoming), batch_size):
-        batch = incoming[offset : offset + batch_size]
+    # Consume the input lazily so only one batch of prepared rows is held at a time.
+    iterator = iter(rows)
+    while batch := [_prepare_row(row) for row in islice(iterator, batch_size)]:
         start = time.perf_counter()
         batch_inserted, batch_updated = await _execute_batch(batch)
         duration = time.perf_counter() - start
+        total += len(batch)
         inserted += batch_inserted
         updated += batch_updated
         skipped_batch = max(0, len(batch) - (batch_inserted + batch_updated))
@@ -116,7 +121,7 @@ async def upsert_many(  # noqa: C901  # pragma: no cover - exercised via integra
         record_logistics_upsert_rows("skipped", skipped_batch)
         record_logistics_upsert_batch(duration)
 
-    skipped = max(0, len(incoming) - (inserted + updated))
+    skipped = max(0, total - (inserted + updated))
     return {"inserted": inserted, "updated": updated, "skipped": skipped}
 
 
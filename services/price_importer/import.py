@@ -17,7 +17,7 @@ from sqlalchemy.orm import sessionmaker
 from awa_common.db.load_log import LOAD_LOG
 from awa_common.etl.guard import process_once
 from awa_common.etl.idempotency import build_payload_meta, compute_idempotency_key
-from awa_common.llm import LLMClient, LLMInvalidResponseError, PriceListLLMResult
+from awa_common.llm import LLMClient, LLMInvalidResponseError, PriceListLLMResult, close_http_clients
 from awa_common.logging import configure_logging
 from awa_common.metrics import (
     flush_textfile,
@@ -32,8 +32,8 @@ from awa_common.metrics import (
 from awa_common.sentry import init_sentry
 from awa_common.settings import settings as SETTINGS
 
-from .io import DEFAULT_BATCH_SIZE, iter_price_batches
-from .normaliser import guess_columns
+from .io import DEFAULT_BATCH_SIZE, iter_price_batches, read_headers
+from .normaliser import bind_columns, guess_columns, header_signature, resolve_columns
 from .repository import Repository
 
 if TYPE_CHECKING:
@@ -238,10 +238,24 @@ async def _run_import(args: argparse.Namespace) -> int:
             llm_error: str | None = None
             llm_provider: str | None = None
             heuristics: dict[str, str] = {}
+            headers = read_headers(file_path)
+            signature = header_signature(headers) if headers else None
+            get_cached_mapping = getattr(repo, "get_column_mapping", None)
+            cached_mapping: dict[str, str] | None = None
+            if signature and callable(get_cached_mapping):
+                cached_mapping = get_cached_mapping(vendor_id, signature)
+            if cached_mapping:
+                logger.info(
+                    "price_import.mapping_cache_hit",
+                    vendor=args.vendor,
+                    vendor_id=vendor_id,
+                    file_name=file_name,
+                    header_signature=signature,
+                )
             llm_enabled = bool(getattr(getattr(SETTINGS, "llm", None), "enable_pricelist", False))
             if getattr(SETTINGS, "TESTING", False) or os.getenv("PYTEST_CURRENT_TEST"):
                 llm_enabled = False
-            if llm_enabled:  # pragma: no cover - network-assisted path
+            if llm_enabled and not cached_mapping:  # pragma: no cover - network-assisted path
                 try:
                     llm_client = LLMClient()
                     preview, heuristics, row_estimate = _build_llm_preview(file_path, vendor_id)
@@ -267,14 +281,26 @@ async def _run_import(args: argparse.Namespace) -> int:
                             file_name=file_name,
                             error=str(exc),
                         )
-            mapping_for_batches = llm_mapping or heuristics or None
+                finally:
+                    # This run owns the event loop, so release the pooled LLM connections before it ends.
+                    await close_http_clients()
+            mapping_for_batches = cached_mapping or llm_mapping or heuristics or None
+            batch_options: dict[str, Any] = {"mapping": mapping_for_batches}
+            if cached_mapping:
+                mapping_source = "cache"
+                # The signature matched, so the stored mapping applies as-is; no need to fuzzy-match the headers.
+                batch_options["columns"] = bind_columns(headers or [], cached_mapping)
+            elif llm_mapping:
+                mapping_source = "llm"
+            else:
+                mapping_source = "heuristic"
             try:
                 batch_no = 0
                 try:
                     batches_iter = iter_price_batches(
                         args.file,
                         batch_size=args.batch_size,
-                        mapping=mapping_for_batches,
+                        **batch_options,
                     )
                 except TypeError:
                     batches_iter = iter_price_batches(args.file, batch_size=args.batch_size)
@@ -308,6 +334,11 @@ async def _run_import(args: argparse.Namespace) -> int:
                         duration_ms=int(duration_s * 1000),
                         dry_run=args.dry_run,
                     )
+                save_mapping = getattr(repo, "save_column_mapping", None)
+                if headers and signature and not cached_mapping and not args.dry_run and callable(save_mapping):
+                    resolved = resolve_columns(headers, mapping_for_batches)
+                    if resolved:
+                        save_mapping(vendor_id, signature, resolved, source=mapping_source)
             except ValueError as exc:
                 record_etl_batch(
                     "price_import",
@@ -334,6 +365,7 @@ async def _run_import(args: argparse.Namespace) -> int:
                     "llm_provider": llm_provider,
                     "llm_error": llm_error,
                     "llm_mapping": llm_mapping,
+                    "mapping_source": mapping_source,
                 }
             )
             handle.session.execute(
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import multiprocessing
 from collections.abc import AsyncIterator, Generator, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Literal, cast
 
 import pandas as pd
 import structlog
@@ -13,7 +15,7 @@ from awa_common.settings import Settings
 from awa_common.types import PriceRow as PriceRowDict, PriceRowModel
 from awa_common.vendor import normalize_currency, normalize_sku, parse_decimal
 
-from .normaliser import normalise
+from .normaliser import normalise, resolve_columns
 from .reader import detect_format
 
 logger = structlog.get_logger(__name__)
@@ -21,6 +23,9 @@ logger = structlog.get_logger(__name__)
 SETTINGS = Settings()
 DEFAULT_BATCH_SIZE = SETTINGS.PRICE_IMPORTER_CHUNK_ROWS
 VALIDATION_WORKERS = SETTINGS.PRICE_IMPORTER_VALIDATION_WORKERS
+VALIDATION_BACKEND = SETTINGS.PRICE_IMPORTER_VALIDATION_BACKEND
+
+ValidationBackend = Literal["thread", "process"]
 
 
 def _parse_int(value: Any, *, default: int = 0) -> int:
@@ -38,8 +43,7 @@ def _parse_int(value: Any, *, default: int = 0) -> int:
         return default
 
 
-def validate_price_rows(rows: Sequence[dict[str, Any]]) -> list[PriceRowDict]:
-    """Validate and normalise a batch of price rows."""
+def _validate_rows(rows: Sequence[dict[str, Any]]) -> tuple[list[PriceRowDict], list[dict[str, Any]]]:
     valid: list[PriceRowDict] = []
     errors: list[dict[str, Any]] = []
 
@@ -62,7 +66,10 @@ def validate_price_rows(rows: Sequence[dict[str, Any]]) -> list[PriceRowDict]:
             valid.append(cast(PriceRowDict, payload))
         except ValueError as exc:
             errors.append({"index": idx, "error": str(exc), "row": dict(raw)})
+    return valid, errors
 
+
+def _finalize_validation(valid: list[PriceRowDict], errors: list[dict[str, Any]]) -> list[PriceRowDict]:
     if errors:
         record_etl_normalize_error("price_import", "row_validation", len(errors))
         sample = errors[:3]
@@ -73,6 +80,12 @@ def validate_price_rows(rows: Sequence[dict[str, Any]]) -> list[PriceRowDict]:
     return valid
 
 
+def validate_price_rows(rows: Sequence[dict[str, Any]]) -> list[PriceRowDict]:
+    """Validate and normalise a batch of price rows."""
+    valid, errors = _validate_rows(rows)
+    return _finalize_validation(valid, errors)
+
+
 def _iter_csv_chunks(path: str | Path, batch_size: int) -> Generator[pd.DataFrame]:
     """Yield CSV chunks while retrying encodings and delimiters like the legacy reader."""
     encodings = ("utf-8", "utf-8-sig", "cp1252")
@@ -143,6 +156,19 @@ def _frame_iterator(path: str | Path, batch_size: int) -> Generator[pd.DataFrame
     raise RuntimeError(f"Unsupported price importer format: {fmt}")
 
 
+def read_headers(path: str | Path) -> list[str] | None:
+    """Return the header row of a price sheet using the same reader as the batch stream."""
+    try:
+        iterator = _frame_iterator(path, 1)
+        frame = _next_frame(iterator)
+        iterator.close()
+    except Exception:
+        return None
+    if frame is None:
+        return None
+    return [str(col) for col in frame.columns]
+
+
 def _next_frame(iterator: Generator[pd.DataFrame]) -> pd.DataFrame | None:
     try:
         return next(iterator)
@@ -150,15 +176,75 @@ def _next_frame(iterator: Generator[pd.DataFrame]) -> pd.DataFrame | None:
         return None
 
 
+def _encode_frame(frame: pd.DataFrame) -> tuple[str, Any]:
+    """Serialise a frame for a worker process, preferring Arrow IPC when pyarrow is installed."""
+    try:
+        import pyarrow as pa
+    except ImportError:  # pragma: no cover - optional dependency guard
+        return "pickle", frame
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # Mixed-type object columns cannot be expressed in Arrow; ship the frame as-is.
+        return "pickle", frame
+    return "arrow", sink.getvalue()
+
+
+def _decode_frame(kind: str, payload: Any) -> pd.DataFrame:
+    if kind == "arrow":
+        import pyarrow as pa
+
+        with pa.ipc.open_stream(payload) as reader:
+            return cast(pd.DataFrame, reader.read_pandas())
+    return cast(pd.DataFrame, payload)
+
+
+def _validate_encoded_frame(
+    kind: str, payload: Any, columns: Mapping[str, str] | None
+) -> tuple[list[PriceRowDict], list[dict[str, Any]]]:
+    """Process-pool entry point; metrics are recorded by the parent once results return."""
+    cleaned = normalise(_decode_frame(kind, payload), columns=columns)
+    records = cleaned.to_dict(orient="records")
+    if not records:
+        return [], []
+    return _validate_rows(records)
+
+
+def _build_executor(backend: ValidationBackend, max_workers: int) -> Executor | None:
+    if backend == "thread":
+        return None
+    if backend == "process":
+        # spawn keeps workers clear of the parent's event loop and reader threads.
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    raise ValueError(f"Unsupported price importer validation backend: {backend}")
+
+
 async def _validate_frame(
-    frame: pd.DataFrame, sem: asyncio.Semaphore, mapping: Mapping[str, str] | None
+    frame: pd.DataFrame,
+    sem: asyncio.Semaphore,
+    columns: Mapping[str, str] | None,
+    executor: Executor | None = None,
 ) -> list[PriceRowDict]:
     async with sem:
-        return await asyncio.to_thread(_normalize_and_validate, frame, mapping)
+        if executor is None:
+            return await asyncio.to_thread(_normalize_and_validate, frame, columns)
+        kind, payload = _encode_frame(frame)
+        loop = asyncio.get_running_loop()
+        valid, errors = await loop.run_in_executor(
+            executor,
+            _validate_encoded_frame,
+            kind,
+            payload,
+            dict(columns) if columns is not None else None,
+        )
+        return _finalize_validation(valid, errors)
 
 
-def _normalize_and_validate(frame: pd.DataFrame, mapping: Mapping[str, str] | None) -> list[PriceRowDict]:
-    cleaned = normalise(frame, mapping=mapping)
+def _normalize_and_validate(frame: pd.DataFrame, columns: Mapping[str, str] | None) -> list[PriceRowDict]:
+    cleaned = normalise(frame, columns=columns)
     records = cleaned.to_dict(orient="records")
     if not records:
         return []
@@ -170,18 +256,30 @@ async def iter_price_batches(
     batch_size: int | None = None,
     max_workers: int | None = None,
     mapping: Mapping[str, str] | None = None,
+    backend: ValidationBackend | None = None,
+    executor: Executor | None = None,
+    columns: Mapping[str, str] | None = None,
 ) -> AsyncIterator[list[PriceRowDict]]:
     """
     Yield validated, normalised price rows with bounded concurrency.
 
     The caller must iterate using ``async for`` to benefit from streaming behaviour.
+    ``backend="process"`` runs normalisation and validation in a process pool; callers may
+    also pass their own ``executor`` (which is left running) to share a pool across files.
+    The header mapping is resolved from the first frame and reused for every later chunk; pass
+    ``columns`` (e.g. a stored vendor mapping bound with :func:`bind_columns`) to skip resolution.
     """
 
     target_batch = max(1, int(batch_size or DEFAULT_BATCH_SIZE))
     worker_limit = max(1, int(max_workers or VALIDATION_WORKERS))
+    owned_executor = None
+    if executor is None:
+        owned_executor = _build_executor(backend or VALIDATION_BACKEND, worker_limit)
+        executor = owned_executor
     iterator = _frame_iterator(path, target_batch)
     sem = asyncio.Semaphore(worker_limit)
     pending: dict[int, asyncio.Task[list[PriceRowDict]]] = {}
+    resolved: dict[str, str] | None = dict(columns) if columns is not None else None
     next_yield = 0
     idx = 0
 
@@ -192,7 +290,9 @@ async def iter_price_batches(
                 break
             if frame.empty:
                 continue
-            task = asyncio.create_task(_validate_frame(frame, sem, mapping))
+            if resolved is None:
+                resolved = resolve_columns(frame.columns, mapping)
+            task = asyncio.create_task(_validate_frame(frame, sem, resolved, executor))
             pending[idx] = task
             idx += 1
             if len(pending) >= worker_limit:
@@ -209,6 +309,8 @@ async def iter_price_batches(
     finally:
         for task in pending.values():
             task.cancel()
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False, cancel_futures=True)
 
 
 async def _await_ordered(pending: dict[int, asyncio.Task[list[PriceRowDict]]], order: int) -> list[PriceRowDict]:
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import hashlib
+from collections.abc import Iterable, Mapping
 from difflib import get_close_matches
+from functools import lru_cache
 
 import pandas as pd
 
@@ -12,34 +14,76 @@ _FIELD_MAP = {
     "lead_time_days": ["lead time", "leadtime", "lead"],
     "currency": ["currency", "curr"],
 }
+_TARGET_COLUMNS = ["sku", "cost", "moq", "lead_time_days", "currency"]
 
 
-def guess_columns(df: pd.DataFrame) -> dict[str, str]:
-    lower = {c.lower(): c for c in df.columns}
-    mapping: dict[str, str] = {}
+@lru_cache(maxsize=256)
+def _guess_from_headers(headers: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+    lower = {c.lower(): c for c in headers}
+    mapping: list[tuple[str, str]] = []
     for key, options in _FIELD_MAP.items():
         for opt in options:
             match = get_close_matches(opt, lower.keys(), n=1, cutoff=0.6)
             if match:
-                mapping[key] = lower[match[0]]
+                mapping.append((key, lower[match[0]]))
                 break
-    return mapping
+    return tuple(mapping)
+
+
+def guess_columns(df: pd.DataFrame) -> dict[str, str]:
+    return dict(_guess_from_headers(tuple(str(c) for c in df.columns)))
 
 
-def normalise(df: pd.DataFrame, mapping: Mapping[str, str] | None = None) -> pd.DataFrame:
-    """Normalise vendor price frames using heuristic and optional LLM mapping."""
+def header_signature(columns: Iterable[object]) -> str:
+    """Stable hash of a sheet's header row, used to key persisted vendor mappings."""
+    normalised = "\x1f".join(str(c).strip().lower() for c in columns)
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
 
-    cols = guess_columns(df)
+
+def resolve_columns(columns: Iterable[object], mapping: Mapping[str, str] | None = None) -> dict[str, str]:
+    """Resolve the target-field -> source-header mapping once for a sheet.
+
+    Heuristic matches are computed first and explicit (e.g. LLM) mappings override them when
+    the referenced header exists.
+    """
+
+    headers = tuple(str(c) for c in columns)
+    cols = dict(_guess_from_headers(headers))
     if mapping:
-        mapping_lower = {k: str(v).strip().lower() for k, v in mapping.items() if v is not None}
-        resolved: dict[str, str] = {}
-        lower_cols = {c.lower(): c for c in df.columns}
-        for target, source in mapping_lower.items():
-            col_name = lower_cols.get(source)
-            if col_name:
-                resolved[target] = col_name
-        if resolved:
-            cols.update(resolved)
+        cols.update(bind_columns(headers, mapping))
+    return cols
+
+
+def bind_columns(columns: Iterable[object], mapping: Mapping[str, str]) -> dict[str, str]:
+    """Point a target-field -> source-header mapping at this sheet's headers without any fuzzy matching.
+
+    Headers are compared the way :func:`header_signature` hashes them, so a stored mapping found by
+    signature binds to every header it was saved for.
+    """
+
+    lookup = {str(c).strip().lower(): str(c) for c in columns}
+    cols: dict[str, str] = {}
+    for target, source in mapping.items():
+        if source is None:
+            continue
+        col_name = lookup.get(str(source).strip().lower())
+        if col_name:
+            cols[target] = col_name
+    return cols
+
+
+def normalise(
+    df: pd.DataFrame,
+    mapping: Mapping[str, str] | None = None,
+    *,
+    columns: Mapping[str, str] | None = None,
+) -> pd.DataFrame:
+    """Normalise vendor price frames using heuristic and optional LLM mapping.
+
+    Pass ``columns`` (from :func:`resolve_columns`) to reuse a mapping resolved for the whole file.
+    """
+
+    cols = dict(columns) if columns is not None else resolve_columns(df.columns, mapping)
     df = df.rename(columns={v: k for k, v in cols.items() if v in df.columns})
-    keep = [c for c in ["sku", "cost", "moq", "lead_time_days", "currency"] if c in df.columns]
+    keep = [c for c in _TARGET_COLUMNS if c in df.columns]
     return df[keep]
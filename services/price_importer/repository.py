@@ -1,20 +1,88 @@
 from __future__ import annotations
 
+import csv
+import io
 from collections.abc import Iterable, Mapping
-from dataclasses import asdict, is_dataclass
+from dataclasses import asdict, dataclass, field, is_dataclass
 from typing import Any
 
-from sqlalchemy import create_engine, func, insert, literal_column, or_, select, update
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import bindparam, create_engine, func, insert, select, update
 from sqlalchemy.engine import Engine
 
 from awa_common.base import Base
 from awa_common.dsn import build_dsn
-from awa_common.models_vendor import Vendor, VendorPrice
+from awa_common.models_vendor import Vendor, VendorColumnMapping, VendorPrice
 
 _TABLE_NAME = VendorPrice.__tablename__ or "vendor_prices"
 _KEY_COLUMNS = ("vendor_id", "sku")
 _UPDATE_COLUMNS = ("cost", "moq", "lead_time_days", "currency")
+_COPY_COLUMNS = (*_KEY_COLUMNS, *_UPDATE_COLUMNS)
+_STAGE_TABLE = "vendor_prices_stage"
+_GENERIC_LOOKUP_CHUNK = 500
+
+_CREATE_STAGE_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} (
+    vendor_id integer NOT NULL,
+    sku text NOT NULL,
+    cost numeric(10, 2),
+    moq integer,
+    lead_time_days integer,
+    currency varchar(3)
+) ON COMMIT DROP
+"""
+
+# One statement merges the staged batch and reports counts plus the SKUs whose row changed.
+_MERGE_SQL = f"""
+WITH merged AS (
+    INSERT INTO {_TABLE_NAME} AS vp (vendor_id, sku, cost, moq, lead_time_days, currency)
+    SELECT vendor_id, sku, cost, moq, lead_time_days, currency FROM {_STAGE_TABLE}
+    ON CONFLICT (vendor_id, sku) DO UPDATE SET
+        cost = EXCLUDED.cost,
+        moq = EXCLUDED.moq,
+        lead_time_days = EXCLUDED.lead_time_days,
+        currency = EXCLUDED.currency,
+        updated_at = now()
+    WHERE (vp.cost, vp.moq, vp.lead_time_days, vp.currency)
+        IS DISTINCT FROM (EXCLUDED.cost, EXCLUDED.moq, EXCLUDED.lead_time_days, EXCLUDED.currency)
+    RETURNING vp.sku, (vp.xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS inserted,
+    count(*) FILTER (WHERE NOT inserted) AS updated,
+    (SELECT count(*) FROM {_STAGE_TABLE}) - count(*) AS unchanged,
+    coalesce(array_agg(sku), ARRAY[]::text[]) AS changed_skus
+FROM merged
+"""
+
+
+@dataclass(frozen=True)
+class PriceUpsertResult:
+    """Outcome of merging one batch into ``vendor_prices``."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    changed_skus: frozenset[str] = field(default_factory=frozenset)
+
+
+def _copy_into_stage(conn: Any, rows: list[dict[str, Any]]) -> None:
+    """COPY *rows* into the staging table on the connection's open transaction."""
+    dbapi_conn = conn.connection.driver_connection
+    columns = ", ".join(_COPY_COLUMNS)
+    copy_sql = f"COPY {_STAGE_TABLE} ({columns}) FROM STDIN"
+    with dbapi_conn.cursor() as cur:
+        if hasattr(cur, "copy"):  # psycopg 3
+            with cur.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(tuple(row[col] for col in _COPY_COLUMNS))
+            return
+        buf = io.StringIO()  # psycopg2
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(["" if row[col] is None else row[col] for col in _COPY_COLUMNS])
+        buf.seek(0)
+        cur.copy_expert(f"{copy_sql} WITH (FORMAT csv, NULL '')", buf)
 
 
 class Repository:
@@ -38,6 +106,37 @@ class Repository:
             res = conn.execute(insert(Vendor).values(name=name).returning(Vendor.id))
             return int(res.scalar())
 
+    def get_column_mapping(self, vendor_id: int, signature: str) -> dict[str, str] | None:
+        """Return the mapping persisted for this vendor and header signature, if any."""
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(VendorColumnMapping.mapping).where(
+                    VendorColumnMapping.vendor_id == vendor_id,
+                    VendorColumnMapping.header_signature == signature,
+                )
+            ).first()
+        if row is None or not row[0]:
+            return None
+        return {str(k): str(v) for k, v in dict(row[0]).items()}
+
+    def save_column_mapping(
+        self, vendor_id: int, signature: str, mapping: Mapping[str, str], source: str = "heuristic"
+    ) -> None:
+        values = {"mapping": dict(mapping), "source": source, "updated_at": func.now()}
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(VendorColumnMapping)
+                .where(
+                    VendorColumnMapping.vendor_id == vendor_id,
+                    VendorColumnMapping.header_signature == signature,
+                )
+                .values(**values)
+            )
+            if not result.rowcount:
+                conn.execute(
+                    insert(VendorColumnMapping).values(vendor_id=vendor_id, header_signature=signature, **values)
+                )
+
     def _prepare_row(self, vendor_id: int, row: Mapping[str, Any] | Any) -> dict[str, Any]:
         if is_dataclass(row):
             data = asdict(row)
@@ -58,6 +157,11 @@ class Repository:
         }
 
     def upsert_prices(self, vendor_id: int, rows: Iterable[Any], dry_run: bool = False) -> tuple[int, int]:
+        result = self.merge_prices(vendor_id, rows, dry_run=dry_run)
+        return result.inserted, result.updated + result.duplicates
+
+    def merge_prices(self, vendor_id: int, rows: Iterable[Any], dry_run: bool = False) -> PriceUpsertResult:
+        """Merge a batch of price rows and report inserted/updated/unchanged counts and changed SKUs."""
         payload = [self._prepare_row(vendor_id, row) for row in rows]
         payload = [row for row in payload if row["sku"]]
         deduped: dict[tuple[int, str], dict[str, Any]] = {}
@@ -69,7 +173,7 @@ class Repository:
             deduped[key] = row
         payload = list(deduped.values())
         if not payload:
-            return 0, 0
+            return PriceUpsertResult()
 
         dialect = self.engine.dialect.name
         dispatcher = self._upsert_postgres if dialect == "postgresql" else self._upsert_generic
@@ -78,74 +182,78 @@ class Repository:
             with self.engine.connect() as conn:
                 trans = conn.begin()
                 try:
-                    inserted, updated = dispatcher(conn, payload)
+                    result = dispatcher(conn, payload)
                 finally:
                     trans.rollback()
-            return inserted, updated + duplicates
+        else:
+            with self.engine.begin() as conn:
+                result = dispatcher(conn, payload)
+        return PriceUpsertResult(
+            inserted=result.inserted,
+            updated=result.updated,
+            unchanged=result.unchanged,
+            duplicates=duplicates,
+            changed_skus=result.changed_skus,
+        )
 
-        with self.engine.begin() as conn:
-            inserted, updated = dispatcher(conn, payload)
-            return inserted, updated + duplicates
-
-    def _upsert_postgres(self, conn, rows: list[dict[str, Any]]) -> tuple[int, int]:
-        table = VendorPrice.__table__
-        stmt = pg_insert(table).values(rows)
-        excluded = stmt.excluded
-        update_values = {col: excluded[col] for col in _UPDATE_COLUMNS}
-        update_values["updated_at"] = func.now()
-        change_predicate = or_(
-            table.c.cost.is_distinct_from(excluded.cost),
-            table.c.moq.is_distinct_from(excluded.moq),
-            table.c.lead_time_days.is_distinct_from(excluded.lead_time_days),
-            table.c.currency.is_distinct_from(excluded.currency),
+    def _upsert_postgres(self, conn, rows: list[dict[str, Any]]) -> PriceUpsertResult:
+        """COPY the batch into a temp table and merge it with one set-based statement."""
+        conn.exec_driver_sql(_CREATE_STAGE_SQL)
+        conn.exec_driver_sql(f"TRUNCATE {_STAGE_TABLE}")
+        _copy_into_stage(conn, rows)
+        inserted, updated, unchanged, changed = conn.exec_driver_sql(_MERGE_SQL).one()
+        return PriceUpsertResult(
+            inserted=int(inserted),
+            updated=int(updated),
+            unchanged=int(unchanged),
+            changed_skus=frozenset(changed or ()),
         )
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[table.c.vendor_id, table.c.sku],
-            set_=update_values,
-            where=change_predicate,
-        ).returning(literal_column("xmax = 0").label("inserted_flag"))
-        result = conn.execute(stmt)
-        result_rows = result.fetchall()
-        inserted = sum(1 for row in result_rows if bool(row.inserted_flag))
-        updated = len(result_rows) - inserted
-        return inserted, updated
-
-    def _upsert_generic(self, conn, rows: list[dict[str, Any]]) -> tuple[int, int]:
+
+    def _upsert_generic(self, conn, rows: list[dict[str, Any]]) -> PriceUpsertResult:
         """Fallback path for SQLite and other dialects."""
-        inserted = 0
-        updated = 0
+        vendor_ids = {row["vendor_id"] for row in rows}
+        existing: dict[tuple[int, str], tuple[Any, ...]] = {}
+        skus = [row["sku"] for row in rows]
+        for start in range(0, len(skus), _GENERIC_LOOKUP_CHUNK):
+            chunk = skus[start : start + _GENERIC_LOOKUP_CHUNK]
+            found = conn.execute(
+                select(
+                    VendorPrice.vendor_id,
+                    VendorPrice.sku,
+                    VendorPrice.cost,
+                    VendorPrice.moq,
+                    VendorPrice.lead_time_days,
+                    VendorPrice.currency,
+                ).where(VendorPrice.vendor_id.in_(vendor_ids), VendorPrice.sku.in_(chunk))
+            )
+            for vid, sku, *values in found:
+                existing[(vid, sku)] = tuple(values)
+
+        to_insert: list[dict[str, Any]] = []
+        to_update: list[dict[str, Any]] = []
         for row in rows:
-            existing = (
-                conn.execute(
-                    select(
-                        VendorPrice.cost,
-                        VendorPrice.moq,
-                        VendorPrice.lead_time_days,
-                        VendorPrice.currency,
-                    ).where(VendorPrice.vendor_id == row["vendor_id"], VendorPrice.sku == row["sku"])
+            current = existing.get((row["vendor_id"], row["sku"]))
+            if current is None:
+                to_insert.append(row)
+            elif current != tuple(row[col] for col in _UPDATE_COLUMNS):
+                to_update.append({f"b_{key}": value for key, value in row.items()})
+
+        if to_insert:
+            conn.execute(insert(VendorPrice), to_insert)
+        if to_update:
+            conn.execute(
+                update(VendorPrice)
+                .where(
+                    VendorPrice.vendor_id == bindparam("b_vendor_id"),
+                    VendorPrice.sku == bindparam("b_sku"),
                 )
-                .mappings()
-                .first()
+                .values({col: bindparam(f"b_{col}") for col in _UPDATE_COLUMNS}),
+                to_update,
             )
-            if existing is None:
-                conn.execute(insert(VendorPrice).values(**row))
-                inserted += 1
-                continue
-            if not (
-                existing["cost"] == row["cost"]
-                and existing["moq"] == row["moq"]
-                and existing["lead_time_days"] == row["lead_time_days"]
-                and existing["currency"] == row["currency"]
-            ):
-                conn.execute(
-                    update(VendorPrice)
-                    .where(VendorPrice.vendor_id == row["vendor_id"], VendorPrice.sku == row["sku"])
-                    .values(
-                        cost=row["cost"],
-                        moq=row["moq"],
-                        lead_time_days=row["lead_time_days"],
-                        currency=row["currency"],
-                    )
-                )
-                updated += 1
-        return inserted, updated
+        changed = frozenset(row["sku"] for row in to_insert) | frozenset(row["b_sku"] for row in to_update)
+        return PriceUpsertResult(
+            inserted=len(to_insert),
+            updated=len(to_update),
+            unchanged=len(rows) - len(to_insert) - len(to_update),
+            changed_skus=changed,
+        )
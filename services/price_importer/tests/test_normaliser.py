@@ -21,3 +21,20 @@ def test_normalise_with_mapping_override():
     mapping = {"sku": "Item", "cost": "Price"}
     out = normalise(df, mapping=mapping)
     assert list(out.columns)[:2] == ["sku", "cost"]
+
+
+def test_resolve_columns_reused_across_chunks():
+    from services.price_importer.normaliser import resolve_columns
+
+    first = pd.DataFrame({"ASIN": ["A1"], "Unit Cost": [1.0]})
+    second = pd.DataFrame({"ASIN": ["A2"], "Unit Cost": [2.0]})
+    columns = resolve_columns(first.columns, {"cost": "unit cost"})
+    assert columns == {"sku": "ASIN", "cost": "Unit Cost"}
+    assert normalise(second, columns=columns)["sku"].tolist() == ["A2"]
+
+
+def test_header_signature_ignores_case_and_whitespace():
+    from services.price_importer.normaliser import header_signature
+
+    assert header_signature(["SKU", " Cost "]) == header_signature(["sku", "cost"])
+    assert header_signature(["sku", "cost"]) != header_signature(["cost", "sku"])
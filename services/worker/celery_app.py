@@ -10,7 +10,7 @@ from typing import Any
 import structlog
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import worker_process_init, worker_process_shutdown
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from pydantic import ValidationError
 
 from awa_common.configuration import CelerySettings
@@ -21,6 +21,14 @@ from awa_common.metrics import enable_celery_metrics, init as metrics_init, star
 from awa_common.sentry import init_sentry
 from awa_common.settings import settings
 from awa_common.utils.env import env_bool
+from services.worker.queues import (
+    INGEST_QUEUE,
+    MAINTENANCE_PRIORITY,
+    PRIORITY_SEP,
+    PRIORITY_STEPS,
+    TASK_ROUTES,
+    task_queues,
+)
 
 app_cfg = getattr(settings, "app", None)
 _worker_version = getattr(settings, "APP_VERSION", getattr(app_cfg, "version", "0.0.0"))
@@ -76,7 +84,15 @@ def make_celery() -> Celery:
         task_acks_late=True,
         worker_prefetch_multiplier=worker_prefetch,
         task_time_limit=task_time_limit,
-        task_default_queue="ingest",
+        task_queues=task_queues(),
+        task_default_queue=INGEST_QUEUE,
+        task_routes=TASK_ROUTES,
+        task_default_priority=MAINTENANCE_PRIORITY,
+        broker_transport_options={
+            "priority_steps": list(PRIORITY_STEPS),
+            "sep": PRIORITY_SEP,
+            "queue_order_strategy": "priority",
+        },
         task_default_rate_limit=None,
         task_ignore_result=False,
         task_track_started=True,
@@ -199,6 +215,12 @@ def _stop_worker_loop_lag_monitor(**_: Any) -> None:
         structlog.get_logger(__name__).warning("loop_lag_monitor.stop_failed", exc_info=True)
 
 
+def _start_worker_metrics_http(**_: Any) -> None:
+    # Only worker processes export: beat and the readiness app import this module too, and would
+    # otherwise grab the port handed to the ingest pool.
+    start_worker_metrics_http_if_enabled()
+
+
 def _run_alertbot_startup_validation(**_: Any) -> None:
     logger = structlog.get_logger(__name__)
     try:
@@ -253,8 +275,10 @@ if getattr(getattr(settings, "observability", None), "enable_metrics", True):
             broker_url=broker_url,
             queue_names=queue_names,
             backlog_interval_s=interval_s,
+            priority_steps=PRIORITY_STEPS,
+            priority_sep=PRIORITY_SEP,
         )
-        start_worker_metrics_http_if_enabled()
+        worker_init.connect(_start_worker_metrics_http, weak=False, dispatch_uid="awa_worker_metrics_http")
 
 nested_celery_cfg = _get_celery_cfg()
 
@@ -302,6 +326,16 @@ beat_entries.append(
     )
 )
 
+if nested_celery_cfg.alerts_outbox_enabled:
+    beat_entries.append(
+        BeatScheduleEntry(
+            "alertbot-deliver",
+            task="alertbot.deliver",
+            setting_name="ALERT_SCHEDULE_CRON",
+            expression=str(nested_celery_cfg.alerts_deliver_cron),
+        )
+    )
+
 validated_entries = _validate_cron_entries(beat_entries)
 for name, task, schedule in validated_entries:
     _beat_schedule[name] = {
@@ -1,29 +1,42 @@
 import asyncio
 import datetime
 import email
+import hashlib
 import os
 import tempfile
-from collections.abc import Iterable
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
 from email.utils import getaddresses, parseaddr
 from typing import Any
 
 import structlog
 from imapclient import IMAPClient
-from sqlalchemy import create_engine, insert, select, text, update  # noqa: F401
+from imapclient.exceptions import IMAPClientError
+from sqlalchemy import Connection, create_engine, insert, select, text, update  # noqa: F401
 from sqlalchemy.exc import SQLAlchemyError
 
-from awa_common.llm import EmailLLMResult, LLMClient
-from awa_common.metrics import record_email_enriched, record_email_needs_manual_review
+from awa_common.llm import EmailLLMResult, LLMClient, close_http_clients
+from awa_common.metrics import (
+    record_email_enriched,
+    record_email_needs_manual_review,
+    record_email_watcher_reconnect,
+)
 from awa_common.minio import create_boto3_client, get_bucket_name
 from awa_common.settings import settings
 from awa_common.utils.env import env_str
 from services.api.app.decision.models import METADATA, inbox_messages, inbox_threads
-from services.etl import load_csv
+from services.worker.queues import import_route
+from services.worker.tasks import task_import_file
 
 logger = structlog.get_logger(__name__).bind(component="email_watcher")
 
 BUCKET = get_bucket_name()
 
+_IDLE_CHECK_S = 1.0
+_RECONNECT_BACKOFF_BASE_S = 1.0
+
 
 def _parse_addresses(values: Iterable[str]) -> list[str]:  # pragma: no cover - formatting helper
     return [addr for _, addr in getaddresses(list(values)) if addr]
@@ -104,6 +117,25 @@ class EmailClassificationStore:
         payload: dict[str, Any],
         classification: EmailLLMResult | None,
         error: str | None = None,
+    ) -> None:
+        self.persist_messages([(payload, classification, error)])
+
+    def persist_messages(  # pragma: no cover - DB side effects
+        self,
+        items: Sequence[tuple[dict[str, Any], EmailLLMResult | None, str | None]],
+    ) -> None:
+        """Persist a batch of classified messages in one transaction."""
+
+        with self.engine.begin() as conn:
+            for payload, classification, error in items:
+                self._persist(conn, payload, classification, error)
+
+    def _persist(  # pragma: no cover - DB side effects
+        self,
+        conn: Connection,
+        payload: dict[str, Any],
+        classification: EmailLLMResult | None,
+        error: str | None,
     ) -> None:
         intent = classification.intent.value if classification else None
         facts = classification.facts.model_dump() if classification else {}
@@ -112,54 +144,53 @@ class EmailClassificationStore:
         recipients = {"to": payload.get("to", []), "cc": payload.get("cc", [])}
         needs_manual_review = bool(error) or classification is None
         received_at = payload.get("received_at") or datetime.datetime.now(datetime.UTC)
-        with self.engine.begin() as conn:
-            existing_thread = conn.execute(
-                select(inbox_threads.c.thread_id).where(inbox_threads.c.thread_id == payload["thread_id"])
-            ).scalar_one_or_none()
-            if existing_thread:
-                conn.execute(
-                    update(inbox_threads)
-                    .where(inbox_threads.c.thread_id == payload["thread_id"])
-                    .values(
-                        last_cls=intent,
-                        **{"class": intent},
-                        last_msg_at=received_at,
-                        updated_at=datetime.datetime.now(datetime.UTC),
-                    )
-                )
-            else:
-                conn.execute(
-                    insert(inbox_threads).values(
-                        thread_id=payload["thread_id"],
-                        state="open",
-                        **{"class": intent},
-                        last_cls=intent,
-                        last_msg_at=received_at,
-                    )
+        existing_thread = conn.execute(
+            select(inbox_threads.c.thread_id).where(inbox_threads.c.thread_id == payload["thread_id"])
+        ).scalar_one_or_none()
+        if existing_thread:
+            conn.execute(
+                update(inbox_threads)
+                .where(inbox_threads.c.thread_id == payload["thread_id"])
+                .values(
+                    last_cls=intent,
+                    **{"class": intent},
+                    last_msg_at=received_at,
+                    updated_at=datetime.datetime.now(datetime.UTC),
                 )
-            already = conn.execute(
-                select(inbox_messages.c.message_id).where(inbox_messages.c.message_id == payload["message_id"])
-            ).scalar_one_or_none()
-            if already:
-                return
+            )
+        else:
             conn.execute(
-                insert(inbox_messages).values(
-                    message_id=payload["message_id"],
+                insert(inbox_threads).values(
                     thread_id=payload["thread_id"],
-                    subject=payload.get("subject"),
-                    sender=payload.get("sender"),
-                    recipients=recipients,
-                    body=payload.get("body"),
-                    has_price_list_attachment=payload.get("has_price_list_attachment", False),
-                    language=payload.get("language"),
-                    intent=intent,
-                    facts=facts,
-                    llm_provider=provider,
-                    confidence=confidence,
-                    needs_manual_review=needs_manual_review,
-                    error=error,
+                    state="open",
+                    **{"class": intent},
+                    last_cls=intent,
+                    last_msg_at=received_at,
                 )
             )
+        already = conn.execute(
+            select(inbox_messages.c.message_id).where(inbox_messages.c.message_id == payload["message_id"])
+        ).scalar_one_or_none()
+        if already:
+            return
+        conn.execute(
+            insert(inbox_messages).values(
+                message_id=payload["message_id"],
+                thread_id=payload["thread_id"],
+                subject=payload.get("subject"),
+                sender=payload.get("sender"),
+                recipients=recipients,
+                body=payload.get("body"),
+                has_price_list_attachment=payload.get("has_price_list_attachment", False),
+                language=payload.get("language"),
+                intent=intent,
+                facts=facts,
+                llm_provider=provider,
+                confidence=confidence,
+                needs_manual_review=needs_manual_review,
+                error=error,
+            )
+        )
 
 
 async def _classify_email_async(  # pragma: no cover - network-dependent
@@ -223,85 +254,278 @@ def _normalize_email_message(
     }
 
 
-def main() -> dict[str, str]:  # pragma: no cover - orchestration entrypoint
-    """Upload CSV/XLSX attachments to MinIO and trigger ingestion.
-
-    Returns {"status": "success"} when processing completes.
-    """
+def _imap_credentials() -> tuple[str, str, str]:
     email_cfg = getattr(settings, "email", None)
     host = env_str("IMAP_HOST", default=email_cfg.host if email_cfg else getattr(settings, "IMAP_HOST", None))
     user = env_str("IMAP_USER", default=email_cfg.username if email_cfg else getattr(settings, "IMAP_USER", None))
     password = env_str("IMAP_PASS", default=email_cfg.password if email_cfg else getattr(settings, "IMAP_PASS", None))
     if not host or not user or not password:
         raise RuntimeError("IMAP configuration is missing")
-    s3 = create_boto3_client()
-    llm_enabled = bool(getattr(settings, "llm", None) and getattr(settings.llm, "enable_email", False))
-    if getattr(settings, "TESTING", False) or os.getenv("PYTEST_CURRENT_TEST"):
-        llm_enabled = False
-    llm_client = LLMClient() if llm_enabled else None
-    db_cfg = getattr(settings, "db", None)
-    db_url = db_cfg.url if db_cfg else settings.DATABASE_URL
-    store = EmailClassificationStore(db_url) if llm_enabled else None
-
-    with IMAPClient(host) as client:
-        client.login(user, password)
-        client.select_folder("INBOX")
-        for uid in client.search(["UNSEEN"]):
-            msg_bytes = client.fetch(uid, ["RFC822"])[uid][b"RFC822"]
-            msg = email.message_from_bytes(msg_bytes)
-            normalized = _normalize_email_message(msg, uid)
-            classification: EmailLLMResult | None = None
-            error_detail: str | None = None
-            if llm_enabled and llm_client:  # pragma: no cover - network-assisted classification
-                classification, error_detail = asyncio.run(_classify_email_async(llm_client, normalized))
-            if store:
-                try:
-                    store.persist_message(normalized, classification, error=error_detail)
-                except SQLAlchemyError as db_exc:  # pragma: no cover - DB failure path
-                    record_email_needs_manual_review("db_error")
-                    logger.error(
-                        "email.llm.persist_failed",
-                        message_id=normalized.get("message_id"),
-                        error=str(db_exc),
-                        error_type=db_exc.__class__.__name__,
+    return host, user, password
+
+
+@dataclass
+class _FetchedMessage:
+    uid: int
+    msg: email.message.Message
+    payload: dict[str, Any]
+    classification: EmailLLMResult | None = None
+    error: str | None = None
+    imports: list[tuple[str, str, int]] = field(default_factory=list)
+
+
+class _Mailbox:
+    """Process unseen mail as a staged pipeline sharing one event loop.
+
+    Each batch of UIDs is fetched in one round-trip, then classified and has its attachments uploaded with
+    bounded concurrency. The batch is persisted in one transaction, every attachment is handed to its own
+    ``ingest.import_file`` task, and only then are the messages flagged as seen. A message that fails
+    preparation stays unseen and is retried on the next pass without holding up the rest of the batch.
+    """
+
+    def __init__(self, runner: asyncio.Runner) -> None:
+        self.runner = runner
+        self.s3 = create_boto3_client()
+        self.llm_enabled = bool(getattr(settings, "llm", None) and getattr(settings.llm, "enable_email", False))
+        if getattr(settings, "TESTING", False) or os.getenv("PYTEST_CURRENT_TEST"):
+            self.llm_enabled = False
+        self.llm_client = LLMClient() if self.llm_enabled else None
+        db_cfg = getattr(settings, "db", None)
+        self.db_url = db_cfg.url if db_cfg else settings.DATABASE_URL
+        self.store = EmailClassificationStore(self.db_url) if self.llm_enabled else None
+        email_cfg = getattr(settings, "email", None)
+        self.concurrency = email_cfg.pipeline_concurrency if email_cfg else 8
+        self.batch_size = email_cfg.fetch_batch_size if email_cfg else 50
+
+    def close(self) -> None:
+        if self.llm_client:
+            self.runner.run(close_http_clients())
+        if self.store:
+            self.store.close()
+
+    def process_unseen(self, client: IMAPClient) -> int:
+        uids = list(client.search(["UNSEEN"]))
+        processed = 0
+        for start in range(0, len(uids), self.batch_size):
+            processed += self._process_batch(client, uids[start : start + self.batch_size])
+        return processed
+
+    def _process_batch(self, client: IMAPClient, uids: list[int]) -> int:
+        fetched = client.fetch(uids, ["RFC822"])
+        messages: list[_FetchedMessage] = []
+        for uid in uids:
+            raw = fetched.get(uid, {}).get(b"RFC822")
+            if raw is None:
+                continue
+            msg = email.message_from_bytes(raw)
+            messages.append(_FetchedMessage(uid=uid, msg=msg, payload=_normalize_email_message(msg, uid)))
+
+        outcomes = self.runner.run(self._prepare_all(messages))
+        ready: list[_FetchedMessage] = []
+        for message, outcome in zip(messages, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning(
+                    "email.message.prepare_failed",
+                    uid=message.uid,
+                    message_id=message.payload.get("message_id"),
+                    error=str(outcome),
+                    error_type=outcome.__class__.__name__,
+                )
+                continue
+            ready.append(message)
+
+        self._persist(ready)
+        for message in ready:
+            for uri, digest, size in message.imports:
+                task_import_file.apply_async(
+                    args=[uri],
+                    kwargs={"report_type": None, "force": False, "idempotency_key": digest},
+                    **import_route(size),
+                )
+        if ready:
+            client.add_flags([message.uid for message in ready], ["\\Seen"])
+        return len(ready)
+
+    async def _prepare_all(self, messages: list[_FetchedMessage]) -> list[BaseException | None]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def prepare(message: _FetchedMessage) -> None:
+            async with semaphore:
+                if self.llm_enabled and self.llm_client:  # pragma: no cover - network-assisted classification
+                    message.classification, message.error = await _classify_email_async(
+                        self.llm_client, message.payload
                     )
-            for part in msg.walk():
-                name = part.get_filename()
-                if not name:
-                    continue
-                if not (name.endswith(".csv") or name.endswith(".xlsx")):
-                    continue
-                data: Any = part.get_payload(decode=True)
-                if not isinstance(data, bytes | bytearray):
-                    data = b""
-                with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                    tmp.write(data)
-                    tmp_path = tmp.name
-                today = datetime.date.today().strftime("%Y-%m")
-                dst = f"raw/amazon/{today}/{name}"
-                s3.upload_file(tmp_path, BUCKET, dst)
-                result = load_csv.main(["--source", f"minio://{dst}", "--table", "auto"])
-                load_id = None
-                inserted = None
-                if isinstance(result, tuple) and len(result) == 2:
-                    load_id, inserted = result
-                elif isinstance(result, dict):
-                    load_id = result.get("load_log_id")
-                    inserted = result.get("rows")
-                if load_id is not None and inserted is not None:
-                    engine = create_engine(db_url)
-                    with engine.begin() as db:
-                        db.execute(
-                            text("UPDATE load_log SET status='success', inserted_rows=:n WHERE id=:id"),
-                            {"n": inserted, "id": load_id},
-                        )
-                    engine.dispose()
+                message.imports = await asyncio.to_thread(self._upload_attachments, message.msg)
+
+        return await asyncio.gather(*(prepare(message) for message in messages), return_exceptions=True)
+
+    def _upload_attachments(self, msg: email.message.Message) -> list[tuple[str, str, int]]:
+        imports: list[tuple[str, str, int]] = []
+        for part in msg.walk():
+            name = part.get_filename()
+            if not name:
+                continue
+            if not (name.endswith(".csv") or name.endswith(".xlsx")):
+                continue
+            data: Any = part.get_payload(decode=True)
+            if not isinstance(data, bytes | bytearray):
+                data = b""
+            digest = hashlib.sha256(data).hexdigest()
+            with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                tmp.write(data)
+                tmp_path = tmp.name
+            today = datetime.date.today().strftime("%Y-%m")
+            # Keyed by content so same-named attachments imported concurrently cannot overwrite each other.
+            dst = f"raw/amazon/{today}/{digest[:16]}/{name}"
+            try:
+                self.s3.upload_file(tmp_path, BUCKET, dst)
+            finally:
                 os.remove(tmp_path)
-            client.add_flags(uid, ["\\Seen"])
-    if store:
-        store.close()
+            imports.append((f"minio://{BUCKET}/{dst}", digest, len(data)))
+        return imports
+
+    def _persist(self, messages: list[_FetchedMessage]) -> None:
+        if not self.store or not messages:
+            return
+        try:
+            self.store.persist_messages([(item.payload, item.classification, item.error) for item in messages])
+        except SQLAlchemyError as db_exc:  # pragma: no cover - DB failure path
+            for _ in messages:
+                record_email_needs_manual_review("db_error")
+            logger.error(
+                "email.llm.persist_failed",
+                message_ids=[item.payload.get("message_id") for item in messages],
+                error=str(db_exc),
+                error_type=db_exc.__class__.__name__,
+            )
+
+
+def main() -> dict[str, str]:  # pragma: no cover - orchestration entrypoint
+    """Upload CSV/XLSX attachments to MinIO and trigger ingestion.
+
+    Returns {"status": "success"} when processing completes.
+    """
+    host, user, password = _imap_credentials()
+    # One event loop for the whole mailbox pass so the LLM client's connection pool is reused.
+    with asyncio.Runner() as runner:
+        mailbox = _Mailbox(runner)
+        try:
+            with IMAPClient(host) as client:
+                client.login(user, password)
+                client.select_folder("INBOX")
+                mailbox.process_unseen(client)
+        finally:
+            mailbox.close()
     return {"status": "success"}
 
 
+def _process_pass(client: IMAPClient, mailbox: _Mailbox) -> None:
+    """Run one catch-up pass; only connection errors escape, so a broker or storage hiccup skips one pass."""
+
+    try:
+        mailbox.process_unseen(client)
+    except (IMAPClientError, OSError):
+        raise
+    except Exception as exc:
+        logger.exception("email.watch.pass_failed", error=str(exc), error_type=exc.__class__.__name__)
+
+
+def _idle_until_stopped(
+    client: IMAPClient,
+    mailbox: _Mailbox,
+    stop: threading.Event,
+    idle_timeout_s: float,
+    on_healthy: Callable[[], None],
+) -> None:
+    while not stop.is_set():
+        client.idle()
+        # Re-issue IDLE well before servers drop it (RFC 2177 recommends under 29 minutes).
+        deadline = time.monotonic() + idle_timeout_s
+        responses: list[Any] = []
+        while not responses and not stop.is_set() and time.monotonic() < deadline:
+            responses = client.idle_check(timeout=min(_IDLE_CHECK_S, idle_timeout_s))
+        client.idle_done()
+        # Also rescan after a quiet cycle: mail that landed while the previous batch was processing
+        # may have been announced outside IDLE.
+        if not stop.is_set():
+            _process_pass(client, mailbox)
+        on_healthy()
+
+
+def _poll_until_stopped(
+    client: IMAPClient,
+    mailbox: _Mailbox,
+    stop: threading.Event,
+    poll_interval_s: float,
+    on_healthy: Callable[[], None],
+) -> None:
+    while not stop.wait(poll_interval_s):
+        _process_pass(client, mailbox)
+        on_healthy()
+
+
+def watch(
+    *,
+    stop: threading.Event | None = None,
+    idle_timeout_s: float | None = None,
+    poll_interval_s: float | None = None,
+    reconnect_backoff_max_s: float | None = None,
+) -> dict[str, str]:
+    """Hold one IMAP connection and process new mail as it arrives until ``stop`` is set.
+
+    Uses IMAP IDLE when the server advertises it and polls the open connection otherwise.
+    Dropped connections are re-established with exponential backoff; unseen mail is caught up
+    on every (re)connect.
+    """
+    email_cfg = getattr(settings, "email", None)
+    idle_timeout_s = idle_timeout_s or (email_cfg.idle_timeout_s if email_cfg else 300.0)
+    poll_interval_s = poll_interval_s or (email_cfg.poll_interval_s if email_cfg else 60.0)
+    backoff_max_s = reconnect_backoff_max_s or (email_cfg.reconnect_backoff_max_s if email_cfg else 60.0)
+    stop = stop or threading.Event()
+    host, user, password = _imap_credentials()
+    backoff_s = _RECONNECT_BACKOFF_BASE_S
+
+    def _healthy() -> None:
+        # Only a connection that survived a full IDLE or poll cycle earns a fresh backoff; servers that
+        # drop every session right after login would otherwise be hammered once a second.
+        nonlocal backoff_s
+        backoff_s = _RECONNECT_BACKOFF_BASE_S
+
+    with asyncio.Runner() as runner:
+        mailbox = _Mailbox(runner)
+        try:
+            while not stop.is_set():
+                try:
+                    with IMAPClient(host) as client:
+                        client.login(user, password)
+                        client.select_folder("INBOX")
+                        _process_pass(client, mailbox)
+                        if client.has_capability("IDLE"):
+                            _idle_until_stopped(client, mailbox, stop, idle_timeout_s, _healthy)
+                        else:
+                            logger.info("email.watch.idle_unsupported", host=host, poll_interval_s=poll_interval_s)
+                            _poll_until_stopped(client, mailbox, stop, poll_interval_s, _healthy)
+                except (IMAPClientError, OSError) as exc:
+                    if stop.is_set():
+                        break
+                    record_email_watcher_reconnect(exc.__class__.__name__)
+                    logger.warning(
+                        "email.watch.disconnected",
+                        host=host,
+                        error=str(exc),
+                        error_type=exc.__class__.__name__,
+                        retry_in_s=backoff_s,
+                    )
+                    stop.wait(backoff_s)
+                    backoff_s = min(backoff_s * 2, backoff_max_s)
+        finally:
+            mailbox.close()
+    return {"status": "stopped"}
+
+
 if __name__ == "__main__":
-    main()
+    email_cfg = getattr(settings, "email", None)
+    if email_cfg and email_cfg.watch_mode == "idle":
+        watch()
+    else:
+        main()
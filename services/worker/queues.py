@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from kombu import Queue
+
+from awa_common.configuration import CelerySettings
+from awa_common.settings import settings
+
+INGEST_QUEUE = "ingest"
+INGEST_BULK_QUEUE = "ingest_bulk"
+MAINTENANCE_QUEUE = "maintenance"
+NOTIFICATIONS_QUEUE = "notifications"
+QUEUE_NAMES = (INGEST_QUEUE, INGEST_BULK_QUEUE, MAINTENANCE_QUEUE, NOTIFICATIONS_QUEUE)
+
+# The Redis transport keeps one list per priority step and drains lower steps first across every
+# queue a worker consumes, so a worker shared by several queues still serves urgent work first.
+PRIORITY_STEPS = (0, 3, 6, 9)
+PRIORITY_SEP = ":"
+INTERACTIVE_PRIORITY = 0
+NOTIFICATIONS_PRIORITY = 3
+MAINTENANCE_PRIORITY = 6
+BULK_PRIORITY = 9
+
+TASK_ROUTES: dict[str, dict[str, Any]] = {
+    "ingest.import_file": {"queue": INGEST_QUEUE, "priority": INTERACTIVE_PRIORITY},
+    "ingest.enqueue_import": {"queue": INGEST_QUEUE, "priority": INTERACTIVE_PRIORITY},
+    "ingest.import_shard": {"queue": INGEST_BULK_QUEUE, "priority": BULK_PRIORITY},
+    "ingest.finalize_import": {"queue": INGEST_BULK_QUEUE, "priority": BULK_PRIORITY},
+    "ingest.fail_import": {"queue": INGEST_BULK_QUEUE, "priority": BULK_PRIORITY},
+    "ingest.rebuild_views": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "ingest.analyze_table": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "ingest.maintenance_nightly": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "db.refresh_roi_mvs": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "logistics.etl.full": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "fees.refresh": {"queue": MAINTENANCE_QUEUE, "priority": MAINTENANCE_PRIORITY},
+    "alertbot.run": {"queue": NOTIFICATIONS_QUEUE, "priority": NOTIFICATIONS_PRIORITY},
+    "alertbot.deliver": {"queue": NOTIFICATIONS_QUEUE, "priority": NOTIFICATIONS_PRIORITY},
+    "alerts.rules_health": {"queue": NOTIFICATIONS_QUEUE, "priority": NOTIFICATIONS_PRIORITY},
+}
+
+
+@dataclass(slots=True, frozen=True)
+class WorkerPool:
+    """A dedicated worker process for one queue, sized independently of the others."""
+
+    queue: str
+    concurrency: int
+    prefetch_multiplier: int
+    metrics_port: int
+
+    def worker_argv(self, *, loglevel: str = "INFO") -> list[str]:
+        return [
+            "worker",
+            f"--queues={self.queue}",
+            f"--hostname={self.queue}@%h",
+            f"--concurrency={self.concurrency}",
+            f"--prefetch-multiplier={self.prefetch_multiplier}",
+            f"--loglevel={loglevel}",
+        ]
+
+
+def _celery_cfg() -> CelerySettings:
+    cfg = getattr(settings, "celery", None)
+    return cfg if isinstance(cfg, CelerySettings) else CelerySettings.from_settings(settings)
+
+
+def task_queues() -> tuple[Queue, ...]:
+    return tuple(Queue(name, routing_key=name) for name in QUEUE_NAMES)
+
+
+def _metrics_port_base() -> int:
+    observability = getattr(settings, "observability", None)
+    return int(observability.worker_metrics_port if observability else settings.WORKER_METRICS_PORT)
+
+
+def worker_pools(cfg: CelerySettings | None = None, *, metrics_port_base: int | None = None) -> dict[str, WorkerPool]:
+    """Return the worker pool for every queue, keyed by queue name.
+
+    Each pool exports its metrics on ``metrics_port_base`` plus the queue's index in ``QUEUE_NAMES``.
+    """
+
+    cfg = cfg or _celery_cfg()
+    base = _metrics_port_base() if metrics_port_base is None else metrics_port_base
+    sizes = {
+        INGEST_QUEUE: (cfg.ingest_concurrency, cfg.ingest_prefetch_multiplier),
+        INGEST_BULK_QUEUE: (cfg.ingest_bulk_concurrency, cfg.ingest_bulk_prefetch_multiplier),
+        MAINTENANCE_QUEUE: (cfg.maintenance_concurrency, cfg.maintenance_prefetch_multiplier),
+        NOTIFICATIONS_QUEUE: (cfg.notifications_concurrency, cfg.notifications_prefetch_multiplier),
+    }
+    return {
+        queue: WorkerPool(queue, *sizes[queue], metrics_port=base + index) for index, queue in enumerate(QUEUE_NAMES)
+    }
+
+
+def import_route(total_bytes: int | None, cfg: CelerySettings | None = None) -> dict[str, Any]:
+    """Return ``apply_async`` routing options for an import of ``total_bytes``.
+
+    Files at or above the bulk threshold go to the bulk queue at the lowest priority so they cannot
+    hold up interactive uploads; unknown sizes are treated as interactive.
+    """
+
+    cfg = cfg or _celery_cfg()
+    threshold = cfg.bulk_import_threshold_bytes
+    if threshold and total_bytes is not None and total_bytes >= threshold:
+        return {"queue": INGEST_BULK_QUEUE, "priority": BULK_PRIORITY}
+    return {"queue": INGEST_QUEUE, "priority": INTERACTIVE_PRIORITY}
+
+
+def main(argv: list[str] | None = None, *, app: Any | None = None) -> None:
+    """Run the worker pool for one queue: ``python -m services.worker.queues <queue>``."""
+
+    args = sys.argv[1:] if argv is None else argv
+    pools = worker_pools()
+    if len(args) != 1 or args[0] not in pools:
+        raise SystemExit(f"usage: python -m services.worker.queues {{{','.join(pools)}}}")
+    pool = pools[args[0]]
+    os.environ["WORKER_METRICS_PORT"] = str(pool.metrics_port)
+    if app is None:
+        from services.worker.celery_app import celery_app
+
+        app = celery_app
+    app.worker_main(pool.worker_argv(loglevel=settings.LOG_LEVEL))
+
+
+if __name__ == "__main__":
+    main()
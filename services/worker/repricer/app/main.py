@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Iterable, Sequence
 from decimal import Decimal
 from functools import lru_cache
+from typing import NamedTuple
 
 from fastapi import Depends, FastAPI, HTTPException
 from sqlalchemy import text
@@ -13,7 +14,7 @@ from awa_common.roi_views import InvalidROIViewError, current_roi_view, quote_id
 from awa_common.settings import settings
 from services.api.db import get_session
 
-from .logic import DEFAULT_MIN_ROI, DEFAULT_QUANT, DEFAULT_UNDERCUT, compute_price, decide_price
+from .logic import DEFAULT_MIN_ROI, DEFAULT_QUANT, DEFAULT_UNDERCUT, MIN_MARGIN, compute_price, decide_price
 from .schemas import (
     ApplyRequest,
     ApplyResponse,
@@ -24,6 +25,7 @@ from .schemas import (
     SimulateResponse,
     SimulateResult,
 )
+from .vectorized import reprice_chunk
 
 app = FastAPI(title="AWA Repricer")
 
@@ -33,9 +35,9 @@ def _repricer_query(view_name: str):
     quoted = quote_identifier(view_name)
     return text(
         f"""
-        SELECT cost, fees, buybox_price
+        SELECT asin, cost, fees, buybox_price
         FROM {quoted}
-        WHERE asin = :asin
+        WHERE asin = ANY(:asins)
         """
     )
 
@@ -44,6 +46,9 @@ repricer_cfg = getattr(settings, "repricer", None)
 MIN_ROI = repricer_cfg.min_roi if repricer_cfg else DEFAULT_MIN_ROI
 UNDERCUT = repricer_cfg.buybox_gap if repricer_cfg else DEFAULT_UNDERCUT
 ROUNDING = repricer_cfg.rounding_quant if repricer_cfg else DEFAULT_QUANT
+CHUNK_SIZE = repricer_cfg.chunk_size if repricer_cfg else 10000
+
+_FULL_QUERY = text("SELECT asin, our_cost, fee_estimate FROM repricer_input")
 
 
 def _strategy_label(applied: Iterable[str]) -> str:
@@ -58,16 +63,27 @@ def _strategy_label(applied: Iterable[str]) -> str:
     return "+".join(applied_sorted)
 
 
-async def _fetch_inputs(session: AsyncSession, asin: str) -> dict:
+async def _fetch_inputs_many(session: AsyncSession, asins: Sequence[str]) -> dict[str, dict]:
+    """Load repricer inputs for every ASIN in one query; 404 on the first ASIN the view lacks."""
+
     try:
         stmt = _repricer_query(current_roi_view())
     except InvalidROIViewError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    result = await session.execute(stmt, {"asin": asin})
-    row = result.mappings().first()
-    if row is None:
-        raise HTTPException(status_code=404, detail=f"ASIN {asin} not found")
-    return dict(row)
+    unique = list(dict.fromkeys(asins))
+    result = await session.execute(stmt, {"asins": unique})
+    inputs: dict[str, dict] = {}
+    for row in result.mappings().all():
+        inputs.setdefault(row["asin"], dict(row))
+    for asin in unique:
+        if asin not in inputs:
+            raise HTTPException(status_code=404, detail=f"ASIN {asin} not found")
+    return inputs
+
+
+async def _fetch_inputs(session: AsyncSession, asin: str) -> dict:
+    inputs = await _fetch_inputs_many(session, [asin])
+    return inputs[asin]
 
 
 def _build_sim_request_items(payload: SimulateRequest) -> list[SimItem]:
@@ -100,9 +116,10 @@ async def simulate(req: SimulateRequest, session: AsyncSession = Depends(get_ses
     if not items:
         raise HTTPException(status_code=400, detail="No ASINs provided")
 
+    inputs_by_asin = await _fetch_inputs_many(session, [item.asin for item in items])
     results: list[SimulateResult] = []
     for item in items:
-        inputs = await _fetch_inputs(session, item.asin)
+        inputs = inputs_by_asin[item.asin]
         price, explain = decide_price(
             item.asin,
             inputs["cost"],
@@ -135,43 +152,50 @@ def _prepare_context(explain: dict, note: str | None, map_price: Decimal | None)
     return context
 
 
-async def _log_price_update(
-    session: AsyncSession,
-    asin: str,
-    old_price: Decimal | None,
-    new_price: Decimal,
-    strategy: str,
-    context: dict,
-) -> None:
-    payload = {
-        "asin": asin,
-        "old_price": old_price,
-        "new_price": new_price,
-        "strategy": strategy,
-        "context": json.dumps(context, default=str),
-    }
+_LOG_PRICE_UPDATES_SQL = text(
+    """
+    INSERT INTO price_updates_log (
+        asin,
+        old_price,
+        new_price,
+        strategy,
+        actor,
+        context
+    )
+    SELECT asin, old_price, new_price, strategy, 'repricer', CAST(context AS JSONB)
+    FROM unnest(
+        CAST(:asins AS TEXT[]),
+        CAST(:old_prices AS NUMERIC[]),
+        CAST(:new_prices AS NUMERIC[]),
+        CAST(:strategies AS TEXT[]),
+        CAST(:contexts AS TEXT[])
+    ) AS rows(asin, old_price, new_price, strategy, context)
+    """
+)
+
+
+class PriceUpdate(NamedTuple):
+    asin: str
+    old_price: Decimal | None
+    new_price: Decimal
+    strategy: str
+    context: dict
+
+
+async def _log_price_updates(session: AsyncSession, updates: Sequence[PriceUpdate]) -> None:
+    """Write all ``price_updates_log`` rows with one multi-row insert."""
+
+    if not updates:
+        return
     await session.execute(
-        text(
-            """
-            INSERT INTO price_updates_log (
-                asin,
-                old_price,
-                new_price,
-                strategy,
-                actor,
-                context
-            )
-            VALUES (
-                :asin,
-                :old_price,
-                :new_price,
-                :strategy,
-                'repricer',
-                :context::jsonb
-            )
-            """
-        ),
-        payload,
+        _LOG_PRICE_UPDATES_SQL,
+        {
+            "asins": [update.asin for update in updates],
+            "old_prices": [update.old_price for update in updates],
+            "new_prices": [update.new_price for update in updates],
+            "strategies": [update.strategy for update in updates],
+            "contexts": [json.dumps(update.context, default=str) for update in updates],
+        },
     )
 
 
@@ -184,15 +208,18 @@ async def apply_prices(req: ApplyRequest, session: AsyncSession = Depends(get_se
     if not req.items:
         raise HTTPException(status_code=400, detail="No ASINs provided")
 
+    inputs_by_asin: dict[str, dict] = {}
+    if not req.dry_run:
+        inputs_by_asin = await _fetch_inputs_many(session, [item.asin for item in req.items])
+
     results: list[dict] = []
-    applied_count = 0
+    updates: list[PriceUpdate] = []
 
     for item in req.items:
         changed = item.old_price is None or item.old_price != item.new_price
-        context = {}
 
         if not req.dry_run:
-            inputs = await _fetch_inputs(session, item.asin)
+            inputs = inputs_by_asin[item.asin]
             _, explain = decide_price(
                 item.asin,
                 inputs["cost"],
@@ -204,28 +231,35 @@ async def apply_prices(req: ApplyRequest, session: AsyncSession = Depends(get_se
                 quant=ROUNDING,
             )
             context = _prepare_context(explain, item.note, item.map_price)
-            await _log_price_update(
-                session,
-                item.asin,
-                item.old_price,
-                item.new_price,
-                item.strategy,
-                context,
-            )
-            applied_count += 1
+            updates.append(PriceUpdate(item.asin, item.old_price, item.new_price, item.strategy, context))
 
         results.append({"asin": item.asin, "changed": changed})
 
     if not req.dry_run:
+        await _log_price_updates(session, updates)
         await session.commit()
 
-    return ApplyResponse(applied=applied_count, results=results)
+    return ApplyResponse(applied=len(updates), results=results)
+
+
+def _full_prices(rows: Sequence[Sequence]) -> list[PriceResponse]:
+    # Same rules as compute_price(), evaluated over the whole chunk at once.
+    priced = reprice_chunk(rows, min_roi=MIN_MARGIN, undercut=Decimal("0"), quant=DEFAULT_QUANT)
+    return [PriceResponse(asin=asin, new_price=new_price) for asin, new_price in priced]
 
 
 async def full(session: AsyncSession) -> list[PriceResponse]:
-    result = await session.execute(text("SELECT asin, our_cost, fee_estimate FROM repricer_input"))
+    result = await session.execute(_FULL_QUERY)
     rows = result.fetchall()
     out: list[PriceResponse] = []
-    for asin, cost, fee in rows:
-        out.append(PriceResponse(asin=asin, new_price=compute_price(asin, cost, fee)))
+    for start in range(0, len(rows), CHUNK_SIZE):
+        out.extend(_full_prices(rows[start : start + CHUNK_SIZE]))
     return out
+
+
+async def stream_full(session: AsyncSession, *, chunk_size: int | None = None) -> AsyncIterator[list[PriceResponse]]:
+    """Reprice the whole catalog, yielding one list of prices per ``chunk_size`` rows read from the server cursor."""
+
+    result = await session.stream(_FULL_QUERY)
+    async for rows in result.partitions(chunk_size or CHUNK_SIZE):
+        yield _full_prices(rows)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .logic import _normalize_quant
+
+# Batches whose intermediates could come near int64 overflow are computed with exact Python ints instead.
+_INT64_SAFE = 2**62
+
+
+def _places(value: Decimal) -> int:
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int):
+        raise ValueError(f"cannot reprice non-finite value {value}")
+    return max(-exponent, 0)
+
+
+def _den_places(den: int) -> int:
+    places = 0
+    while (10**places) % den:
+        places += 1
+    return places
+
+
+class _Column:
+    """A money column as exact integer ratios, with a mask of the rows that have a value."""
+
+    present: NDArray[np.bool_]
+    # int64 normally; object (exact Python ints) when a ratio overflows int64.
+    nums: NDArray[Any]
+    dens: NDArray[Any]
+
+    def __init__(self, values: Sequence[Decimal | None] | None, size: int) -> None:
+        if values is None:
+            self.present = np.zeros(size, dtype=bool)
+            self.nums = np.zeros(size, dtype=np.int64)
+            self.dens = np.ones(size, dtype=np.int64)
+            return
+        self.present = np.fromiter((value is not None for value in values), dtype=bool, count=size)
+        ratios = (part for value in values for part in (value.as_integer_ratio() if value is not None else (0, 1)))
+        try:
+            pairs = np.fromiter(ratios, dtype=np.int64, count=2 * size)
+        except OverflowError:
+            pairs = np.array(
+                [part for value in values for part in (value.as_integer_ratio() if value is not None else (0, 1))],
+                dtype=object,
+            )
+        self.nums, self.dens = pairs[0::2], pairs[1::2]
+
+    def scaled(self, scale: int, dtype: Any) -> NDArray[Any]:
+        uniques, inverse = np.unique(self.dens, return_inverse=True)
+        factors: NDArray[Any] = np.array([10**scale // int(den) for den in uniques.tolist()], dtype=dtype)
+        scaled: NDArray[Any] = self.nums.astype(dtype) * factors[inverse.reshape(-1)]
+        return scaled
+
+
+def _round_half_even(numerator: NDArray[Any], denominator: int) -> NDArray[Any]:
+    quotient = numerator // denominator
+    twice_remainder = 2 * (numerator - quotient * denominator)
+    round_up = (twice_remainder > denominator) | ((twice_remainder == denominator) & (quotient % 2 == 1))
+    return np.where(round_up, quotient + 1, quotient)
+
+
+def reprice_columns(
+    cost: Sequence[Decimal],
+    fees: Sequence[Decimal],
+    *,
+    buybox: Sequence[Decimal | None] | None = None,
+    map_price: Sequence[Decimal | None] | None = None,
+    min_roi: Decimal,
+    undercut: Decimal,
+    quant: Decimal,
+) -> tuple[list[Decimal], list[str]]:
+    """Apply the ``decide_price`` rules to whole columns at once.
+
+    Money and ratios are scaled to integers and every candidate is compared over one common
+    denominator, so prices and strategy labels match ``decide_price`` exactly. Returns the final
+    prices and ``+``-joined strategy labels in input order.
+    """
+    if min_roi >= Decimal("1"):
+        raise ValueError("min_roi must be < 1")
+    size = len(cost)
+    if not size:
+        return [], []
+    quant_exp = int(_normalize_quant(quant).as_tuple().exponent)
+
+    ratio_scale = max(_places(min_roi), _places(undercut))
+    ratio_den = 10**ratio_scale
+    roi_units = int(min_roi.scaleb(ratio_scale))
+    undercut_units = int(undercut.scaleb(ratio_scale))
+    roi_den = ratio_den - roi_units
+
+    columns = [_Column(cost, size), _Column(fees, size), _Column(buybox, size), _Column(map_price, size)]
+    money_scale = max(_den_places(int(den)) for column in columns for den in np.unique(column.dens).tolist())
+    largest = max(int(np.abs(column.nums).max()) for column in columns)
+
+    price_factor = 10 ** max(-quant_exp, 0)
+    ratio_factor = max(ratio_den * ratio_den, abs(ratio_den - undercut_units) * roi_den, ratio_den * roi_den)
+    bound = largest * 10**money_scale * 4 * ratio_factor * price_factor
+    denominator = ratio_den * roi_den * 10**money_scale * 10 ** max(quant_exp, 0)
+    dtype = np.int64 if max(bound, 2 * denominator) < _INT64_SAFE else object
+
+    cost_units, fee_units, buybox_units, map_units = (column.scaled(money_scale, dtype) for column in columns)
+    has_buybox, has_map = columns[2].present, columns[3].present
+
+    # Candidates as numerators over ratio_den * roi_den * 10**money_scale.
+    min_roi_num = (cost_units + fee_units) * (ratio_den * ratio_den)
+    buybox_num = np.where(has_buybox, buybox_units * ((ratio_den - undercut_units) * roi_den), min_roi_num)
+    map_num = np.where(has_map, map_units * (ratio_den * roi_den), min_roi_num)
+    chosen = np.maximum(np.maximum(min_roi_num, buybox_num), map_num)
+    price_units = _round_half_even(chosen * price_factor, denominator)
+
+    applied_buybox = has_buybox & (buybox_num == chosen)
+    applied_map = has_map & (map_num == chosen)
+    labels = np.select(
+        [applied_buybox & applied_map, applied_buybox, applied_map],
+        ["min_roi+buybox_gap+map", "min_roi+buybox_gap", "min_roi+map"],
+        default="min_roi",
+    )
+    quantum = Decimal(1).scaleb(quant_exp)
+    prices = [Decimal(value) * quantum for value in price_units.tolist()]
+    return prices, labels.tolist()
+
+
+def reprice_chunk(
+    rows: Sequence[Sequence[Any]],
+    *,
+    min_roi: Decimal,
+    undercut: Decimal,
+    quant: Decimal,
+) -> list[tuple[str, Decimal]]:
+    """Price ``(asin, cost, fees)`` rows, returning ``(asin, price)`` pairs in input order."""
+
+    asins = [row[0] for row in rows]
+    prices, _ = reprice_columns(
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        min_roi=min_roi,
+        undercut=undercut,
+        quant=quant,
+    )
+    return list(zip(asins, prices, strict=True))
+
+
+__all__ = ["reprice_chunk", "reprice_columns"]
@@ -12,7 +12,8 @@ from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar, cast
 
 import aioboto3
 import structlog
-from celery import states
+from celery import chord, group, states
+from celery.utils.time import get_exponential_backoff_interval
 
 from awa_common.metrics import (
     instrument_task as _instrument_task,
@@ -20,7 +21,7 @@ from awa_common.metrics import (
     record_ingest_task_mode,
     record_ingest_task_outcome,
 )
-from awa_common.minio import get_s3_client_config, get_s3_client_kwargs
+from awa_common.minio import create_boto3_client, get_s3_client_config, get_s3_client_kwargs
 from awa_common.settings import settings
 from services.alert_bot import worker as alerts_worker
 from services.worker.celery_app import celery_app
@@ -72,6 +73,7 @@ if TYPE_CHECKING:
         def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R: ...
         def apply_async(self, *args: Any, **kwargs: Any) -> Any: ...
         def delay(self, *args: P.args, **kwargs: P.kwargs) -> Any: ...
+        def s(self, *args: Any, **kwargs: Any) -> Any: ...
 
     def celery_task(*args: Any, **kwargs: Any) -> Callable[[Callable[P, R]], _CeleryTask[P, R]]: ...
 
@@ -82,6 +84,7 @@ else:
 
 logger = structlog.get_logger(__name__)
 _evaluate_alerts_sync: Callable[[], dict[str, int]] = async_to_sync(alerts_worker.evaluate_alert_rules)
+_deliver_alerts_sync: Callable[[], dict[str, Any]] = async_to_sync(alerts_worker.deliver_alerts)
 
 
 async def _download_minio_async(uri: str) -> Path:
@@ -144,6 +147,100 @@ def _streaming_knobs() -> tuple[bool, int, int, int]:
     return enabled, threshold_mb, chunk_rows, chunk_size_mb
 
 
+def _sharding_knobs() -> tuple[bool, int, int, int]:
+    ingest_cfg = getattr(settings, "ingestion", None)
+    enabled = bool(ingest_cfg.sharding_enabled if ingest_cfg else getattr(settings, "INGEST_SHARDING_ENABLED", True))
+    threshold_mb = int(
+        ingest_cfg.shard_threshold_mb if ingest_cfg else getattr(settings, "INGEST_SHARD_THRESHOLD_MB", 512)
+    )
+    shard_size_mb = int(ingest_cfg.shard_size_mb if ingest_cfg else getattr(settings, "INGEST_SHARD_SIZE_MB", 64))
+    max_retries = int(ingest_cfg.shard_max_retries if ingest_cfg else getattr(settings, "INGEST_SHARD_MAX_RETRIES", 3))
+    return enabled, max(threshold_mb, 0), max(shard_size_mb, 1), max(max_retries, 0)
+
+
+def _should_shard(local_path: Path, file_size_bytes: int, *, enabled: bool, threshold_mb: int) -> bool:
+    from etl import load_csv
+
+    # Shards are cut at byte offsets, so only plain delimited text qualifies, and each shard commits
+    # its rows with its marker row, which needs the COPY path.
+    return bool(
+        enabled
+        and load_csv.USE_COPY
+        and local_path.suffix.lower() in load_csv.CSV_EXTENSIONS
+        and file_size_bytes >= threshold_mb * 1024 * 1024
+    )
+
+
+def _read_uri_range(uri: str, start: int, end: int) -> bytes:
+    if uri.startswith("minio://"):
+        from urllib.parse import urlparse
+
+        parsed = urlparse(uri)
+        response = create_boto3_client().get_object(
+            Bucket=parsed.netloc, Key=parsed.path.lstrip("/"), Range=f"bytes={start}-{end - 1}"
+        )
+        return cast(bytes, response["Body"].read())
+    with _resolve_uri_to_path(uri).open("rb") as handle:
+        handle.seek(start)
+        return handle.read(end - start)
+
+
+def _dispatch_sharded_import(
+    task: Any,
+    uri: str,
+    local_path: Path,
+    plan: Any,
+    *,
+    report_type: str | None,
+    force: bool,
+    idempotency_key: str | None,
+    cleanup_dir: Path | None,
+) -> dict[str, Any]:
+    from etl import sharded
+
+    task_id = getattr(getattr(task, "request", None), "id", None)
+    job = sharded.prepare_sharded_import(
+        local_path,
+        plan,
+        report_type=report_type,
+        force=force,
+        idempotency_key=idempotency_key,
+        task_id=task_id,
+    )
+    if job["status"] != "pending":
+        return job
+    # Shards re-read MinIO objects directly; local uploads are read in place and removed once the
+    # finalize (or failure) callback has run.
+    shard_uri = uri if uri.startswith("minio://") else str(local_path)
+    cleanup = str(cleanup_dir) if cleanup_dir and not uri.startswith("minio://") else None
+    callback = task_finalize_import.s(job=job, cleanup_dir=cleanup)
+    callback.on_error(task_fail_import.s(job=job, cleanup_dir=cleanup))
+    header = group(task_import_shard.s(job=job, uri=shard_uri, start=start, end=end) for start, end in job["shards"])
+    try:
+        result = chord(header)(callback)
+    except Exception as exc:
+        sharded.fail_sharded_import(job, str(exc))
+        raise
+    if getattr(getattr(task, "request", None), "is_eager", False) or celery_app.conf.task_always_eager:
+        return cast(dict[str, Any], result.get())
+    logger.info(
+        "task_import_file.sharded",
+        task_id=task_id,
+        uri=uri,
+        shards=len(job["shards"]),
+        finalize_task_id=result.id,
+    )
+    return {
+        "status": "dispatched",
+        "sharded": True,
+        "shards": len(job["shards"]),
+        "dialect": job["dialect"],
+        "target_table": job["target_table"],
+        "idempotency_key": job["idempotency_key"],
+        "finalize_task_id": result.id,
+    }
+
+
 @celery_task(name="ingest.import_file", bind=True)
 @instrument_task("ingest.import_file", emit_metrics=False)
 def task_import_file(
@@ -172,6 +269,28 @@ def task_import_file(
             file_size_bytes = os.path.getsize(local_path)
         except OSError:
             file_size_bytes = 0
+        sharding_enabled, shard_threshold_mb, shard_size_mb, _ = _sharding_knobs()
+        if _should_shard(local_path, file_size_bytes, enabled=sharding_enabled, threshold_mb=shard_threshold_mb):
+            from etl import sharded
+
+            plan = sharded.plan_shards(local_path, shard_bytes=shard_size_mb * 1024 * 1024)
+            if len(plan.ranges) > 1:
+                self.update_state(state=states.STARTED, meta={"stage": "shard", "shards": len(plan.ranges)})
+                sharded_summary = _dispatch_sharded_import(
+                    self,
+                    uri,
+                    local_path,
+                    plan,
+                    report_type=report_type,
+                    force=force,
+                    idempotency_key=idempotency_key,
+                    cleanup_dir=tmp_dir,
+                )
+                if sharded_summary["status"] == "dispatched" and not uri.startswith("minio://"):
+                    tmp_dir = None
+                self.update_state(state=states.SUCCESS, meta=sharded_summary)
+                success = True
+                return sharded_summary
         threshold_bytes = max(threshold_mb, 0) * 1024 * 1024
         streaming = bool(streaming_enabled and file_size_bytes > threshold_bytes)
         streaming_chunk_size = chunk_size_rows if streaming else None
@@ -217,6 +336,73 @@ def task_import_file(
             shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
+@celery_task(name="ingest.import_shard", bind=True)
+@instrument_task("ingest.import_shard", emit_metrics=False)
+def task_import_shard(self: Any, *, job: dict[str, Any], uri: str, start: int, end: int) -> dict[str, Any]:
+    """Load one byte range of a sharded import; transient failures retry this shard only."""
+
+    from etl import load_csv, sharded
+
+    try:
+        header = _read_uri_range(uri, 0, int(job["header_end"]))
+        body = _read_uri_range(uri, start, end)
+        return sharded.load_shard(
+            header,
+            body,
+            job=job,
+            start=start,
+            end=end,
+            task_id=getattr(self.request, "id", None),
+        )
+    except load_csv.ImportValidationError:
+        raise
+    except Exception as exc:
+        _, _, _, max_retries = _sharding_knobs()
+        logger.warning(
+            "task_import_shard.retry",
+            load_log_id=job.get("load_log_id"),
+            start=start,
+            end=end,
+            retries=self.request.retries,
+            error=str(exc),
+        )
+        countdown = get_exponential_backoff_interval(
+            factor=1, retries=self.request.retries, maximum=60, full_jitter=True
+        )
+        raise self.retry(exc=exc, countdown=countdown, max_retries=max_retries) from exc
+
+
+@celery_task(name="ingest.finalize_import")
+@instrument_task("ingest.finalize_import", emit_metrics=False)
+def task_finalize_import(
+    results: list[dict[str, Any]], *, job: dict[str, Any], cleanup_dir: str | None = None
+) -> dict[str, Any]:
+    """Chord callback: record the sharded import on ``load_log`` once every shard has landed."""
+
+    from etl import sharded
+
+    try:
+        return sharded.finalize_sharded_import(job, results)
+    finally:
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
+@celery_task(name="ingest.fail_import")
+def task_fail_import(
+    request: Any, exc: BaseException, traceback: Any, *, job: dict[str, Any], cleanup_dir: str | None = None
+) -> None:
+    """Chord errback: a shard ran out of retries, so mark the whole import failed."""
+
+    from etl import sharded
+
+    try:
+        sharded.fail_sharded_import(job, str(exc))
+    finally:
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+
 @celery_task(name="ingest.rebuild_views", bind=True)
 @instrument_task("ingest.rebuild_views", emit_metrics=False)
 def task_rebuild_views(self: Any) -> dict[str, Any]:
@@ -241,6 +427,14 @@ def alertbot_run() -> dict[str, Any]:
     return _evaluate_alerts_sync()
 
 
+@celery_task(name="alertbot.deliver")
+@instrument_task("alertbot.deliver")
+def alertbot_deliver() -> dict[str, Any]:
+    """Periodic task that drains the alert outbox to Telegram."""
+
+    return _deliver_alerts_sync()
+
+
 def evaluate_alert_rules() -> dict[str, Any]:
     """Backward-compatible helper for legacy callers."""
 
@@ -0,0 +1,111 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import text
+
+from etl import sharded
+
+HEADER = "ASIN,Order ID,Return Reason,Return Date,Qty,Refund Amount,Currency\n"
+
+
+def _shard_rows(data: bytes, plan: sharded.ShardPlan) -> list[list[str]]:
+    header = data[: plan.header_end]
+    rows: list[list[str]] = []
+    for start, end in plan.ranges:
+        rows.extend(list(csv.reader(io.StringIO((header + data[start:end]).decode())))[1:])
+    return rows
+
+
+def test_plan_shards_never_splits_quoted_newlines(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharded, "_SCAN_BLOCK_BYTES", 16)
+    rows = [[f"A{idx}", f'line one\nline "two" {idx}', "x,y" if idx % 3 else ""] for idx in range(200)]
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\r\n").writerows([["asin", "note", "extra"], *rows])
+    data = buf.getvalue().encode()
+    path = tmp_path / "quoted.csv"
+    path.write_bytes(data)
+
+    plan = sharded.plan_shards(path, shard_bytes=100)
+
+    assert len(plan.ranges) > 10
+    assert plan.header_end == len(b"asin,note,extra\r\n")
+    assert plan.ranges[0][0] == plan.header_end
+    assert plan.ranges[-1][1] == plan.size == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(plan.ranges, plan.ranges[1:], strict=False))
+    assert _shard_rows(data, plan) == rows
+
+
+def test_plan_shards_handles_missing_trailing_newline_and_header_only(tmp_path):
+    path = tmp_path / "tail.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4")
+    plan = sharded.plan_shards(path, shard_bytes=1)
+    assert plan.ranges == ((4, 8), (8, 11))
+
+    path.write_bytes(b"a,b\n")
+    assert sharded.plan_shards(path, shard_bytes=1).ranges == ()
+
+    path.write_bytes(b"a,b")
+    assert sharded.plan_shards(path, shard_bytes=1) == sharded.ShardPlan(size=3, header_end=3, ranges=())
+
+
+def test_read_header_detects_delimiter(tmp_path):
+    path = tmp_path / "semi.csv"
+    path.write_bytes("\ufeffASIN;Qty;Refund Amount\nA1;1;5,0\n".encode())
+
+    plan = sharded.plan_shards(path, shard_bytes=1024)
+
+    assert sharded._read_header(path, plan.header_end) == (["ASIN", "Qty", "Refund Amount"], ";")
+
+
+def _returns_csv(tmp_path, rows: int):
+    path = tmp_path / "returns.csv"
+    body = "".join(f"S{idx},O{idx},Damaged,2024-06-01,1,{idx % 50}.25,EUR\n" for idx in range(rows))
+    path.write_text(HEADER + body)
+    return path
+
+
+@pytest.mark.integration
+def test_sharded_import_resumes_after_a_failed_shard(tmp_path, db_engine, monkeypatch):
+    path = _returns_csv(tmp_path, 3000)
+    plan = sharded.plan_shards(path, shard_bytes=16 * 1024)
+    data = path.read_bytes()
+    header = data[: plan.header_end]
+    with db_engine.begin() as conn:
+        before = conn.execute(text("SELECT count(*) FROM returns_raw")).scalar()
+
+    job = sharded.prepare_sharded_import(path, plan, idempotency_key="sharded-resume")
+    assert job["status"] == "pending"
+    assert job["dialect"] == "returns_report"
+    for start, end in plan.ranges[:2]:
+        sharded.load_shard(header, data[start:end], job=job, start=start, end=end)
+
+    real_copy = sharded.copy_df_via_temp
+
+    def broken_copy(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(sharded, "copy_df_via_temp", broken_copy)
+    start, end = plan.ranges[2]
+    with pytest.raises(RuntimeError):
+        sharded.load_shard(header, data[start:end], job=job, start=start, end=end)
+    sharded.fail_sharded_import(job, "connection reset")
+    monkeypatch.setattr(sharded, "copy_df_via_temp", real_copy)
+
+    resumed = sharded.prepare_sharded_import(path, plan, idempotency_key="sharded-resume")
+    assert resumed["load_log_id"] == job["load_log_id"]
+    results = [
+        sharded.load_shard(header, data[start:end], job=resumed, start=start, end=end) for start, end in plan.ranges
+    ]
+    summary = sharded.finalize_sharded_import(resumed, results)
+
+    assert [result["status"] for result in results[:2]] == ["skipped", "skipped"]
+    assert summary["rows"] == 3000
+    assert summary["shards_skipped"] == 2
+    with db_engine.begin() as conn:
+        assert conn.execute(text("SELECT count(*) FROM returns_raw")).scalar() - before == 3000
+        status, rows = conn.execute(
+            text("SELECT status, payload_meta->>'rows' FROM load_log WHERE id = :id"), {"id": job["load_log_id"]}
+        ).one()
+    assert (status, int(rows)) == ("success", 3000)
+    assert sharded.prepare_sharded_import(path, plan, idempotency_key="sharded-resume")["status"] == "skipped"
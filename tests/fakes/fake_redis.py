@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import fnmatch
+import math
 import time
 from typing import Any
 
@@ -35,6 +36,51 @@ class FakeRedis:
         self._state[key] = (window_ms, reset_at_ms, count)
         return ttl
 
+    async def eval(self, script: str, numkeys: int, key: str, limit: Any, window_ms: Any, algorithm: str) -> list[int]:
+        """Python port of ``services.api.rate_limit.CONSUME_LUA`` (the only script the app evaluates)."""
+
+        del script, numkeys
+        await self._purge()
+        limit, window = int(limit), int(window_ms)
+        now = int(self._now() * 1000)
+        async with self._lock:
+            if algorithm == "fixed_window":
+                count = int(self._data.get(key, 0)) + 1
+                self._data[key] = count
+                expires = self._exp.get(key)
+                if expires is None:
+                    self._exp[key] = self._now() + window / 1000.0
+                    ttl = window
+                else:
+                    ttl = int((expires - self._now()) * 1000)
+                return [int(count <= limit), count, ttl]
+            if algorithm == "gcra":
+                interval = window / limit
+                tat = max(float(self._data.get(key, now)), now)
+                new_tat = tat + interval
+                allow_at = new_tat - window
+                if allow_at > now:
+                    return [0, limit, math.ceil(allow_at - now)]
+                self._data[key] = new_tat
+                self._exp[key] = self._now() + (new_tat - now) / 1000.0
+                return [1, math.ceil((new_tat - now) / interval), math.ceil(new_tat - now)]
+            start = now - now % window
+            bucket, cur, prev = self._data.get(key, (None, 0, 0))
+            if bucket != start:
+                prev = cur if bucket == start - window else 0
+                cur = 0
+            elapsed = now - start
+            used = math.floor(prev * (window - elapsed) / window) + cur
+            if used >= limit:
+                if cur >= limit:
+                    wait = (window - elapsed) + math.ceil(window * (1 - limit / cur)) + 1
+                else:
+                    wait = math.ceil((window - elapsed) - window * (limit - cur) / prev) + 1
+                return [0, used, max(wait, 1)]
+            self._data[key] = (start, cur + 1, prev)
+            self._exp[key] = self._now() + 2 * window / 1000.0
+            return [1, used + 1, window - elapsed]
+
     async def ping(self) -> bool:
         return True
 
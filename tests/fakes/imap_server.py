@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import re
+import select
+import socket
+import socketserver
+import threading
+from typing import Any
+
+
+class FakeIMAPServer:
+    """In-process IMAP4rev1 server covering the commands ``IMAPClient`` issues for the email watcher.
+
+    Supports LOGIN, SELECT, UID SEARCH UNSEEN, UID FETCH RFC822, UID STORE +FLAGS and, when
+    ``idle=True``, IDLE with ``* n EXISTS`` pushes for messages added while a client is idling.
+    """
+
+    def __init__(self, *, idle: bool = True, user: str = "user", password: str = "pass") -> None:
+        self.idle = idle
+        self.user = user
+        self.password = password
+        self.logins = 0
+        self.idle_commands = 0
+        self._messages: list[dict[str, Any]] = []
+        self._lock = threading.Condition()
+        self._sockets: set[socket.socket] = set()
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                server._serve(self)
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-imap", daemon=True)
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def __enter__(self) -> FakeIMAPServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.disconnect_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_message(self, raw: bytes) -> int:
+        with self._lock:
+            self._messages.append({"uid": len(self._messages) + 1, "raw": raw, "seen": False})
+            self._lock.notify_all()
+            return len(self._messages)
+
+    def unseen(self) -> list[int]:
+        with self._lock:
+            return [message["uid"] for message in self._messages if not message["seen"]]
+
+    def wait_until_seen(self, count: int, timeout: float = 10.0) -> bool:
+        with self._lock:
+            return self._lock.wait_for(
+                lambda: sum(message["seen"] for message in self._messages) >= count, timeout=timeout
+            )
+
+    def disconnect_all(self) -> None:
+        with self._lock:
+            sockets, self._sockets = set(self._sockets), set()
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _capabilities(self) -> bytes:
+        return b"IMAP4rev1 IDLE" if self.idle else b"IMAP4rev1"
+
+    def _serve(self, handler: socketserver.StreamRequestHandler) -> None:
+        # Message count this connection was last told about, so IDLE announces anything newer.
+        handler.known = 0  # type: ignore[attr-defined]
+        with self._lock:
+            self._sockets.add(handler.connection)
+        try:
+            handler.wfile.write(b"* OK [CAPABILITY " + self._capabilities() + b"] fake imap ready\r\n")
+            while line := handler.rfile.readline():
+                tag, _, rest = line.rstrip(b"\r\n").partition(b" ")
+                command, _, args = rest.partition(b" ")
+                if not self._dispatch(handler, tag, command.upper(), args):
+                    break
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._sockets.discard(handler.connection)
+
+    def _dispatch(self, handler: socketserver.StreamRequestHandler, tag: bytes, command: bytes, args: bytes) -> bool:
+        write = handler.wfile.write
+        if command == b"CAPABILITY":
+            write(b"* CAPABILITY " + self._capabilities() + b"\r\n")
+        elif command == b"LOGIN":
+            user, password = (value.strip(b'"').decode() for value in args.split(b" ", 1))
+            if (user, password) != (self.user, self.password):
+                write(tag + b" NO [AUTHENTICATIONFAILED] invalid credentials\r\n")
+                return True
+            self.logins += 1
+        elif command == b"SELECT":
+            with self._lock:
+                handler.known = len(self._messages)  # type: ignore[attr-defined]
+                write(b"* %d EXISTS\r\n* FLAGS (\\Seen)\r\n" % handler.known)  # type: ignore[attr-defined]
+            write(tag + b" OK [READ-WRITE] SELECT completed\r\n")
+            return True
+        elif command == b"UID":
+            self._uid_command(handler, args)
+        elif command == b"IDLE" and self.idle:
+            self._idle(handler, tag)
+            return True
+        elif command == b"LOGOUT":
+            write(b"* BYE logging out\r\n" + tag + b" OK LOGOUT completed\r\n")
+            return False
+        elif command != b"NOOP":
+            write(tag + b" BAD unsupported command\r\n")
+            return True
+        write(tag + b" OK " + command + b" completed\r\n")
+        return True
+
+    def _uid_command(self, handler: socketserver.StreamRequestHandler, args: bytes) -> None:
+        write = handler.wfile.write
+        subcommand, _, rest = args.partition(b" ")
+        subcommand = subcommand.upper()
+        if subcommand == b"SEARCH":
+            uids = self.unseen() if b"UNSEEN" in rest.upper() else [message["uid"] for message in self._messages]
+            write(b"* SEARCH" + b"".join(b" %d" % uid for uid in uids) + b"\r\n")
+            return
+        match = re.match(rb"(\d+)", rest)
+        uid = int(match.group(1)) if match else 0
+        with self._lock:
+            message = next((item for item in self._messages if item["uid"] == uid), None)
+            if message is None:
+                return
+            if subcommand == b"FETCH":
+                raw = message["raw"]
+                write(b"* %d FETCH (UID %d RFC822 {%d}\r\n" % (uid, uid, len(raw)) + raw + b")\r\n")
+            elif subcommand == b"STORE" and b"\\SEEN" in rest.upper():
+                message["seen"] = True
+                write(b"* %d FETCH (UID %d FLAGS (\\Seen))\r\n" % (uid, uid))
+                self._lock.notify_all()
+
+    def _idle(self, handler: socketserver.StreamRequestHandler, tag: bytes) -> None:
+        self.idle_commands += 1
+        handler.wfile.write(b"+ idling\r\n")
+        while True:
+            with self._lock:
+                total = len(self._messages)
+            if total > handler.known:  # type: ignore[attr-defined]
+                handler.wfile.write(b"* %d EXISTS\r\n" % total)
+                handler.known = total  # type: ignore[attr-defined]
+            readable, _, _ = select.select([handler.connection], [], [], 0.02)
+            if readable:
+                handler.rfile.readline()  # DONE (or EOF on disconnect)
+                handler.wfile.write(tag + b" OK IDLE terminated\r\n")
+                return
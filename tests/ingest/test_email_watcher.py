@@ -7,6 +7,7 @@ from sqlalchemy import create_engine, text
 
 from awa_common.dsn import build_dsn
 from services.worker import email_watcher
+from services.worker.tasks import task_import_file
 
 pytestmark = [pytest.mark.integration, pytest.mark.anyio]
 
@@ -43,7 +44,7 @@ class FakeIMAP:
     def search(self, crit):
         return [1]
 
-    def fetch(self, uid, parts):
+    def fetch(self, uids, parts):
         return {1: {b"RFC822": self.msg_bytes}}
 
     def add_flags(self, uid, flags):
@@ -63,6 +64,16 @@ def test_email_watcher(monkeypatch, pg_pool, tmp_path):
 
     monkeypatch.setattr(email_watcher, "IMAPClient", lambda host: FakeIMAP(msg.as_bytes()))
 
+    class InlineImportTask:
+        # Run the hand-off synchronously against the uploaded bytes instead of going through the broker.
+        def apply_async(self, args, kwargs, **_options):
+            key = args[0].split("/", 3)[3]
+            local = tmp_path / key.rsplit("/", 1)[1]
+            local.write_bytes(fake_s3.store[key])
+            return task_import_file.apply(args=[f"file://{local}"], kwargs=kwargs)
+
+    monkeypatch.setattr(email_watcher, "task_import_file", InlineImportTask())
+
     os.environ["IMAP_HOST"] = "x"
     os.environ["IMAP_USER"] = "u"
     os.environ["IMAP_PASS"] = "p"
@@ -10,7 +10,7 @@ import services.api.main as api_main
 from awa_common.security.models import Role, UserCtx
 from awa_common.settings import settings
 from services.api import security
-from tests.integration.test_audit_log import _connect_db
+from tests.integration.test_audit_log import _connect_db, _flush_audit
 
 pytestmark = pytest.mark.integration
 
@@ -47,6 +47,7 @@ def test_api_audit_rate_limit_records_and_invokes_limiter():
             assert response.status_code == 200
 
             assert limiter_calls, "rate limiter dependency was not triggered"
+            _flush_audit(client)
 
             with _connect_db() as conn, conn.cursor() as cur:
                 cur.execute("SELECT user_id, email, roles FROM audit_log ORDER BY id DESC LIMIT 1")
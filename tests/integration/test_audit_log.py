@@ -20,6 +20,12 @@ def _connect_db():
     return psycopg.connect(dsn)
 
 
+def _flush_audit(client: TestClient) -> None:
+    writer = client.app.state.audit_writer
+    if writer is not None:
+        client.portal.call(writer.flush)
+
+
 @pytest.fixture
 def audit_client(monkeypatch: pytest.MonkeyPatch):
     app = api_main.app
@@ -55,6 +61,7 @@ def test_audit_log_records_authenticated_request(audit_client):
 
     resp = client.get("/stats/kpi")
     assert resp.status_code == 200
+    _flush_audit(client)
 
     with _connect_db() as conn, conn.cursor() as cur:
         cur.execute("SELECT user_id, email, roles, request_id FROM audit_log ORDER BY id DESC LIMIT 1")
@@ -75,6 +82,7 @@ def test_audit_log_skips_health(audit_client):
 
     resp = client.get("/health")
     assert resp.status_code == 200
+    _flush_audit(client)
 
     with _connect_db() as conn, conn.cursor() as cur:
         cur.execute("SELECT COUNT(*) FROM audit_log")
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from fastapi import Depends, FastAPI, Request
+
+from awa_common.logging import RequestIdMiddleware
+from awa_common.metrics import MetricsMiddleware
+from awa_common.security.headers import install_security_headers
+from awa_common.security.models import Role, UserCtx
+from awa_common.security.request_limits import install_body_size_limit
+from awa_common.settings import settings
+from services.api.middlewares.audit import AuditLogWriter, AuditMiddleware
+from services.api.security import RequestContextMiddleware
+
+_USER = UserCtx(sub="bench", email="bench@example.com", roles=[Role.viewer], raw_claims={})
+
+
+class _NullSession:
+    async def __aenter__(self) -> _NullSession:
+        return self
+
+    async def __aexit__(self, *_exc: object) -> bool:
+        return False
+
+    async def execute(self, *_args: Any) -> None:
+        return None
+
+    async def commit(self) -> None:
+        return None
+
+
+def _authenticated(request: Request) -> UserCtx:
+    request.state.user = _USER
+    return _USER
+
+
+def build_app(*, with_middleware: bool) -> FastAPI:
+    """Build an app with the API middleware stack in the order ``create_app`` installs it."""
+
+    app = FastAPI()
+    if with_middleware:
+        install_security_headers(app, settings)
+        install_body_size_limit(app, settings)
+        app.add_middleware(RequestIdMiddleware)
+        app.add_middleware(MetricsMiddleware)
+        app.add_middleware(RequestContextMiddleware)
+        app.add_middleware(AuditMiddleware, session_factory=_NullSession)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, _user: UserCtx = Depends(_authenticated)) -> dict[str, int]:
+        return {"id": item_id}
+
+    return app
+
+
+async def _request(app: FastAPI, idx: int) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/items/{idx}",
+        "raw_path": f"/items/{idx}".encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise SystemExit(f"unexpected status {message['status']}")
+
+    await app(scope, receive, send)
+
+
+async def _measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    writer = AuditLogWriter(_NullSession, max_queue=requests + 1, batch_size=500, flush_interval_s=0.05)
+    app.state.audit_writer = writer
+    writer.start()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(idx: int) -> None:
+        async with sem:
+            await _request(app, idx)
+
+    await asyncio.gather(*(one(idx) for idx in range(50)))  # warm-up
+    start = time.perf_counter()
+    await asyncio.gather(*(one(idx) for idx in range(requests)))
+    duration = time.perf_counter() - start
+    await writer.close()
+    return requests / duration
+
+
+def run_benchmark(requests: int, concurrency: int) -> None:
+    bare = asyncio.run(_measure(build_app(with_middleware=False), requests, concurrency))
+    stacked = asyncio.run(_measure(build_app(with_middleware=True), requests, concurrency))
+    print(f"bare app:         {bare:9.0f} req/s")
+    print(f"middleware stack: {stacked:9.0f} req/s ({stacked / bare:.0%} of bare, {requests} requests)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API middleware stack throughput in-process.")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests to send (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight (default: 32)")
+    args = parser.parse_args()
+    run_benchmark(args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
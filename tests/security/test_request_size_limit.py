@@ -18,6 +18,16 @@ from awa_common.security.request_limits import (
 from awa_common.settings import settings
 
 
+async def _run(middleware: BodySizeLimitMiddleware, scope: dict[str, Any], receive: Any) -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
 def _build_echo_app() -> FastAPI:
     app = FastAPI()
     install_body_size_limit(app, settings)
@@ -87,7 +97,12 @@ def test_invalid_content_length_ignored(monkeypatch):
 @pytest.mark.anyio
 async def test_chunked_request_enforced_without_content_length():
     settings_stub = SimpleNamespace(MAX_REQUEST_BYTES=8)
-    middleware = BodySizeLimitMiddleware(lambda scope, receive, send: None, settings=settings_stub)
+
+    async def app(scope, receive, send) -> None:
+        await StarletteRequest(scope, receive).body()
+        await StarletteResponse("ok")(scope, receive, send)
+
+    middleware = BodySizeLimitMiddleware(app, settings=settings_stub)
 
     chunks = [b"abcd", b"efgh", b"ijkl"]
 
@@ -107,21 +122,19 @@ async def test_chunked_request_enforced_without_content_length():
         "server": ("test", 80),
         "scheme": "http",
     }
-    request = StarletteRequest(scope, receive)
-
-    async def call_next(req: StarletteRequest) -> StarletteResponse:
-        await req.body()
-        return StarletteResponse("ok")
-
-    response = await middleware.dispatch(request, call_next)
-    assert response.status_code == 413
-    assert json.loads(response.body.decode()) == {"detail": "Request body too large"}
+    messages = await _run(middleware, scope, receive)
+    assert messages[0]["status"] == 413
+    assert json.loads(messages[1]["body"].decode()) == {"detail": "Request body too large"}
 
 
 @pytest.mark.anyio
 async def test_body_size_limit_handles_exception_group():
     settings_stub = SimpleNamespace(MAX_REQUEST_BYTES=1)
-    middleware = BodySizeLimitMiddleware(lambda scope, receive, send: None, settings=settings_stub)
+
+    async def app(scope, receive, send) -> None:
+        raise BaseExceptionGroup("wrapper", [_RequestTooLarge()])
+
+    middleware = BodySizeLimitMiddleware(app, settings=settings_stub)
 
     async def receive() -> dict[str, Any]:
         return {"type": "http.request", "body": b"", "more_body": False}
@@ -136,11 +149,6 @@ async def test_body_size_limit_handles_exception_group():
         "server": ("test", 80),
         "scheme": "http",
     }
-    request = StarletteRequest(scope, receive)
-
-    async def call_next(req: StarletteRequest) -> StarletteResponse:
-        raise BaseExceptionGroup("wrapper", [_RequestTooLarge()])
-
-    response = await middleware.dispatch(request, call_next)
-    assert response.status_code == 413
-    assert json.loads(response.body.decode()) == {"detail": "Request body too large"}
+    messages = await _run(middleware, scope, receive)
+    assert messages[0]["status"] == 413
+    assert json.loads(messages[1]["body"].decode()) == {"detail": "Request body too large"}
@@ -19,6 +19,21 @@ async def test_legacy_chat_truncated(monkeypatch: pytest.MonkeyPatch) -> None:
     assert result["completion"].endswith("[truncated]")
 
 
+@pytest.mark.anyio
+async def test_legacy_chat_uses_warm_pool_when_configured(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Pool:
+        async def run_batch(self, payloads, *, log_context=None):
+            return [(f"pooled {payload['prompt']}\n", False) for payload in payloads]
+
+    async def fail_run(*args, **kwargs):
+        raise AssertionError("per-request binary must not be spawned")
+
+    monkeypatch.setattr(llm_app, "_BIN_POOL", _Pool())
+    monkeypatch.setattr(llm_app, "run_llm_binary", fail_run)
+    result = await llm_app._legacy_chat(llm_app.LegacyRequest(prompt="hi"))
+    assert result == {"completion": "pooled hi"}
+
+
 def test_extract_content_with_choices() -> None:
     payload = {"choices": [{"message": {"content": '{"ok":true}'}}]}
     assert llm_app._extract_content(payload) == '{"ok":true}'
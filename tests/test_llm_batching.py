@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from services.llm_server import app as llm_app
+from services.llm_server.batching import MicroBatcher
+from services.llm_server.errors import LLMProviderClientError, LLMProviderTimeoutError
+
+
+def _timeout() -> Exception:
+    return LLMProviderTimeoutError(provider="local")
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_requests_and_fans_out_results() -> None:
+    batches: list[list[str]] = []
+
+    async def invoke(items: list[str]) -> list[str | BaseException]:
+        batches.append(items)
+        return [
+            LLMProviderClientError(provider="local", status=400) if item == "bad" else item.upper() for item in items
+        ]
+
+    batcher = MicroBatcher(invoke, backend="local", window_s=0.05, max_size=3)
+    results = await asyncio.gather(
+        *(batcher.submit(item, timeout_s=5.0, on_timeout=_timeout) for item in ("a", "bad", "b", "c")),
+        return_exceptions=True,
+    )
+
+    assert batches == [["a", "bad", "b"], ["c"]]
+    assert results[0] == "A" and results[2:] == ["B", "C"]
+    assert isinstance(results[1], LLMProviderClientError)
+
+
+@pytest.mark.asyncio
+async def test_batcher_keeps_per_request_deadline() -> None:
+    release = asyncio.Event()
+
+    async def invoke(items: list[str]) -> list[str]:
+        await release.wait()
+        return items
+
+    batcher = MicroBatcher(invoke, backend="local", window_s=0.0, max_size=1)
+    with pytest.raises(LLMProviderTimeoutError):
+        await batcher.submit("slow", timeout_s=0.05, on_timeout=_timeout)
+    release.set()
+    assert await batcher.submit("fast", timeout_s=1.0, on_timeout=_timeout) == "fast"
+
+
+@pytest.mark.asyncio
+async def test_call_provider_sends_concurrent_requests_as_one_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    batches: list[int] = []
+
+    class _Client:
+        async def chat_completions(self, payloads, *, operation):
+            batches.append(len(payloads))
+            return [{"choices": [{"message": {"content": payload["messages"][-1]["content"]}}]} for payload in payloads]
+
+    monkeypatch.setattr(llm_app, "_PROVIDER_CLIENTS", {"local": _Client()})
+    monkeypatch.setattr(llm_app, "_PROVIDER_BATCHERS", {})
+    monkeypatch.setattr(llm_app, "BATCH_MAX_SIZE", 4)
+    monkeypatch.setattr(llm_app, "BATCH_WINDOW_S", 0.05)
+    requests = [
+        llm_app.LLMRequest(task="chat_completion", input={"prompt": str(idx)}, provider="local") for idx in range(4)
+    ]
+
+    contents = await asyncio.gather(*(llm_app._call_provider(req, "local") for req in requests))
+
+    assert batches == [4]
+    assert [content.split('"prompt": "')[1][0] for content in contents] == ["0", "1", "2", "3"]
@@ -193,3 +193,21 @@ async def test_provider_client_base_with_v1(monkeypatch: pytest.MonkeyPatch) ->
     await client.chat_completion({"model": "m", "messages": []})
     await client.chat_completion({"model": "m", "messages": []}, operation="chat_completion")
     assert seen["url"] == "https://example.com/v1/chat/completions"
+
+
+@pytest.mark.anyio
+async def test_provider_client_batch_returns_errors_in_place(monkeypatch: pytest.MonkeyPatch) -> None:
+    events = _patch_metrics(monkeypatch)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if b'"bad"' in request.content:
+            return httpx.Response(400, json={"error": "bad"}, request=request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}}]}, request=request)
+
+    client = _client(handler)
+    results = await client.chat_completions(
+        [{"model": "m", "messages": []}, {"model": "bad", "messages": []}], operation="classify_email"
+    )
+    assert results[0]["choices"][0]["message"]["content"] == "{}"
+    assert isinstance(results[1], LLMProviderClientError)
+    assert sorted(outcome for _, _, outcome in events["requests"]) == ["client_error", "success"]
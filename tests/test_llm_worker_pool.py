@@ -0,0 +1,164 @@
+import asyncio
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from services.llm_server.errors import LLMBinaryNonZeroExitError, LLMBinaryOverloadedError, LLMBinaryTimeoutError
+from services.llm_server.worker_pool import LLMWorkerPool
+
+_FAKE_WORKER = textwrap.dedent(
+    """
+    import json, os, struct, sys, time
+
+    def answer(request):
+        prompt = request["prompt"]
+        if prompt == "crash":
+            sys.stderr.write("model exploded")
+            sys.exit(3)
+        if prompt == "refuse":
+            return {"error": "prompt refused"}
+        if prompt.startswith("sleep"):
+            time.sleep(float(prompt.split()[1]))
+        return {"output": f"{os.getpid()}:{prompt.upper()}"}
+
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while True:
+        header = stdin.read(4)
+        if len(header) < 4:
+            break
+        request = json.loads(stdin.read(struct.unpack(">I", header)[0]))
+        reply = [answer(item) for item in request] if isinstance(request, list) else answer(request)
+        body = json.dumps(reply).encode()
+        stdout.write(struct.pack(">I", len(body)) + body)
+        stdout.flush()
+    """
+)
+
+
+@pytest.fixture
+def fake_worker(tmp_path: Path) -> list[str]:
+    script = tmp_path / "fake_llm_worker.py"
+    script.write_text(_FAKE_WORKER)
+    return [sys.executable, str(script)]
+
+
+def _pool(command: list[str], **overrides) -> LLMWorkerPool:
+    options = {"size": 1, "queue_size": 4, "max_requests": 0, "timeout_s": 5.0, "max_output_bytes": 1024}
+    options.update(overrides)
+    return LLMWorkerPool(command, **options)
+
+
+async def _settle(pool: LLMWorkerPool) -> None:
+    while pool._background:
+        await asyncio.wait(set(pool._background))
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_worker_and_recycles_after_max_requests(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker, max_requests=2)
+    await pool.start()
+    try:
+        first, _ = await pool.run({"prompt": "a"})
+        second, truncated = await pool.run({"prompt": "b"})
+        await _settle(pool)
+        third, _ = await pool.run({"prompt": "c"})
+    finally:
+        await pool.close()
+
+    pids = [out.split(":")[0] for out in (first, second, third)]
+    assert [out.split(":")[1] for out in (first, second, third)] == ["A", "B", "C"]
+    assert truncated is False
+    assert pids[0] == pids[1] != pids[2]
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_crashed_worker(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker)
+    await pool.start()
+    try:
+        with pytest.raises(LLMBinaryNonZeroExitError) as excinfo:
+            await pool.run({"prompt": "crash"})
+        output, _ = await pool.run({"prompt": "ok"})
+    finally:
+        await pool.close()
+
+    assert excinfo.value.details == {"exit_code": 3, "stderr": "model exploded"}
+    assert output.endswith(":OK")
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_admission_and_times_out_stuck_workers(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker, queue_size=1, timeout_s=2.0)
+    await pool.start()
+    try:
+        busy = asyncio.ensure_future(pool.run({"prompt": "sleep 5"}))
+        queued = asyncio.ensure_future(pool.run({"prompt": "next"}))
+        while pool.queue_depth < 1:
+            await asyncio.wait({busy, queued}, timeout=0.01)
+        with pytest.raises(LLMBinaryOverloadedError):
+            await pool.run({"prompt": "rejected"})
+        queued.cancel()
+        with pytest.raises(LLMBinaryTimeoutError):
+            await busy
+        await _settle(pool)
+        output, _ = await pool.run({"prompt": "next"})
+    finally:
+        await pool.close()
+
+    assert output.endswith(":NEXT")
+
+
+@pytest.mark.asyncio
+async def test_pool_queue_wait_counts_against_the_request_timeout(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker, timeout_s=2.0)
+    await pool.start()
+    try:
+        first = asyncio.ensure_future(pool.run({"prompt": "sleep 1.2"}))
+        while pool._busy < 1:
+            await asyncio.wait({first}, timeout=0.01)
+        with pytest.raises(LLMBinaryTimeoutError):
+            await pool.run({"prompt": "sleep 1.2"})
+        output, _ = await first
+    finally:
+        await pool.close()
+
+    assert output.endswith(":SLEEP 1.2")
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_batch_in_one_frame_with_per_item_errors(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker, max_requests=1)
+    await pool.start()
+    try:
+        results = await pool.run_batch([{"prompt": "a"}, {"prompt": "refuse"}, {"prompt": "b"}])
+        recycles = len(pool._background)
+    finally:
+        await pool.close()
+
+    first, error, last = results
+    assert first[0].split(":")[0] == last[0].split(":")[0]
+    assert (first[0].split(":")[1], last[0].split(":")[1]) == ("A", "B")
+    assert isinstance(error, LLMBinaryNonZeroExitError)
+    assert error.details["stderr"] == "prompt refused"
+    assert recycles == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_close_stops_a_worker_that_was_busy(fake_worker: list[str]) -> None:
+    pool = _pool(fake_worker)
+    await pool.start()
+    busy = asyncio.ensure_future(pool.run({"prompt": "sleep 0.5"}))
+    while pool._busy < 1:
+        await asyncio.wait({busy}, timeout=0.01)
+    await pool.close()
+
+    output, _ = await busy
+    await _settle(pool)
+
+    pid = int(output.split(":")[0])
+    assert pool._idle.empty()
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
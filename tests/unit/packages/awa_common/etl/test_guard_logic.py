@@ -104,3 +104,63 @@ def test_process_once_failure_marks_failed(monkeypatch, session_factory):
         ):
             raise RuntimeError("boom")
     assert flags["failed"]
+
+
+class AsyncStubSession:
+    def __init__(self) -> None:
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    async def run_sync(self, fn, *args: Any, **kwargs: Any) -> Any:
+        return fn(self, *args, **kwargs)
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_process_once_async_success_marks_success(monkeypatch, session_factory):
+    marked: list[int] = []
+    monkeypatch.setattr(guard, "mark_success", lambda _s, load_log_id, _duration_ms: marked.append(load_log_id))
+    session = AsyncStubSession()
+    async with guard.process_once_async(
+        lambda: session,
+        source="demo",
+        payload_meta={},
+        idempotency_key="abc",
+    ) as handle:
+        assert handle is not None and handle.load_log_id == 1
+    assert marked == [1]
+    assert session.closed and session.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_process_once_async_duplicate_and_failure(monkeypatch, session_factory):
+    flags: dict[str, Any] = {}
+    monkeypatch.setattr(guard, "try_insert_load_log", lambda *a, **k: "duplicate")
+    monkeypatch.setattr(
+        guard, "soft_update_meta_on_duplicate", lambda *_a, **kwargs: flags.setdefault("meta", kwargs["payload_meta"])
+    )
+    async with guard.process_once_async(
+        AsyncStubSession,
+        source="demo",
+        payload_meta={"refresh": True},
+        idempotency_key="dup",
+        on_duplicate="update_meta",
+    ) as handle:
+        assert handle is None
+    assert flags["meta"] == {"refresh": True}
+
+    monkeypatch.setattr(guard, "try_insert_load_log", lambda *a, **k: "inserted")
+    monkeypatch.setattr(guard, "mark_failed", lambda _s, _id, message: flags.setdefault("failed", message))
+    with pytest.raises(RuntimeError):
+        async with guard.process_once_async(AsyncStubSession, source="demo", payload_meta={}, idempotency_key="x"):
+            raise RuntimeError("boom")
+    assert flags["failed"] == "boom"
@@ -86,3 +86,35 @@ async def test_async_http_client_allows_status_and_async_chunk(tmp_path) -> None
     assert closed.get("closed") is True
     assert b"".join(seen) == payload
     assert dest.read_bytes() == payload
+
+
+@pytest.mark.asyncio
+async def test_async_download_on_response_runs_per_attempt(tmp_path) -> None:
+    attempts = {"count": 0}
+
+    def handler(request: Request) -> Response:
+        attempts["count"] += 1
+        if attempts["count"] == 1:
+            return Response(503, request=request)
+        return Response(200, request=request, content=b"payload", headers={"ETag": '"v2"'})
+
+    client = AsyncHTTPClient(
+        integration="test",
+        transport=MockTransport(handler),
+        max_retries=2,
+        total_timeout_s=5,
+        backoff_base_s=0,
+        backoff_max_s=0,
+        retry_jitter_s=0,
+        retry_status_codes={503},
+    )
+    seen: list[str | None] = []
+    async with client as cli:
+        await cli.download_to_file(
+            "https://example.com/blob",
+            dest_path=tmp_path / "blob.bin",
+            on_response=lambda response: seen.append(response.headers.get("etag")),
+        )
+
+    assert seen == ['"v2"']
+    assert (tmp_path / "blob.bin").read_bytes() == b"payload"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import types
 
 import pytest
@@ -7,6 +8,13 @@ import pytest
 from awa_common import llm
 
 
+@pytest.fixture(autouse=True)
+def _fresh_response_cache():
+    llm.clear_response_cache()
+    yield
+    llm.clear_response_cache()
+
+
 class _StubLLMConfig:
     def __init__(self) -> None:
         self.provider = "local"
@@ -137,3 +145,105 @@ async def test_parse_price_list_disabled(monkeypatch):
     client = llm.LLMClient()
     with pytest.raises(llm.LLMConfigurationError):
         await client.parse_price_list(preview={"headers": []})
+
+
+@pytest.mark.asyncio
+async def test_duplicate_requests_are_served_from_cache(monkeypatch):
+    cfg = _StubLLMConfig()
+    monkeypatch.setattr(llm, "_settings", types.SimpleNamespace(llm=cfg))
+    client = llm.LLMClient()
+    calls: list[dict] = []
+
+    async def fake_post(body, provider, task):
+        calls.append(body["input"])
+        if task == "chat_completion":
+            return {"result": {"completion": "text"}, "provider": provider}
+        return {"result": {"intent": "interested", "confidence": 0.9}, "provider": provider}
+
+    monkeypatch.setattr(client, "_post", fake_post)
+    first = await client.classify_email(subject="s", body="same", sender="x@y.com")
+    first.facts.currency = "EUR"
+    second = await client.classify_email(subject="s", body="same", sender="x@y.com")
+    await client.classify_email(subject="s", body="other", sender="x@y.com")
+    await client.generate("hi", temperature=0.7)
+    await client.generate("hi", temperature=0.7)
+
+    assert [call.get("body", call.get("prompt")) for call in calls] == ["same", "other", "hi", "hi"]
+    assert second.intent == llm.EmailIntent.INTERESTED
+    assert second.facts.currency is None
+
+
+def test_response_cache_expires_and_evicts(monkeypatch):
+    cache = llm._ResponseCache()
+    now = {"value": 100.0}
+    monkeypatch.setattr(llm.time, "monotonic", lambda: now["value"])
+
+    cache.put("a", {"v": 1}, ttl_s=10, max_entries=2)
+    cache.put("b", {"v": 2}, ttl_s=10, max_entries=2)
+    assert cache.get("a") == {"v": 1}
+    cache.put("c", {"v": 3}, ttl_s=10, max_entries=2)
+    assert (cache.get("a"), cache.get("b")) == ({"v": 1}, None)
+
+    now["value"] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_pooled_http_client(monkeypatch):
+    cfg = _StubLLMConfig()
+    monkeypatch.setattr(llm, "_settings", types.SimpleNamespace(llm=cfg))
+    built: list[object] = []
+
+    class _StubHTTP:
+        closed = False
+
+        async def post_json(self, url, *, json, headers, timeout):
+            return {"result": {"completion": json["input"]["prompt"]}, "provider": "local"}
+
+        async def aclose(self):
+            self.closed = True
+
+    def _build(self, integration):
+        built.append(_StubHTTP())
+        return built[-1]
+
+    monkeypatch.setattr(llm.LLMClient, "_build_http_client", _build)
+
+    assert await llm.LLMClient().generate("one") == "one"
+    assert await llm.LLMClient().generate("two") == "two"
+    await llm.close_http_clients()
+
+    assert len(built) == 1
+    assert built[0].closed is True
+
+
+@pytest.mark.asyncio
+async def test_facades_close_their_own_http_client(monkeypatch):
+    cfg = _StubLLMConfig()
+    monkeypatch.setattr(llm, "_settings", types.SimpleNamespace(llm=cfg))
+    built: list[object] = []
+
+    class _StubHTTP:
+        closed = False
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            self.closed = True
+
+        async def post_json(self, url, *, json, headers, timeout):
+            return {"result": {"completion": json["input"]["prompt"]}, "provider": "local"}
+
+    def _build(self, integration):
+        built.append(_StubHTTP())
+        return built[-1]
+
+    monkeypatch.setattr(llm.LLMClient, "_build_http_client", _build)
+
+    assert await llm.generate("one") == "one"
+
+    assert len(built) == 1
+    assert built[0].closed is True
+    assert asyncio.get_running_loop() not in llm._HTTP_CLIENTS
@@ -81,15 +81,16 @@ async def test_metrics_middleware_handles_http_exception():
     async def receive():
         return {"type": "http.request", "body": b"", "more_body": False}
 
-    request = Request(scope, receive)
+    async def send(_message):
+        return None
 
-    middleware = metrics.MetricsMiddleware(lambda scope: None)
-
-    async def failing_next(_request):
+    async def failing_app(_scope, _receive, _send):
         raise HTTPException(status_code=429)
 
+    middleware = metrics.MetricsMiddleware(failing_app)
+
     with pytest.raises(HTTPException):
-        await middleware.dispatch(request, failing_next)
+        await middleware(scope, receive, send)
 
     samples = metrics.HTTP_REQUESTS_TOTAL.collect()[0].samples
     status_codes = {sample.labels["status"] for sample in samples}
@@ -109,14 +110,16 @@ async def test_metrics_middleware_handles_unexpected_exception():
     async def receive():
         return {"type": "http.request", "body": b"", "more_body": False}
 
-    request = Request(scope, receive)
-    middleware = metrics.MetricsMiddleware(lambda scope: None)
+    async def send(_message):
+        return None
 
-    async def bomb(_request):
+    async def bomb(_scope, _receive, _send):
         raise RuntimeError("boom")
 
+    middleware = metrics.MetricsMiddleware(bomb)
+
     with pytest.raises(RuntimeError):
-        await middleware.dispatch(request, bomb)
+        await middleware(scope, receive, send)
 
     samples = metrics.HTTP_REQUESTS_TOTAL.collect()[0].samples
     status_codes = {sample.labels["status"] for sample in samples}
@@ -292,6 +295,78 @@ def test_backlog_probe_start_to_finish(monkeypatch):
     sys.modules.pop("redis", None)
 
 
+def test_backlog_probe_sums_priority_lists(monkeypatch):
+    class FakeRedisClient:
+        def llen(self, key: str) -> int:
+            return {"bulk": 2, "bulk:3": 5, "bulk:9": 1}.get(key, 0)
+
+    class FakeRedisModule:
+        class Redis:
+            @staticmethod
+            def from_url(_url, decode_responses=False):
+                return FakeRedisClient()
+
+    monkeypatch.setitem(sys.modules, "redis", FakeRedisModule)
+
+    def fake_sleep(_):
+        raise StopIteration
+
+    monkeypatch.setattr(metrics.time, "sleep", fake_sleep)
+
+    class FakeThread:
+        def __init__(self, target, name, daemon):
+            self._target = target
+
+        def start(self):
+            try:
+                self._target()
+            except StopIteration:
+                pass
+
+    monkeypatch.setattr(metrics.threading, "Thread", FakeThread)
+    metrics.init(service="worker", env="test", version="1.0.0")
+
+    metrics._maybe_start_backlog_probe(
+        broker_url="redis://localhost/0",
+        queue_names=["bulk"],
+        interval=1,
+        priority_steps=(0, 3, 6, 9),
+        priority_sep=":",
+    )
+
+    samples = metrics.QUEUE_BACKLOG.collect()[0].samples
+    assert [sample.value for sample in samples if sample.labels["queue"] == "bulk"] == [8.0]
+    metrics._BACKLOG_THREAD = None
+    sys.modules.pop("redis", None)
+
+
+def test_queue_wait_recorded_from_publish_header(monkeypatch):
+    metrics.init(service="worker", env="test", version="1.0.0")
+    headers: dict[str, object] = {}
+    monkeypatch.setattr(metrics.time, "time", lambda: 100.0)
+    metrics.on_before_task_publish(sender="ingest.import_file", headers=headers)
+    assert headers[metrics.PUBLISHED_AT_HEADER] == 100.0
+
+    request = SimpleNamespace(delivery_info={"routing_key": "ingest_bulk"}, eta=None, **headers)
+    task = SimpleNamespace(name="ingest.import_file", request=request)
+    monkeypatch.setattr(metrics.time, "time", lambda: 112.5)
+
+    def wait_sample(suffix: str) -> float:
+        samples = metrics.CELERY_QUEUE_WAIT_SECONDS.collect()[0].samples
+        return next(s.value for s in samples if s.name.endswith(suffix) and s.labels["queue"] == "ingest_bulk")
+
+    metrics.CELERY_QUEUE_WAIT_SECONDS.clear()
+    metrics.on_task_prerun(sender=task, task_id="", task=task)
+    assert wait_sample("_sum") == 12.5
+
+    # Delayed tasks are measured from their ETA, and tasks without the header are ignored.
+    request.eta = "1970-01-01T00:01:50+00:00"
+    metrics.on_task_prerun(sender=task, task_id="", task=task)
+    metrics.on_task_prerun(sender=task, task_id="", task=SimpleNamespace(request=SimpleNamespace()))
+    assert wait_sample("_sum") == 15.0
+    assert wait_sample("_count") == 2.0
+
+
 def test_backlog_probe_when_thread_exists():
     sentinel = object()
     metrics._BACKLOG_THREAD = sentinel
@@ -343,6 +418,18 @@ def test_start_worker_metrics_http_variants(monkeypatch):
     assert called["port"] == 9108
     assert called["registry"] is metrics.REGISTRY
 
+    def port_in_use(port, registry):
+        raise OSError(98, "Address already in use")
+
+    monkeypatch.setenv("WORKER_METRICS_PORT", "9110")
+    monkeypatch.setattr(metrics, "start_http_server", fake_start_http_server)
+    metrics.start_worker_metrics_http_if_enabled()  # per-queue worker handed its own port
+    assert called["port"] == 9110
+
+    monkeypatch.setattr(metrics, "start_http_server", port_in_use)
+    with pytest.raises(OSError):
+        metrics.start_worker_metrics_http_if_enabled()
+
 
 def test_enable_celery_metrics_idempotent(monkeypatch):
     class _Connector:
@@ -353,6 +440,7 @@ def test_enable_celery_metrics_idempotent(monkeypatch):
             self.calls += 1
 
     fake_signals = SimpleNamespace(
+        before_task_publish=_Connector(),
         task_prerun=_Connector(),
         task_postrun=_Connector(),
         task_failure=_Connector(),
@@ -370,7 +458,7 @@ def test_enable_celery_metrics_idempotent(monkeypatch):
 def test_celery_queue_names_split(monkeypatch):
     captured = {}
 
-    def fake_enable(celery_app_instance, *, broker_url, queue_names, backlog_interval_s):
+    def fake_enable(celery_app_instance, *, broker_url, queue_names, backlog_interval_s, **_kwargs):
         captured["queue_names"] = queue_names
 
     monkeypatch.setattr(metrics, "enable_celery_metrics", fake_enable)
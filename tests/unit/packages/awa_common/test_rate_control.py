@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import pytest
+from httpx import AsyncByteStream, MockTransport, Request, Response
+
+from awa_common import http_client, rate_control
+from awa_common.http_client import AsyncHTTPClient
+from awa_common.rate_control import AdaptiveRateController
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _controller(clock: _Clock, **overrides) -> AdaptiveRateController:
+    params = {
+        "initial_rps": 10.0,
+        "min_rps": 1.0,
+        "max_rps": 50.0,
+        "burst": 1,
+        "increase_rps": 1.0,
+        "decrease_factor": 0.5,
+        "latency_factor": 4.0,
+        "cooldown_s": 1.0,
+        "clock": clock,
+    }
+    params.update(overrides)
+    return AdaptiveRateController("test", **params)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_controllers():
+    rate_control.reset_rate_controllers()
+    yield
+    rate_control.reset_rate_controllers()
+
+
+def test_throttle_halves_rate_once_per_cooldown_and_success_recovers_additively() -> None:
+    clock = _Clock()
+    controller = _controller(clock)
+
+    controller.on_throttle()
+    controller.on_throttle()
+    assert controller.rate == pytest.approx(5.0)
+
+    clock.now += 1.5
+    controller.on_throttle()
+    assert controller.rate == pytest.approx(2.5)
+
+    for _ in range(10):
+        controller.on_success(0.1)
+    assert 2.5 < controller.rate < 6.5
+
+
+def test_reserve_spaces_requests_and_honours_retry_after() -> None:
+    clock = _Clock()
+    controller = _controller(clock, burst=2)
+
+    delays = [controller.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1)
+    assert delays[3] == pytest.approx(0.2)
+
+    clock.now += 10
+    controller.on_throttle(retry_after=3.0)
+    assert controller.reserve() == pytest.approx(3.0)
+
+
+def test_latency_above_baseline_counts_as_congestion() -> None:
+    clock = _Clock()
+    controller = _controller(clock)
+
+    controller.on_success(0.05)
+    for _ in range(20):
+        controller.on_success(1.0)
+
+    assert controller.rate < 10.0
+
+
+@pytest.mark.anyio
+async def test_async_clients_share_controller_and_back_off_on_429() -> None:
+    calls = {"count": 0}
+
+    def handler(request: Request) -> Response:
+        calls["count"] += 1
+        if calls["count"] == 1:
+            return Response(429, headers={"Retry-After": "0"}, request=request)
+        return Response(200, json={"ok": True}, request=request)
+
+    first = AsyncHTTPClient(
+        integration="h10", transport=MockTransport(handler), max_retries=3, total_timeout_s=5, adaptive_rate=True
+    )
+    second = AsyncHTTPClient(
+        integration="H10", transport=MockTransport(handler), max_retries=1, total_timeout_s=5, adaptive_rate=True
+    )
+    disabled = AsyncHTTPClient(integration="h10", transport=MockTransport(handler), adaptive_rate=False)
+    controller = rate_control.rate_controller_for("h10")
+    initial = controller.rate
+
+    assert await first.get_json("https://example.com/fees") == {"ok": True}
+    assert calls["count"] == 2
+    assert controller.rate < initial
+    assert second._rate is controller
+    assert disabled._rate is None
+
+    for client in (first, second, disabled):
+        await client.aclose()
+
+
+def test_adaptive_rate_is_opt_in_per_integration(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(http_client.settings, "HTTP_ADAPTIVE_RATE_ENABLED", False, raising=False)
+    monkeypatch.setattr(http_client.settings, "HTTP_ADAPTIVE_RATE_INTEGRATIONS", ["Helium10"], raising=False)
+
+    assert AsyncHTTPClient(integration="helium10")._adaptive_rate
+    assert not AsyncHTTPClient(integration="llm_cloud")._adaptive_rate
+    assert AsyncHTTPClient(integration="llm_cloud", adaptive_rate=True)._adaptive_rate
+
+    monkeypatch.setattr(http_client.settings, "HTTP_ADAPTIVE_RATE_ENABLED", True, raising=False)
+    assert AsyncHTTPClient(integration="llm_cloud")._adaptive_rate
+
+
+@pytest.mark.anyio
+async def test_download_latency_is_measured_to_the_response_headers(tmp_path, monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(http_client.time, "perf_counter", clock)
+
+    class SlowBody(AsyncByteStream):
+        async def __aiter__(self):
+            clock.now += 30.0
+            yield b"x" * 10
+
+    def handler(request: Request) -> Response:
+        clock.now += 0.2
+        return Response(200, stream=SlowBody(), request=request)
+
+    client = AsyncHTTPClient(integration="dl_latency", transport=MockTransport(handler), adaptive_rate=True)
+    observed: list[float] = []
+    monkeypatch.setattr(client._rate, "acquire", _no_wait)
+    monkeypatch.setattr(client._rate, "on_success", observed.append)
+
+    await client.download_to_file("https://example.com/big.csv", dest_path=tmp_path / "big.csv")
+    await client.aclose()
+
+    assert observed == [pytest.approx(0.2)]
+
+
+async def _no_wait() -> None:
+    return None
@@ -1,9 +1,10 @@
 import uuid
 
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from fastapi.testclient import TestClient
 
-from awa_common.logging import RequestIdMiddleware
+from awa_common.logging import _REQUEST_ID, RequestIdMiddleware
 
 
 def _build_app():
@@ -39,3 +40,22 @@ def test_request_id_middleware_respects_existing_header() -> None:
     assert response.status_code == 200
     assert response.headers["X-Request-ID"] == custom_id
     assert response.json()["request_id"] == custom_id
+
+
+def test_request_id_middleware_keeps_context_while_streaming() -> None:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        def body():
+            for _ in range(3):
+                yield (_REQUEST_ID.get() or "-") + "\n"
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    with TestClient(app) as client:
+        response = client.get("/stream", headers={"X-Request-ID": "req-stream"})
+
+    assert response.headers["X-Request-ID"] == "req-stream"
+    assert response.text.splitlines() == ["req-stream"] * 3
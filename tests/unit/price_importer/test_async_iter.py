@@ -31,3 +31,51 @@ def test_frame_iterator_rejects_format(monkeypatch, tmp_path):
     monkeypatch.setattr(importer_io, "detect_format", lambda _p: "binary")
     with pytest.raises(RuntimeError):
         importer_io._frame_iterator(other, 1)
+
+
+@pytest.mark.asyncio
+async def test_iter_price_batches_process_backend_preserves_order(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    rows = "\n".join(f"sku{i},{i},eur" for i in range(6))
+    csv_path.write_text(f"sku,cost,currency\n{rows}\n", encoding="utf-8")
+    batches = []
+    async for batch in importer_io.iter_price_batches(csv_path, batch_size=2, max_workers=2, backend="process"):
+        batches.append(batch)
+    assert [row["sku"] for batch in batches for row in batch] == [f"sku{i}" for i in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_iter_price_batches_process_backend_surfaces_validation_errors(tmp_path):
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("sku,cost,currency\nsku1,-1,eur\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="invalid price rows"):
+        async for _batch in importer_io.iter_price_batches(csv_path, batch_size=1, max_workers=1, backend="process"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_iter_price_batches_uses_supplied_executor(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_text("sku,cost,currency\nsku1,1,eur\n", encoding="utf-8")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        batches = [batch async for batch in importer_io.iter_price_batches(csv_path, batch_size=1, executor=executor)]
+        # The caller owns the executor, so it stays usable after iteration.
+        assert executor.submit(lambda: 1).result() == 1
+    assert batches[0][0]["sku"] == "sku1"
+
+
+def test_encoded_frame_round_trip():
+    import pandas as pd
+
+    frame = pd.DataFrame([{"sku": "A", "cost": "1.5", "currency": "eur"}])
+    kind, payload = importer_io._encode_frame(frame)
+    valid, errors = importer_io._validate_encoded_frame(kind, payload, None)
+    assert errors == []
+    assert valid[0]["sku"] == "A"
+
+
+def test_build_executor_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        importer_io._build_executor("gpu", 1)  # type: ignore[arg-type]
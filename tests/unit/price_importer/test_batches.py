@@ -42,3 +42,19 @@ async def test_iter_price_batches_ignores_empty_frames(monkeypatch):
         batches.append(batch)
     assert len(batches) == 1
     assert batches[0][0]["sku"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_iter_price_batches_uses_supplied_columns_as_is(tmp_path, monkeypatch):
+    from services.price_importer import io
+
+    def _no_resolve(*_a, **_k):
+        raise AssertionError("supplied columns must not be re-resolved")
+
+    monkeypatch.setattr(io, "resolve_columns", _no_resolve)
+    csv_path = tmp_path / "vendor.csv"
+    csv_path.write_text("Artikel,Preis,Waehrung\nSKU-1,10,eur\n", encoding="utf-8")
+
+    columns = {"sku": "Artikel", "cost": "Preis", "currency": "Waehrung"}
+    batches = [batch async for batch in iter_price_batches(csv_path, batch_size=1, max_workers=1, columns=columns)]
+    assert [row["sku"] for row in batches[0]] == ["SKU-1"]
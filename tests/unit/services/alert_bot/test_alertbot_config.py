@@ -173,3 +173,43 @@ def test_config_manager_no_watch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch
     runtime = manager.load(force=True)
     assert runtime is not None
     assert manager.maybe_reload() is runtime
+
+
+def test_config_manager_rejects_broken_template_and_keeps_previous(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(alert_config.signal, "signal", lambda *args, **kwargs: None)
+    monkeypatch.setattr(alert_config.AlertConfigManager, "_signal_installed", False, raising=False)
+    path = _write_yaml(
+        tmp_path,
+        """
+        version: 1
+        defaults:
+          chat_id: "@ops"
+        rules:
+          - id: roi_drop
+            type: roi_drop
+            template: "{{ count }} rows"
+        """,
+    )
+    manager = alert_config.AlertConfigManager(path=path, watch=False)
+    runtime = manager.load(force=True)
+    assert runtime is not None
+    path.write_text(
+        textwrap.dedent(
+            """
+            version: 2
+            defaults:
+              chat_id: "@ops"
+            rules:
+              - id: roi_drop
+                type: roi_drop
+                template: "{% for row in rows %}{{ row.asin }}"
+            """
+        ),
+        encoding="utf-8",
+    )
+    manager.request_reload()
+    with pytest.raises(ValueError, match="rule 'roi_drop' has an invalid template"):
+        manager.maybe_reload()
+    assert manager.get() is runtime
@@ -7,6 +7,7 @@ from services.alert_bot.decider import (
     RuleDecision,
     build_alert_requests,
     build_notification_intents,
+    plan_deliveries,
 )
 from services.alert_bot.rules import AlertEvent
 
@@ -59,3 +60,46 @@ def test_build_alert_requests_flattens_chats() -> None:
 
 def test_build_alert_requests_empty_decisions() -> None:
     assert build_alert_requests([]) == []
+
+
+def _request(chat_id: str, message: str, key: str, *, severity: str = "info", rule_id: str = "roi") -> AlertRequest:
+    return AlertRequest(
+        rule_id=rule_id,
+        severity=severity,
+        chat_id=chat_id,
+        message=message,
+        parse_mode="HTML",
+        dedupe_key=key,
+        disable_web_page_preview=True,
+    )
+
+
+def test_plan_deliveries_packs_chat_messages_within_limit() -> None:
+    requests = [_request("@ops", "x" * 40, f"roi:{idx}", rule_id=f"r{idx % 2}") for idx in range(5)]
+    requests.append(_request("@ops", "x" * 40, "roi:0"))
+
+    plan = plan_deliveries(requests, max_message_chars=100)
+
+    lane = plan.lanes["@ops"]
+    assert plan.requests_in == 6
+    assert [len(message.message) for message in lane] == [82, 82, 40]
+    assert all(len(message.message) <= 100 for message in lane)
+    assert [key for message in lane for key in message.part_keys] == [f"roi:{idx}" for idx in range(5)]
+    assert lane[0].rule_ids == ("r0", "r1")
+    assert lane[0].dedupe_key.startswith("batch:")
+    assert lane[2].dedupe_key == "roi:4"
+
+
+def test_plan_deliveries_orders_lanes_by_severity_and_splits_by_chat() -> None:
+    requests = [
+        _request("chat1", "info", "a"),
+        _request("chat1", "boom", "b", severity="critical"),
+        _request("chat2", "info", "c"),
+        _request("chat1", "more info", "d"),
+    ]
+
+    plan = plan_deliveries(requests)
+
+    assert [message.message for message in plan.lanes["chat1"]] == ["boom", "info\n\nmore info"]
+    assert [message.message for message in plan.lanes["chat2"]] == ["info"]
+    assert plan.messages == 3
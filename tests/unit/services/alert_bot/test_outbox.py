@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from awa_common import telegram
+from services.alert_bot import config as alert_config, outbox, worker
+from services.alert_bot.decider import AlertRequest
+from services.alert_bot.rules import AlertEvent
+from services.alert_bot.settings import AlertBotSettings
+
+
+def _request(chat_id: str, key: str, message: str = "alert") -> AlertRequest:
+    return AlertRequest(
+        rule_id="roi_drop",
+        severity="info",
+        chat_id=chat_id,
+        message=message,
+        parse_mode="HTML",
+        dedupe_key=key,
+        disable_web_page_preview=True,
+    )
+
+
+def _result(ok: bool, *, status_code: int = 200, retry_after: float | None = None) -> telegram.TelegramSendResult:
+    if ok:
+        return telegram.TelegramSendResult(ok=True, status="ok", response=None)
+    response = telegram.TelegramResponse(
+        ok=False, status_code=status_code, payload={}, description=f"http {status_code}", retry_after=retry_after
+    )
+    status = "retry" if retry_after is not None or status_code == 429 else "error"
+    return telegram.TelegramSendResult(ok=False, status=status, response=response)
+
+
+class _MemoryOutbox:
+    """In-memory stand-in for the alert_outbox table."""
+
+    def __init__(self) -> None:
+        self.rows: dict[int, dict] = {}
+
+    def add(self, request: AlertRequest, *, attempts: int = 0) -> int:
+        row_id = len(self.rows) + 1
+        self.rows[row_id] = {"request": request, "status": "pending", "attempts": attempts, "delay": None}
+        return row_id
+
+    def status(self, key: str) -> str:
+        return next(row["status"] for row in self.rows.values() if row["request"].dedupe_key == key)
+
+    def install(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        async def enqueue(requests, *, dedupe_window_s):
+            known = {(row["request"].chat_id, row["request"].dedupe_key) for row in self.rows.values()}
+            fresh = [request for request in requests if (request.chat_id, request.dedupe_key) not in known]
+            for request in fresh:
+                self.add(request)
+            return len(fresh)
+
+        async def claim(limit, *, lease_s):
+            claimed = []
+            for row_id, row in self.rows.items():
+                if row["status"] == "pending" and row["delay"] is None and len(claimed) < limit:
+                    row["status"] = "sending"
+                    row["attempts"] += 1
+                    claimed.append(outbox.OutboxEntry(id=row_id, attempts=row["attempts"], request=row["request"]))
+            return claimed
+
+        async def mark_sent(ids):
+            for row_id in ids:
+                self.rows[row_id]["status"] = "sent"
+
+        async def reschedule(ids, delay_s, error, *, refund=False):
+            for row_id in ids:
+                row = self.rows[row_id]
+                row.update(status="pending", delay=delay_s)
+                if refund:
+                    row["attempts"] -= 1
+
+        async def mark_failed(ids, error):
+            for row_id in ids:
+                self.rows[row_id]["status"] = "failed"
+
+        async def backlog():
+            pending = [row for row in self.rows.values() if row["status"] in {"pending", "sending"}]
+            return len(pending), (3600.0 if pending else None)
+
+        async def purge(_older_than_s):
+            return None
+
+        for name, func in {
+            "enqueue": enqueue,
+            "claim": claim,
+            "mark_sent": mark_sent,
+            "reschedule": reschedule,
+            "mark_failed": mark_failed,
+            "backlog": backlog,
+            "purge": purge,
+        }.items():
+            monkeypatch.setattr(outbox, name, func)
+
+
+class _StubTransport:
+    def __init__(self, results: dict[str, list[telegram.TelegramSendResult]] | None = None) -> None:
+        self.calls: list[AlertRequest] = []
+        self._results = results or {}
+
+    async def send(self, request: AlertRequest) -> telegram.TelegramSendResult:
+        self.calls.append(request)
+        queued = self._results.get(request.chat_id)
+        return queued.pop(0) if queued else _result(True)
+
+    async def validate(self, chat_ids: set[str]) -> tuple[bool, str | None]:
+        return True, None
+
+
+def _runner(transport: _StubTransport, **overrides: object) -> worker.AlertBotRunner:
+    settings = AlertBotSettings(
+        enabled=True,
+        telegram_token="12345:ABCDEabcde",
+        default_chat_id="@ops",
+        outbox_enabled=True,
+        outbox_max_attempts=3,
+        outbox_drain_s=1.0,
+        env="test",
+        version="test",
+    ).model_copy(update=overrides)
+    runner = worker.AlertBotRunner(settings=settings, transport=transport)
+    runner._sending_enabled = True
+    runner._degraded_reason = None
+    runner._last_validation_version = "1"
+    return runner
+
+
+def _runtime(chat_ids: list[str]) -> alert_config.AlertRulesRuntime:
+    rule = alert_config.AlertRule(
+        id="roi_drop",
+        type="roi_drop",
+        enabled=True,
+        schedule=None,
+        chat_ids=chat_ids,
+        parse_mode="HTML",
+        params={},
+        template=None,
+    )
+    defaults = alert_config.AlertRuleDefaults(enabled=True, parse_mode="HTML", chat_ids=chat_ids)
+    return alert_config.AlertRulesRuntime(
+        version="1", defaults=defaults, rules=[rule], source_path=Path("x"), loaded_at=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_queues_alerts_and_skips_repeats_without_sending(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = _MemoryOutbox()
+    store.install(monkeypatch)
+    transport = _StubTransport()
+    runner = _runner(transport)
+    runtime = _runtime(["@ops"])
+    runner._last_validated_chat_ids = frozenset({"@ops"})
+    monkeypatch.setattr(runner, "_load_config", lambda: runtime)
+
+    async def fake_evaluate(_rule):
+        return [AlertEvent(rule_id="roi_drop", chat_ids=["@ops"], text="hi", dedupe_key="k")]
+
+    monkeypatch.setattr(worker, "evaluate_rule", fake_evaluate)
+
+    first = await runner.run(now=datetime(2024, 1, 1, tzinfo=UTC))
+    second = await runner.run(now=datetime(2024, 1, 1, 0, 5, tzinfo=UTC))
+
+    assert (first["notifications_queued"], second["notifications_queued"]) == (1, 0)
+    assert transport.calls == []
+    assert len(store.rows) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_sends_directly_when_outbox_is_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def broken_enqueue(*_args, **_kwargs):
+        raise RuntimeError("relation alert_outbox does not exist")
+
+    monkeypatch.setattr(outbox, "enqueue", broken_enqueue)
+    transport = _StubTransport()
+    runner = _runner(transport)
+    runtime = _runtime(["@ops"])
+    runner._last_validated_chat_ids = frozenset({"@ops"})
+    monkeypatch.setattr(runner, "_load_config", lambda: runtime)
+
+    async def fake_evaluate(_rule):
+        return [AlertEvent(rule_id="roi_drop", chat_ids=["@ops"], text="hi", dedupe_key="k")]
+
+    monkeypatch.setattr(worker, "evaluate_rule", fake_evaluate)
+
+    result = await runner.run(now=datetime(2024, 1, 1, tzinfo=UTC))
+
+    assert result["notifications_queued"] == 0
+    assert result["notifications_sent"] == 1
+    assert [call.dedupe_key for call in transport.calls] == ["k"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_coalesces_and_defers_throttled_chat(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = _MemoryOutbox()
+    store.install(monkeypatch)
+    for idx in range(3):
+        store.add(_request("@ops", f"ops:{idx}", "x" * 3000))
+    store.add(_request("@buyers", "buyers:0"))
+    store.add(_request("@buyers", "buyers:1"))
+    transport = _StubTransport({"@ops": [_result(False, status_code=429, retry_after=7.0)]})
+    runner = _runner(transport)
+    monkeypatch.setattr(runner, "_load_config", lambda: _runtime(["@ops", "@buyers"]))
+    runner._last_validated_chat_ids = frozenset({"@ops", "@buyers"})
+
+    summary = await runner.deliver()
+
+    assert summary["notifications_sent"] == 1
+    assert summary["retries"] == 1
+    assert [store.status(f"ops:{idx}") for idx in range(3)] == ["pending"] * 3
+    assert [row["delay"] for row in store.rows.values()][:3] == [7.0, 7.0, 7.0]
+    assert [row["attempts"] for row in store.rows.values()][:3] == [1, 0, 0]
+    assert store.status("buyers:0") == store.status("buyers:1") == "sent"
+    assert [call.chat_id for call in transport.calls].count("@buyers") == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_fails_rejected_and_exhausted_messages(monkeypatch: pytest.MonkeyPatch) -> None:
+    store = _MemoryOutbox()
+    store.install(monkeypatch)
+    store.add(_request("@ops", "bad"))
+    store.add(_request("@buyers", "flaky"), attempts=2)
+    transport = _StubTransport(
+        {"@ops": [_result(False, status_code=400)], "@buyers": [_result(False, status_code=502)]}
+    )
+    runner = _runner(transport)
+    monkeypatch.setattr(runner, "_load_config", lambda: _runtime(["@ops", "@buyers"]))
+    runner._last_validated_chat_ids = frozenset({"@ops", "@buyers"})
+
+    summary = await runner.deliver()
+
+    assert summary["notifications_failed"] == 2
+    assert store.status("bad") == store.status("flaky") == "failed"
+
+
+@pytest.mark.asyncio
+async def test_enqueue_collapses_duplicates_into_one_statement(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple] = []
+
+    async def fake_fetch_rows(query: str, *args):
+        calls.append(args)
+        return [{"id": 1}, {"id": 2}]
+
+    monkeypatch.setattr(outbox, "fetch_rows", fake_fetch_rows)
+
+    queued = await outbox.enqueue(
+        [_request("@ops", "a"), _request("@ops", "a"), _request("@buyers", "a")], dedupe_window_s=60
+    )
+
+    assert queued == 2
+    assert len(calls) == 1
+    assert calls[0][0] == ["@ops", "@buyers"]
+    assert calls[0][-1] == 60.0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from services.alert_bot import rules
+from services.alert_bot.config import AlertRule
+
+
+def _rule(**overrides: object) -> AlertRule:
+    base = AlertRule(
+        id="price",
+        type="price_increase_pct",
+        enabled=True,
+        schedule=None,
+        chat_ids=["@ops"],
+        parse_mode=None,
+        params={},
+        template="{{ rule }}={{ count }}",
+    )
+    return replace(base, **overrides)
+
+
+def _patch_queries(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, tuple]]:
+    calls: list[tuple[str, tuple]] = []
+
+    async def fake_price_increase(*args):
+        calls.append(("price_increase", args))
+        return [{"sku": f"S{delta}", "vendor_id": 1, "delta": delta} for delta in (6.0, 12.0, 25.0)]
+
+    async def fake_stale(*args):
+        calls.append(("stale", args))
+        return [{"vendor_id": 1, "age_days": 8.5}, {"vendor_id": 2, "age_days": 40.0}]
+
+    monkeypatch.setattr(rules, "query_price_increase", fake_price_increase)
+    monkeypatch.setattr(rules, "query_stale_price_lists", fake_stale)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_rule_batch_runs_one_query_per_type_with_loosest_threshold(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _patch_queries(monkeypatch)
+    batch_rules = [
+        _rule(id="p5", params={"grow_pct": 5}),
+        _rule(id="p10", params={"grow_pct": 10}),
+        _rule(id="p20", params={"grow_pct": 20}),
+        _rule(id="s7", type="price_outdated", params={"stale_days": 7}),
+        _rule(id="s30", type="stale_price_days", params={"stale_days": 30}),
+    ]
+
+    async with rules.rule_batch(batch_rules, incremental=False) as batch:
+        results = await asyncio.gather(*(rules.evaluate_rule(rule) for rule in batch_rules))
+
+    assert sorted(calls) == [("price_increase", (5.0,)), ("stale", (7,))]
+    assert batch.queries_run == 2
+    assert [events[0].text for events in results] == ["p5=3", "p10=2", "p20=1", "s7=2", "s30=1"]
+
+
+@pytest.mark.asyncio
+async def test_rules_query_directly_outside_a_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _patch_queries(monkeypatch)
+
+    events = await rules.evaluate_rule(_rule(params={"grow_pct": 10}))
+
+    assert calls == [("price_increase", (10.0,))]
+    assert events[0].text == "price=3"
+
+
+@pytest.mark.asyncio
+async def test_rule_timeout_does_not_cancel_shared_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = asyncio.Event()
+    calls = {"count": 0}
+
+    async def slow_price_increase(*_args):
+        calls["count"] += 1
+        await release.wait()
+        return [{"sku": "S", "vendor_id": 1, "delta": 30.0}]
+
+    monkeypatch.setattr(rules, "query_price_increase", slow_price_increase)
+    first, second = _rule(id="a", params={"grow_pct": 5}), _rule(id="b", params={"grow_pct": 10})
+
+    async with rules.rule_batch([first, second], incremental=False):
+        waiting = asyncio.ensure_future(rules.evaluate_rule(second))
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(rules.evaluate_rule(first), timeout=0.01)
+        release.set()
+        events = await waiting
+
+    assert calls["count"] == 1
+    assert events[0].text == "b=1"
+
+
+class _StateDb:
+    """Fake ``fetch_rows`` serving change scans and the alert_rule_state table."""
+
+    def __init__(self, changes: list[list[dict]]) -> None:
+        self.changes = changes
+        self.stored: dict[str, dict] = {}
+        self.change_bounds: list[object] = []
+
+    async def __call__(self, query: str, *args):
+        if "FROM alert_rule_state" in query:
+            return [dict(self.stored[rule_id], rule_id=rule_id) for rule_id in args[0] if rule_id in self.stored]
+        if "INSERT INTO alert_rule_state" in query:
+            for rule_id, digest, watermark, active in zip(*args, strict=True):
+                self.stored[rule_id] = {"params_hash": digest, "watermark": watermark, "active": active}
+            return []
+        self.change_bounds.append(args[0])
+        return self.changes.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_incremental_rules_scan_only_changes_since_watermark(monkeypatch: pytest.MonkeyPatch) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    now = datetime.now(UTC)
+    first_seen = now - timedelta(hours=2)
+    db = _StateDb(
+        [
+            [
+                {"vendor_id": 1, "sku": "A", "updated_at": first_seen, "delta": 15.0},
+                {"vendor_id": 1, "sku": "B", "updated_at": first_seen, "delta": 2.0},
+            ],
+            [
+                {"vendor_id": 1, "sku": "A", "updated_at": now, "delta": -3.0},
+                {"vendor_id": 1, "sku": "C", "updated_at": now, "delta": 40.0},
+            ],
+        ]
+    )
+    monkeypatch.setattr(rules, "fetch_rows", db)
+    monkeypatch.setattr(rules.SETTINGS, "ALERT_WATERMARK_OVERLAP_S", 60.0, raising=False)
+    rule = _rule(template="{% for row in rows %}{{ row.sku }}{% endfor %}", params={"grow_pct": 10})
+
+    async with rules.rule_batch([rule], incremental=True):
+        first = await rules.evaluate_rule(rule)
+    async with rules.rule_batch([rule], incremental=True):
+        second = await rules.evaluate_rule(rule)
+
+    assert [first[0].text, second[0].text] == ["A", "C"]
+    assert db.change_bounds[0] is None
+    assert db.change_bounds[1] == first_seen - timedelta(seconds=60)
+    assert db.stored["price"]["watermark"] == now
+
+
+@pytest.mark.asyncio
+async def test_incremental_state_tracks_ageing_and_resets_on_threshold_change(monkeypatch: pytest.MonkeyPatch) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    now = datetime.now(UTC)
+    db = _StateDb(
+        [
+            [
+                {"vendor_id": 1, "updated_at": now - timedelta(days=10)},
+                {"vendor_id": 2, "updated_at": now - timedelta(days=1)},
+            ],
+            [],
+            [{"vendor_id": 1, "updated_at": now - timedelta(days=10)}],
+        ]
+    )
+    monkeypatch.setattr(rules, "fetch_rows", db)
+    rule = _rule(id="stale", type="price_outdated", template="{{ count }}", params={"stale_days": 7})
+
+    async with rules.rule_batch([rule], incremental=True):
+        assert (await rules.evaluate_rule(rule))[0].text == "1"
+    async with rules.rule_batch([rule], incremental=True):
+        assert (await rules.evaluate_rule(rule))[0].text == "1"
+    assert db.change_bounds[1] is not None
+
+    changed = replace(rule, params={"stale_days": 3})
+    async with rules.rule_batch([changed], incremental=True):
+        assert (await rules.evaluate_rule(changed))[0].text == "1"
+    assert db.change_bounds[2] is None
+
+
+@pytest.mark.asyncio
+async def test_incremental_falls_back_to_full_snapshot_without_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _patch_queries(monkeypatch)
+
+    async def broken_fetch_rows(*_args):
+        raise RuntimeError("relation alert_rule_state does not exist")
+
+    monkeypatch.setattr(rules, "fetch_rows", broken_fetch_rows)
+    rule = _rule(params={"grow_pct": 10})
+
+    async with rules.rule_batch([rule], incremental=True) as batch:
+        events = await rules.evaluate_rule(rule)
+
+    assert batch.incremental is False
+    assert calls == [("price_increase", (10.0,))]
+    assert events[0].text == "price=2"
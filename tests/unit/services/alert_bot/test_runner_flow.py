@@ -408,3 +408,31 @@ def test_run_startup_validation_fallback_loop(monkeypatch: pytest.MonkeyPatch) -
 
     worker.run_startup_validation()
     assert called["fallback"] is True
+
+
+@pytest.mark.asyncio
+async def test_dispatch_coalesces_burst_per_chat() -> None:
+    transport = _StubTransport()
+    runner = _runner(transport=transport)
+    runner._sending_enabled = True
+    runner._degraded_reason = None
+    requests = [
+        AlertRequest(
+            rule_id="roi_drop",
+            severity="info",
+            message=f"breach {idx}",
+            chat_id=chat_id,
+            parse_mode="HTML",
+            dedupe_key=f"{chat_id}:{idx}",
+            disable_web_page_preview=True,
+        )
+        for chat_id in ("@ops", "@buyers")
+        for idx in range(200)
+    ]
+
+    stats = worker.BatchStats()
+    await runner._dispatch_requests(requests, stats)
+
+    assert stats.messages_planned == stats.messages_sent == len(transport.calls) < 10
+    assert {call.chat_id for call in transport.calls} == {"@ops", "@buyers"}
+    assert sum(len(call.part_keys) for call in transport.calls) == 400
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from services.alert_bot import config as alert_config, rules, templates
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    templates.clear_template_cache()
+    yield
+    templates.clear_template_cache()
+
+
+def test_compiled_templates_are_reused_per_source_and_parse_mode() -> None:
+    source = "<b>{{ count }}</b> {{ label }}"
+
+    html = templates.compile_template(source, "HTML")
+    assert templates.compile_template(source, "html") is html
+    text = templates.compile_template(source, None)
+
+    assert text is not html
+    assert templates.template_cache_size() == 2
+    assert html.render(count=1, label="<x>") == "<b>1</b> &lt;x&gt;"
+    assert text.render(count=1, label="<x>") == "<b>1</b> <x>"
+
+
+def test_template_cache_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(templates.settings, "ALERT_TEMPLATE_CACHE_SIZE", 2, raising=False)
+    first = templates.compile_template("a {{ x }}")
+    templates.compile_template("b {{ x }}")
+    assert templates.compile_template("a {{ x }}") is first
+    templates.compile_template("c {{ x }}")
+
+    assert templates.template_cache_size() == 2
+    assert templates.compile_template("a {{ x }}") is first
+
+
+def test_render_template_reports_syntax_errors_without_raising() -> None:
+    assert rules.render_template("{% if %}", {"rule": "r"})[0].startswith("[template error]")
+
+
+def test_every_rule_type_has_a_template_fallback() -> None:
+    assert set(rules._RULE_HANDLERS) <= set(templates.TEMPLATE_FALLBACKS)
+
+
+def test_precompile_warms_the_template_alias_types_render_with(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        textwrap.dedent(
+            """
+            version: 1
+            defaults:
+              chat_id: "@ops"
+              parse_mode: HTML
+            rules:
+              - id: roi
+                type: roi
+              - id: buybox
+                type: buybox_drop_pct
+            """
+        ),
+        encoding="utf-8",
+    )
+    runtime = alert_config.load_config(path)
+
+    assert alert_config.precompile_templates(runtime) == 2
+    assert templates.template_cache_size() == 2
+    templates.compile_template(templates.DEFAULT_TEMPLATES["roi_drop"], "HTML")
+    templates.compile_template(templates.DEFAULT_TEMPLATES["buybox_loss"], "HTML")
+    assert templates.template_cache_size() == 2
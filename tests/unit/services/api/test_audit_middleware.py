@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 import pytest
@@ -8,7 +9,7 @@ from fastapi.testclient import TestClient
 
 from awa_common.security.models import Role, UserCtx
 from services.api import security
-from services.api.middlewares.audit import AuditMiddleware
+from services.api.middlewares.audit import AuditLogWriter, AuditMiddleware
 
 
 @pytest.fixture
@@ -120,3 +121,56 @@ def test_audit_middleware_records_and_skips_paths(audit_app):
     resp_recover = client.get("/viewer", headers=headers)
     assert resp_recover.status_code == 200
     assert len(sink) == 2
+
+
+class _BatchSession:
+    def __init__(self, batches: list[list[dict[str, Any]]], written: asyncio.Event | None = None) -> None:
+        self._batches = batches
+        self._written = written
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def execute(self, _statement, params):
+        self._batches.append(list(params))
+        if self._written is not None:
+            self._written.set()
+
+    async def commit(self):
+        return None
+
+
+def test_audit_middleware_enqueues_when_writer_is_running(audit_app):
+    client, sink, _ = audit_app
+    batches: list[list[dict[str, Any]]] = []
+    writer = AuditLogWriter(lambda: _BatchSession(batches), max_queue=10, batch_size=50, flush_interval_s=60.0)
+    client.app.state.audit_writer = writer
+
+    headers = {"Authorization": "Bearer viewer"}
+    for _ in range(3):
+        assert client.get("/viewer", headers=headers).status_code == 200
+
+    assert sink == []
+    assert writer.backlog == 3
+    asyncio.run(writer.flush())
+    assert [len(batch) for batch in batches] == [3]
+    assert {record["path"] for record in batches[0]} == {"/viewer"}
+
+
+@pytest.mark.asyncio
+async def test_audit_writer_batches_drops_overflow_and_drains_on_close() -> None:
+    batches: list[list[dict[str, Any]]] = []
+    written = asyncio.Event()
+    writer = AuditLogWriter(lambda: _BatchSession(batches, written), max_queue=3, batch_size=2, flush_interval_s=60.0)
+
+    accepted = [writer.submit({"path": f"/p{idx}", "method": "GET", "status": 200}) for idx in range(4)]
+    writer.start()
+    await asyncio.wait_for(written.wait(), timeout=5.0)
+    await writer.close()
+
+    assert accepted == [True, True, True, False]
+    assert [[record["path"] for record in batch] for batch in batches] == [["/p0", "/p1"], ["/p2"]]
+    assert writer.backlog == 0
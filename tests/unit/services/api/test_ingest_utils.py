@@ -4,6 +4,7 @@ import hashlib
 import shutil
 from io import BytesIO
 from pathlib import Path
+from types import SimpleNamespace
 
 import httpx
 import pytest
@@ -83,6 +84,23 @@ def test_enqueue_import_task_uses_ingest_queue(monkeypatch):
     assert result.id == "task-1"
 
 
+def test_enqueue_import_task_routes_large_uploads_to_bulk_queue(monkeypatch):
+    recorded = {}
+
+    def fake_apply_async(*args, **kwargs):
+        recorded.update(kwargs)
+        return SimpleNamespace(id="task-2")
+
+    threshold = ingest_utils.settings.celery.bulk_import_threshold_bytes
+    upload = IngestUpload(uri="file:///tmp/big.csv", digest="hash", total_bytes=threshold, extension="csv")
+    monkeypatch.setattr(ingest_utils.task_import_file, "apply_async", fake_apply_async)
+    monkeypatch.setattr(ingest_utils.celery_app.conf, "task_always_eager", False, raising=False)
+
+    ingest_utils.enqueue_import_task(upload, report_type=None, force=False, log=ingest_utils.logger)
+    assert recorded["queue"] == "ingest_bulk"
+    assert recorded["priority"] == 9
+
+
 @pytest.mark.asyncio
 async def test_upload_file_to_minio_builds_uri(monkeypatch):
     class DummyClient:
@@ -320,6 +338,7 @@ async def test_write_stream_to_temp_too_large(monkeypatch):
         yield b"0123456789"
 
     monkeypatch.setattr(ingest_utils.settings, "MAX_REQUEST_BYTES", 5)
+    monkeypatch.delitem(ingest_utils.settings.__dict__, "ingestion", raising=False)
     with pytest.raises(ApiError):
         await ingest_utils._write_stream_to_temp(gen(), scheme="http")
 
@@ -127,7 +127,7 @@ async def test_rate_limiter_uses_token_when_available(monkeypatch: pytest.Monkey
 @pytest.mark.anyio
 async def test_rate_limit_allows_when_redis_errors(monkeypatch: pytest.MonkeyPatch):
     class BrokenRedis(FakeRedis):
-        async def incr(self, key):
+        async def eval(self, *args):
             raise RuntimeError("redis down")
 
     FastAPILimiter.redis = BrokenRedis()
@@ -9,15 +9,25 @@ from tests.fakes import FakeRedis
 pytestmark = pytest.mark.anyio
 
 
-async def test_fake_redis_ttl_and_reset(monkeypatch: pytest.MonkeyPatch):
-    redis = FakeRedis()
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> dict[str, float]:
     current = {"value": 100.0}
+    monkeypatch.setattr(FakeRedis, "_now", lambda _self: current["value"], raising=False)
+    return current
 
-    def _now() -> float:
-        return current["value"]
 
-    monkeypatch.setattr(redis, "_now", _now, raising=False)
+def _limiter(monkeypatch: pytest.MonkeyPatch, algorithm: str = "fixed_window", precheck: bool = False):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ALGORITHM", algorithm, raising=False)
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_PRECHECK", precheck, raising=False)
+    settings.__dict__.pop("limiter", None)
     limiter = rate_limit.SmartRateLimiter(settings)
+    settings.__dict__.pop("limiter", None)
+    return limiter
+
+
+async def test_fake_redis_ttl_and_reset(monkeypatch: pytest.MonkeyPatch, clock: dict[str, float]):
+    redis = FakeRedis()
+    limiter = _limiter(monkeypatch)
 
     allowed, remaining, reset = await limiter._consume(redis, "bucket", limit=2, window=5)
     assert allowed is True
@@ -34,8 +44,63 @@ async def test_fake_redis_ttl_and_reset(monkeypatch: pytest.MonkeyPatch):
     assert remaining == 0
     assert reset == 5
 
-    current["value"] += 6
+    clock["value"] += 6
     allowed, remaining, reset = await limiter._consume(redis, "bucket", limit=2, window=5)
     assert allowed is True
     assert remaining == 1
     assert reset == 5
+
+
+async def test_fixed_window_hits_do_not_extend_the_window(monkeypatch: pytest.MonkeyPatch, clock: dict[str, float]):
+    redis = FakeRedis()
+    limiter = _limiter(monkeypatch)
+
+    await limiter._consume(redis, "bucket", limit=5, window=5)
+    clock["value"] += 4
+    allowed, remaining, reset = await limiter._consume(redis, "bucket", limit=5, window=5)
+
+    assert (allowed, remaining, reset) == (True, 3, 1)
+
+
+async def test_gcra_spaces_requests_after_the_burst(monkeypatch: pytest.MonkeyPatch, clock: dict[str, float]):
+    redis = FakeRedis()
+    limiter = _limiter(monkeypatch, "gcra")
+
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[:2] == (True, 1)
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[:2] == (True, 0)
+    assert await limiter._consume(redis, "bucket", limit=2, window=10) == (False, 0, 5)
+
+    clock["value"] += 5
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[0] is True
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[0] is False
+
+
+async def test_sliding_window_weights_the_previous_bucket(monkeypatch: pytest.MonkeyPatch, clock: dict[str, float]):
+    redis = FakeRedis()
+    limiter = _limiter(monkeypatch, "sliding_window")
+
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[0] is True
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[0] is True
+    assert await limiter._consume(redis, "bucket", limit=2, window=10) == (False, 0, 11)
+
+    clock["value"] += 15
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[:2] == (True, 0)
+    assert (await limiter._consume(redis, "bucket", limit=2, window=10))[0] is False
+
+
+async def test_local_precheck_rejects_without_a_round_trip(monkeypatch: pytest.MonkeyPatch, clock: dict[str, float]):
+    class CountingRedis(FakeRedis):
+        calls = 0
+
+        async def eval(self, *args):
+            CountingRedis.calls += 1
+            return await super().eval(*args)
+
+    redis = CountingRedis()
+    limiter = _limiter(monkeypatch, precheck=True)
+
+    for _ in range(5):
+        allowed, _remaining, reset = await limiter._consume(redis, "bucket", limit=1, window=30)
+
+    assert (allowed, reset, CountingRedis.calls) == (False, 30, 2)
+    assert (await limiter._consume(CountingRedis(), "bucket", limit=1, window=30))[0] is True
@@ -23,6 +23,10 @@ class _DummyConnection:
         self.queries.append(query)
         return self.responses.pop(0)
 
+    async def execute(self, query: str, *params):
+        self.queries.append(query)
+        self.params = params
+
 
 class _DummyPool:
     def __init__(self, conn: _DummyConnection):
@@ -91,3 +95,20 @@ async def test_upsert_fee_rows_batches(monkeypatch: pytest.MonkeyPatch) -> None:
 
     assert summary == {"inserted": 1, "updated": 1}
     assert len(conn.queries) == 2
+
+
+@pytest.mark.anyio
+async def test_record_failed_fetches_stamps_an_attempt(monkeypatch: pytest.MonkeyPatch) -> None:
+    from services.fees_h10 import db_async
+
+    conn = _DummyConnection([])
+    monkeypatch.setattr(db_async, "_POOL", _DummyPool(conn), raising=False)
+
+    await db_async.record_failed_fetches([])
+    assert conn.queries == []
+
+    await db_async.record_failed_fetches(["GONE", "GONE"])
+
+    assert conn.params == (["GONE", "GONE"],)
+    assert "INSERT INTO fee_refresh_state (asin, last_fetched_at)" in conn.queries[0]
+    assert "fetch_count" not in conn.queries[0]
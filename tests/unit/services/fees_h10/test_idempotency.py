@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime, timedelta
+
 import pytest
 
 from services.fees_h10 import worker
+from services.fees_h10.planner import RefreshPlan
+
+PLANNED_AT = datetime(2024, 6, 1, 3, 0, tzinfo=UTC)
+
+
+def _plan(planned_at: datetime = PLANNED_AT) -> RefreshPlan:
+    return RefreshPlan(asins=["A1"], candidates=1, new_listings=0, overdue=1, fresh=0, planned_at=planned_at)
 
 
 class _StubSession:
@@ -36,7 +45,7 @@ def _install_stubs(monkeypatch: pytest.MonkeyPatch, stub_load_log, run_result) -
     engine = _StubEngine()
     monkeypatch.setattr(worker, "create_engine", lambda *a, **k: engine)
     monkeypatch.setattr(worker, "sessionmaker", lambda *a, **k: (lambda: session))
-    monkeypatch.setattr(worker, "list_active_asins", lambda: ["A1"])
+    monkeypatch.setattr(worker, "plan_refresh_asins", _plan)
 
     async def fake_run_refresh(asins):
         if isinstance(run_result, Exception):
@@ -64,6 +73,48 @@ def test_refresh_fees_idempotent_skip(monkeypatch: pytest.MonkeyPatch, stub_load
     assert engine.disposed
 
 
+def test_refresh_fees_reruns_when_the_same_asins_are_planned_again(
+    monkeypatch: pytest.MonkeyPatch, stub_load_log
+) -> None:
+    _install_stubs(
+        monkeypatch,
+        stub_load_log,
+        {"requested": 1, "processed": 1, "inserted": 0, "updated": 1, "failures": 0},
+    )
+    plans = iter([_plan(), _plan(PLANNED_AT + timedelta(hours=6))])
+    monkeypatch.setattr(worker, "plan_refresh_asins", lambda: next(plans))
+
+    worker.refresh_fees()
+    worker.refresh_fees()
+
+    assert [record["status"] for record in stub_load_log.values()] == ["success", "success"]
+
+
+def test_refresh_fees_skips_a_redelivered_run_even_when_it_replans(
+    monkeypatch: pytest.MonkeyPatch, stub_load_log
+) -> None:
+    _install_stubs(monkeypatch, stub_load_log, None)
+    runs: list[list[str]] = []
+
+    async def counting_run_refresh(asins):
+        runs.append(asins)
+        return {"requested": 1, "processed": 1, "inserted": 0, "updated": 1, "failures": 0}
+
+    monkeypatch.setattr(worker, "_run_refresh", counting_run_refresh)
+    plans = iter(_plan(PLANNED_AT + timedelta(minutes=minutes)) for minutes in range(3))
+    monkeypatch.setattr(worker, "plan_refresh_asins", lambda: next(plans))
+
+    worker.refresh_fees.apply(task_id="beat-1")
+    worker.refresh_fees.apply(task_id="beat-1")
+    worker.refresh_fees.apply(task_id="beat-2")
+
+    assert len(runs) == 2
+    assert [(record["task_id"], record["status"]) for record in stub_load_log.values()] == [
+        ("beat-1", "skipped"),
+        ("beat-2", "success"),
+    ]
+
+
 def test_refresh_fees_failure_marks_failed(monkeypatch: pytest.MonkeyPatch, stub_load_log) -> None:
     engine = _install_stubs(monkeypatch, stub_load_log, RuntimeError("boom"))
     with pytest.raises(RuntimeError):
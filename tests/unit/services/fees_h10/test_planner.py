@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from services.fees_h10 import worker
+from services.fees_h10.planner import RefreshCandidate, plan_refresh, roi_sensitivity
+
+NOW = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+def _fetched(
+    asin: str, *, days: float, fetches: int = 10, changes: int = 0, roi: float | None = None, now: datetime = NOW
+):
+    return RefreshCandidate(
+        asin=asin,
+        last_fetched_at=now - timedelta(days=days),
+        fetch_count=fetches,
+        change_count=changes,
+        roi_pct=roi,
+    )
+
+
+def _plan(candidates, **kwargs):
+    params = {"now": NOW, "budget": 0, "min_age_hours": 20, "max_age_days": 30, "roi_threshold": 5, "roi_band": 10}
+    params.update(kwargs)
+    return plan_refresh(candidates, **params)
+
+
+def test_plan_orders_new_then_overdue_then_priority() -> None:
+    candidates = [
+        _fetched("STABLE", days=3, changes=0),
+        _fetched("VOLATILE", days=3, changes=8),
+        _fetched("OVERDUE", days=45),
+        RefreshCandidate("NEW"),
+        _fetched("FRESH", days=0.2, changes=9),
+    ]
+    plan = _plan(candidates)
+    assert plan.asins == ["NEW", "OVERDUE", "VOLATILE", "STABLE"]
+    assert plan.as_meta() == {
+        "planned_at": NOW.isoformat(),
+        "candidates": 5,
+        "planned": 4,
+        "new_listings": 1,
+        "overdue": 1,
+        "fresh": 1,
+    }
+
+
+def test_plan_prefers_roi_near_threshold_and_respects_budget() -> None:
+    candidates = [
+        _fetched("FAR", days=5, changes=3, roi=80.0),
+        _fetched("EDGE", days=5, changes=3, roi=6.0),
+    ]
+    plan = _plan(candidates, budget=1)
+    assert plan.asins == ["EDGE"]
+    assert roi_sensitivity(5.0, threshold=5, band=10) == pytest.approx(1.0)
+    assert roi_sensitivity(None, threshold=5, band=10) == pytest.approx(0.5)
+
+
+def test_refresh_fees_fetches_planned_subset(monkeypatch: pytest.MonkeyPatch, stub_load_log) -> None:
+    class _Session:
+        def execute(self, *_a, **_k):
+            return None
+
+        def commit(self):
+            return None
+
+        def rollback(self):
+            return None
+
+        def close(self):
+            return None
+
+    class _Engine:
+        def dispose(self):
+            return None
+
+    seen: dict[str, list[str]] = {}
+
+    async def fake_run_refresh(asins):
+        seen["asins"] = list(asins)
+        return {"requested": len(asins), "processed": len(asins), "failures": 0, "inserted": 0, "updated": 0}
+
+    monkeypatch.setattr(worker, "create_engine", lambda *a, **k: _Engine())
+    monkeypatch.setattr(worker, "sessionmaker", lambda *a, **k: (lambda: _Session()))
+    monkeypatch.setattr(worker, "list_active_asins", lambda: ["A1", "A2", "A3"])
+    monkeypatch.setattr(
+        worker,
+        "load_refresh_candidates",
+        lambda asins: [
+            _fetched("A1", days=2, now=datetime.now(UTC)),
+            RefreshCandidate("A2"),
+            _fetched("A3", days=0.1, now=datetime.now(UTC)),
+        ],
+    )
+    monkeypatch.setattr(worker, "_run_refresh", fake_run_refresh)
+    monkeypatch.setattr(worker.SETTINGS, "H10_REFRESH_BUDGET", 5, raising=False)
+
+    worker.refresh_fees()
+
+    assert seen["asins"] == ["A2", "A1"]
+    record = next(iter(stub_load_log.values()))
+    assert record["payload_meta"]["planned"] == 2
+    assert record["payload_meta"]["fresh"] == 1
+
+
+def test_load_refresh_candidates_without_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(worker, "_database_configured", lambda: False)
+    assert worker.load_refresh_candidates(["A1"]) == [RefreshCandidate("A1")]
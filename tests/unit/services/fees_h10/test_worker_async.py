@@ -34,10 +34,17 @@ async def test_run_refresh_persists_rows(monkeypatch: pytest.MonkeyPatch) -> Non
     monkeypatch.setattr(worker, "close_http_client", fake_close, raising=False)
     monkeypatch.setattr(worker.db_async, "upsert_fee_rows", fake_upsert, raising=False)
     monkeypatch.setattr(worker.db_async, "close_pool", fake_close, raising=False)
+    failed: list[str] = []
+
+    async def fake_record_failed(asins):
+        failed.extend(asins)
+
+    monkeypatch.setattr(worker.db_async, "record_failed_fetches", fake_record_failed, raising=False)
 
     await worker._run_refresh(["OK", "FAIL"])
 
     assert rows and rows[0]["asin"] == "OK"
+    assert failed == ["FAIL"]
     assert closed["count"] == 2  # http + db
 
 
@@ -118,3 +125,127 @@ def test_fallback_async_to_sync_executes_event_loop() -> None:
 
     sync_fn = worker._fallback_async_to_sync(sample)
     assert sync_fn() == "ok"
+
+
+def _patch_pipeline(monkeypatch: pytest.MonkeyPatch, worker, fake_fetch, fake_upsert, **settings) -> list[str]:
+    failed: list[str] = []
+
+    async def fake_noop():
+        return None
+
+    async def fake_record_failed(asins):
+        failed.extend(asins)
+
+    monkeypatch.setattr(worker, "_database_configured", lambda: True, raising=False)
+    monkeypatch.setattr(worker, "fetch_fees", fake_fetch, raising=False)
+    monkeypatch.setattr(worker, "init_http_client", fake_noop, raising=False)
+    monkeypatch.setattr(worker, "close_http_client", fake_noop, raising=False)
+    monkeypatch.setattr(worker.db_async, "upsert_fee_rows", fake_upsert, raising=False)
+    monkeypatch.setattr(worker.db_async, "close_pool", fake_noop, raising=False)
+    monkeypatch.setattr(worker.db_async, "record_failed_fetches", fake_record_failed, raising=False)
+    for name, value in settings.items():
+        monkeypatch.setattr(worker.SETTINGS, name, value, raising=False)
+    return failed
+
+
+@pytest.mark.anyio
+async def test_bulk_flushes_every_n_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    from services.fees_h10 import worker
+
+    batches: list[list[str]] = []
+
+    async def fake_fetch(asin: str) -> dict[str, object]:
+        if asin == "FAIL":
+            raise httpx.TimeoutException("boom", request=httpx.Request("GET", "https://example.com"))
+        return {"asin": asin, "fulfil_fee": 1, "referral_fee": 1, "storage_fee": 0, "currency": "EUR"}
+
+    async def fake_upsert(rows):
+        batches.append([row["asin"] for row in rows])
+        return {"inserted": len(rows) - 1, "updated": 1}
+
+    failed = _patch_pipeline(
+        monkeypatch, worker, fake_fetch, fake_upsert, H10_MAX_CONCURRENCY=1, H10_WRITE_BATCH_ROWS=2
+    )
+
+    summary = await worker._run_refresh(["A1", "A2", "FAIL", "A3", "A4", "A5"])
+
+    assert batches == [["A1", "A2"], ["A3", "A4"], ["A5"]]
+    assert summary == {"requested": 6, "processed": 5, "failures": 1, "inserted": 2, "updated": 3}
+    assert failed == ["FAIL"]
+
+
+@pytest.mark.anyio
+async def test_failed_fetch_drops_out_of_the_next_plan(monkeypatch: pytest.MonkeyPatch) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from services.fees_h10 import worker
+    from services.fees_h10.planner import RefreshCandidate, plan_refresh
+
+    now = datetime.now(UTC)
+
+    async def fake_fetch(asin: str) -> dict[str, object]:
+        if asin == "DELISTED":
+            raise httpx.HTTPStatusError(
+                "404", request=httpx.Request("GET", "https://example.com"), response=httpx.Response(404)
+            )
+        return {"asin": asin, "fulfil_fee": 1, "referral_fee": 1, "storage_fee": 0, "currency": "EUR"}
+
+    async def fake_upsert(rows):
+        return {"inserted": len(rows), "updated": 0}
+
+    failed = _patch_pipeline(monkeypatch, worker, fake_fetch, fake_upsert)
+    stale = RefreshCandidate("STALE", last_fetched_at=now - timedelta(days=3), fetch_count=4, change_count=2)
+    options = {"now": now, "budget": 1, "min_age_hours": 20, "max_age_days": 30}
+    assert plan_refresh([RefreshCandidate("DELISTED"), stale], **options).asins == ["DELISTED"]
+
+    await worker._run_refresh(["DELISTED"])
+
+    attempted = [RefreshCandidate(asin, last_fetched_at=now) for asin in failed]
+    assert plan_refresh([*attempted, stale], **options).asins == ["STALE"]
+
+
+@pytest.mark.anyio
+async def test_bulk_writes_rows_before_fetching_finishes(monkeypatch: pytest.MonkeyPatch) -> None:
+    from services.fees_h10 import worker
+
+    written = asyncio.Event()
+
+    async def fake_fetch(asin: str) -> dict[str, object]:
+        if asin == "LAST":
+            # Only completes once earlier rows were flushed by the timer, not by the final drain.
+            await written.wait()
+        return {"asin": asin, "fulfil_fee": 1, "referral_fee": 1, "storage_fee": 0, "currency": "EUR"}
+
+    async def fake_upsert(rows):
+        written.set()
+        return {"inserted": len(rows), "updated": 0}
+
+    _patch_pipeline(
+        monkeypatch,
+        worker,
+        fake_fetch,
+        fake_upsert,
+        H10_MAX_CONCURRENCY=2,
+        H10_WRITE_BATCH_ROWS=100,
+        H10_WRITE_FLUSH_S=0.01,
+    )
+
+    summary = await asyncio.wait_for(worker._run_refresh(["A1", "LAST"]), timeout=5)
+
+    assert summary["processed"] == 2
+
+
+@pytest.mark.anyio
+async def test_bulk_writer_failure_cancels_fetchers(monkeypatch: pytest.MonkeyPatch) -> None:
+    from services.fees_h10 import worker
+
+    async def fake_fetch(asin: str) -> dict[str, object]:
+        return {"asin": asin, "fulfil_fee": 1, "referral_fee": 1, "storage_fee": 0, "currency": "EUR"}
+
+    async def fake_upsert(_rows):
+        raise RuntimeError("db down")
+
+    _patch_pipeline(monkeypatch, worker, fake_fetch, fake_upsert, H10_MAX_CONCURRENCY=2, H10_WRITE_BATCH_ROWS=1)
+
+    with pytest.raises(RuntimeError, match="db down"):
+        await asyncio.wait_for(worker._run_refresh([f"A{i}" for i in range(20)]), timeout=5)
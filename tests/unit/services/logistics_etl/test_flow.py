@@ -38,7 +38,7 @@ async def test_full_idempotent_skips_second_run(monkeypatch):
         "error": None,
     }
 
-    async def fake_fetch_sources():
+    async def fake_open_sources(semaphore=None):
         return [snapshot]
 
     seen_pairs: set[tuple[str, str]] = set()
@@ -63,7 +63,7 @@ async def test_full_idempotent_skips_second_run(monkeypatch):
         upserts["count"] += 1
         return {"inserted": len(kwargs["rows"]), "updated": 0, "skipped": 0}
 
-    monkeypatch.setattr(client, "fetch_sources", fake_fetch_sources)
+    monkeypatch.setattr(client, "open_sources", fake_open_sources)
     monkeypatch.setattr(repository, "seen_load", fake_seen)
     monkeypatch.setattr(repository, "mark_load", fake_mark)
     monkeypatch.setattr(repository, "upsert_many", fake_upsert_many)
@@ -94,7 +94,7 @@ async def test_full_records_failure(monkeypatch):
         lambda job, processed, errors, duration_s: None,
     )
 
-    async def fake_fetch_sources():
+    async def fake_open_sources(semaphore=None):
         return [
             {
                 "source": "http://example.com/bad.csv",
@@ -108,7 +108,7 @@ async def test_full_records_failure(monkeypatch):
     async def never_called(*args, **kwargs):
         raise AssertionError("repository function should not be called on failure")
 
-    monkeypatch.setattr(client, "fetch_sources", fake_fetch_sources)
+    monkeypatch.setattr(client, "open_sources", fake_open_sources)
     monkeypatch.setattr(repository, "seen_load", never_called)
     monkeypatch.setattr(repository, "mark_load", never_called)
     monkeypatch.setattr(repository, "upsert_many", never_called)
@@ -119,3 +119,61 @@ async def test_full_records_failure(monkeypatch):
     assert entry["skipped"] is False
 
     assert retry_calls == [("logistics_etl", "RuntimeError")]
+
+
+@pytest.mark.asyncio
+async def test_full_streams_sources_in_bounded_batches(monkeypatch, tmp_path):
+    monkeypatch.setattr(flow, "record_etl_batch", lambda *a, **k: None)
+    payload = (
+        b"carrier,origin,dest,service,eur_per_kg,effective_from\n"
+        b"DHL,DE,FR,Express,1.25,2024-01-01\n"
+        b"UPS,IT,ES,Standard,2.5,2024-02-01\n"
+        b"GLS,NL,DE,Economy,0.95,2024-03-01\n"
+    )
+    spool = tmp_path / "spool.csv"
+    spool.write_bytes(payload)
+    streams: list[client.SourceStream] = []
+
+    async def fake_open_sources(semaphore=None):
+        stream = client.SourceStream(
+            source="s3://bucket/rates.csv",
+            path=spool,
+            meta={"content_type": "text/csv"},
+            sha256="abc",
+            size=len(payload),
+        )
+        streams.append(stream)
+        return [stream]
+
+    marked: list[tuple] = []
+    batches: list[int] = []
+
+    async def fake_seen(source, sha256, seqno):
+        return bool(marked)
+
+    async def fake_mark(source, sha256, seqno, rows):
+        marked.append((source, sha256, rows))
+
+    async def fake_upsert_many(**kwargs):
+        batches.append(len(kwargs["rows"]))
+        return {"inserted": len(kwargs["rows"]), "updated": 0, "skipped": 0}
+
+    monkeypatch.setattr(client, "open_sources", fake_open_sources)
+    monkeypatch.setattr(repository, "seen_load", fake_seen)
+    monkeypatch.setattr(repository, "mark_load", fake_mark)
+    monkeypatch.setattr(repository, "upsert_many", fake_upsert_many)
+    monkeypatch.setenv("LOGISTICS_UPSERT_BATCH_SIZE", "2")
+
+    first = await flow.full()
+    assert batches == [2, 1]
+    assert first[0]["rows_in"] == 3
+    assert first[0]["rows_upserted"] == 3
+    assert marked == [("s3://bucket/rates.csv", "abc", 3)]
+    assert streams[0].path is None and not spool.exists()
+
+    spool.write_bytes(payload)
+    second = await flow.full()
+    assert second[0]["skipped"] is True
+    assert second[0]["rows_in"] == 0
+    assert streams[1].rows_read == 0
+    assert batches == [2, 1]
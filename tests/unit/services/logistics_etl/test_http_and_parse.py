@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import builtins
+import hashlib
+import io
 from decimal import Decimal
 from pathlib import Path
 
 import pytest
+from httpx import MockTransport, Request, Response
 
+from awa_common.http_client import AsyncHTTPClient
 from services.logistics_etl import client
 
 
@@ -158,3 +162,41 @@ async def test_fetch_rates_normalizes_values(monkeypatch) -> None:
     assert rows[0]["carrier"] == "DHL"
     assert rows[0]["eur_per_kg"] == pytest.approx(1.5)
     assert rows[1]["eur_per_kg"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_stream_http_spools_and_hashes_incrementally(monkeypatch) -> None:
+    fixture_path = Path(__file__).resolve().parents[3] / "fixtures" / "logistics_etl" / "rates_sample.csv"
+    payload = fixture_path.read_bytes()
+
+    def handler(request: Request) -> Response:
+        return Response(200, request=request, content=payload, headers={"content-type": "text/csv", "etag": '"e1"'})
+
+    http = AsyncHTTPClient(integration="test", transport=MockTransport(handler), max_retries=1, total_timeout_s=5)
+
+    async def _fake_client(**kwargs):
+        return http
+
+    monkeypatch.setattr(client, "_ensure_http_client", _fake_client, raising=False)
+    monkeypatch.setattr(client, "_CHUNK_SIZE", 16)
+    stream = await client._stream_http("https://example.com/rates.csv", timeout_s=5)
+    try:
+        assert stream.sha256 == hashlib.sha256(payload).hexdigest()
+        assert stream.size == len(payload)
+        assert stream.meta["seqno"] == "e1"
+        rows = list(stream.iter_rows())
+        assert [row["carrier"] for row in rows] == ["DHL", "UPS", "FedEx"]
+        assert stream.rows_read == 3
+    finally:
+        spool_path = stream.path
+        stream.close()
+        await http.aclose()
+    assert spool_path is not None and not spool_path.exists()
+
+
+def test_iter_csv_rows_sniffs_dialect_and_strips_bom() -> None:
+    payload = "\ufeffcarrier;origin;dest;service;eur_per_kg\nDHL;DE;FR;Express;1.25\nUPS;IT;ES;Standard;\n".encode()
+    rows = list(client._iter_csv_rows("s3://bucket/rates.csv", io.BytesIO(payload)))
+    assert len(rows) == 1
+    assert rows[0]["carrier"] == "DHL"
+    assert rows[0]["eur_per_kg"] == Decimal("1.25")
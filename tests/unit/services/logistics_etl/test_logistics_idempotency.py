@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
-from services.logistics_etl import flow
+from services.logistics_etl import client, flow, repository
 
 
 class _StubSession:
@@ -10,16 +12,19 @@ class _StubSession:
         self.executed: list[tuple] = []
         self.closed = False
 
-    def execute(self, stmt, params=None):
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
+
+    async def execute(self, stmt, params=None):
         self.executed.append((stmt, params))
 
-    def commit(self):
+    async def commit(self):
         return None
 
-    def rollback(self):
+    async def rollback(self):
         return None
 
-    def close(self):
+    async def close(self):
         self.closed = True
 
 
@@ -27,19 +32,29 @@ class _StubEngine:
     def __init__(self) -> None:
         self.disposed = False
 
-    def dispose(self):
+    async def dispose(self):
         self.disposed = True
 
 
+def _install_engine(monkeypatch: pytest.MonkeyPatch, session: _StubSession) -> _StubEngine:
+    engine = _StubEngine()
+    monkeypatch.setattr(repository, "_engine", engine)
+    monkeypatch.setattr(flow, "async_sessionmaker", lambda *a, **k: (lambda: session))
+    return engine
+
+
 def _install_success(monkeypatch: pytest.MonkeyPatch, stub_load_log):
     session = _StubSession()
-    engine = _StubEngine()
     snapshot = {"source": "s3://example/rates.csv", "raw": b"123", "meta": {"seqno": "1"}, "rows": [1, 2]}
+    loops: list[asyncio.AbstractEventLoop] = []
 
-    async def fake_collect_inputs():
+    async def fake_collect_inputs(semaphore=None):
+        loops.append(asyncio.get_running_loop())
         return [snapshot], []
 
     async def fake_process(snapshots, **kwargs):
+        loops.append(asyncio.get_running_loop())
+        assert kwargs["semaphore"] is not None
         return [
             {
                 "source": snapshots[0]["source"],
@@ -52,18 +67,22 @@ def _install_success(monkeypatch: pytest.MonkeyPatch, stub_load_log):
 
     monkeypatch.setattr(flow, "_collect_inputs", fake_collect_inputs)
     monkeypatch.setattr(flow, "_process_snapshots", fake_process)
-    monkeypatch.setattr(flow, "create_engine", lambda *a, **k: engine)
-    monkeypatch.setattr(flow, "sessionmaker", lambda *a, **k: (lambda: session))
-    return engine
+    return session, loops
 
 
 def test_logistics_run_skips_duplicate(monkeypatch: pytest.MonkeyPatch, stub_load_log) -> None:
-    engine = _install_success(monkeypatch, stub_load_log)
+    session, loops = _install_success(monkeypatch, stub_load_log)
+    engine = _install_engine(monkeypatch, session)
 
     flow.run_once_with_guard(dry_run=False)
     statuses_first = {record["status"] for record in stub_load_log.values()}
     assert "success" in statuses_first
+    assert len(loops) == 2 and loops[0] is loops[1]
+    assert session.executed and session.closed
+    assert engine.disposed
+    assert repository._engine is None
 
+    engine = _install_engine(monkeypatch, session)
     flow.run_once_with_guard(dry_run=False)
     statuses_second = {record["status"] for record in stub_load_log.values()}
     assert "skipped" in statuses_second
@@ -72,9 +91,9 @@ def test_logistics_run_skips_duplicate(monkeypatch: pytest.MonkeyPatch, stub_loa
 
 def test_logistics_run_failure(monkeypatch: pytest.MonkeyPatch, stub_load_log) -> None:
     session = _StubSession()
-    engine = _StubEngine()
+    engine = _install_engine(monkeypatch, session)
 
-    async def fake_collect_inputs():
+    async def fake_collect_inputs(semaphore=None):
         return ([{"source": "s3://example.csv", "raw": b"", "meta": {}, "rows": []}], [])
 
     async def boom(_snapshots, **_kwargs):
@@ -82,11 +101,30 @@ def test_logistics_run_failure(monkeypatch: pytest.MonkeyPatch, stub_load_log) -
 
     monkeypatch.setattr(flow, "_collect_inputs", fake_collect_inputs)
     monkeypatch.setattr(flow, "_process_snapshots", boom)
-    monkeypatch.setattr(flow, "create_engine", lambda *a, **k: engine)
-    monkeypatch.setattr(flow, "sessionmaker", lambda *a, **k: (lambda: session))
 
     with pytest.raises(RuntimeError):
         flow.run_once_with_guard(dry_run=False)
     statuses = {record["status"] for record in stub_load_log.values()}
     assert "failed" in statuses
     assert engine.disposed
+
+
+@pytest.mark.asyncio
+async def test_open_sources_bounds_concurrent_downloads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOGISTICS_SOURCES", "s3://b/a.csv,s3://b/b.csv,s3://b/c.csv")
+    active = {"now": 0, "peak": 0}
+    both_running = asyncio.Event()
+
+    async def fake_stream(uri, *, timeout_s, retries):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        if active["now"] == 2:
+            both_running.set()
+        await asyncio.wait_for(both_running.wait(), timeout=1)
+        active["now"] -= 1
+        return client.SourceStream(uri, None, {})
+
+    monkeypatch.setattr(client, "_stream_with_retries", fake_stream)
+    streams = await client.open_sources(asyncio.Semaphore(2))
+    assert [stream.source for stream in streams] == ["s3://b/a.csv", "s3://b/b.csv", "s3://b/c.csv"]
+    assert active["peak"] == 2
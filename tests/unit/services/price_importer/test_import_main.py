@@ -97,3 +97,63 @@ def test_merge_mappings_and_safe_value():
     assert "unit_price" not in merged  # confidence too low keeps heuristic
     assert importer._safe_value(None) is None
     assert importer._safe_value({"x": 1}) == "{'x': 1}"
+
+
+def _mapping_repo(cached):
+    class MappingRepo:
+        def __init__(self) -> None:
+            self.saved: list[tuple] = []
+            self.lookups: list[tuple] = []
+
+        def ensure_vendor(self, vendor: str) -> int:
+            return 3
+
+        def upsert_prices(self, vendor_id, batch, dry_run=False):
+            return len(batch), 0
+
+        def get_column_mapping(self, vendor_id, signature):
+            self.lookups.append((vendor_id, signature))
+            return cached
+
+        def save_column_mapping(self, vendor_id, signature, mapping, source="heuristic"):
+            self.saved.append((vendor_id, signature, mapping, source))
+
+    return MappingRepo()
+
+
+def test_main_persists_resolved_mapping_on_cache_miss(monkeypatch, tmp_path):
+    importer = _get_importer_module()
+    tmp_file = tmp_path / "prices.csv"
+    tmp_file.write_text("Item Code,Unit Cost,Currency\nA1,1,EUR\n", encoding="utf-8")
+    repo = _mapping_repo(None)
+    monkeypatch.setattr(importer, "_bootstrap_observability", lambda: None, raising=False)
+    monkeypatch.setattr(importer, "Repository", lambda: repo, raising=False)
+
+    assert importer.main([str(tmp_file), "--vendor", "ACME"]) == 0
+    assert len(repo.saved) == 1
+    _vendor_id, signature, mapping, source = repo.saved[0]
+    assert signature == repo.lookups[0][1]
+    assert mapping["cost"] == "Unit Cost"
+    assert source == "heuristic"
+
+
+def test_main_uses_cached_mapping(monkeypatch, tmp_path):
+    importer = _get_importer_module()
+    tmp_file = tmp_path / "prices.csv"
+    tmp_file.write_text("artikel ,PREIS\nA1,1\n", encoding="utf-8")
+    repo = _mapping_repo({"sku": "Artikel", "cost": "Preis"})
+    seen: dict[str, object] = {}
+
+    async def _fake_batches(*_a, mapping=None, columns=None, **_k):
+        seen["mapping"] = mapping
+        seen["columns"] = columns
+        yield [{"sku": "A1", "unit_price": Decimal("1"), "currency": "EUR", "moq": 0, "lead_time_d": 0}]
+
+    monkeypatch.setattr(importer, "_bootstrap_observability", lambda: None, raising=False)
+    monkeypatch.setattr(importer, "iter_price_batches", _fake_batches, raising=False)
+    monkeypatch.setattr(importer, "Repository", lambda: repo, raising=False)
+
+    assert importer.main([str(tmp_file), "--vendor", "ACME"]) == 0
+    assert seen["mapping"] == {"sku": "Artikel", "cost": "Preis"}
+    assert seen["columns"] == {"sku": "artikel ", "cost": "PREIS"}
+    assert repo.saved == []
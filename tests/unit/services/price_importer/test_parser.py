@@ -8,7 +8,7 @@ from sqlalchemy import create_engine, select
 
 from awa_common.models_vendor import VendorPrice
 from services.price_importer import reader
-from services.price_importer.normaliser import guess_columns, normalise
+from services.price_importer.normaliser import bind_columns, guess_columns, header_signature, normalise, resolve_columns
 from services.price_importer.repository import Repository
 
 
@@ -28,6 +28,15 @@ def test_normalise_handles_missing_headers() -> None:
     assert normalised.iloc[0]["sku"] == "SKU-1"
 
 
+def test_stored_mapping_binds_to_headers_with_the_same_signature() -> None:
+    stored = {"sku": "Artikel", "cost": "Preis", "moq": None}
+    headers = [" artikel ", "PREIS"]
+
+    assert header_signature(headers) == header_signature(["Artikel", "Preis"])
+    assert bind_columns(headers, stored) == {"sku": " artikel ", "cost": "PREIS"}
+    assert resolve_columns(headers, stored)["cost"] == "PREIS"
+
+
 def test_reader_loads_fixture_and_filters_invalid_rows() -> None:
     fixture = Path("tests/fixtures/price_importer/sample.csv")
     assert reader.detect_format(fixture) == "csv"
@@ -99,3 +108,68 @@ def test_upsert_prices_counts_duplicates_in_dry_run() -> None:
 
     assert inserted == 1
     assert updated == 1
+
+
+def test_merge_prices_reports_unchanged_and_changed_skus() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    repo = Repository(engine)
+    vendor_id = repo.ensure_vendor("MergeVendor")
+
+    rows = [
+        {"sku": "SKU-1", "unit_price": Decimal("10.00"), "currency": "EUR", "moq": 1, "lead_time_d": 2},
+        {"sku": "SKU-2", "unit_price": Decimal("5.00"), "currency": "USD", "moq": 0, "lead_time_d": 0},
+    ]
+    first = repo.merge_prices(vendor_id, rows)
+    assert (first.inserted, first.updated, first.unchanged) == (2, 0, 0)
+    assert first.changed_skus == {"SKU-1", "SKU-2"}
+
+    rows[0]["unit_price"] = Decimal("11.00")
+    second = repo.merge_prices(vendor_id, [*rows, {"sku": "SKU-3", "unit_price": Decimal("1.00"), "moq": 0}])
+    assert (second.inserted, second.updated, second.unchanged) == (1, 1, 1)
+    assert second.changed_skus == {"SKU-1", "SKU-3"}
+
+
+def test_copy_into_stage_uses_psycopg2_copy_expert_fallback() -> None:
+    from services.price_importer import repository as repo_module
+
+    class _Cursor:
+        def __init__(self) -> None:
+            self.sql = ""
+            self.payload = ""
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def copy_expert(self, sql, buf):
+            self.sql = sql
+            self.payload = buf.read()
+
+    cursor = _Cursor()
+
+    class _Conn:
+        class connection:  # noqa: N801 - mimics SQLAlchemy attribute layout
+            class driver_connection:  # noqa: N801
+                @staticmethod
+                def cursor():
+                    return cursor
+
+    repo_module._copy_into_stage(
+        _Conn(),
+        [{"vendor_id": 1, "sku": "A", "cost": Decimal("1.50"), "moq": None, "lead_time_days": 0, "currency": "EUR"}],
+    )
+    assert cursor.sql.startswith("COPY vendor_prices_stage")
+    assert cursor.payload.strip() == "1,A,1.50,,0,EUR"
+
+
+def test_column_mapping_round_trip() -> None:
+    engine = create_engine("sqlite:///:memory:", future=True)
+    repo = Repository(engine)
+    vendor_id = repo.ensure_vendor("MappingVendor")
+
+    assert repo.get_column_mapping(vendor_id, "sig") is None
+    repo.save_column_mapping(vendor_id, "sig", {"sku": "Item"}, source="llm")
+    repo.save_column_mapping(vendor_id, "sig", {"sku": "Item", "cost": "Price"})
+    assert repo.get_column_mapping(vendor_id, "sig") == {"sku": "Item", "cost": "Price"}
@@ -221,3 +221,21 @@ def test_run_alertbot_startup_validation_alert_error(monkeypatch):
     monkeypatch.setitem(sys.modules, "services.alert_bot.worker", stub)
     with pytest.raises(DummyError):
         celery_module._run_alertbot_startup_validation()
+
+
+def test_worker_metrics_exporter_starts_on_worker_init_only(monkeypatch, reload_celery_module):
+    from celery.signals import worker_init
+
+    from awa_common import metrics
+
+    started = []
+    monkeypatch.setenv("BROKER_URL", "redis://localhost/0")
+    monkeypatch.setenv("CELERY_TASK_ALWAYS_EAGER", "false")
+    monkeypatch.setattr(metrics, "enable_celery_metrics", lambda *args, **kwargs: None)
+    monkeypatch.setattr(metrics, "start_worker_metrics_http_if_enabled", lambda: started.append(True))
+
+    reload_celery_module(celery_module)
+    assert started == []  # importing the app (beat, readiness API) must not bind the exporter port
+
+    worker_init.send(sender=None)
+    assert started == [True]
@@ -1,6 +1,13 @@
+import asyncio
+import functools
+import hashlib
+import threading
 from email.message import EmailMessage
 
+from imapclient import IMAPClient
+
 from services.worker import email_watcher
+from tests.fakes.imap_server import FakeIMAPServer
 
 
 class DummyS3:
@@ -11,29 +18,17 @@ class DummyS3:
         self.uploads.append((tmp_path, bucket, key))
 
 
-class DummyEngine:
+class DummyImportTask:
     def __init__(self):
-        self.executed = []
+        self.calls = []
 
-    def begin(self):
-        return self
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
-
-    def execute(self, stmt, params):
-        self.executed.append((str(stmt), params))
-
-    def dispose(self):
-        return None
+    def apply_async(self, args=None, kwargs=None, **options):
+        self.calls.append((args, kwargs, options))
 
 
 class DummyIMAP:
-    def __init__(self, message_bytes):
-        self.message_bytes = message_bytes
+    def __init__(self, *messages):
+        self.messages = dict(enumerate(messages, start=1))
         self.flags = []
 
     def __enter__(self):
@@ -50,13 +45,13 @@ class DummyIMAP:
         assert name == "INBOX"
 
     def search(self, criteria):
-        return [1]
+        return list(self.messages)
 
-    def fetch(self, uid, fields):
-        return {uid: {b"RFC822": self.message_bytes}}
+    def fetch(self, uids, fields):
+        return {uid: {b"RFC822": self.messages[uid]} for uid in uids}
 
-    def add_flags(self, uid, flags):
-        self.flags.append((uid, flags))
+    def add_flags(self, uids, flags):
+        self.flags.append((uids, flags))
 
 
 def test_email_watcher_main(monkeypatch):
@@ -73,12 +68,187 @@ def test_email_watcher_main(monkeypatch):
 
     dummy_s3 = DummyS3()
     monkeypatch.setattr(email_watcher, "create_boto3_client", lambda **_kwargs: dummy_s3)
-    dummy_engine = DummyEngine()
-    monkeypatch.setattr(email_watcher, "create_engine", lambda *_: dummy_engine)
-    monkeypatch.setattr(email_watcher.load_csv, "main", lambda args: ("load-1", 2))
-    monkeypatch.setattr(email_watcher, "IMAPClient", lambda host: DummyIMAP(raw))
+    import_task = DummyImportTask()
+    monkeypatch.setattr(email_watcher, "task_import_file", import_task)
+    imap = DummyIMAP(raw)
+    monkeypatch.setattr(email_watcher, "IMAPClient", lambda host: imap)
 
     result = email_watcher.main()
     assert result == {"status": "success"}
-    assert dummy_s3.uploads, "expected upload to be called"
-    assert dummy_engine.executed[0][1]["n"] == 2
+    ((_, bucket, key),) = dummy_s3.uploads
+    digest = hashlib.sha256(b"col\n1\n").hexdigest()
+    assert key.endswith(f"/{digest[:16]}/report.csv")
+    assert import_task.calls == [
+        (
+            [f"minio://{bucket}/{key}"],
+            {"report_type": None, "force": False, "idempotency_key": digest},
+            {"queue": "ingest", "priority": 0},
+        )
+    ]
+    assert imap.flags == [([1], ["\\Seen"])]
+
+
+def test_mailbox_prepares_messages_concurrently_and_skips_failures(monkeypatch):
+    dummy_s3 = DummyS3()
+    monkeypatch.setattr(email_watcher, "create_boto3_client", lambda **_kwargs: dummy_s3)
+    import_task = DummyImportTask()
+    monkeypatch.setattr(email_watcher, "task_import_file", import_task)
+    in_flight = 0
+    peak = 0
+    all_started = asyncio.Event()
+
+    async def classify(_client, payload):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        if in_flight == 3:
+            all_started.set()
+        await asyncio.wait_for(all_started.wait(), timeout=5)
+        in_flight -= 1
+        if payload["subject"] == "broken":
+            raise RuntimeError("llm exploded")
+        return None, None
+
+    monkeypatch.setattr(email_watcher, "_classify_email_async", classify)
+    imap = DummyIMAP(*(_price_list(subject) for subject in ("a", "broken", "b", "c")))
+    persisted = []
+
+    class Store:
+        def persist_messages(self, items):
+            persisted.append([payload["subject"] for payload, _, _ in items])
+
+    with asyncio.Runner() as runner:
+        mailbox = email_watcher._Mailbox(runner)
+        mailbox.llm_enabled, mailbox.llm_client, mailbox.store = True, object(), Store()
+        mailbox.concurrency, mailbox.batch_size = 3, 3
+        processed = mailbox.process_unseen(imap)
+
+    assert processed == 3
+    assert peak == 3
+    assert persisted == [["a", "b"], ["c"]]
+    assert imap.flags == [([1, 3], ["\\Seen"]), ([4], ["\\Seen"])]
+    assert len(import_task.calls) == 3
+
+
+def _price_list(subject: str) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = "vendor@example.com"
+    msg["To"] = "dest@example.com"
+    msg["Subject"] = subject
+    msg.set_content("prices attached")
+    msg.add_attachment(b"col\n1\n", maintype="text", subtype="csv", filename=f"{subject}.csv")
+    return msg.as_bytes()
+
+
+def _start_watcher(monkeypatch, server, **options):
+    monkeypatch.setenv("IMAP_HOST", server.host)
+    monkeypatch.setenv("IMAP_USER", "user")
+    monkeypatch.setenv("IMAP_PASS", "pass")
+    dummy_s3 = DummyS3()
+    monkeypatch.setattr(email_watcher, "create_boto3_client", lambda **_kwargs: dummy_s3)
+    monkeypatch.setattr(email_watcher, "task_import_file", DummyImportTask())
+    monkeypatch.setattr(email_watcher, "IMAPClient", functools.partial(IMAPClient, port=server.port, ssl=False))
+    monkeypatch.setattr(email_watcher, "_RECONNECT_BACKOFF_BASE_S", 0.01)
+    monkeypatch.setattr(email_watcher, "_IDLE_CHECK_S", 0.05)
+    stop = threading.Event()
+    thread = threading.Thread(target=email_watcher.watch, kwargs={"stop": stop, **options}, daemon=True)
+    thread.start()
+    return dummy_s3, stop, thread
+
+
+def _uploaded(s3: DummyS3) -> list[str]:
+    return sorted(key.rsplit("/", 1)[1] for _, _, key in s3.uploads)
+
+
+def test_watch_idle_processes_new_mail_and_reconnects(monkeypatch):
+    with FakeIMAPServer(idle=True) as server:
+        server.add_message(_price_list("backlog"))
+        s3, stop, thread = _start_watcher(monkeypatch, server, idle_timeout_s=30.0)
+        try:
+            assert server.wait_until_seen(1)
+            server.add_message(_price_list("pushed"))
+            assert server.wait_until_seen(2)
+
+            server.disconnect_all()
+            server.add_message(_price_list("after-drop"))
+            assert server.wait_until_seen(3)
+        finally:
+            stop.set()
+            thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert _uploaded(s3) == ["after-drop.csv", "backlog.csv", "pushed.csv"]
+    assert server.logins == 2
+    assert server.idle_commands >= 1
+
+
+def test_watch_falls_back_to_polling_without_idle(monkeypatch):
+    with FakeIMAPServer(idle=False) as server:
+        s3, stop, thread = _start_watcher(monkeypatch, server, poll_interval_s=0.05)
+        try:
+            server.add_message(_price_list("polled"))
+            assert server.wait_until_seen(1)
+        finally:
+            stop.set()
+            thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert _uploaded(s3) == ["polled.csv"]
+    assert server.logins == 1
+    assert server.idle_commands == 0
+
+
+class _RecordingStop(threading.Event):
+    def __init__(self, waits: int):
+        super().__init__()
+        self.waits: list[float] = []
+        self._remaining = waits
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self.set()
+        return self.is_set()
+
+
+def test_watch_keeps_backing_off_when_server_drops_right_after_login(monkeypatch):
+    class DroppingIMAP(DummyIMAP):
+        def search(self, criteria):
+            raise ConnectionResetError("dropped after login")
+
+    monkeypatch.setenv("IMAP_HOST", "imap.example.com")
+    monkeypatch.setenv("IMAP_USER", "user")
+    monkeypatch.setenv("IMAP_PASS", "pass")
+    monkeypatch.setattr(email_watcher, "create_boto3_client", lambda **_kwargs: DummyS3())
+    monkeypatch.setattr(email_watcher, "IMAPClient", lambda host: DroppingIMAP())
+    monkeypatch.setattr(email_watcher, "_RECONNECT_BACKOFF_BASE_S", 1.0)
+    stop = _RecordingStop(waits=4)
+
+    email_watcher.watch(stop=stop, reconnect_backoff_max_s=5.0)
+
+    assert stop.waits == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_watch_survives_a_failed_pass_without_reconnecting(monkeypatch):
+    class FlakyImportTask(DummyImportTask):
+        def apply_async(self, args=None, kwargs=None, **options):
+            if not self.calls:
+                self.calls.append(None)
+                raise RuntimeError("broker unavailable")
+            super().apply_async(args, kwargs, **options)
+
+    with FakeIMAPServer(idle=False) as server:
+        server.add_message(_price_list("retried"))
+        s3, stop, thread = _start_watcher(monkeypatch, server, poll_interval_s=0.05)
+        import_task = FlakyImportTask()
+        monkeypatch.setattr(email_watcher, "task_import_file", import_task)
+        try:
+            assert server.wait_until_seen(1)
+            assert thread.is_alive()
+        finally:
+            stop.set()
+            thread.join(timeout=10)
+
+    assert len(import_task.calls) == 2
+    assert server.logins == 1
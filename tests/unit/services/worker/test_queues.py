@@ -0,0 +1,82 @@
+import os
+import types
+
+import pytest
+
+from awa_common.configuration import CelerySettings
+from awa_common.settings import settings
+from services.worker import queues
+from services.worker.celery_app import celery_app
+
+
+def _cfg(**overrides) -> CelerySettings:
+    return CelerySettings.from_settings(settings).model_copy(update=overrides)
+
+
+def test_import_route_sends_large_files_to_bulk_queue():
+    cfg = _cfg(bulk_import_threshold_bytes=1024)
+
+    assert queues.import_route(1023, cfg) == {"queue": "ingest", "priority": queues.INTERACTIVE_PRIORITY}
+    assert queues.import_route(None, cfg) == {"queue": "ingest", "priority": queues.INTERACTIVE_PRIORITY}
+    assert queues.import_route(1024, cfg) == {"queue": "ingest_bulk", "priority": queues.BULK_PRIORITY}
+    assert queues.import_route(10**12, _cfg(bulk_import_threshold_bytes=0))["queue"] == "ingest"
+
+
+def test_worker_pools_use_per_queue_settings():
+    pools = queues.worker_pools(_cfg(ingest_bulk_concurrency=3, notifications_prefetch_multiplier=8))
+
+    assert set(pools) == set(queues.QUEUE_NAMES)
+    assert pools["ingest_bulk"].concurrency == 3
+    assert pools["notifications"].prefetch_multiplier == 8
+    assert pools["ingest_bulk"].worker_argv(loglevel="DEBUG") == [
+        "worker",
+        "--queues=ingest_bulk",
+        "--hostname=ingest_bulk@%h",
+        "--concurrency=3",
+        "--prefetch-multiplier=1",
+        "--loglevel=DEBUG",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("task_name", "queue", "priority"),
+    [
+        ("ingest.import_file", "ingest", queues.INTERACTIVE_PRIORITY),
+        ("ingest.import_shard", "ingest_bulk", queues.BULK_PRIORITY),
+        ("db.refresh_roi_mvs", "maintenance", queues.MAINTENANCE_PRIORITY),
+        ("ingest.maintenance_nightly", "maintenance", queues.MAINTENANCE_PRIORITY),
+        ("fees.refresh", "maintenance", queues.MAINTENANCE_PRIORITY),
+        ("alertbot.deliver", "notifications", queues.NOTIFICATIONS_PRIORITY),
+    ],
+)
+def test_celery_app_routes_tasks_to_named_queues(task_name, queue, priority):
+    route = celery_app.amqp.router.route({}, task_name)
+
+    assert route["queue"].name == queue
+    assert route["priority"] == priority
+
+
+def test_explicit_bulk_route_overrides_task_default():
+    route = celery_app.amqp.router.route(queues.import_route(10**12, _cfg()), "ingest.import_file")
+
+    assert route["queue"].name == "ingest_bulk"
+    assert route["priority"] == queues.BULK_PRIORITY
+
+
+def test_worker_pools_get_one_metrics_port_each():
+    pools = queues.worker_pools(_cfg(), metrics_port_base=9200)
+
+    assert [pools[name].metrics_port for name in queues.QUEUE_NAMES] == [9200, 9201, 9202, 9203]
+
+
+def test_main_runs_worker_for_requested_queue(monkeypatch):
+    calls = []
+    monkeypatch.setenv("WORKER_METRICS_PORT", "9108")
+    app = types.SimpleNamespace(worker_main=calls.append)
+
+    queues.main(["maintenance"], app=app)
+
+    assert calls[0][:2] == ["worker", "--queues=maintenance"]
+    assert os.environ["WORKER_METRICS_PORT"] == str(queues.worker_pools()["maintenance"].metrics_port)
+    with pytest.raises(SystemExit):
+        queues.main(["unknown"], app=app)
@@ -9,14 +9,14 @@ from services.worker.repricer.app import main
 
 
 class StubResult:
-    def __init__(self, mapping):
-        self._mapping = mapping
+    def __init__(self, mappings):
+        self._mappings = mappings
 
     def mappings(self):
         return self
 
-    def first(self):
-        return self._mapping
+    def all(self):
+        return self._mappings
 
 
 class StubSession:
@@ -31,13 +31,9 @@ class StubSession:
         text_stmt = str(stmt)
         if "INSERT INTO price_updates_log" in text_stmt:
             self.inserts.append(params)
-            return StubResult(None)
+            return StubResult([])
 
-        asin = params["asin"]
-        mapping = self.rows.get(asin)
-        if mapping is None:
-            return StubResult(None)
-        return StubResult(mapping)
+        return StubResult([{"asin": asin, **self.rows[asin]} for asin in params["asins"] if asin in self.rows])
 
     async def commit(self):
         self.committed = True
@@ -112,7 +108,7 @@ async def test_apply_endpoint_inserts_log_and_marks_changed():
     assert body["results"][0]["changed"] is True
     assert len(stub.inserts) == 1
     logged = stub.inserts[0]
-    context = json.loads(logged["context"])
+    context = json.loads(logged["contexts"][0])
     assert context["note"] == "audit"
     assert context["applied"] == ["min_roi", "buybox_gap"]
     assert stub.committed is True
@@ -161,3 +157,39 @@ async def test_apply_endpoint_dry_run_skips_inserts():
     assert stub.committed is False
 
     main.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_simulate_and_apply_batch_lookups_and_log_rows():
+    asins = [f"ASIN{idx:07d}" for idx in range(50)]
+    stub = StubSession(
+        rows={asin: {"cost": Decimal("10"), "fees": Decimal("2"), "buybox_price": Decimal("16")} for asin in asins}
+    )
+
+    async def override_session():
+        yield stub
+
+    main.app.dependency_overrides[get_session] = override_session
+
+    apply_payload = {
+        "items": [{"asin": asin, "new_price": "15.68", "strategy": "min_roi+buybox_gap"} for asin in asins],
+    }
+    transport = ASGITransport(app=main.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        simulated = await client.post("/pricing/simulate", json={"items": [{"asin": asin} for asin in asins]})
+        lookups_after_simulate = len(stub.calls)
+        applied = await client.post("/pricing/apply", json=apply_payload)
+        missing = await client.post("/pricing/simulate", json={"items": [{"asin": asins[0]}, {"asin": "ASIN9999999"}]})
+
+    main.app.dependency_overrides.clear()
+
+    assert simulated.status_code == 200
+    assert [item["asin"] for item in simulated.json()["results"]] == asins
+    assert lookups_after_simulate == 1
+    assert applied.status_code == 200
+    assert applied.json()["applied"] == len(asins)
+    assert len(stub.calls) == 1 + 2 + 1
+    assert len(stub.inserts) == 1
+    assert stub.inserts[0]["asins"] == asins
+    assert missing.status_code == 404
+    assert missing.json()["detail"] == "ASIN ASIN9999999 not found"
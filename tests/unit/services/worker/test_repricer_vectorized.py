@@ -0,0 +1,119 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from services.worker.repricer.app import main
+from services.worker.repricer.app.logic import decide_price
+from services.worker.repricer.app.vectorized import reprice_columns
+
+
+def _money(rng: random.Random, *, optional: bool = False) -> Decimal | None:
+    if optional and rng.random() < 0.3:
+        return None
+    places = rng.choice([0, 1, 2, 2, 2, 3, 4])
+    return Decimal(rng.randint(0, 5_000_000)).scaleb(-places)
+
+
+def _corpus(seed: int, size: int) -> list[tuple[Decimal, Decimal, Decimal | None, Decimal | None]]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(size):
+        cost, fees = _money(rng), _money(rng)
+        buybox, map_price = _money(rng, optional=True), _money(rng, optional=True)
+        if rng.random() < 0.2:
+            # Land candidates on each other to exercise ties between strategies.
+            buybox = (cost + fees) * 2
+            map_price = rng.choice([buybox, map_price])
+        rows.append((cost, fees, buybox, map_price))
+    return rows
+
+
+@pytest.mark.parametrize(
+    ("seed", "min_roi", "undercut", "quant"),
+    [
+        (1, Decimal("0.15"), Decimal("0.02"), Decimal("0.01")),
+        (2, Decimal("0.05"), Decimal("0.05"), Decimal("0.10")),
+        (3, Decimal("0.333"), Decimal("0.5"), Decimal("1")),
+        (4, Decimal("-0.1"), Decimal("0"), Decimal("0.001")),
+        (5, Decimal("0.5"), Decimal("0.125"), Decimal("0")),
+        (6, Decimal("0.2"), Decimal("0.01"), Decimal("1E+1")),
+    ],
+)
+def test_reprice_columns_matches_decide_price(seed, min_roi, undercut, quant):
+    corpus = _corpus(seed, 2000)
+    corpus.append((Decimal("0.0025"), Decimal("0"), Decimal("0.005"), None))  # exact half-cent ties
+    corpus.append((Decimal("0"), Decimal("0"), None, None))
+
+    prices, labels = reprice_columns(
+        [row[0] for row in corpus],
+        [row[1] for row in corpus],
+        buybox=[row[2] for row in corpus],
+        map_price=[row[3] for row in corpus],
+        min_roi=min_roi,
+        undercut=undercut,
+        quant=quant,
+    )
+
+    for (cost, fees, buybox, map_price), price, label in zip(corpus, prices, labels, strict=True):
+        expected, explain = decide_price(
+            "ASIN",
+            cost,
+            fees,
+            buybox=buybox,
+            map_price=map_price,
+            min_roi=min_roi,
+            undercut=undercut,
+            quant=quant,
+        )
+        assert (price, str(price)) == (expected, str(expected)), (cost, fees, buybox, map_price)
+        assert label == "+".join(explain["applied"])
+
+
+def test_reprice_columns_falls_back_to_exact_ints_for_large_values():
+    cost = [Decimal("123456789012345.6789")]
+    fees = [Decimal("0.0001")]
+
+    prices, labels = reprice_columns(
+        cost, fees, min_roi=Decimal("0.15"), undercut=Decimal("0.02"), quant=Decimal("0.01")
+    )
+
+    expected, _ = decide_price(
+        "ASIN",
+        cost[0],
+        fees[0],
+        buybox=None,
+        map_price=None,
+        min_roi=Decimal("0.15"),
+        undercut=Decimal("0.02"),
+        quant=Decimal("0.01"),
+    )
+    assert prices == [expected]
+    assert labels == ["min_roi"]
+
+
+def test_reprice_columns_rejects_min_roi_of_one():
+    with pytest.raises(ValueError):
+        reprice_columns(
+            [Decimal("1")], [Decimal("1")], min_roi=Decimal("1"), undercut=Decimal("0"), quant=Decimal("0.01")
+        )
+
+
+@pytest.mark.asyncio
+async def test_stream_full_yields_chunks():
+    rows = [(f"ASIN{idx:07d}", Decimal(idx), Decimal("1.5")) for idx in range(5)]
+
+    class StubStream:
+        async def partitions(self, size):
+            for start in range(0, len(rows), size):
+                yield rows[start : start + size]
+
+    class StubSession:
+        async def stream(self, stmt):
+            return StubStream()
+
+    chunks = [chunk async for chunk in main.stream_full(StubSession(), chunk_size=2)]
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    flattened = [item for chunk in chunks for item in chunk]
+    assert [item.new_price for item in flattened] == [main.compute_price(*row) for row in rows]
@@ -295,3 +295,104 @@ def test_task_import_file_handles_missing_size(monkeypatch, tmp_path):
 
     assert calls["streaming"] is False
     assert result["streaming"] is False
+
+
+def _stub_sharded_import(monkeypatch, tmp_path, *, load_shard):
+    from etl import sharded
+
+    target = tmp_path / "ingest_upload" / "big.csv"
+    target.parent.mkdir()
+    rows = "".join(f'A{idx},"note {idx}\nsecond line",{idx}\n' for idx in range(100_000))
+    target.write_text("asin,note,qty\n" + rows, encoding="utf-8")
+    job = {
+        "status": "pending",
+        "load_log_id": 7,
+        "idempotency_key": "key",
+        "dialect": "returns_report",
+        "target_table": "returns_raw",
+        "delimiter": ",",
+        "payload_meta": {},
+        "started_at": 0.0,
+    }
+    failures: list[str] = []
+
+    def fake_prepare(path, plan, **kwargs):
+        return {**job, "header_end": plan.header_end, "shards": [list(shard) for shard in plan.ranges]}
+
+    def fake_finalize(job, results):
+        return {"status": "success", "rows": sum(result["rows"] for result in results), "shards": len(results)}
+
+    monkeypatch.setattr(tasks_module.celery_app.conf, "task_always_eager", True)
+    # Eager mode only re-runs ``self.retry`` when errors are not propagated, like a worker would.
+    monkeypatch.setattr(tasks_module.celery_app.conf, "task_eager_propagates", False)
+    monkeypatch.setattr(tasks_module, "_sharding_knobs", lambda: (True, 0, 1, 2))
+    monkeypatch.setattr(tasks_module, "_resolve_uri_to_path", lambda uri: Path(uri.removeprefix("file://")))
+    monkeypatch.setattr(tasks_module.task_import_file, "update_state", lambda *a, **k: None, raising=False)
+    monkeypatch.setattr(sharded, "prepare_sharded_import", fake_prepare)
+    monkeypatch.setattr(sharded, "load_shard", load_shard)
+    monkeypatch.setattr(sharded, "finalize_sharded_import", fake_finalize)
+    monkeypatch.setattr(sharded, "fail_sharded_import", lambda job, error: failures.append(error))
+    monkeypatch.setattr("etl.load_csv.import_file", lambda *a, **k: pytest.fail("whole-file import used"))
+    return target, failures
+
+
+def test_task_import_file_loads_large_csv_as_chord_of_shards(monkeypatch, tmp_path):
+    loaded: list[tuple[int, int, str]] = []
+
+    def fake_load_shard(header, body, *, job, start, end, task_id=None):
+        assert header == b"asin,note,qty\n"
+        loaded.append((start, end, body.decode()))
+        return {"status": "success", "rows": body.count(b"\nsecond line"), "start": start, "end": end}
+
+    target, failures = _stub_sharded_import(monkeypatch, tmp_path, load_shard=fake_load_shard)
+    body_text = target.read_text(encoding="utf-8").split("\n", 1)[1]
+
+    result = tasks_module.task_import_file.run(uri=f"file://{target}")
+
+    assert result == {"status": "success", "rows": 100_000, "shards": len(loaded)}
+    assert len(loaded) > 1
+    assert "".join(body for *_, body in sorted(loaded)) == body_text
+    assert all(body.startswith("A") for *_, body in loaded)
+    assert failures == []
+    assert not target.parent.exists()
+
+
+def test_task_import_shard_retries_only_the_failing_shard(monkeypatch, tmp_path):
+    attempts: dict[int, int] = {}
+
+    def flaky_load_shard(header, body, *, job, start, end, task_id=None):
+        attempts[start] = attempts.get(start, 0) + 1
+        if start == job["shards"][1][0] and attempts[start] == 1:
+            raise ConnectionError("server closed the connection")
+        return {"status": "success", "rows": 1, "start": start, "end": end}
+
+    target, failures = _stub_sharded_import(monkeypatch, tmp_path, load_shard=flaky_load_shard)
+
+    result = tasks_module.task_import_file.run(uri=f"file://{target}")
+
+    assert result["status"] == "success"
+    assert sorted(attempts.values()) == [1] * (len(attempts) - 1) + [2]
+    assert failures == []
+
+
+def test_task_import_file_marks_sharded_import_failed_after_retries(monkeypatch, tmp_path):
+    def broken_load_shard(header, body, *, job, start, end, task_id=None):
+        raise ConnectionError("server closed the connection")
+
+    target, failures = _stub_sharded_import(monkeypatch, tmp_path, load_shard=broken_load_shard)
+
+    with pytest.raises(ConnectionError):
+        tasks_module.task_import_file.run(uri=f"file://{target}")
+
+    assert failures == ["server closed the connection"]
+    assert not target.parent.exists()
+
+
+def test_should_shard_requires_plain_csv_over_threshold(tmp_path):
+    big = 600 * 1024 * 1024
+
+    assert tasks_module._should_shard(tmp_path / "a.csv", big, enabled=True, threshold_mb=512) is True
+    assert tasks_module._should_shard(tmp_path / "a.csv", big, enabled=False, threshold_mb=512) is False
+    assert tasks_module._should_shard(tmp_path / "a.csv", 10, enabled=True, threshold_mb=512) is False
+    assert tasks_module._should_shard(tmp_path / "a.xlsx", big, enabled=True, threshold_mb=512) is False
+    assert tasks_module._should_shard(tmp_path / "a.csv.gz", big, enabled=True, threshold_mb=512) is False